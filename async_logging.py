@@ -0,0 +1,108 @@
+"""
+Queued logging for ShamaOllama
+Log calls only append a record to a bounded in-memory queue; a background
+listener thread formats and writes them to a rotating file. Network and UI
+code paths that log security events never wait on the disk.
+"""
+
+import logging
+import logging.handlers
+import queue
+from pathlib import Path
+from typing import Optional, Union
+
+# Records buffered before the oldest are dropped
+DEFAULT_QUEUE_SIZE = 1000
+
+# Size-based rotation defaults
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks; drops the oldest record when full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+            # Make room by discarding the oldest buffered record
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that can stop and be waited on with a full queue"""
+
+    def enqueue_sentinel(self):
+        # The base class uses put_nowait, which fails on a full bounded queue
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        """Write out buffered records, then close the file handlers"""
+        if self._thread is not None:
+            super().stop()
+        for handler in self.handlers:
+            handler.close()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued record has been written"""
+        if self._thread is None:
+            return self.queue.unfinished_tasks == 0
+        # Queue.join() has no timeout, so wait on its condition directly
+        with self.queue.all_tasks_done:
+            if self.queue.unfinished_tasks:
+                self.queue.all_tasks_done.wait(timeout)
+            return self.queue.unfinished_tasks == 0
+
+
+def create_file_handler(
+    log_file: Union[str, Path],
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    when: Optional[str] = None,
+) -> logging.Handler:
+    """Rotating file handler: by time when `when` is set, otherwise by size"""
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=when, backupCount=backup_count, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+
+
+def attach_queued_file_logging(
+    logger: logging.Logger,
+    log_file: Union[str, Path],
+    formatter: Optional[logging.Formatter] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    when: Optional[str] = None,
+) -> FlushingQueueListener:
+    """Route a logger through a bounded queue to a rotating file
+
+    Returns the started listener; stop() it to flush and close the file.
+    """
+    file_handler = create_file_handler(log_file, max_bytes, backup_count, when)
+    if formatter is not None:
+        file_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    logger.addHandler(BoundedQueueHandler(log_queue))
+
+    listener = FlushingQueueListener(log_queue, file_handler)
+    listener.start()
+    return listener
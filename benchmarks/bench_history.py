@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Chat history retention benchmark for ShamaOllama
+Compares loading an unbounded chat_history.json with loading the hot history
+left by the retention policy, and reports archive size, search and
+on-demand load times for gzip and lzma segments.
+
+Usage:
+    python benchmarks/bench_history.py [--sessions 5000] [--keep 100]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from history_archive import HistoryArchive, split_for_retention  # noqa: E402
+
+WORDS = ["model", "token", "context", "python", "answer", "ollama", "gpu", "data"]
+
+
+def make_history(count, seed=1978):
+    """Synthetic sessions of 4-20 messages, oldest first"""
+    rng = random.Random(seed)
+    history = []
+    for i in range(count):
+        messages = []
+        for turn in range(rng.randint(2, 10)):
+            for role in ("user", "assistant"):
+                text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 120)))
+                messages.append({"role": role, "content": text, "model": "llama3.2"})
+        history.append(
+            {"title": f"Chat {i}", "timestamp": f"2025-07-28T12:{i % 60:02d}:00"}
+        )
+        history[-1]["messages"] = messages
+    history[count // 2]["messages"][0]["content"] += " shamalamadingdong"
+    return history
+
+
+def timed(function, repeat=3):
+    """Best-of-repeat seconds and the last result"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--keep", type=int, default=100)
+    args = parser.parse_args()
+
+    history = make_history(args.sessions)
+    keep, moved = split_for_retention(history, max_sessions=args.keep)
+
+    print("📦 ShamaOllama Chat History Retention Benchmark")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as work_dir:
+        work = Path(work_dir)
+        full_file = work / "full.json"
+        hot_file = work / "hot.json"
+        for path, sessions in [(full_file, history), (hot_file, keep)]:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(sessions, f, indent=2, ensure_ascii=False)
+
+        full_time, _ = timed(lambda: load_json(full_file))
+        hot_time, _ = timed(lambda: load_json(hot_file))
+        full_mb = full_file.stat().st_size / 1e6
+        hot_mb = hot_file.stat().st_size / 1e6
+        print(f"Launch load, {len(history)} sessions: {full_time * 1000:8.1f} ms")
+        print(f"  ({full_mb:.1f} MB)")
+        print(f"Launch load, {len(keep)} hot sessions:  {hot_time * 1000:8.1f} ms")
+        print(f"  ({hot_mb:.2f} MB)")
+
+        for compression in ["gzip", "lzma"]:
+            archive = HistoryArchive(work / compression, compression)
+            started = time.perf_counter()
+            archive.add(moved)
+            write_time = time.perf_counter() - started
+            size = sum(path.stat().st_size for path in (work / compression).iterdir())
+
+            search_time, results = timed(lambda: archive.search("shamalamadingdong"))
+            ref = archive.entries()[-1]["ref"]
+            load_time, _ = timed(lambda: archive.load_session(ref))
+            print(f"\n{compression} archive of {len(moved)} sessions:")
+            print(f"  size {size / 1e6:.2f} MB, written in {write_time:.2f} s")
+            print(f"  full-text search {search_time * 1000:.0f} ms")
+            print(f"  ({len(results)} match)")
+            print(f"  open one session {load_time * 1000:.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
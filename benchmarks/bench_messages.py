@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Chat message memory benchmark for ShamaOllama
+Builds a large chat history in the previous dict-per-message form and as
+slotted Message objects in MessageLog sessions, each in a fresh process, and
+reports resident memory growth and build time.
+
+Usage:
+    python benchmarks/bench_messages.py [--messages 1000000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from chat_messages import Message, MessageLog  # noqa: E402
+
+MODELS = ["llama3.2:latest", "mistral:7b", "qwen2.5:14b"]
+MESSAGES_PER_SESSION = 20
+
+
+def resident_bytes():
+    """Current resident set size (peak size where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def message_texts(count, seed=1978):
+    """Distinct short contents, generated before measuring"""
+    rng = random.Random(seed)
+    return [f"message {i} {rng.random():.6f}" for i in range(count)]
+
+
+def build_dicts(texts):
+    """The previous representation: a dict with an ISO string per message"""
+    start = datetime(2025, 7, 28, 12, 0)
+    history = []
+    for offset in range(0, len(texts), MESSAGES_PER_SESSION):
+        messages = []
+        for i in range(offset, min(offset + MESSAGES_PER_SESSION, len(texts))):
+            role = "user" if i % 2 == 0 else "assistant"
+            messages.append(
+                {
+                    "role": role,
+                    "content": texts[i],
+                    "timestamp": (start + timedelta(seconds=i)).isoformat(),
+                    # Names decoded from JSON are separate string objects
+                    "model": "".join(MODELS[i % len(MODELS)]),
+                }
+            )
+        history.append({"title": f"Chat {offset}", "messages": messages.copy()})
+    return history
+
+
+def build_slotted(texts):
+    """Slotted messages in copy-on-write session logs"""
+    start = datetime(2025, 7, 28, 12, 0).timestamp()
+    history = []
+    for offset in range(0, len(texts), MESSAGES_PER_SESSION):
+        session = MessageLog()
+        for i in range(offset, min(offset + MESSAGES_PER_SESSION, len(texts))):
+            role = "user" if i % 2 == 0 else "assistant"
+            model = "".join(MODELS[i % len(MODELS)])
+            session.append(Message(role, texts[i], start + i, model))
+        history.append({"title": f"Chat {offset}", "messages": session.snapshot()})
+    return history
+
+
+def measure(mode, count):
+    """Build one representation and report its cost as JSON"""
+    texts = message_texts(count)
+    gc.collect()
+    build = build_dicts if mode == "dict" else build_slotted
+    rss_before = resident_bytes()
+    started = time.perf_counter()
+    history = build(texts)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    rss = resident_bytes() - rss_before
+    print(json.dumps({"rss": rss, "seconds": elapsed}))
+    return len(history)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["dict", "slotted"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        measure(args.mode, args.messages)
+        return 0
+
+    print("🧮 ShamaOllama Chat Message Memory Benchmark")
+    print("=" * 60)
+    print(f"{args.messages:,} messages, {MESSAGES_PER_SESSION} per session")
+    print("(content strings are shared and excluded from both)\n")
+    results = {}
+    for mode in ["dict", "slotted"]:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--mode",
+                mode,
+                "--messages",
+                str(args.messages),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'':<10}{'resident MB':>14}{'build s':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<10}{result['rss'] / 1e6:>14.1f}{result['seconds']:>10.2f}")
+    saved = 1 - results["slotted"]["rss"] / max(1, results["dict"]["rss"])
+    print(f"\nResident memory saved: {saved:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
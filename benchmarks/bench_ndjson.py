@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+NDJSON streaming benchmark for ShamaOllama
+Replays a recorded 50k-token /api/chat stream through the old
+iter_lines() + json.loads(line.decode()) loop and through NDJSONStreamReader,
+and reports per-token CPU time for both.
+
+Usage:
+    python benchmarks/bench_ndjson.py [--tokens 50000] [--stream recorded.ndjson]
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests  # noqa: E402
+
+from ndjson_stream import NDJSONStreamReader, STREAM_CHUNK_SIZE  # noqa: E402
+
+WORDS = [
+    "the", "model", "streams", "tokens", "quickly", "über", "naïve", "日本語",
+    "code", "```python", "print(x)", 'say "hi"', "path\\to", "emoji 🎸", "and",
+]  # fmt: skip
+
+
+def record_stream(tokens: int, seed: int = 1978) -> bytes:
+    """Build a deterministic chat stream shaped like Ollama's output"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(tokens):
+        content = rng.choice(WORDS) + ("\n" if rng.random() < 0.05 else " ")
+        lines.append(
+            {
+                "model": "llama3.2:latest",
+                "created_at": f"2025-07-28T12:00:{i % 60:02d}.{i:06d}Z",
+                "message": {"role": "assistant", "content": content},
+                "done": False,
+            }
+        )
+    lines.append(
+        {
+            "model": "llama3.2:latest",
+            "created_at": "2025-07-28T12:01:00.000000Z",
+            "message": {"role": "assistant", "content": ""},
+            "done_reason": "stop",
+            "done": True,
+            "total_duration": 5_000_000_000,
+            "eval_count": tokens,
+        }
+    )
+    return b"".join(
+        json.dumps(line, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        + b"\n"
+        for line in lines
+    )
+
+
+class ChunkedRaw(io.RawIOBase):
+    """Raw stream returning one HTTP chunk per read, like chunked transfer"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return next(self.chunks, b"")
+
+
+def make_response(raw) -> requests.Response:
+    """Wrap a raw stream in a requests.Response"""
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = raw
+    return response
+
+
+def run_baseline(response) -> str:
+    """The previous OllamaAPI.chat streaming loop"""
+    parts = []
+    for line in response.iter_lines():
+        if line:
+            data = json.loads(line.decode())
+            if "message" in data and "content" in data["message"]:
+                parts.append(data["message"]["content"])
+            if data.get("done", False):
+                break
+    return "".join(parts)
+
+
+def run_reader(response) -> str:
+    """The NDJSONStreamReader loop used by OllamaAPI.chat"""
+    parts = []
+    reader = NDJSONStreamReader(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+    for content, data in reader.iter_chat():
+        if content:
+            parts.append(content)
+        if data is not None and data.get("done", False):
+            break
+    return "".join(parts)
+
+
+def measure(name, runner, make_raw, tokens, repeat):
+    """Best-of-N CPU time for one runner"""
+    best = None
+    result = ""
+    for _ in range(repeat):
+        response = make_response(make_raw())
+        started = time.process_time()
+        result = runner(response)
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {name:<28} {best * 1000:8.1f} ms  {best / tokens * 1e6:6.2f} µs/token")
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stream", help="replay a recorded NDJSON stream file")
+    args = parser.parse_args()
+
+    if args.stream:
+        data = Path(args.stream).read_bytes()
+    else:
+        data = record_stream(args.tokens)
+    lines = data.splitlines(keepends=True)
+    tokens = len(lines)
+
+    print("⚡ ShamaOllama NDJSON Streaming Benchmark")
+    print("=" * 60)
+    print(f"Stream: {tokens:,} lines, {len(data) / 1024:.0f} KB")
+
+    scenarios = [
+        ("one HTTP chunk per token", lambda: ChunkedRaw(lines)),
+        ("coalesced 64 KB reads", lambda: io.BytesIO(data)),
+    ]
+    for label, make_raw in scenarios:
+        print(f"\n{label}:")
+        base, expected = measure(
+            "iter_lines + json.loads", run_baseline, make_raw, tokens, args.repeat
+        )
+        new, result = measure(
+            "NDJSONStreamReader", run_reader, make_raw, tokens, args.repeat
+        )
+        if result != expected:
+            print("❌ Reader output differs from baseline")
+            return 1
+        print(f"  Speedup: {base / new:.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for ShamaOllama
+Measures cold `import main` time in a fresh interpreter, eager vs background
+chat history loading, and (when a display is available) time to the first
+interactive frame together with the panel build time that is now deferred.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--sessions 500]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Add parent directory to path to find main modules
+sys.path.insert(0, str(ROOT))
+
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(elapsed, int("gpu_info" in sys.modules))
+"""
+
+GUI_PROBE = """
+import time
+import main
+from startup_profiler import profiler
+
+app = main.ShamaOllamaGUI()
+while not any(label == "first interactive frame" for label, _ in profiler.marks):
+    app.root.update()
+first_frame = dict(profiler.marks)["first interactive frame"]
+
+started = time.perf_counter()
+for name in app.panel_builders:
+    app.get_panel(name)
+deferred = time.perf_counter() - started
+
+app.connection_monitor.stop()
+app.root.destroy()
+print(first_frame, deferred)
+"""
+
+
+def run_probe(code: str, home: str) -> str:
+    """Run a snippet in a fresh interpreter with an isolated home directory"""
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def write_history(home: str, sessions: int, messages: int = 40):
+    """Write a synthetic chat history file"""
+    data_dir = Path(home) / ".shamollama"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    history = [
+        {
+            "title": f"Chat {i}",
+            "timestamp": "2025-07-28T12:00:00",
+            "messages": [
+                {
+                    "role": "user" if j % 2 == 0 else "assistant",
+                    "content": "Shama lama ding dong " * 20,
+                    "timestamp": "2025-07-28T12:00:00",
+                    "model": "llama3.2:latest",
+                }
+                for j in range(messages)
+            ],
+        }
+        for i in range(sessions)
+    ]
+    history_file = data_dir / "chat_history.json"
+    history_file.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    return history_file.stat().st_size
+
+
+def bench_history(home: str, repeat: int):
+    """Compare ChatManager construction with eager and background history"""
+    os.environ["HOME"] = os.environ["USERPROFILE"] = home
+    from main import ChatManager
+
+    results = {}
+    for label, lazy in [("eager load_history()", False), ("lazy_history=True", True)]:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            manager = ChatManager(lazy_history=lazy)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+            if lazy:
+                manager.load_history()
+        results[label] = best
+        print(f"  {label:<28} {best * 1000:8.1f} ms on the Tk thread")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+
+    print("⏱️ ShamaOllama Startup Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as home:
+        print("\nCold import of main.py:")
+        timings = []
+        for _ in range(args.repeat):
+            elapsed, gpu_loaded = run_probe(IMPORT_PROBE, home).split()
+            timings.append(float(elapsed))
+        print(f"  {'import main (best)':<28} {min(timings) * 1000:8.1f} ms")
+        print(f"  {'gpu_info imported':<28} {'yes' if gpu_loaded == '1' else 'no'}")
+
+        size = write_history(home, args.sessions)
+        print(f"\nChat history ({args.sessions} sessions, {size / 1e6:.1f} MB):")
+        bench_history(home, args.repeat)
+
+        print("\nTime to first interactive frame:")
+        if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+            print("  skipped (no display available)")
+            return 0
+        first_frame, deferred = map(float, run_probe(GUI_PROBE, home).split())
+        print(f"  {'first interactive frame':<28} {first_frame * 1000:8.1f} ms")
+        print(f"  {'deferred panel builds':<28} {deferred * 1000:8.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
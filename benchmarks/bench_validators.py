@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Validator micro-benchmarks for ShamaOllama
+Times the SecurityValidator checks that run per model in get_models, per
+chat request and per URL, comparing the previous per-call regex
+compilation with the precompiled matchers, cold and with the LRU memo warm.
+
+Usage:
+    python benchmarks/bench_validators.py [--calls 20000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Add parent directory to path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from security import SecurityValidator, security  # noqa: E402
+
+MODEL_NAMES = [
+    f"{base}:{tag}"
+    for base in ["llama3.2", "mistral", "codellama", "phi3", "gemma2", "qwen2.5"]
+    for tag in ["latest", "7b", "13b-instruct-q4_K_M", "70b-q8_0"]
+]
+
+URLS = [
+    "http://localhost:11434",
+    "https://github.com/BlancuzziJ/Ollama-GUI",
+    "https://example.com/docs/api?query=1",
+    "javascript:alert('xss')",
+    "http://192.168.1.20:11434",
+]
+
+
+def baseline_model_name(model_name):
+    """The previous validate_model_name body"""
+    if not model_name or len(model_name) > SecurityValidator.MAX_MODEL_NAME_LENGTH:
+        return False
+    pattern = re.compile(r"^[a-zA-Z0-9._:-]+$")
+    return bool(pattern.match(model_name))
+
+
+def baseline_dangerous(text):
+    """The previous contains_dangerous_patterns body"""
+    text_lower = text.lower()
+    for pattern in SecurityValidator.DANGEROUS_PATTERNS:
+        if re.search(pattern, text_lower, re.IGNORECASE):
+            return True
+    return False
+
+
+def baseline_domain(domain):
+    """The previous validate_domain body"""
+    if not domain:
+        return False
+    host = domain.split(":")[0] if ":" in domain else domain
+    if host in ["localhost", "127.0.0.1", "::1"]:
+        return True
+    github_domains = [
+        "github.com",
+        "www.github.com",
+        "github.io",
+        "githubusercontent.com",
+    ]
+    if any(host.endswith(allowed) for allowed in github_domains):
+        return True
+    domain_pattern = re.compile(
+        r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)*[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?$"
+    )
+    return bool(domain_pattern.match(host))
+
+
+def make_message(length, seed=1978):
+    """Chat-like text without dangerous patterns"""
+    rng = random.Random(seed)
+    words = ["the", "model", "answer", "code", "print(x)", "<b>", "über", "data"]
+    text = ""
+    while len(text) < length:
+        text += rng.choice(words) + " "
+    return text[:length]
+
+
+def per_call(function, inputs, calls):
+    """Best-of-5 microseconds per call, cycling through inputs"""
+    count = len(inputs)
+
+    def run():
+        for i in range(calls):
+            function(inputs[i % count])
+
+    best = min(timeit.repeat(run, number=1, repeat=5))
+    return best / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    domains = [url.split("//")[-1].split("/")[0] for url in URLS]
+    suites = [
+        (
+            "validate_model_name",
+            baseline_model_name,
+            security.validate_model_name,
+            MODEL_NAMES,
+        ),
+        (
+            "contains_dangerous (URLs)",
+            baseline_dangerous,
+            security.contains_dangerous_patterns,
+            URLS,
+        ),
+        (
+            "contains_dangerous (2 KB msg)",
+            baseline_dangerous,
+            security.contains_dangerous_patterns,
+            [make_message(2000, seed) for seed in range(4)],
+        ),
+        (
+            "contains_dangerous (10 KB msg)",
+            baseline_dangerous,
+            security.contains_dangerous_patterns,
+            [make_message(10_000, seed) for seed in range(4)],
+        ),
+        ("validate_domain", baseline_domain, security.validate_domain, domains),
+    ]
+
+    print("⚡ ShamaOllama Validator Micro-Benchmarks")
+    print("=" * 72)
+    print(f"{'check':<32}{'baseline':>12}{'compiled':>12}{'memoized':>12}  µs/call")
+
+    for name, baseline, current, inputs in suites:
+        for value in inputs:
+            if baseline(value) != current(value):
+                print(f"❌ {name} disagrees with the baseline on {value[:40]!r}")
+                return 1
+
+        base = per_call(baseline, inputs, args.calls)
+
+        def cold(value, current=current):
+            security.clear_validation_cache()
+            return current(value)
+
+        compiled = per_call(cold, inputs, args.calls)
+        memoized = per_call(current, inputs, args.calls)
+        print(f"{name:<32}{base:>12.2f}{compiled:>12.2f}{memoized:>12.2f}")
+
+    print("\n'compiled' clears the memo before every call (includes that cost)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Local Ollama blob store analysis for ShamaOllama
+Ollama stores every model as a manifest (manifests/<registry>/<namespace>/
+<model>/<tag>) listing content-addressed layers kept once in blobs/
+(sha256-<hex>). Models built from the same weights share layers, so the
+per-model sizes from /api/tags add up to more than the disk actually holds.
+This module indexes which models use each layer to report real versus
+apparent usage, the shared layers, and the bytes deleting models would
+free. Parsed manifests are cached by mtime, so rescans only read manifests
+that changed.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from memory_fit import MB, format_size
+
+DEFAULT_REGISTRY = "registry.ollama.ai"
+
+CACHE_VERSION = 1
+
+# Shared layers listed in the usage report
+REPORT_SHARED_LAYERS = 10
+
+
+def default_models_dir() -> Path:
+    """Ollama's model directory: OLLAMA_MODELS or ~/.ollama/models"""
+    configured = os.environ.get("OLLAMA_MODELS")
+    return Path(configured) if configured else Path.home() / ".ollama" / "models"
+
+
+def model_name_from_path(parts: Tuple[str, ...]) -> str:
+    """Model name for a manifest path below manifests/
+
+    registry.ollama.ai/library/llama3.2/latest -> llama3.2:latest
+    registry.ollama.ai/jmorgan/phi/2b -> jmorgan/phi:2b
+    """
+    repository = "/".join(parts[:-1])
+    for prefix in (f"{DEFAULT_REGISTRY}/library/", f"{DEFAULT_REGISTRY}/"):
+        if repository.startswith(prefix):
+            repository = repository[len(prefix) :]
+            break
+    return f"{repository}:{parts[-1]}"
+
+
+def blob_file_name(digest: str) -> str:
+    """File name of a layer in blobs/ ("sha256:ab.." -> "sha256-ab..")"""
+    return digest.replace(":", "-", 1)
+
+
+def parse_manifest(path: Path) -> List[Tuple[str, int]]:
+    """(digest, size) of the config and every layer of a manifest"""
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    entries = [manifest.get("config") or {}] + list(manifest.get("layers") or [])
+    return [
+        (entry["digest"], int(entry.get("size") or 0))
+        for entry in entries
+        if isinstance(entry, dict) and entry.get("digest")
+    ]
+
+
+class BlobStoreIndex:
+    """Layer-to-models index over a local Ollama model directory"""
+
+    def __init__(
+        self, models_dir: Optional[Path] = None, cache_file: Optional[Path] = None
+    ):
+        self.models_dir = (
+            Path(models_dir).expanduser() if models_dir else default_models_dir()
+        )
+        if cache_file is None:
+            data_dir = Path.home() / ".shamollama"
+            data_dir.mkdir(exist_ok=True)
+            cache_file = data_dir / "blob_manifests.json"
+        self.cache_file = Path(cache_file)
+        self._lock = threading.Lock()
+        # Manifest path -> {mtime_ns, size, model, layers}
+        self._manifests: Dict[str, Dict] = {}
+        self.models: Dict[str, List[Tuple[str, int]]] = {}  # model -> layers
+        self.layer_models: Dict[str, Set[str]] = {}  # digest -> models
+        self.layer_sizes: Dict[str, int] = {}
+        self.blob_sizes: Dict[str, int] = {}  # blob file name -> bytes on disk
+        self.parsed = 0  # Manifests read by the last scan
+        self.load()
+
+    def load(self):
+        """Load cached manifest parses from disk"""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._manifests = {
+                    path: dict(
+                        entry, layers=[tuple(layer) for layer in entry["layers"]]
+                    )
+                    for path, entry in data.get("manifests", {}).items()
+                }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.debug(f"Failed to load blob manifest cache: {e}")
+            self._manifests = {}
+
+    def save(self):
+        """Persist cached manifest parses to disk"""
+        with self._lock:
+            data = {"version": CACHE_VERSION, "manifests": dict(self._manifests)}
+        try:
+            temp_file = self.cache_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            temp_file.replace(self.cache_file)
+        except Exception as e:
+            logging.debug(f"Failed to save blob manifest cache: {e}")
+
+    def exists(self) -> bool:
+        """Whether the model directory has a manifests/ folder"""
+        return (self.models_dir / "manifests").is_dir()
+
+    def scan(self) -> int:
+        """Re-read changed manifests and blob sizes; returns manifests parsed"""
+        manifests_dir = self.models_dir / "manifests"
+        seen: Dict[str, Dict] = {}
+        parsed = 0
+        for root, dirs, files in os.walk(manifests_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for file_name in files:
+                if file_name.startswith("."):
+                    continue
+                path = Path(root) / file_name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                key = str(path)
+                entry = self._manifests.get(key)
+                if (
+                    entry is None
+                    or entry["mtime_ns"] != stat.st_mtime_ns
+                    or entry["size"] != stat.st_size
+                ):
+                    try:
+                        layers = parse_manifest(path)
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        logging.debug(f"Skipping unreadable manifest {path}: {e}")
+                        continue
+                    parts = path.relative_to(manifests_dir).parts
+                    entry = {
+                        "mtime_ns": stat.st_mtime_ns,
+                        "size": stat.st_size,
+                        "model": model_name_from_path(parts),
+                        "layers": layers,
+                    }
+                    parsed += 1
+                seen[key] = entry
+
+        blob_sizes = {}
+        try:
+            with os.scandir(self.models_dir / "blobs") as scan:
+                for blob in scan:
+                    if blob.is_file(follow_symlinks=False):
+                        blob_sizes[blob.name] = blob.stat().st_size
+        except FileNotFoundError:
+            pass
+
+        models: Dict[str, List[Tuple[str, int]]] = {}
+        layer_models: Dict[str, Set[str]] = {}
+        layer_sizes: Dict[str, int] = {}
+        for entry in seen.values():
+            models[entry["model"]] = entry["layers"]
+            for digest, size in entry["layers"]:
+                layer_models.setdefault(digest, set()).add(entry["model"])
+                layer_sizes[digest] = size
+
+        changed = parsed or len(seen) != len(self._manifests)
+        with self._lock:
+            self._manifests = seen
+            self.models = models
+            self.layer_models = layer_models
+            self.layer_sizes = layer_sizes
+            self.blob_sizes = blob_sizes
+            self.parsed = parsed
+        if changed:
+            self.save()
+        return parsed
+
+    def _layer_bytes(self, digest: str) -> int:
+        """Bytes a layer takes on disk, or its manifest size if missing"""
+        return self.blob_sizes.get(blob_file_name(digest), self.layer_sizes[digest])
+
+    def reclaimable(self, model_names: Iterable[str]) -> int:
+        """Bytes deleting these models would free: layers no other model uses"""
+        selection = set(model_names)
+        with self._lock:
+            return sum(
+                self._layer_bytes(digest)
+                for digest, users in self.layer_models.items()
+                if users <= selection and users & selection
+            )
+
+    def model_usage(self, model_name: str) -> Dict[str, int]:
+        """Apparent size of a model and the part of it shared with others"""
+        with self._lock:
+            layers = self.models.get(model_name, [])
+            shared = sum(
+                self._layer_bytes(digest)
+                for digest, _ in layers
+                if len(self.layer_models[digest]) > 1
+            )
+            total = sum(self._layer_bytes(digest) for digest, _ in layers)
+        return {"total": total, "shared": shared, "unique": total - shared}
+
+    def report(self) -> Dict:
+        """Real versus apparent usage, shared layers and unreferenced blobs"""
+        with self._lock:
+            apparent = sum(
+                self._layer_bytes(digest)
+                for layers in self.models.values()
+                for digest, _ in layers
+            )
+            real = sum(self._layer_bytes(digest) for digest in self.layer_models)
+            shared = sorted(
+                (
+                    {
+                        "digest": digest,
+                        "size": self._layer_bytes(digest),
+                        "models": sorted(users),
+                    }
+                    for digest, users in self.layer_models.items()
+                    if len(users) > 1
+                ),
+                key=lambda layer: -layer["size"],
+            )
+            referenced = {blob_file_name(digest) for digest in self.layer_models}
+            unreferenced = {
+                name: size
+                for name, size in self.blob_sizes.items()
+                if name not in referenced
+            }
+            missing = [
+                digest
+                for digest in self.layer_models
+                if blob_file_name(digest) not in self.blob_sizes
+            ]
+            return {
+                "models": len(self.models),
+                "layers": len(self.layer_models),
+                "apparent_bytes": apparent,
+                "real_bytes": real,
+                "saved_bytes": apparent - real,
+                "shared_layers": shared,
+                "unreferenced_bytes": sum(unreferenced.values()),
+                "unreferenced_blobs": sorted(unreferenced),
+                "missing_blobs": sorted(missing),
+            }
+
+
+def format_bytes(size: int) -> str:
+    """Format a byte count as MB or GB"""
+    return format_size(size / MB)
+
+
+def format_usage_report(
+    index: BlobStoreIndex, selected: Optional[Iterable[str]] = None
+) -> str:
+    """Plain-text disk usage report, with what deleting selected would free"""
+    report = index.report()
+    lines = [
+        f"📁 {index.models_dir}",
+        f"{report['models']} models, {report['layers']} distinct layers",
+        f"Listed model sizes: {format_bytes(report['apparent_bytes'])}",
+        f"Actually on disk:   {format_bytes(report['real_bytes'])} "
+        f"({format_bytes(report['saved_bytes'])} saved by shared layers)",
+    ]
+    if report["unreferenced_blobs"]:
+        lines.append(
+            f"Unreferenced blobs: {len(report['unreferenced_blobs'])} files, "
+            f"{format_bytes(report['unreferenced_bytes'])}"
+        )
+    if report["missing_blobs"]:
+        lines.append(f"⚠️ Layers missing from blobs/: {len(report['missing_blobs'])}")
+
+    selected = sorted(selected or [])
+    if selected:
+        lines.append("")
+        lines.append(
+            f"Deleting the {len(selected)} selected models frees "
+            f"{format_bytes(index.reclaimable(selected))}"
+        )
+
+    lines += ["", "Per model (size / only in this model):"]
+    for name in sorted(index.models):
+        usage = index.model_usage(name)
+        lines.append(
+            f"  {name}: {format_bytes(usage['total'])} / "
+            f"{format_bytes(usage['unique'])}"
+        )
+
+    if report["shared_layers"]:
+        lines += ["", "Largest shared layers:"]
+        for layer in report["shared_layers"][:REPORT_SHARED_LAYERS]:
+            lines.append(
+                f"  {layer['digest'][:19]} {format_bytes(layer['size'])} "
+                f"used by {', '.join(layer['models'])}"
+            )
+    return "\n".join(lines)
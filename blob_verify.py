@@ -0,0 +1,257 @@
+"""
+Blob integrity verification for ShamaOllama
+Ollama names every blob after the sha256 of its content (blobs/sha256-<hex>),
+so a blob can be checked by hashing it again. Blobs are hashed in parallel
+in a process pool through memory-mapped (or large buffered) reads, with
+progress reported in bytes/s. Blobs that verified are remembered by
+(inode, size, mtime), so checking an unchanged store again is near-instant.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Bytes hashed per update; large enough that hashing, not Python, dominates
+READ_BLOCK = 8 * 1024 * 1024
+
+# Seconds between progress reports
+PROGRESS_INTERVAL = 0.5
+
+# Hash in-process below this many bytes; a pool costs more than it saves
+POOL_MIN_BYTES = 64 * 1024 * 1024
+
+BLOB_NAME = re.compile(r"^sha256-([0-9a-f]{64})$")
+
+CACHE_VERSION = 1
+
+# Bytes hashed so far, shared with pool workers
+_hashed_bytes = None
+
+
+def _init_worker(counter):
+    global _hashed_bytes
+    _hashed_bytes = counter
+
+
+def _count(size: int):
+    if _hashed_bytes is not None:
+        with _hashed_bytes.get_lock():
+            _hashed_bytes.value += size
+
+
+def hash_file(path: str) -> str:
+    """sha256 hex digest of a file, read through mmap or a reused buffer"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None  # Empty files and filesystems without mmap
+        if mapped is not None:
+            with mapped:
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, len(view), READ_BLOCK):
+                        block = view[start : start + READ_BLOCK]
+                        digest.update(block)
+                        _count(len(block))
+                        block.release()
+                finally:
+                    view.release()
+        else:
+            buffer = bytearray(READ_BLOCK)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+                _count(read)
+    return digest.hexdigest()
+
+
+def _signature(stat: os.stat_result) -> List[int]:
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+class BlobVerifier:
+    """Checks blobs against their digest names, caching good results"""
+
+    def __init__(
+        self,
+        models_dir: Path,
+        cache_file: Optional[Path] = None,
+        workers: Optional[int] = None,
+    ):
+        self.blobs_dir = Path(models_dir) / "blobs"
+        if cache_file is None:
+            data_dir = Path.home() / ".shamollama"
+            data_dir.mkdir(exist_ok=True)
+            cache_file = data_dir / "blob_verified.json"
+        self.cache_file = Path(cache_file)
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self._lock = threading.Lock()
+        self._verified: Dict[str, List[int]] = {}  # blob path -> signature
+        self.load()
+
+    def load(self):
+        """Load remembered results from disk"""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._verified = data.get("verified", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.debug(f"Failed to load blob verification cache: {e}")
+            self._verified = {}
+
+    def save(self):
+        """Persist remembered results to disk"""
+        with self._lock:
+            data = {"version": CACHE_VERSION, "verified": dict(self._verified)}
+        try:
+            temp_file = self.cache_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            temp_file.replace(self.cache_file)
+        except Exception as e:
+            logging.debug(f"Failed to save blob verification cache: {e}")
+
+    def blobs(self, digests: Optional[Iterable[str]] = None) -> List[Tuple[Path, str]]:
+        """(path, expected hex digest) of complete blobs, optionally limited
+
+        digests are "sha256:<hex>" as in manifests; partial downloads and
+        other files are skipped.
+        """
+        wanted = None
+        if digests is not None:
+            wanted = {d.split(":", 1)[-1] for d in digests}
+        found = []
+        try:
+            with os.scandir(self.blobs_dir) as scan:
+                for entry in scan:
+                    match = BLOB_NAME.match(entry.name)
+                    if not match or not entry.is_file(follow_symlinks=False):
+                        continue
+                    if wanted is None or match.group(1) in wanted:
+                        found.append((Path(entry.path), match.group(1)))
+        except FileNotFoundError:
+            pass
+        return sorted(found)
+
+    def verify(
+        self,
+        digests: Optional[Iterable[str]] = None,
+        progress: Optional[Callable[[int, int, float], None]] = None,
+    ) -> Dict:
+        """Hash blobs that changed since they last verified
+
+        progress(done_bytes, total_bytes, bytes_per_second) is called while
+        hashing. Returns counts of verified and cached blobs, the names of
+        corrupt blobs, unreadable blobs with their errors, and throughput.
+        """
+        pending: Dict[str, Tuple[str, List[int]]] = {}
+        cached = 0
+        for path, expected in self.blobs(digests):
+            try:
+                signature = _signature(path.stat())
+            except OSError:
+                continue
+            if self._verified.get(str(path)) == signature:
+                cached += 1
+            else:
+                pending[str(path)] = (expected, signature)
+
+        total = sum(signature[1] for _, signature in pending.values())
+        started = time.perf_counter()
+        corrupt: List[str] = []
+        errors: Dict[str, str] = {}
+
+        def check(path: str, actual: Optional[str], error: Optional[str] = None):
+            expected, signature = pending[path]
+            name = Path(path).name
+            if error is not None:
+                errors[name] = error
+            elif actual == expected:
+                with self._lock:
+                    self._verified[path] = signature
+            else:
+                corrupt.append(name)
+                with self._lock:
+                    self._verified.pop(path, None)
+
+        # Spawned, not forked: forking the multithreaded GUI can deadlock
+        context = multiprocessing.get_context("spawn")
+        counter = context.Value("q", 0)
+        if total < POOL_MIN_BYTES or self.workers == 1 or len(pending) == 1:
+            _init_worker(counter)
+            try:
+                for path in pending:
+                    try:
+                        check(path, hash_file(path))
+                    except OSError as e:
+                        check(path, None, str(e))
+                    if progress:
+                        elapsed = time.perf_counter() - started
+                        done = counter.value
+                        progress(done, total, done / elapsed if elapsed else 0.0)
+            finally:
+                _init_worker(None)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(pending)),
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(counter,),
+            ) as pool:
+                # Largest first, so one big blob doesn't finish last alone
+                order = sorted(pending, key=lambda p: -pending[p][1][1])
+                futures = {pool.submit(hash_file, path): path for path in order}
+                remaining = set(futures)
+                while remaining:
+                    finished, remaining = wait(
+                        remaining,
+                        timeout=PROGRESS_INTERVAL,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in finished:
+                        try:
+                            check(futures[future], future.result())
+                        except OSError as e:
+                            check(futures[future], None, str(e))
+                    if progress:
+                        elapsed = time.perf_counter() - started
+                        done = counter.value
+                        progress(done, total, done / elapsed if elapsed else 0.0)
+
+        # Forget blobs that no longer exist
+        with self._lock:
+            self._verified = {
+                path: signature
+                for path, signature in self._verified.items()
+                if os.path.exists(path)
+            }
+        if pending:
+            self.save()
+        seconds = time.perf_counter() - started
+        return {
+            "checked": len(pending),
+            "cached": cached,
+            "verified": len(pending) - len(corrupt) - len(errors) + cached,
+            "corrupt": sorted(corrupt),
+            "errors": errors,
+            "bytes": total,
+            "seconds": seconds,
+            "bytes_per_second": total / seconds if seconds else 0.0,
+        }
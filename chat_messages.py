@@ -0,0 +1,203 @@
+"""
+Compact chat messages for ShamaOllama
+Messages are slotted objects with interned role and model strings and float
+timestamps instead of dicts holding ISO strings. Sessions are append-only
+message logs whose snapshots share storage until one side changes. Both
+convert to the existing chat_history.json shape when written out, and
+messages still support msg["role"] style access.
+"""
+
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+FIELDS = ("role", "content", "timestamp", "model")
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Seconds since the epoch from an ISO timestamp (or a number)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Local ISO timestamp, as datetime.now().isoformat() writes it"""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+class Message:
+    """One chat message; reads like the dict it replaces"""
+
+    __slots__ = ("role", "content", "timestamp", "model", "extra")
+
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        timestamp: Optional[float] = None,
+        model: str = "",
+        extra: Optional[Dict] = None,
+    ):
+        # A history repeats a handful of roles and models; share one copy
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.model = sys.intern(model or "")
+        self.extra = extra  # Unknown keys from the file, kept for round trips
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Message":
+        """Build a message from its JSON form"""
+        extra = {key: value for key, value in data.items() if key not in FIELDS}
+        message = cls(
+            str(data.get("role", "")),
+            data.get("content", ""),
+            0.0,
+            data.get("model") or "",
+            extra or None,
+        )
+        # Keep messages without a readable time undated rather than "now"
+        message.timestamp = parse_timestamp(data.get("timestamp"))
+        return message
+
+    def to_dict(self) -> Dict:
+        """The chat_history.json form of this message"""
+        data: Dict[str, Any] = {"role": self.role, "content": self.content}
+        if self.timestamp is not None:
+            data["timestamp"] = format_timestamp(self.timestamp)
+        data["model"] = self.model
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "timestamp":
+            if self.timestamp is None:
+                raise KeyError(key)
+            return format_timestamp(self.timestamp)
+        if key in FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict.get() equivalent"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Message):
+            return all(
+                getattr(self, name) == getattr(other, name)
+                for name in Message.__slots__
+            )
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Message({self.role!r}, {self.content[:40]!r}, model={self.model!r})"
+
+
+class MessageLog(Sequence):
+    """Append-only message list whose snapshots share storage
+
+    snapshot() is O(1): the snapshot and the original point at the same
+    list, each with its own length. Appending to the longest view writes in
+    place; any other change copies the visible part first.
+    """
+
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, messages: Iterable[Message] = ()):
+        self._items: List[Message] = list(messages)
+        self._length = len(self._items)
+
+    @classmethod
+    def from_dicts(cls, messages: Iterable[Union[Dict, Message]]) -> "MessageLog":
+        """Build a log from JSON messages (or existing Message objects)"""
+        if isinstance(messages, MessageLog):
+            return messages.snapshot()
+        return cls(
+            message if isinstance(message, Message) else Message.from_dict(message)
+            for message in messages
+        )
+
+    def snapshot(self) -> "MessageLog":
+        """A view of the current messages that later changes do not affect"""
+        view = MessageLog.__new__(MessageLog)
+        view._items = self._items
+        view._length = self._length
+        return view
+
+    copy = snapshot
+
+    def _own(self):
+        """Copy the storage if it is shared with a longer view"""
+        if len(self._items) != self._length:
+            self._items = self._items[: self._length]
+
+    def append(self, message: Message):
+        """Add a message at the end"""
+        self._own()
+        self._items.append(message)
+        self._length += 1
+
+    def clear(self):
+        """Remove every message (other views keep theirs)"""
+        self._items = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[: self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("message index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[Message]:
+        items = self._items
+        for i in range(self._length):
+            yield items[i]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (MessageLog, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageLog({self._length} messages)"
+
+    def to_dicts(self) -> List[Dict]:
+        """The chat_history.json form of these messages"""
+        return [message.to_dict() for message in self]
+
+
+def json_default(value: Any) -> Any:
+    """json.dump(default=...) hook for messages and logs"""
+    if isinstance(value, Message):
+        return value.to_dict()
+    if isinstance(value, MessageLog):
+        return value.to_dicts()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def load_sessions(sessions: List[Dict]) -> List[Dict]:
+    """Convert the messages of sessions read from JSON in place"""
+    for session in sessions:
+        if isinstance(session, dict) and "messages" in session:
+            session["messages"] = MessageLog.from_dicts(session["messages"])
+    return sessions
@@ -0,0 +1,137 @@
+"""
+Connection monitor for ShamaOllama
+A single long-lived health checker that probes Ollama on a background
+thread, backs off exponentially while the server is down, probes faster for
+a short time after it comes back, and publishes results as events instead
+of touching Tk widgets from the worker thread.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+SPARKLINE_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+class ConnectionMonitor:
+    """Long-lived Ollama health monitor with exponential backoff"""
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        publish: Callable[[Dict], None],
+        interval: float = 10.0,
+        fast_interval: float = 2.0,
+        fast_period: float = 30.0,
+        failure_interval: float = 2.0,
+        max_backoff: float = 120.0,
+        history_size: int = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.probe = probe
+        self.publish = publish
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.fast_period = fast_period
+        self.failure_interval = failure_interval
+        self.max_backoff = max_backoff
+        self.clock = clock
+
+        self.connected: Optional[bool] = None
+        self.consecutive_failures = 0
+        self.recovered_at: Optional[float] = None
+        self.latency_history = deque(maxlen=history_size)
+
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the monitor thread if it is not already running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ConnectionMonitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the monitor thread"""
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def wake(self):
+        """Probe immediately, e.g. after the Ollama URL changed"""
+        self._wake_event.set()
+
+    def _run(self):
+        """Monitor loop: probe, publish, sleep until the next probe"""
+        while not self._stop_event.is_set():
+            delay = self.step()
+            self._wake_event.wait(delay)
+            self._wake_event.clear()
+
+    def step(self) -> float:
+        """Run one probe, publish the result and return the next delay"""
+        started = self.clock()
+        try:
+            is_connected = bool(self.probe())
+        except Exception:
+            is_connected = False
+        finished = self.clock()
+        latency_ms = (finished - started) * 1000
+
+        changed = is_connected != self.connected
+        if is_connected:
+            self.latency_history.append(latency_ms)
+            if changed:
+                self.recovered_at = finished
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+            self.recovered_at = None
+        self.connected = is_connected
+
+        self.publish(
+            {
+                "type": "connection",
+                "connected": is_connected,
+                "changed": changed,
+                "latency_ms": latency_ms if is_connected else None,
+                "history": list(self.latency_history),
+            }
+        )
+        return self.next_delay(finished)
+
+    def next_delay(self, now: Optional[float] = None) -> float:
+        """Seconds until the next probe given the current state"""
+        if now is None:
+            now = self.clock()
+
+        if not self.connected:
+            backoff = self.failure_interval * (2 ** (self.consecutive_failures - 1))
+            return min(self.max_backoff, backoff)
+
+        if self.recovered_at is not None and now - self.recovered_at < self.fast_period:
+            return self.fast_interval
+
+        return self.interval
+
+
+def render_sparkline(values: List[float]) -> str:
+    """Render values as a compact unicode sparkline"""
+    if not values:
+        return ""
+
+    low = min(values)
+    high = max(values)
+    span = high - low
+    if span <= 0:
+        return SPARKLINE_BLOCKS[0] * len(values)
+
+    scale = len(SPARKLINE_BLOCKS) - 1
+    return "".join(
+        SPARKLINE_BLOCKS[int(round((value - low) / span * scale))] for value in values
+    )
@@ -0,0 +1,512 @@
+"""
+Local document retrieval for ShamaOllama chats
+Folders and files attached to chats are read as a stream of line-aligned
+chunks, embedded in batches through /api/embed by a small worker pool and
+stored in a memory-mapped float32 matrix (vector_store.VectorStore) under
+the data directory. Chunk text is not copied: each row records the file, byte
+offset and length, and is read back when retrieved. A refresh only embeds
+files whose size and mtime changed and whose content hash differs, so a
+large corpus is not embedded again; rows of replaced or removed files are
+skipped and compacted away once they pile up. One index serves every
+chat; retrieval is limited to the sources attached to the chat at hand.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from vector_store import VectorStore
+
+# Files read as text; anything else in an attached folder is ignored
+TEXT_SUFFIXES = {
+    ".txt", ".md", ".rst", ".org", ".tex", ".csv", ".tsv", ".json", ".yaml",
+    ".yml", ".toml", ".ini", ".cfg", ".log", ".html", ".htm", ".xml", ".py",
+    ".js", ".ts", ".java", ".c", ".h", ".cpp", ".hpp", ".cs", ".go", ".rs",
+    ".rb", ".php", ".sh", ".sql",
+}  # fmt: skip
+
+# Larger files are skipped
+MAX_FILE_BYTES = 50 * 1024 * 1024
+
+# Target chunk size; chunks end at a line break once they reach it
+CHUNK_BYTES = 1500
+
+# Chunks sent per /api/embed request, and requests in flight at once
+EMBED_BATCH = 32
+EMBED_WORKERS = 4
+
+# Seconds between sidecar saves while indexing
+SAVE_INTERVAL = 2.0
+
+# Compact the matrix once this share of rows belongs to old file versions
+COMPACT_RATIO = 0.25
+
+# Chunks scoring below this are not worth putting in front of the model
+MIN_SCORE = 0.3
+
+INDEX_VERSION = 1
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+def iter_files(source: Path) -> Iterator[Path]:
+    """Text files of an attached file or folder, skipping hidden entries"""
+    if source.is_file():
+        yield source
+        return
+    for path in sorted(source.rglob("*")):
+        relative = path.relative_to(source).parts
+        if any(part.startswith(".") for part in relative):
+            continue
+        if path.suffix.lower() in TEXT_SUFFIXES and path.is_file():
+            yield path
+
+
+def within(path: str, sources: List[str]) -> bool:
+    """Whether path is one of sources or inside one of them"""
+    return any(
+        path == source or path.startswith(source.rstrip(os.sep) + os.sep)
+        for source in sources
+    )
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_chunks(path: Path, chunk_bytes: int = CHUNK_BYTES) -> Iterator[Tuple]:
+    """(byte offset, byte length, text) of consecutive chunks of a file
+
+    The file is streamed; lines longer than a chunk are split. Chunks with
+    nothing but whitespace are skipped.
+    """
+    with open(path, "rb") as f:
+        start, size, parts = 0, 0, []
+        for line in iter(lambda: f.readline(chunk_bytes), b""):
+            parts.append(line)
+            size += len(line)
+            if size >= chunk_bytes:
+                text = b"".join(parts).decode("utf-8", errors="replace")
+                if text.strip():
+                    yield start, size, text
+                start, size, parts = start + size, 0, []
+        text = b"".join(parts).decode("utf-8", errors="replace")
+        if text.strip():
+            yield start, size, text
+
+
+class DocumentIndex:
+    """Embedded chunks of attached documents with top-k retrieval"""
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.meta_file = self.index_dir / "documents.json"
+        self.store = VectorStore(self.index_dir / "chunks.f32")
+        self.model = ""
+        self.embed: Optional[Embedder] = None
+        self.top_k = 4  # Chunks added to a chat request; 0 turns retrieval off
+        self.sources: List[str] = []  # Attached to any chat
+        # Indexed version of each file: id, mtime_ns, size, sha256, chunks
+        self.files: Dict[str, Dict] = {}
+        # (file id, byte offset, byte length) of each matrix row
+        self.rows: List[Tuple[int, int, int]] = []
+        self.next_id = 1
+        self.error: Optional[str] = None
+        # Called with (files indexed, files still to embed); -1 on failure
+        self.on_progress: Optional[Callable[[int, int], None]] = None
+        self._lock = threading.RLock()
+        self._stale: Optional[Set[int]] = None  # Rows of replaced files
+        self._saved_at = 0.0
+        self._refresh_requested = False
+        self._worker: Optional[threading.Thread] = None
+        self.load()
+
+    # Persistence
+
+    def load(self):
+        """Load the sidecar and drop matrix rows it does not describe"""
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                raise ValueError("unsupported index version")
+            self.model = data["model"]
+            self.store.dim = data["dim"]
+            self.sources = data["sources"]
+            self.files = data["files"]
+            self.rows = [tuple(row) for row in data["rows"]]
+            self.next_id = data["next_id"]
+        except FileNotFoundError:
+            self.store.reset()
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Rebuilding document index: {e}")
+            self.clear_vectors()
+            return
+
+        stored = self.store.rows
+        if stored > len(self.rows):
+            self.store.truncate(len(self.rows))
+        elif stored < len(self.rows):
+            logging.warning("Document index is incomplete; rebuilding")
+            self.clear_vectors()
+
+    def save(self):
+        """Persist the sidecar; call after the rows it lists were appended"""
+        with self._lock:
+            data = {
+                "version": INDEX_VERSION,
+                "model": self.model,
+                "dim": self.store.dim,
+                "sources": self.sources,
+                "files": self.files,
+                "rows": self.rows,
+                "next_id": self.next_id,
+            }
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            temp_file = self.meta_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            temp_file.replace(self.meta_file)
+            self._saved_at = time.monotonic()
+
+    def clear_vectors(self):
+        """Forget every embedding but keep the attached sources"""
+        with self._lock:
+            self.files = {}
+            self.rows = []
+            self._stale = None
+            self.store.reset()
+            self.save()
+
+    # Configuration
+
+    def configure(self, model: str, embed: Optional[Embedder], top_k: int = 4):
+        """Set the embedding model; vectors of another model are discarded"""
+        with self._lock:
+            if model != self.model:
+                self.model = model
+                if self.rows or self.files:
+                    self.clear_vectors()
+                else:
+                    self.store.reset()
+            self.embed = embed if model else None
+            self.top_k = top_k
+            self.error = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether chats should be given document context"""
+        return bool(self.embed and self.top_k and self.files)
+
+    def attach(self, paths: List[str]) -> List[str]:
+        """Add files or folders to the index; call refresh_async() after
+
+        Returns the resolved paths, as chats refer to them.
+        """
+        resolved = [str(Path(path).expanduser().resolve()) for path in paths]
+        with self._lock:
+            for source in resolved:
+                if source not in self.sources:
+                    self.sources.append(source)
+            self.save()
+        return resolved
+
+    def detach(self, paths: List[str]):
+        """Remove sources no chat uses any more, with their embeddings"""
+        with self._lock:
+            self.sources = [source for source in self.sources if source not in paths]
+            for path in list(self.files):
+                if within(path, paths) and not within(path, self.sources):
+                    del self.files[path]
+            self._stale = None
+            self.save()
+
+    def detach_all(self):
+        """Remove every attached source and its embeddings"""
+        with self._lock:
+            self.sources = []
+            self.clear_vectors()
+
+    # Indexing
+
+    def scan(self) -> Tuple[Dict[str, Tuple], List[Tuple[str, Tuple, str]]]:
+        """Files of the attached sources, and those needing new embeddings
+
+        Returns {path: (mtime_ns, size)} and (path, (mtime_ns, size), sha256)
+        for new or changed files. Files whose mtime changed but whose
+        content did not only have their record updated.
+        """
+        found: Dict[str, Tuple] = {}
+        for source in list(self.sources):
+            try:
+                for path in iter_files(Path(source)):
+                    stat = path.stat()
+                    if stat.st_size <= MAX_FILE_BYTES:
+                        found[str(path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                logging.warning(f"Cannot read attached source {source}: {e}")
+
+        changed = []
+        for path, (mtime_ns, size) in found.items():
+            record = self.files.get(path)
+            if record and (record["mtime_ns"], record["size"]) == (mtime_ns, size):
+                continue
+            try:
+                digest = file_digest(Path(path))
+            except OSError as e:
+                logging.warning(f"Cannot read {path}: {e}")
+                continue
+            if record and record["sha256"] == digest:
+                with self._lock:
+                    record["mtime_ns"] = mtime_ns
+                continue
+            changed.append((path, (mtime_ns, size), digest))
+        return found, changed
+
+    def refresh(self) -> int:
+        """Embed new and changed files and drop removed ones
+
+        Returns the number of files embedded. Raises whatever the embedder
+        raises; files finished before the failure are kept.
+        """
+        with self._lock:
+            embed, model = self.embed, self.model
+        if embed is None:
+            return 0
+
+        found, changed = self.scan()
+        with self._lock:
+            for path in [path for path in self.files if path not in found]:
+                del self.files[path]
+            self._stale = None
+            self.save()
+
+        in_flight: Deque[Tuple] = deque()
+        done = 0
+
+        def finish_oldest():
+            nonlocal done
+            if self._collect(model, *in_flight.popleft()):
+                done += 1
+                if self.on_progress:
+                    self.on_progress(len(self.files), len(changed) - done)
+
+        with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as pool:
+            for path, (mtime_ns, size), digest in changed:
+                with self._lock:
+                    record = {
+                        "id": self.next_id,
+                        "mtime_ns": mtime_ns,
+                        "size": size,
+                        "sha256": digest,
+                        "chunks": 0,
+                    }
+                    self.next_id += 1
+                batch: List[Tuple] = []
+                try:
+                    for chunk in read_chunks(Path(path)):
+                        batch.append(chunk)
+                        if len(batch) < EMBED_BATCH:
+                            continue
+                        future = pool.submit(embed, [text for _, _, text in batch])
+                        in_flight.append((future, path, record, batch, False))
+                        batch = []
+                        while len(in_flight) > EMBED_WORKERS * 2:
+                            finish_oldest()
+                except OSError as e:
+                    # Batches already sent become stale rows, compacted later
+                    logging.warning(f"Cannot read {path}: {e}")
+                    continue
+                # The file's last batch; an empty one needs no request
+                future = (
+                    pool.submit(embed, [text for _, _, text in batch])
+                    if batch
+                    else None
+                )
+                in_flight.append((future, path, record, batch, True))
+            while in_flight:
+                finish_oldest()
+
+        with self._lock:
+            if model == self.model:
+                self.compact()
+                self.save()
+        return done
+
+    def _collect(
+        self,
+        model: str,
+        future: Optional[Future],
+        path: str,
+        record: Dict,
+        batch: List[Tuple],
+        last: bool,
+    ) -> bool:
+        """Store one embedded batch; returns whether it completed its file"""
+        vectors = future.result() if future is not None else []
+        if len(vectors) != len(batch):
+            raise ValueError("Embedding model returned the wrong number of vectors")
+        with self._lock:
+            if model != self.model:
+                raise RuntimeError("Embedding model changed while indexing")
+            self.store.append(vectors)
+            self.rows.extend((record["id"], offset, size) for offset, size, _ in batch)
+            record["chunks"] += len(batch)
+            self._stale = None
+            if last:
+                # The new version replaces the old one only once fully embedded
+                self.files[path] = record
+                if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+                    self.save()
+        return last
+
+    def stale_rows(self) -> Set[int]:
+        """Rows of files that were replaced, removed or never finished"""
+        with self._lock:
+            if self._stale is None:
+                live = {record["id"] for record in self.files.values()}
+                self._stale = {
+                    row for row, (file_id, _, _) in enumerate(self.rows)
+                    if file_id not in live
+                }  # fmt: skip
+            return self._stale
+
+    def compact(self):
+        """Rewrite the matrix without stale rows once they pile up"""
+        with self._lock:
+            stale = self.stale_rows()
+            if not stale or len(stale) < COMPACT_RATIO * len(self.rows):
+                return
+            keep = [row for row in range(len(self.rows)) if row not in stale]
+            # Matrix first: a crash before the sidecar is saved then shows
+            # up as missing rows, which rebuilds instead of mismatching
+            self.store.compact(keep)
+            self.rows = [self.rows[row] for row in keep]
+            self._stale = None
+            self.save()
+
+    def refresh_async(self):
+        """Refresh on a background thread; repeated calls are coalesced"""
+        if self.embed is None:
+            return
+        with self._lock:
+            self._refresh_requested = True
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._drain, daemon=True)
+            self._worker.start()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._refresh_requested:
+                    self._worker = None
+                    return
+                self._refresh_requested = False
+            remaining = 0
+            try:
+                self.refresh()
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                remaining = -1
+                logging.warning(f"Document indexing failed: {e}")
+            if self.on_progress:
+                self.on_progress(len(self.files), remaining)
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until background indexing finishes"""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    # Retrieval
+
+    def read_chunk(self, row: int, paths: Dict[int, str]) -> Optional[str]:
+        """Text of a row, or None if its file changed since it was indexed
+
+        paths maps the file ids of indexed files to their paths.
+        """
+        file_id, offset, size = self.rows[row]
+        path = paths.get(file_id)
+        if path is None:
+            return None
+        try:
+            if Path(path).stat().st_mtime_ns != self.files[path]["mtime_ns"]:
+                return None
+            with open(path, "rb") as f:
+                f.seek(offset)
+                return f.read(size).decode("utf-8", errors="replace")
+        except OSError:
+            return None
+
+    def search(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        sources: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """Chunks closest in meaning to query: path, text and score
+
+        sources limits the search to files of those attached sources.
+        """
+        embed = self.embed
+        k = self.top_k if k is None else k
+        if embed is None or not k or not query.strip() or sources == []:
+            return []
+        vector = embed([query])[0]
+        with self._lock:
+            paths = {record["id"]: path for path, record in self.files.items()}
+            exclude = self.stale_rows()
+            if sources is not None:
+                outside = {
+                    file_id for file_id, path in paths.items()
+                    if not within(path, sources)
+                }  # fmt: skip
+                if outside:
+                    exclude = exclude | {
+                        row for row, (file_id, _, _) in enumerate(self.rows)
+                        if file_id in outside
+                    }  # fmt: skip
+            hits = self.store.top_k(vector, k, limit=len(self.rows), exclude=exclude)
+            results = []
+            for row, score in hits:
+                text = self.read_chunk(row, paths) if score >= MIN_SCORE else None
+                if text is not None:
+                    path = paths[self.rows[row][0]]
+                    results.append({"path": path, "text": text, "score": score})
+        return results
+
+    def get_context(self, query: str, sources: Optional[List[str]] = None) -> str:
+        """System context with the attached-document chunks relevant to query
+
+        sources limits the excerpts to those a chat has attached.
+        """
+        if not self.ready:
+            return ""
+        try:
+            chunks = self.search(query, sources=sources)
+        except Exception as e:
+            logging.warning(f"Document retrieval failed: {e}")
+            return ""
+        if not chunks:
+            return ""
+        parts = ["Excerpts from the user's attached documents (use if relevant):"]
+        for chunk in chunks:
+            parts.append("")
+            parts.append(f"[{Path(chunk['path']).name}]")
+            parts.append(chunk["text"].strip())
+        return "\n".join(parts)
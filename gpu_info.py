@@ -7,7 +7,22 @@ import platform
 import subprocess
 import json
 import logging
-from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from linux_probe import LinuxSysfsProbe
+from memory_fit import (
+    DEFAULT_NUM_CTX,
+    GPU_RESERVE_MB,
+    RAM_RESERVE_GB,
+    estimate_fit,
+    fit_badge,
+    format_size,
+    hardware_budget,
+    max_parameters,
+)
 
 # Optional dependencies for enhanced GPU detection
 # These imports are wrapped in try/except to prevent errors when packages aren't installed
@@ -35,62 +50,107 @@ except ImportError:
     # psutil not installed - enhanced system info detection not available
     psutil = None  # type: ignore
 
+# Hardware facts that do not change while the app runs (names, total VRAM,
+# drivers) are cached far longer than the ones that change every second
+STATIC_GPU_FIELDS = (
+    "name",
+    "memory_total",
+    "driver",
+    "uuid",
+    "vendor",
+    "pci_bus",
+    "note",
+)
+VOLATILE_GPU_FIELDS = ("memory_used", "memory_free", "temperature", "load")
+STATIC_TTL = 3600.0
+VOLATILE_TTL = 5.0
+
+
+def _same_gpu(a: Dict, b: Dict) -> bool:
+    """Whether two probe entries describe the same device
+
+    Compared by uuid or PCI bus when both entries have one, else by name.
+    """
+    for key in ("uuid", "pci_bus"):
+        if a.get(key) and b.get(key):
+            return a[key] == b[key]
+    return a["name"] == b["name"]
+
 
 class GPUInfo:
     """GPU information and AI suitability analysis"""
 
-    def __init__(self):
-        self.gpu_data = []
+    def __init__(self, detect: bool = True):
+        self.gpu_static: List[Dict] = []
+        self.gpu_volatile: List[Dict] = []
         self.system_ram = 0
+        self.ram_available = 0
         self.cpu_info = ""
-        self._detect_hardware()
+        self.linux_probe = LinuxSysfsProbe()
+        if detect:
+            self._detect_hardware()
+
+    @property
+    def gpu_data(self) -> List[Dict]:
+        """Static and volatile GPU facts merged per GPU"""
+        return [
+            {**static, **volatile}
+            for static, volatile in zip(self.gpu_static, self.gpu_volatile)
+        ]
+
+    @gpu_data.setter
+    def gpu_data(self, gpus: List[Dict]):
+        self.gpu_static = [
+            {key: gpu[key] for key in STATIC_GPU_FIELDS if key in gpu} for gpu in gpus
+        ]
+        self.gpu_volatile = [
+            {key: gpu[key] for key in VOLATILE_GPU_FIELDS if key in gpu} for gpu in gpus
+        ]
 
     def _detect_hardware(self):
-        """Detect system hardware"""
+        """Detect system hardware, running the independent probes concurrently"""
         if not GPU_UTIL_AVAILABLE and not PSUTIL_AVAILABLE:
             logging.info(
                 "GPU detection libraries not installed. Using basic detection."
             )
-        self._detect_gpus()
-        self._detect_system_info()
-
-    def _detect_gpus(self):
-        """Detect available GPUs"""
-        self.gpu_data = []
-
-        # Try GPUtil first (NVIDIA GPUs)
-        if GPU_UTIL_AVAILABLE:
-            try:
-                gpus = GPUtil.getGPUs()
-                for gpu in gpus:
-                    gpu_info = {
-                        "name": gpu.name,
-                        "memory_total": gpu.memoryTotal,
-                        "memory_used": gpu.memoryUsed,
-                        "memory_free": gpu.memoryFree,
-                        "driver": gpu.driver,
-                        "uuid": gpu.uuid,
-                        "vendor": "NVIDIA",
-                        "temperature": getattr(gpu, "temperature", None),
-                        "load": getattr(gpu, "load", None),
-                    }
-                    self.gpu_data.append(gpu_info)
-            except Exception as e:
-                logging.debug(f"GPUtil detection failed: {e}")
-                # Falling back to platform detection
 
-        # Try platform-specific detection for other GPUs
-        self._detect_platform_gpus()
+        # GPUtil first so its richer entries win for the same device
+        probes = [self._detect_gputil_gpus] + self._platform_gpu_probes()
+        with ThreadPoolExecutor(max_workers=len(probes) + 1) as pool:
+            system_future = pool.submit(self._detect_system_info)
+            gpu_futures = [pool.submit(probe) for probe in probes]
+            results = [future.result() for future in gpu_futures]
+            system_future.result()
+
+        self.gpu_data = self._merge_gpus(results)
+
+    def _merge_gpus(self, results: List[List[Dict]]) -> List[Dict]:
+        """Merge probe results in priority order, skipping GPUs already found
+
+        Every GPU a probe reports is kept, so identical cards stay separate.
+        A later probe's GPU is dropped when it is the same device as a known
+        one (see _same_gpu); each known GPU absorbs one entry per probe.
+        """
+        gpus: List[Dict] = []
+        for probe_gpus in results:
+            unmatched = list(gpus)
+            for gpu in probe_gpus:
+                for i, known in enumerate(unmatched):
+                    if _same_gpu(known, gpu):
+                        del unmatched[i]
+                        break
+                else:
+                    gpus.append(gpu)
 
         # If no GPUs detected, note integrated graphics
-        if not self.gpu_data:
+        if not gpus:
             fallback_note = "Basic detection mode"
             if not GPU_UTIL_AVAILABLE:
                 fallback_note += (
                     " - Install requirements-gpu.txt for enhanced detection"
                 )
 
-            self.gpu_data.append(
+            gpus.append(
                 {
                     "name": "Integrated/Unknown Graphics",
                     "memory_total": 0,
@@ -101,20 +161,85 @@ class GPUInfo:
                     "note": fallback_note,
                 }
             )
+        return gpus
 
-    def _detect_platform_gpus(self):
-        """Platform-specific GPU detection"""
+    def _detect_gputil_gpus(self) -> List[Dict]:
+        """Detect NVIDIA GPUs with GPUtil"""
+        gpus = []
+        if GPU_UTIL_AVAILABLE:
+            try:
+                for gpu in GPUtil.getGPUs():
+                    gpus.append(
+                        {
+                            "name": gpu.name,
+                            "memory_total": gpu.memoryTotal,
+                            "memory_used": gpu.memoryUsed,
+                            "memory_free": gpu.memoryFree,
+                            "driver": gpu.driver,
+                            "uuid": gpu.uuid,
+                            "vendor": "NVIDIA",
+                            "temperature": getattr(gpu, "temperature", None),
+                            "load": getattr(gpu, "load", None),
+                        }
+                    )
+            except Exception as e:
+                logging.debug(f"GPUtil detection failed: {e}")
+                # Falling back to platform detection
+        return gpus
+
+    def _platform_gpu_probes(self) -> List[Callable[[], List[Dict]]]:
+        """Platform-specific GPU probes, in priority order"""
         system = platform.system()
 
         if system == "Windows":
-            self._detect_windows_gpus()
+            return [self._detect_windows_gpus]
         elif system == "Darwin":  # macOS
-            self._detect_macos_gpus()
+            return [self._detect_macos_gpus]
         elif system == "Linux":
-            self._detect_linux_gpus()
+            return [self._detect_linux_gpus]
+        return []
+
+    def refresh_volatile(self, gputil: bool = True):
+        """Re-read memory use, load and temperature without full detection
+
+        gputil=False keeps the last GPUtil readings: each GPUtil call runs
+        nvidia-smi, far too costly for frequent sampling. sysfs is always read.
+        """
+        volatile = [dict(entry) for entry in self.gpu_volatile]
+        if gputil and GPU_UTIL_AVAILABLE:
+            try:
+                readings = {gpu.uuid: gpu for gpu in GPUtil.getGPUs()}
+                for static, entry in zip(self.gpu_static, volatile):
+                    gpu = readings.get(static.get("uuid"))
+                    if gpu is not None:
+                        entry.update(
+                            memory_used=gpu.memoryUsed,
+                            memory_free=gpu.memoryFree,
+                            temperature=getattr(gpu, "temperature", None),
+                            load=getattr(gpu, "load", None),
+                        )
+            except Exception as e:
+                logging.debug(f"GPUtil refresh failed: {e}")
+
+        if platform.system() == "Linux":
+            for static, entry in zip(self.gpu_static, volatile):
+                if static.get("pci_bus"):
+                    entry.update(self.linux_probe.volatile(static["pci_bus"]))
+
+        if PSUTIL_AVAILABLE:
+            try:
+                self.ram_available = psutil.virtual_memory().available / (1024**3)
+            except Exception as e:
+                logging.debug(f"RAM refresh failed: {e}")
+        elif platform.system() == "Linux":
+            self.ram_available = self.linux_probe.memory_gb()["available"]
+
+        # Swap in whole so readers never see a half-updated list
+        self.gpu_volatile = volatile
 
-    def _detect_windows_gpus(self):
+    def _detect_windows_gpus(self) -> List[Dict]:
         """Detect GPUs on Windows using WMI"""
+        gpus = []
         try:
             result = subprocess.run(
                 [
@@ -142,29 +267,27 @@ class GPUInfo:
                                     ram_bytes / (1024 * 1024) if ram_bytes > 0 else 0
                                 )
 
-                                # Skip if already detected by GPUtil
                                 gpu_name = parts[3].strip()
-                                if not any(
-                                    gpu["name"] == gpu_name for gpu in self.gpu_data
-                                ):
-                                    self.gpu_data.append(
-                                        {
-                                            "name": gpu_name,
-                                            "memory_total": ram_mb,
-                                            "memory_used": 0,
-                                            "memory_free": ram_mb,
-                                            "driver": parts[2].strip(),
-                                            "vendor": self._guess_vendor(gpu_name),
-                                        }
-                                    )
+                                gpus.append(
+                                    {
+                                        "name": gpu_name,
+                                        "memory_total": ram_mb,
+                                        "memory_used": 0,
+                                        "memory_free": ram_mb,
+                                        "driver": parts[2].strip(),
+                                        "vendor": self._guess_vendor(gpu_name),
+                                    }
+                                )
                             except (ValueError, IndexError):
                                 continue
         except Exception as e:
             logging.debug(f"Windows GPU detection failed: {e}")
             # Silently fall back to basic detection
+        return gpus
 
-    def _detect_macos_gpus(self):
+    def _detect_macos_gpus(self) -> List[Dict]:
         """Detect GPUs on macOS"""
+        gpus = []
         try:
             result = subprocess.run(
                 ["system_profiler", "SPDisplaysDataType", "-json"],
@@ -190,7 +313,7 @@ class GPUInfo:
                             float(vram.replace(" GB", "").replace(",", "")) * 1024
                         )
 
-                    self.gpu_data.append(
+                    gpus.append(
                         {
                             "name": name,
                             "memory_total": vram_mb,
@@ -203,15 +326,29 @@ class GPUInfo:
         except Exception as e:
             logging.debug(f"macOS GPU detection failed: {e}")
             # Silently fall back to basic detection
+        return gpus
+
+    def _detect_linux_gpus(self) -> List[Dict]:
+        """Detect GPUs on Linux from sysfs, asking nvidia-smi only for NVIDIA"""
+        gpus = self.linux_probe.gpus()
+
+        # NVIDIA's driver exposes no VRAM size in sysfs
+        if any(gpu["vendor"] == "NVIDIA" for gpu in gpus):
+            by_bus = {gpu["pci_bus"]: gpu for gpu in self._detect_nvidia_smi_gpus()}
+            gpus = [
+                {**gpu, **by_bus[gpu["pci_bus"]]} if gpu["pci_bus"] in by_bus else gpu
+                for gpu in gpus
+            ]
+        return gpus
 
-    def _detect_linux_gpus(self):
-        """Detect GPUs on Linux"""
-        # Try nvidia-smi for NVIDIA GPUs
+    def _detect_nvidia_smi_gpus(self) -> List[Dict]:
+        """Detect NVIDIA GPUs on Linux with nvidia-smi"""
+        gpus = []
         try:
             result = subprocess.run(
                 [
                     "nvidia-smi",
-                    "--query-gpu=name,memory.total,driver_version",
+                    "--query-gpu=name,memory.total,driver_version,pci.bus_id",
                     "--format=csv,noheader,nounits",
                 ],
                 capture_output=True,
@@ -223,8 +360,8 @@ class GPUInfo:
                 lines = result.stdout.strip().split("\n")
                 for line in lines:
                     parts = [p.strip() for p in line.split(",")]
-                    if len(parts) >= 3:
-                        self.gpu_data.append(
+                    if len(parts) >= 4:
+                        gpus.append(
                             {
                                 "name": parts[0],
                                 "memory_total": int(parts[1]),
@@ -232,47 +369,22 @@ class GPUInfo:
                                 "memory_free": int(parts[1]),
                                 "driver": parts[2],
                                 "vendor": "NVIDIA",
+                                # 00000000:01:00.0 -> sysfs style 0000:01:00.0
+                                "pci_bus": parts[3].lower()[-12:],
                             }
                         )
         except Exception:
             pass
-
-        # Try lspci for other GPUs
-        try:
-            result = subprocess.run(
-                ["lspci", "-v"], capture_output=True, text=True, timeout=10
-            )
-
-            if result.returncode == 0:
-                lines = result.stdout.split("\n")
-                for line in lines:
-                    if (
-                        "VGA compatible controller" in line
-                        or "Display controller" in line
-                    ):
-                        name = (
-                            line.split(": ", 1)[-1] if ": " in line else "Unknown GPU"
-                        )
-                        if not any(gpu["name"] == name for gpu in self.gpu_data):
-                            self.gpu_data.append(
-                                {
-                                    "name": name,
-                                    "memory_total": 0,
-                                    "memory_used": 0,
-                                    "memory_free": 0,
-                                    "driver": "Unknown",
-                                    "vendor": self._guess_vendor(name),
-                                }
-                            )
-        except Exception:
-            pass
+        return gpus
 
     def _detect_system_info(self):
         """Detect system RAM and CPU info"""
         if PSUTIL_AVAILABLE:
             try:
                 # System RAM in GB
-                self.system_ram = psutil.virtual_memory().total / (1024**3)
+                memory = psutil.virtual_memory()
+                self.system_ram = memory.total / (1024**3)
+                self.ram_available = memory.available / (1024**3)
 
                 # CPU info
                 self.cpu_info = f"{psutil.cpu_count()} cores"
@@ -287,6 +399,15 @@ class GPUInfo:
         else:
             # Basic fallback detection without psutil
             try:
+                # Linux exposes everything in /proc without extra packages
+                if platform.system() == "Linux":
+                    memory = self.linux_probe.memory_gb()
+                    self.system_ram = memory["total"]
+                    self.ram_available = memory["available"]
+                    self.cpu_info = self.linux_probe.cpu_info()
+                    if self.cpu_info:
+                        return
+
                 # Try to get basic RAM info on Windows
                 if platform.system() == "Windows":
                     result = subprocess.run(
@@ -347,61 +468,35 @@ class GPUInfo:
         else:
             return "Unknown"
 
-    def get_ai_recommendations(self) -> Dict:
+    def get_ai_recommendations(
+        self,
+        installed_models: Optional[List[Dict]] = None,
+        num_ctx: int = DEFAULT_NUM_CTX,
+    ) -> Dict:
         """Get AI model recommendations based on hardware"""
         recommendations = {
             "suitable_models": [],
             "performance_tier": "Unknown",
             "limitations": [],
             "upgrades": [],
+            "installed_models": [],
         }
 
-        # Determine best GPU
-        best_gpu = None
-        max_vram = 0
-
-        for gpu in self.gpu_data:
-            vram = gpu.get("memory_total", 0)
-            if vram > max_vram:
-                max_vram = vram
-                best_gpu = gpu
+        vram_mb, ram_gb = hardware_budget(self)
 
         # Performance tiers based on VRAM
-        if max_vram >= 16000:  # 16GB+
+        if vram_mb >= 16000:  # 16GB+
             recommendations["performance_tier"] = "High-End (16GB+ VRAM)"
-            recommendations["suitable_models"] = [
-                "Large models (13B-70B parameters)",
-                "llama2:13b, llama2:70b",
-                "codellama:13b, codellama:34b",
-                "mistral:7b with room for multiple models",
-            ]
-        elif max_vram >= 8000:  # 8GB+
+        elif vram_mb >= 8000:  # 8GB+
             recommendations["performance_tier"] = "Mid-Range (8GB+ VRAM)"
-            recommendations["suitable_models"] = [
-                "Medium models (7B-13B parameters)",
-                "llama2:7b, llama2:13b",
-                "codellama:7b, codellama:13b",
-                "mistral:7b",
-            ]
-        elif max_vram >= 4000:  # 4GB+
+        elif vram_mb >= 4000:  # 4GB+
             recommendations["performance_tier"] = "Entry-Level (4GB+ VRAM)"
-            recommendations["suitable_models"] = [
-                "Small models (3B-7B parameters)",
-                "llama2:7b (may be slow)",
-                "mistral:7b (may be slow)",
-                "phi-2, tinyllama",
-            ]
             recommendations["limitations"] = [
                 "Large models may run slowly or not at all",
                 "Consider using quantized models",
             ]
-        elif max_vram >= 2000:  # 2GB+
+        elif vram_mb >= 2000:  # 2GB+
             recommendations["performance_tier"] = "Limited (2GB+ VRAM)"
-            recommendations["suitable_models"] = [
-                "Very small models only",
-                "tinyllama",
-                "phi-2 (may be slow)",
-            ]
             recommendations["limitations"] = [
                 "Very limited model selection",
                 "Slow performance expected",
@@ -409,11 +504,6 @@ class GPUInfo:
             ]
         else:
             recommendations["performance_tier"] = "CPU-Only / Integrated Graphics"
-            recommendations["suitable_models"] = [
-                "Small models in CPU mode",
-                "tinyllama (CPU)",
-                "Consider remote Ollama server",
-            ]
             recommendations["limitations"] = [
                 "GPU acceleration not available",
                 "Very slow performance",
@@ -425,6 +515,19 @@ class GPUInfo:
                 "AMD RX 6800 XT or better",
             ]
 
+        # Capacity, rather than a fixed list of model names
+        if vram_mb > GPU_RESERVE_MB:
+            billions = max_parameters(vram_mb - GPU_RESERVE_MB, num_ctx)
+            recommendations["suitable_models"].append(
+                f"Up to ~{billions:.0f}B parameters at Q4_K_M "
+                f"with a {num_ctx} token context fully on GPU"
+            )
+        if ram_gb > RAM_RESERVE_GB:
+            billions = max_parameters((ram_gb - RAM_RESERVE_GB) * 1024, num_ctx)
+            recommendations["suitable_models"].append(
+                f"Up to ~{billions:.0f}B parameters at Q4_K_M in system RAM (slower)"
+            )
+
         # RAM recommendations
         if self.system_ram < 16:
             recommendations["limitations"].append(
@@ -433,6 +536,22 @@ class GPUInfo:
             if self.system_ram < 8:
                 recommendations["upgrades"].append("Upgrade to 16GB+ system RAM")
 
+        # Installed models, using cached /api/show metadata when available
+        for model in installed_models or []:
+            estimate = estimate_fit(model, vram_mb, ram_gb, num_ctx)
+            details = [
+                detail
+                for detail in (model.get("parameter_size"), model.get("quantization"))
+                if detail
+            ]
+            details.append(format_size(estimate["weights_mb"]))
+            name = model.get("name", "Unknown")
+            recommendations["installed_models"].append(
+                f"{name} ({', '.join(details)}) - {fit_badge(estimate)}"
+            )
+            if estimate["placement"] == "gpu":
+                recommendations["suitable_models"].append(f"{name} (installed)")
+
         return recommendations
 
     def get_summary(self) -> str:
@@ -461,9 +580,54 @@ class GPUInfo:
         return " | ".join(summary)
 
 
-def get_gpu_info() -> GPUInfo:
-    """Get GPU information for the current system"""
-    return GPUInfo()
+class GPUInfoCache:
+    """Caches detection results, re-reading volatile facts on a shorter TTL"""
+
+    def __init__(
+        self,
+        static_ttl: float = STATIC_TTL,
+        volatile_ttl: float = VOLATILE_TTL,
+        factory: Callable[[], GPUInfo] = GPUInfo,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.static_ttl = static_ttl
+        self.volatile_ttl = volatile_ttl
+        self.factory = factory
+        self.clock = clock
+        self.info: Optional[GPUInfo] = None
+        self.detected_at = 0.0
+        self.refreshed_at = 0.0
+        # Concurrent callers wait for one detection instead of starting more
+        self._lock = threading.Lock()
+
+    def get(self, refresh: bool = False) -> GPUInfo:
+        """Return cached hardware info, detecting or refreshing as needed"""
+        with self._lock:
+            now = self.clock()
+            if (
+                self.info is None
+                or refresh
+                or now - self.detected_at >= self.static_ttl
+            ):
+                self.info = self.factory()
+                self.detected_at = self.refreshed_at = now
+            elif now - self.refreshed_at >= self.volatile_ttl:
+                self.info.refresh_volatile()
+                self.refreshed_at = now
+            return self.info
+
+    def invalidate(self):
+        """Force full detection on the next call"""
+        with self._lock:
+            self.info = None
+
+
+_gpu_info_cache = GPUInfoCache()
+
+
+def get_gpu_info(refresh: bool = False) -> GPUInfo:
+    """Get GPU information for the current system (cached)"""
+    return _gpu_info_cache.get(refresh)
 
 
 def check_gpu_dependencies() -> Dict[str, bool]:
@@ -498,7 +662,9 @@ def get_dependency_install_message() -> str:
         return "All GPU detection dependencies are available!"
 
 
-def format_gpu_info_for_display(gpu_info: GPUInfo) -> str:
+def format_gpu_info_for_display(
+    gpu_info: GPUInfo, installed_models: Optional[List[Dict]] = None
+) -> str:
     """Format GPU info for display in the GUI"""
     lines = []
 
@@ -542,7 +708,7 @@ def format_gpu_info_for_display(gpu_info: GPUInfo) -> str:
     lines.append("")
 
     # AI Recommendations
-    recommendations = gpu_info.get_ai_recommendations()
+    recommendations = gpu_info.get_ai_recommendations(installed_models)
     lines.append("🤖 AI MODEL RECOMMENDATIONS")
     lines.append("=" * 50)
     lines.append(f"Performance Tier: {recommendations['performance_tier']}")
@@ -554,6 +720,12 @@ def format_gpu_info_for_display(gpu_info: GPUInfo) -> str:
             lines.append(f"  • {model}")
         lines.append("")
 
+    if recommendations["installed_models"]:
+        lines.append("📦 Installed Models:")
+        for model in recommendations["installed_models"]:
+            lines.append(f"  • {model}")
+        lines.append("")
+
     if recommendations["limitations"]:
         lines.append("⚠️ Limitations:")
         for limitation in recommendations["limitations"]:
@@ -0,0 +1,279 @@
+"""
+Chat history retention and archive for ShamaOllama
+A retention policy keeps the hot history (chat_history.json) small: sessions
+beyond the session count, age or size limits move into compressed archive
+segments. Segments are JSON lines compressed with gzip or lzma and are only
+read when the archive is searched or an archived session is opened; a small
+catalog keeps titles and dates so the archive can be listed without
+decompressing anything.
+"""
+
+import gzip
+import json
+import logging
+import lzma
+import threading
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from chat_messages import json_default
+
+# Compression formats for archive segments: opener and file suffix. gzip's
+# default level 9 is several times slower than 6 for a few percent smaller
+# files; lzma trades slower writes for the smallest archive.
+COMPRESSORS = {
+    "gzip": (partial(gzip.open, compresslevel=6), ".jsonl.gz"),
+    "lzma": (lzma.open, ".jsonl.xz"),
+}
+
+# Sessions appended to a segment before a new one is started
+SEGMENT_SESSIONS = 200
+
+CATALOG_VERSION = 1
+
+# Characters of context shown around a search match
+SNIPPET_CHARS = 60
+
+
+def session_size(session: Dict) -> int:
+    """Bytes a session takes in the history file"""
+    text = json.dumps(session, ensure_ascii=False, default=json_default)
+    return len(text.encode("utf-8"))
+
+
+def session_time(session: Dict) -> Optional[datetime]:
+    """When a session was saved, or None if unknown"""
+    try:
+        return datetime.fromisoformat(session.get("timestamp", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def split_for_retention(
+    history: List[Dict],
+    max_sessions: int = 0,
+    max_age_days: int = 0,
+    max_bytes: int = 0,
+    now: Optional[datetime] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Split history (oldest first) into sessions to keep and to archive
+
+    Sessions older than max_age_days go first, then the oldest sessions
+    until at most max_sessions remain and they fit in max_bytes. The newest
+    session is always kept. A limit of 0 disables that rule.
+    """
+    now = now or datetime.now()
+    archive = set()
+    if max_age_days:
+        cutoff = now - timedelta(days=max_age_days)
+        for i, session in enumerate(history[:-1]):
+            saved = session_time(session)
+            if saved is not None and saved < cutoff:
+                archive.add(i)
+
+    kept = [i for i in range(len(history)) if i not in archive]
+    if max_sessions:
+        while len(kept) > max_sessions:
+            archive.add(kept.pop(0))
+    if max_bytes:
+        sizes = {i: session_size(history[i]) for i in kept}
+        total = sum(sizes.values())
+        while total > max_bytes and len(kept) > 1:
+            oldest = kept.pop(0)
+            total -= sizes[oldest]
+            archive.add(oldest)
+
+    keep = [session for i, session in enumerate(history) if i not in archive]
+    moved = [session for i, session in enumerate(history) if i in archive]
+    return keep, moved
+
+
+def find_snippet(session: Dict, needle: str) -> Optional[str]:
+    """Text around the first case-insensitive match of needle, or None"""
+    texts = [session.get("title", "")]
+    texts.extend(message.get("content", "") for message in session.get("messages", []))
+    for text in texts:
+        position = text.lower().find(needle)
+        if position >= 0:
+            start = max(0, position - SNIPPET_CHARS)
+            end = position + len(needle) + SNIPPET_CHARS
+            snippet = text[start:end].replace("\n", " ")
+            return ("…" if start else "") + snippet + ("…" if end < len(text) else "")
+    return None
+
+
+class HistoryArchive:
+    """Compressed, append-only segments of archived chat sessions"""
+
+    def __init__(self, archive_dir: Path, compression: str = "gzip"):
+        self.archive_dir = Path(archive_dir)
+        self.catalog_file = self.archive_dir / "catalog.json"
+        self.compression = compression if compression in COMPRESSORS else "gzip"
+        self._lock = threading.RLock()
+        # Each segment: file name, format, compressed size and session summaries
+        self.segments: List[Dict] = []
+        self.load()
+
+    def load(self):
+        """Load the catalog from disk"""
+        try:
+            with open(self.catalog_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CATALOG_VERSION:
+                self.segments = data["segments"]
+        except FileNotFoundError:
+            self.segments = []
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Failed to load history archive catalog: {e}")
+            self.segments = []
+
+    def save(self):
+        """Persist the catalog to disk"""
+        data = {"version": CATALOG_VERSION, "segments": self.segments}
+        temp_file = self.catalog_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        temp_file.replace(self.catalog_file)
+
+    def __len__(self) -> int:
+        return sum(len(segment["sessions"]) for segment in self.segments)
+
+    def _segment_path(self, segment: Dict) -> Path:
+        return self.archive_dir / segment["file"]
+
+    def _writable_segment(self) -> Dict:
+        """The last segment if more sessions can be appended, else a new one"""
+        if self.segments:
+            last = self.segments[-1]
+            try:
+                # A size mismatch means a write was interrupted: start afresh
+                intact = self._segment_path(last).stat().st_size == last["bytes"]
+            except OSError:
+                intact = False
+            if (
+                intact
+                and last["compression"] == self.compression
+                and len(last["sessions"]) < SEGMENT_SESSIONS
+            ):
+                return last
+
+        suffix = COMPRESSORS[self.compression][1]
+        segment = {
+            "file": f"segment-{len(self.segments) + 1:05d}{suffix}",
+            "compression": self.compression,
+            "bytes": 0,
+            "sessions": [],
+        }
+        # Left by a write whose catalog update never happened; those sessions
+        # are still in the hot history and will be archived again
+        self._segment_path(segment).unlink(missing_ok=True)
+        self.segments.append(segment)
+        return segment
+
+    def add(self, sessions: List[Dict]):
+        """Append sessions (oldest first) to the archive"""
+        if not sessions:
+            return
+        with self._lock:
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            remaining = list(sessions)
+            while remaining:
+                segment = self._writable_segment()
+                room = SEGMENT_SESSIONS - len(segment["sessions"])
+                batch, remaining = remaining[:room], remaining[room:]
+                opener = COMPRESSORS[segment["compression"]][0]
+                path = self._segment_path(segment)
+                # Each append is a complete gzip member / xz stream; readers
+                # decode concatenated members as one file
+                with opener(path, "at", encoding="utf-8") as f:
+                    for session in batch:
+                        line = json.dumps(
+                            session, ensure_ascii=False, default=json_default
+                        )
+                        f.write(line + "\n")
+                segment["bytes"] = path.stat().st_size
+                segment["sessions"].extend(
+                    {
+                        "title": session.get("title", ""),
+                        "timestamp": session.get("timestamp", ""),
+                        "messages": len(session.get("messages", [])),
+                    }
+                    for session in batch
+                )
+            self.save()
+
+    def entries(self) -> List[Dict]:
+        """Summaries of all archived sessions, newest first"""
+        with self._lock:
+            found = []
+            for segment_index, segment in enumerate(self.segments):
+                for position, summary in enumerate(segment["sessions"]):
+                    found.append(dict(summary, ref=(segment_index, position)))
+        found.reverse()
+        return found
+
+    def _read_segment(self, segment_index: int) -> Iterator[Dict]:
+        """Decompress and decode a segment's sessions in order"""
+        segment = self.segments[segment_index]
+        opener = COMPRESSORS[segment["compression"]][0]
+        with opener(self._segment_path(segment), "rt", encoding="utf-8") as f:
+            for position, line in enumerate(f):
+                if position >= len(segment["sessions"]):
+                    break  # Tail of an interrupted write
+                yield json.loads(line)
+
+    def load_session(self, ref: Tuple[int, int]) -> Optional[Dict]:
+        """Read one archived session"""
+        segment_index, position = ref
+        with self._lock:
+            try:
+                for i, session in enumerate(self._read_segment(segment_index)):
+                    if i == position:
+                        return session
+            except (OSError, EOFError, ValueError, IndexError, lzma.LZMAError) as e:
+                logging.warning(f"Failed to read archived session: {e}")
+        return None
+
+    def search(self, query: str, limit: int = 50) -> List[Dict]:
+        """Archived sessions whose title or messages contain query, newest first
+
+        Segments are decompressed one at a time, newest first, and the scan
+        stops once limit matches were found.
+        """
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        results = []
+        with self._lock:
+            for segment_index in range(len(self.segments) - 1, -1, -1):
+                summaries = self.segments[segment_index]["sessions"]
+                try:
+                    sessions = list(self._read_segment(segment_index))
+                except (OSError, EOFError, ValueError, lzma.LZMAError) as e:
+                    logging.warning(f"Skipping unreadable archive segment: {e}")
+                    continue
+                for position in range(len(sessions) - 1, -1, -1):
+                    snippet = find_snippet(sessions[position], needle)
+                    if snippet is None:
+                        continue
+                    summary = summaries[position]
+                    results.append(
+                        dict(summary, ref=(segment_index, position), snippet=snippet)
+                    )
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def clear(self):
+        """Delete every archived session"""
+        with self._lock:
+            for segment in self.segments:
+                try:
+                    self._segment_path(segment).unlink()
+                except OSError:
+                    pass
+            self.segments = []
+            if self.archive_dir.exists():
+                self.save()
@@ -0,0 +1,230 @@
+"""
+Semantic search over ShamaOllama chat history
+Messages are embedded with an Ollama embedding model (/api/embed) in
+batches on a background thread and kept in a memory-mapped float32 matrix
+(vector_store.VectorStore). Saved sessions never change, so each run only
+embeds messages added since the last one; a JSON sidecar maps matrix rows
+to (session timestamp, message index). Queries embed the search text and
+rank sessions by their best-matching message.
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from vector_store import VectorStore
+
+# Messages sent to the embedding model per request
+EMBED_BATCH = 32
+
+# Characters of a message that are embedded; longer messages are cut
+EMBED_CHARS = 2000
+
+# Batches embedded between sidecar saves; rows past the sidecar are
+# discarded on load, so an interrupted run only repeats this much work
+SAVE_EVERY_BATCHES = 8
+
+INDEX_VERSION = 1
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+class HistorySemanticIndex:
+    """Embeddings of saved chat messages with top-k session search"""
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.meta_file = self.index_dir / "history_vectors.json"
+        self.store = VectorStore(self.index_dir / "history_vectors.f32")
+        self.model = ""
+        self.embed: Optional[Embedder] = None
+        # (session timestamp, message index) of each matrix row
+        self.rows: List[Tuple[str, int]] = []
+        # Messages of each session already looked at
+        self.embedded: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        # Called with (indexed messages, messages still to embed)
+        self.on_progress: Optional[Callable[[int, int], None]] = None
+        self._lock = threading.RLock()
+        self._pending: Optional[List[Dict]] = None
+        self._worker: Optional[threading.Thread] = None
+        self.load()
+
+    def load(self):
+        """Load the sidecar and drop matrix rows it does not describe"""
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                raise ValueError("unsupported index version")
+            self.model = data["model"]
+            self.store.dim = data["dim"]
+            self.rows = [(key, index) for key, index in data["rows"]]
+            self.embedded = data["embedded"]
+        except FileNotFoundError:
+            self.store.reset()
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Rebuilding semantic history index: {e}")
+            self.reset()
+            return
+
+        stored = self.store.rows
+        if stored > len(self.rows):
+            self.store.truncate(len(self.rows))
+        elif stored < len(self.rows):
+            logging.warning("Semantic history index is incomplete; rebuilding")
+            self.reset()
+
+    def save(self):
+        """Persist the sidecar; call after the rows it lists were appended"""
+        data = {
+            "version": INDEX_VERSION,
+            "model": self.model,
+            "dim": self.store.dim,
+            "rows": self.rows,
+            "embedded": self.embedded,
+        }
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        temp_file = self.meta_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        temp_file.replace(self.meta_file)
+
+    def reset(self):
+        """Forget every embedding"""
+        with self._lock:
+            self.rows = []
+            self.embedded = {}
+            self.store.reset()
+            self.meta_file.unlink(missing_ok=True)
+
+    def configure(self, model: str, embed: Optional[Embedder]):
+        """Set the embedding model; vectors of another model are discarded"""
+        with self._lock:
+            if model != self.model:
+                self.reset()
+                self.model = model
+            self.embed = embed if model else None
+            self.error = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def pending(self, sessions: Sequence[Dict]) -> List[Tuple[str, int, str]]:
+        """(session key, message index, text) of messages not embedded yet"""
+        work = []
+        for session in sessions:
+            key = session.get("timestamp", "")
+            messages = session.get("messages", [])
+            for index in range(self.embedded.get(key, 0), len(messages)):
+                message = messages[index]
+                text = message.get("content", "")
+                if message.get("role") in ("user", "assistant") and text.strip():
+                    work.append((key, index, text[:EMBED_CHARS]))
+        return work
+
+    def update(self, sessions: Sequence[Dict]) -> int:
+        """Embed new messages of sessions; returns how many were embedded
+
+        Raises whatever the embedder raises; rows embedded before the
+        failure are kept.
+        """
+        with self._lock:
+            embed, model = self.embed, self.model
+            work = self.pending(sessions)
+        if embed is None:
+            return 0
+
+        done = 0
+        for batch_number, start in enumerate(range(0, len(work), EMBED_BATCH), 1):
+            batch = work[start : start + EMBED_BATCH]
+            vectors = embed([text for _, _, text in batch])
+            if len(vectors) != len(batch):
+                raise ValueError("Embedding model returned the wrong number of vectors")
+            with self._lock:
+                if model != self.model:
+                    return done  # Switched models while this batch ran
+                self.store.append(vectors)
+                for key, index, _ in batch:
+                    self.rows.append((key, index))
+                    self.embedded[key] = index + 1
+                if batch_number % SAVE_EVERY_BATCHES == 0:
+                    self.save()
+            done += len(batch)
+            if self.on_progress:
+                self.on_progress(len(self.rows), len(work) - done)
+
+        with self._lock:
+            if model == self.model:
+                # Trailing system or empty messages need no second look either
+                for session in sessions:
+                    key = session.get("timestamp", "")
+                    self.embedded[key] = len(session.get("messages", []))
+                self.save()
+        return done
+
+    def update_async(self, sessions: Sequence[Dict]):
+        """Embed new messages on a background thread
+
+        Calls made while a run is in progress are coalesced; only the most
+        recent sessions are indexed next.
+        """
+        if self.embed is None:
+            return
+        with self._lock:
+            self._pending = list(sessions)
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._drain, daemon=True)
+            self._worker.start()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                sessions, self._pending = self._pending, None
+                if sessions is None:
+                    self._worker = None
+                    return
+            try:
+                self.update(sessions)
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                logging.warning(f"Semantic history indexing failed: {e}")
+                if self.on_progress:
+                    self.on_progress(len(self.rows), -1)
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until background indexing finishes"""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Sessions whose messages are closest in meaning to query, best first
+
+        Each result has the session key (its timestamp), the index of the
+        best-matching message and its cosine similarity score.
+        """
+        embed = self.embed
+        if embed is None or not query.strip():
+            return []
+        vector = embed([query[:EMBED_CHARS]])[0]
+        with self._lock:
+            # Several hits usually come from one session; over-fetch
+            hits = self.store.top_k(vector, limit * 4, limit=len(self.rows))
+            rows = [(self.rows[row], score) for row, score in hits]
+
+        results: List[Dict] = []
+        seen = set()
+        for (key, index), score in rows:
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append({"key": key, "message": index, "score": score})
+            if len(results) >= limit:
+                break
+        return results
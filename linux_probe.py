@@ -0,0 +1,218 @@
+"""
+Subprocess-free Linux hardware probe for ShamaOllama
+Reads /proc and /sys directly instead of forking lspci, so detection takes
+milliseconds. All paths are relative to a root directory, which lets tests
+point the probe at a fixture tree.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# PCI vendor IDs of GPU makers
+PCI_VENDORS = {
+    "0x10de": "NVIDIA",
+    "0x1002": "AMD",
+    "0x8086": "Intel",
+    "0x106b": "Apple",
+}
+
+# PCI base class 0x03 is "display controller" (VGA, XGA, 3D, other)
+DISPLAY_CLASS_PREFIX = "0x03"
+
+# Where distributions install the PCI ID database, for friendly names
+PCI_IDS_PATHS = ["usr/share/hwdata/pci.ids", "usr/share/misc/pci.ids"]
+
+
+class LinuxSysfsProbe:
+    """Reads memory, CPU and GPU facts from procfs and sysfs"""
+
+    def __init__(self, root: str = "/"):
+        self.root = Path(root)
+        self.pci_devices = self.root / "sys" / "bus" / "pci" / "devices"
+
+    def _read(self, path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="utf-8", errors="replace").strip()
+        except OSError:
+            return None
+
+    def _read_int(self, path: Path) -> Optional[int]:
+        text = self._read(path)
+        try:
+            return int(text) if text is not None else None
+        except ValueError:
+            return None
+
+    def read_meminfo(self) -> Dict[str, int]:
+        """Parse /proc/meminfo into kB values"""
+        values = {}
+        text = self._read(self.root / "proc" / "meminfo") or ""
+        for line in text.splitlines():
+            key, _, rest = line.partition(":")
+            parts = rest.split()
+            if parts and parts[0].isdigit():
+                values[key] = int(parts[0])
+        return values
+
+    def memory_gb(self) -> Dict[str, float]:
+        """Total and available system RAM in GB"""
+        meminfo = self.read_meminfo()
+        available = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+        return {
+            "total": meminfo.get("MemTotal", 0) / (1024**2),
+            "available": available / (1024**2),
+        }
+
+    def cpu_info(self) -> str:
+        """Summarize /proc/cpuinfo as model, logical cores and clock"""
+        text = self._read(self.root / "proc" / "cpuinfo") or ""
+        cores = 0
+        model = ""
+        mhz = 0.0
+        for line in text.splitlines():
+            key, _, value = line.partition(":")
+            key = key.strip()
+            if key == "processor":
+                cores += 1
+            elif key == "model name" and not model:
+                model = value.strip()
+            elif key == "cpu MHz" and not mhz:
+                try:
+                    mhz = float(value)
+                except ValueError:
+                    pass
+
+        if not cores:
+            return ""
+        summary = f"{cores} cores"
+        if mhz:
+            summary += f" @ {mhz / 1000:.1f}GHz"
+        return f"{model} ({summary})" if model else summary
+
+    def cpu_times(self) -> Optional[Tuple[int, int]]:
+        """Busy and total jiffies from the aggregate line of /proc/stat"""
+        text = self._read(self.root / "proc" / "stat") or ""
+        for line in text.splitlines():
+            if line.startswith("cpu "):
+                values = [int(value) for value in line.split()[1:]]
+                # idle + iowait are the only non-busy columns
+                idle = sum(values[3:5])
+                return sum(values) - idle, sum(values)
+        return None
+
+    def gpus(self) -> List[Dict]:
+        """List display controllers on the PCI bus"""
+        gpus = []
+        try:
+            devices = sorted(self.pci_devices.iterdir())
+        except OSError:
+            return gpus
+
+        for device in devices:
+            device_class = self._read(device / "class") or ""
+            if not device_class.startswith(DISPLAY_CLASS_PREFIX):
+                continue
+
+            vendor_id = (self._read(device / "vendor") or "").lower()
+            device_id = (self._read(device / "device") or "").lower()
+            vendor = PCI_VENDORS.get(vendor_id, "Unknown")
+            vram_total = self._read_int(device / "mem_info_vram_total")
+            memory_total = vram_total / (1024 * 1024) if vram_total else 0
+
+            gpu = {
+                "name": self.device_name(vendor_id, device_id, vendor),
+                "memory_total": memory_total,
+                "memory_used": 0,
+                "memory_free": memory_total,
+                "driver": self.driver(device),
+                "vendor": vendor,
+                "pci_bus": device.name,
+            }
+            gpu.update(self.volatile(device.name))
+            gpus.append(gpu)
+        return gpus
+
+    def volatile(self, pci_bus: str) -> Dict:
+        """Read fast-changing facts a DRM driver exposes (amdgpu does)"""
+        device = self.pci_devices / pci_bus
+        facts = {}
+
+        vram_total = self._read_int(device / "mem_info_vram_total")
+        vram_used = self._read_int(device / "mem_info_vram_used")
+        if vram_total and vram_used is not None:
+            facts["memory_used"] = vram_used / (1024 * 1024)
+            facts["memory_free"] = (vram_total - vram_used) / (1024 * 1024)
+
+        busy = self._read_int(device / "gpu_busy_percent")
+        if busy is not None:
+            facts["load"] = busy / 100
+
+        for temp_file in sorted(device.glob("hwmon/hwmon*/temp1_input")):
+            millidegrees = self._read_int(temp_file)
+            if millidegrees is not None:
+                facts["temperature"] = millidegrees / 1000
+                break
+
+        return facts
+
+    def driver(self, device: Path) -> str:
+        """Kernel driver bound to a device, with the version when known"""
+        try:
+            name = (device / "driver").resolve(strict=True).name
+        except OSError:
+            return "Unknown"
+
+        if name == "nvidia":
+            version = self._read(self.root / "proc" / "driver" / "nvidia" / "version")
+            # "NVRM version: NVIDIA UNIX x86_64 Kernel Module  550.54.14  ..."
+            for word in (version or "").split():
+                if word[:1].isdigit() and "." in word:
+                    return word
+        return name
+
+    def device_name(self, vendor_id: str, device_id: str, vendor: str) -> str:
+        """Look a device up in pci.ids, falling back to vendor and IDs"""
+        vendor_hex = vendor_id.replace("0x", "")
+        device_hex = device_id.replace("0x", "")
+        fallback = f"{vendor} GPU [{vendor_hex}:{device_hex}]"
+
+        for relative in PCI_IDS_PATHS:
+            path = self.root / relative
+            if not path.exists():
+                continue
+            try:
+                pci_name = self._lookup_pci_ids(path, vendor_hex, device_hex)
+            except OSError as e:
+                logging.debug(f"Reading {path} failed: {e}")
+                continue
+            return self.marketing_name(pci_name, vendor) if pci_name else fallback
+        return fallback
+
+    def _lookup_pci_ids(self, path: Path, vendor_hex: str, device_hex: str):
+        """Scan pci.ids for a vendor's device entry"""
+        in_vendor = False
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                if not line.startswith("\t"):
+                    if in_vendor:
+                        return None
+                    in_vendor = line.startswith(vendor_hex + " ")
+                elif in_vendor and line.startswith("\t" + device_hex + " "):
+                    return line.strip()[len(device_hex) :].strip()
+        return None
+
+    @staticmethod
+    def marketing_name(pci_name: str, vendor: str) -> str:
+        """Turn "AD102 [GeForce RTX 4090]" into "NVIDIA GeForce RTX 4090"
+
+        This matches the names nvidia-smi and GPUtil report, so duplicate
+        entries from different probes can be merged by name.
+        """
+        if "[" in pci_name and pci_name.endswith("]"):
+            pci_name = pci_name[pci_name.rfind("[") + 1 : -1]
+        if vendor != "Unknown" and vendor.lower() not in pci_name.lower():
+            pci_name = f"{vendor} {pci_name}"
+        return pci_name
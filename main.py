@@ -18,14 +18,18 @@ Email: john@blancuzzi.org
 Project: https://github.com/BlancuzziJ/Ollama-GUI
 """
 
+from startup_profiler import profiler  # First, so it can time the imports below
+import argparse
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
 from PIL import Image
 import requests
 import json
+import multiprocessing
 import threading
 import time
+import queue
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
 import os
@@ -33,7 +37,39 @@ import logging
 from pathlib import Path
 import webbrowser
 from security import security  # Minimal security for URLs only
-from gpu_info import get_gpu_info, format_gpu_info_for_display, check_gpu_dependencies
+from model_metadata import ModelMetadataCache, license_summary
+from model_inventory import ModelDelta, ModelInventory
+from connection_monitor import ConnectionMonitor, render_sparkline
+from ndjson_stream import NDJSONStreamReader, STREAM_CHUNK_SIZE
+from telemetry import TelemetrySampler, extract_turn_metrics
+import security_log
+from memory_fit import DEFAULT_NUM_CTX, NUM_CTX_CHOICES, estimate_fit, fit_badge
+from settings import MODEL_OPTION_LIMITS, Settings, SettingsStore
+from history_archive import SNIPPET_CHARS, HistoryArchive, split_for_retention
+from chat_messages import Message, MessageLog, json_default, load_sessions
+from history_search import HistorySemanticIndex
+from document_index import DocumentIndex
+from memory_notes import NoteIndex
+from quant_compare import (
+    DEFAULT_PROMPTS,
+    DEFAULT_QUANTS,
+    QuantComparison,
+    format_table,
+    memory_budget_mb,
+    recommend,
+    related_models,
+    variant_names,
+)
+from response_cache import ResponseCache, cache_key
+from blob_store import (
+    BlobStoreIndex,
+    default_models_dir,
+    format_bytes,
+    format_usage_report,
+)
+from blob_verify import BlobVerifier
+
+profiler.mark("imports done")
 
 # Configure logging to suppress debug messages from GPU detection
 logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
@@ -43,20 +79,67 @@ ctk.set_appearance_mode("dark")  # "dark" or "light"
 ctk.set_default_color_theme("blue")  # "blue", "green", "dark-blue"
 
 
+# Characters per chunk when a cached response is replayed as a stream
+REPLAY_CHUNK_CHARS = 64
+
+# Milliseconds to gather /api/show results before views re-estimate once
+METADATA_REFRESH_DELAY_MS = 250
+
+
 class OllamaAPI:
     """Handles all communication with the Ollama API with security validation"""
 
-    def __init__(self, base_url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        pool_size: int = 4,
+        max_request_bytes: Optional[int] = None,
+        connect_timeout: float = 5.0,
+        request_timeout: float = 60.0,
+    ):
+        self.set_base_url(base_url)
+        self.max_request_bytes = max_request_bytes or security.max_request_bytes
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+
+        # Pooled keep-alive connections shared by health checks and requests
+        self.session = requests.Session()
+        self.pool_size = 0
+        self.set_pool_size(pool_size)
+
+        # Replays responses to repeated requests when set; keyed on digests
+        self.response_cache: Optional[ResponseCache] = None
+        self.model_digests: Dict[str, str] = {}
+        self.model_options: Dict[str, Dict] = {}  # Option presets by model name
+
+    def set_base_url(self, base_url: str):
+        """Point the client at another Ollama server"""
         # Validate URL before setting
         if not security.validate_url(base_url):
             security.log_security_event("Invalid Ollama URL", {"url": base_url})
             raise ValueError("Invalid Ollama URL provided")
         self.base_url = base_url.rstrip("/")
 
+    def set_pool_size(self, pool_size: int):
+        """Resize the connection pool; requests in flight keep their connection"""
+        if pool_size == self.pool_size:
+            return
+        previous = self.session.adapters.get("http://")
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool_size = pool_size
+        if previous is not None:
+            previous.close()
+
     def test_connection(self) -> bool:
         """Test if Ollama is running and accessible - fast, no validation"""
         try:
-            response = requests.get(f"{self.base_url}/api/version", timeout=5)
+            response = self.session.get(
+                f"{self.base_url}/api/version", timeout=self.connect_timeout
+            )
             return response.status_code == 200
         except requests.RequestException as e:
             security.log_security_event("Connection test failed", {"error": str(e)})
@@ -64,8 +147,16 @@ class OllamaAPI:
 
     def get_models(self) -> List[Dict]:
         """Get list of available models with security validation"""
+        return self.fetch_models() or []
+
+    def fetch_models(self) -> Optional[List[Dict]]:
+        """Like get_models, but None when the list could not be fetched
+
+        Callers that track installed models use this, so a failed request
+        is not mistaken for every model having been removed.
+        """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=10)
             if response.status_code == 200:
                 models = response.json().get("models", [])
                 # Validate each model name
@@ -78,10 +169,33 @@ class OllamaAPI:
                             security.log_security_event(
                                 "Invalid model name detected", {"model": model["name"]}
                             )
+                self.model_digests = {
+                    model["name"]: model.get("digest", "") for model in validated_models
+                }
                 return validated_models
         except requests.RequestException as e:
             security.log_security_event("Failed to get models", {"error": str(e)})
-        return []
+        return None
+
+    def show_model(self, model_name: str) -> Optional[Dict]:
+        """Get detailed model information from /api/show"""
+        if not security.validate_model_name(model_name):
+            security.log_security_event(
+                "Invalid model name for show", {"model": model_name}
+            )
+            return None
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/show", json={"name": model_name}, timeout=10
+            )
+            if response.status_code == 200:
+                return response.json()
+        except requests.RequestException as e:
+            security.log_security_event(
+                "Failed to show model", {"model": model_name, "error": str(e)}
+            )
+        return None
 
     def pull_model(
         self, model_name: str, progress_callback: Optional[Callable] = None
@@ -95,7 +209,7 @@ class OllamaAPI:
             return False
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/pull",
                 json={"name": model_name},
                 stream=True,
@@ -103,13 +217,14 @@ class OllamaAPI:
             )
 
             if response.status_code == 200:
-                for line in response.iter_lines():
-                    if line:
-                        data = json.loads(line.decode())
-                        if progress_callback:
-                            progress_callback(data)
-                        if data.get("status") == "success":
-                            return True
+                reader = NDJSONStreamReader(
+                    response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                )
+                for data in reader:
+                    if progress_callback:
+                        progress_callback(data)
+                    if data.get("status") == "success":
+                        return True
         except requests.RequestException:
             pass
         return False
@@ -124,7 +239,7 @@ class OllamaAPI:
             return False
 
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.base_url}/api/delete", json={"name": model_name}, timeout=30
             )
             return response.status_code == 200
@@ -134,14 +249,76 @@ class OllamaAPI:
             )
             return False
 
+    def running_models(self) -> List[Dict]:
+        """Models loaded in memory, from /api/ps (size and size_vram in bytes)"""
+        try:
+            response = self.session.get(f"{self.base_url}/api/ps", timeout=10)
+            if response.status_code == 200:
+                return response.json().get("models", [])
+        except requests.RequestException as e:
+            logging.debug(f"Failed to list running models: {e}")
+        return []
+
+    def unload_model(self, model_name: str) -> bool:
+        """Ask Ollama to free a model's memory now (keep_alive 0)"""
+        if not security.validate_model_name(model_name):
+            return False
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/chat",
+                json={"model": model_name, "messages": [], "keep_alive": 0},
+                timeout=30,
+            )
+            return response.status_code == 200
+        except requests.RequestException as e:
+            logging.debug(f"Failed to unload {model_name}: {e}")
+            return False
+
+    def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        """Embed texts with an embedding model via /api/embed"""
+        if not security.validate_model_name(model):
+            security.log_security_event(
+                "Invalid model name for embed", {"model": model}
+            )
+            raise ValueError(f"Invalid embedding model name: {model}")
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/embed",
+                json={"model": model, "input": texts},
+                timeout=(self.connect_timeout, self.request_timeout),
+            )
+        except requests.RequestException as e:
+            raise Exception(f"Embedding request failed: {str(e)}")
+        if response.status_code != 200:
+            try:
+                error = response.json().get("error", response.reason)
+            except ValueError:
+                error = response.reason
+            raise Exception(f"Embedding with {model} failed: {error}")
+        return response.json()["embeddings"]
+
     def chat(
         self,
         model: str,
         messages: List[Dict],
         stream_callback: Optional[Callable] = None,
         hide_thinking: bool = False,
+        metrics_callback: Optional[Callable] = None,
+        use_cache: bool = True,
+        options: Optional[Dict] = None,
+        use_preset: bool = True,
     ) -> str:
-        """Send chat request to Ollama with security validation"""
+        """Send chat request to Ollama with security validation
+
+        metrics_callback receives the timing metrics (eval_count,
+        eval_duration, ...) from the final response line. Raises ValueError
+        when the request body exceeds max_request_bytes. When a response
+        cache is set, repeated requests are answered from it unless
+        use_cache is False; cached metrics carry "cached": True. options
+        override the model's preset from model_options for this request;
+        with use_preset False they are sent alone.
+        """
         # Validate model name
         if not security.validate_model_name(model):
             security.log_security_event("Invalid model name for chat", {"model": model})
@@ -154,26 +331,44 @@ class OllamaAPI:
             "stream": bool(stream_callback),
         }
 
-        # Add options for thinking models
-        if hide_thinking:
-            # Common parameters to suppress thinking/reasoning
-            request_data["options"] = {
-                "temperature": 0.7,  # Keep default temperature
-                "hide_thinking": True,  # Custom parameter for some models
-                "show_reasoning": False,  # Alternative parameter name
-                "thinking": False,  # Another common parameter
-            }
+        # Per-model preset (num_ctx, num_gpu, ...); Ollama's defaults otherwise.
+        # Thinking is hidden by filtering the reply, not by an option.
+        preset = self.model_options.get(model, {}) if use_preset else {}
+        options = dict(preset, **(options or {}))
+        if options:
+            request_data["options"] = options
+
+        key = None
+        if use_cache and self.response_cache and self.model_digests.get(model):
+            key = cache_key(
+                self.model_digests[model],
+                messages,
+                dict(options, hide_thinking=hide_thinking),
+            )
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return self._replay(cached, stream_callback, metrics_callback)
 
-        if not security.validate_json_data(request_data):
-            security.log_security_event("Request data too large", {"model": model})
-            return ""
+        # Serialize once: the same bytes are size-checked and sent
+        body = security.encode_json(request_data)
+        if not security.validate_json_size(body, self.max_request_bytes):
+            security.log_security_event(
+                "Request data too large",
+                {"model": model, "bytes": len(body), "limit": self.max_request_bytes},
+            )
+            raise ValueError(
+                f"Conversation is too large to send ({len(body) // 1024} KB, "
+                f"limit {self.max_request_bytes // 1024} KB). Start a new chat "
+                f"or raise {security.MAX_REQUEST_BYTES_ENV}."
+            )
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/chat",
-                json=request_data,
+                data=body,
+                headers={"Content-Type": "application/json"},
                 stream=bool(stream_callback),
-                timeout=60,
+                timeout=(self.connect_timeout, self.request_timeout),
             )
 
             if response.status_code == 200:
@@ -182,52 +377,59 @@ class OllamaAPI:
                     thinking_content = ""
                     in_thinking_block = False
 
-                    for line in response.iter_lines():
-                        if line:
-                            data = json.loads(line.decode())
-                            if "message" in data and "content" in data["message"]:
-                                content = data["message"]["content"]
-
-                                if hide_thinking:
-                                    # Try to detect and filter thinking blocks
-                                    # Common patterns: <thinking>, [THINKING], **Thinking:**
-                                    if any(
-                                        marker in content.lower()
-                                        for marker in [
-                                            "<thinking>",
-                                            "[thinking]",
-                                            "**thinking",
-                                            "thinking:",
-                                        ]
-                                    ):
-                                        in_thinking_block = True
-                                        thinking_content += content
-                                        continue
-                                    elif any(
-                                        marker in content.lower()
-                                        for marker in [
-                                            "</thinking>",
-                                            "[/thinking]",
-                                            "**answer",
-                                            "answer:",
-                                        ]
-                                    ):
-                                        in_thinking_block = False
-                                        thinking_content = ""
-                                        # Skip this chunk as it's the end of thinking
-                                        continue
-                                    elif in_thinking_block:
-                                        thinking_content += content
-                                        continue
-
-                                full_response += content
-                                stream_callback(content)
-                            if data.get("done", False):
-                                break
+                    reader = NDJSONStreamReader(
+                        response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                    )
+                    for content, data in reader.iter_chat():
+                        if content:
+                            if hide_thinking:
+                                # Try to detect and filter thinking blocks
+                                # Common patterns: <thinking>, [THINKING], **Thinking:**
+                                if any(
+                                    marker in content.lower()
+                                    for marker in [
+                                        "<thinking>",
+                                        "[thinking]",
+                                        "**thinking",
+                                        "thinking:",
+                                    ]
+                                ):
+                                    in_thinking_block = True
+                                    thinking_content += content
+                                    continue
+                                elif any(
+                                    marker in content.lower()
+                                    for marker in [
+                                        "</thinking>",
+                                        "[/thinking]",
+                                        "**answer",
+                                        "answer:",
+                                    ]
+                                ):
+                                    in_thinking_block = False
+                                    thinking_content = ""
+                                    # Skip this chunk as it's the end of thinking
+                                    continue
+                                elif in_thinking_block:
+                                    thinking_content += content
+                                    continue
+
+                            full_response += content
+                            stream_callback(content)
+                        if data is not None and data.get("done", False):
+                            metrics = extract_turn_metrics(data)
+                            if metrics_callback:
+                                metrics_callback(metrics)
+                            # Only complete responses are worth replaying
+                            self._store(key, full_response, metrics)
+                            break
                     return full_response
                 else:
                     data = response.json()
                     response_content = data["message"]["content"]
+                    metrics = extract_turn_metrics(data)
+                    if metrics_callback:
+                        metrics_callback(metrics)
 
                     if hide_thinking:
                         # Post-process to remove thinking blocks from non-streaming response
@@ -235,11 +437,32 @@ class OllamaAPI:
                             response_content
                         )
 
+                    self._store(key, response_content, metrics)
                     return response_content
         except requests.RequestException as e:
             raise Exception(f"Chat request failed: {str(e)}")
         return ""
 
+    def _store(self, key: Optional[str], content: str, metrics: Dict):
+        """Cache a finished response"""
+        if key is not None and content:
+            self.response_cache.put(key, {"content": content, "metrics": metrics})
+
+    @staticmethod
+    def _replay(
+        cached: Dict,
+        stream_callback: Optional[Callable],
+        metrics_callback: Optional[Callable],
+    ) -> str:
+        """Deliver a cached response the way a live one arrives"""
+        content = cached["content"]
+        if stream_callback:
+            for start in range(0, len(content), REPLAY_CHUNK_CHARS):
+                stream_callback(content[start : start + REPLAY_CHUNK_CHARS])
+        if metrics_callback:
+            metrics_callback(dict(cached.get("metrics", {}), cached=True))
+        return content
+
     def _filter_thinking_content(self, content: str) -> str:
         """Filter out thinking/reasoning blocks from response content"""
         import re
@@ -271,40 +494,63 @@ class OllamaAPI:
 class ChatManager:
     """Manages chat sessions and history"""
 
-    def __init__(self):
-        self.current_session = []
+    def __init__(self, lazy_history: bool = False, max_history: int = 100):
+        self.current_session = MessageLog()
+        # Stored session the current one continues: its timestamp, title and
+        # message count when opened or last saved
+        self.session_origin: Optional[Dict] = None
+        # Documents attached to the current chat; excerpts come only from them
+        self.document_sources: List[str] = []
         self.chat_history = []
         self.data_dir = Path.home() / ".shamollama"
         self.data_dir.mkdir(exist_ok=True)
         self.history_file = self.data_dir / "chat_history.json"
+        # Retention limits for the hot history; 0 disables a limit
+        self.max_history = max_history
+        self.max_history_age_days = 0
+        self.max_history_bytes = 0
+        self.archive = HistoryArchive(self.data_dir / "history_archive")
+        # Embeddings of saved messages; idle until an embedding model is set
+        self.semantic_index = HistorySemanticIndex(self.data_dir / "semantic_index")
+        # Chunks of the documents attached to any chat
+        self.document_index = DocumentIndex(self.data_dir / "documents")
+        self.history_lock = threading.RLock()
         self.memory_manager = PersonalMemoryManager()
-        self.load_history()
+        self.history_loaded = threading.Event()
+        if not lazy_history:
+            self.load_history()
 
     def add_message(self, role: str, content: str, model: str = ""):
         """Add a message to current session"""
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "model": model,
-        }
-        self.current_session.append(message)
+        self.current_session.append(Message(role, content, model=model))
 
     def get_messages_for_api(self) -> List[Dict]:
         """Get messages formatted for Ollama API with personal memory context"""
         messages = []
+        question = next(
+            (m.content for m in reversed(self.current_session) if m.role == "user"),
+            "",
+        )
 
         # Add personal memory context as system message if enabled
-        memory_context = self.memory_manager.get_system_context()
+        memory_context = self.memory_manager.get_system_context(question)
         if memory_context:
             messages.append({"role": "system", "content": memory_context})
 
+        # Add excerpts of this chat's documents relevant to the latest question
+        if self.document_sources and self.document_index.ready:
+            document_context = self.document_index.get_context(
+                question, self.document_sources
+            )
+            if document_context:
+                messages.append({"role": "system", "content": document_context})
+
         # Add conversation messages
         messages.extend(
             [
-                {"role": msg["role"], "content": msg["content"]}
+                {"role": msg.role, "content": msg.content}
                 for msg in self.current_session
-                if msg["role"] in ["user", "assistant"]
+                if msg.role in ["user", "assistant"]
             ]
         )
 
@@ -315,42 +561,239 @@ class ChatManager:
         if not self.current_session:
             return
 
+        origin = self.session_origin
+        if (
+            origin
+            and len(self.current_session) == origin["messages"]
+            and self.document_sources == origin["documents"]
+            and not title
+        ):
+            return  # Nothing new since it was opened or last saved
+
+        # Never append to (and then overwrite) a history still being loaded
+        self.history_loaded.wait()
         session = {
-            "title": title or f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            "title": title
+            or (origin["title"] if origin else "")
+            or f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}",
             "timestamp": datetime.now().isoformat(),
-            "messages": self.current_session.copy(),
+            "messages": self.current_session.snapshot(),
         }
-        self.chat_history.append(session)
-        self.save_history()
+        if self.document_sources:
+            session["documents"] = list(self.document_sources)
+        with self.history_lock:
+            # A continued hot session is updated in place; an archived one is
+            # saved again under its title, as it can't be changed in the archive
+            index = next(
+                (
+                    i
+                    for i, stored in enumerate(self.chat_history)
+                    if origin and stored.get("timestamp") == origin["timestamp"]
+                ),
+                None,
+            )
+            if index is None:
+                self.chat_history.append(session)
+            else:
+                session["timestamp"] = origin["timestamp"]
+                self.chat_history[index] = session
+            self.session_origin = {
+                "timestamp": session["timestamp"],
+                "title": session["title"],
+                "messages": len(session["messages"]),
+                "documents": list(self.document_sources),
+            }
+            self.enforce_retention()
+            self.save_history()
+            self.semantic_index.update_async(self.chat_history)
+
+    def set_retention(
+        self,
+        max_sessions: int,
+        max_age_days: int = 0,
+        max_bytes: int = 0,
+        compression: str = "gzip",
+    ):
+        """Set the hot history limits; takes effect on the next enforcement"""
+        self.max_history = max_sessions
+        self.max_history_age_days = max_age_days
+        self.max_history_bytes = max_bytes
+        self.archive.compression = compression
+
+    def enforce_retention(self) -> int:
+        """Move sessions beyond the retention limits to the archive
+
+        Returns the number of sessions archived; the caller saves the history.
+        """
+        with self.history_lock:
+            keep, archived = split_for_retention(
+                self.chat_history,
+                self.max_history,
+                self.max_history_age_days,
+                self.max_history_bytes,
+            )
+            if archived:
+                # Archive first so a failure cannot lose sessions
+                self.archive.add(archived)
+                self.chat_history = keep
+            return len(archived)
 
     def new_session(self):
         """Start a new chat session"""
         if self.current_session:
             self.save_session()
-        self.current_session = []
+        self.current_session = MessageLog()
+        self.session_origin = None
+        self.document_sources = []
+
+    def open_session(self, session: Dict):
+        """Continue a stored session; saving updates it instead of copying it"""
+        self.current_session = MessageLog.from_dicts(session["messages"])
+        self.use_session_documents(session)
+        self.session_origin = {
+            "timestamp": session.get("timestamp"),
+            "title": session.get("title", ""),
+            "messages": len(self.current_session),
+            "documents": list(self.document_sources),
+        }
+
+    def use_session_documents(self, session: Dict):
+        """Retrieve from a stored session's documents, indexing them if needed"""
+        self.document_sources = list(session.get("documents") or [])
+        if self.document_sources:
+            # Sources of archived chats may have been dropped from the index
+            self.document_index.attach(self.document_sources)
+            self.document_index.refresh_async()
+
+    def attach_documents(self, paths: List[str]):
+        """Attach files or folders to the current chat and index them"""
+        for source in self.document_index.attach(paths):
+            if source not in self.document_sources:
+                self.document_sources.append(source)
+        self.document_index.refresh_async()
+
+    def detach_documents(self):
+        """Detach every document from the current chat
+
+        Sources no other saved chat uses are dropped from the index too.
+        """
+        removed, self.document_sources = self.document_sources, []
+        origin = self.session_origin
+        self.history_loaded.wait()
+        with self.history_lock:
+            in_use = {
+                source
+                for session in self.chat_history
+                if not origin or session.get("timestamp") != origin["timestamp"]
+                for source in session.get("documents", [])
+            }
+        self.document_index.detach([s for s in removed if s not in in_use])
 
     def load_session(self, index: int):
         """Load a session from history"""
         if 0 <= index < len(self.chat_history):
-            self.current_session = self.chat_history[index]["messages"].copy()
+            self.current_session = self.chat_history[index]["messages"].snapshot()
+            self.use_session_documents(self.chat_history[index])
+            self.session_origin = None
 
     def save_history(self):
         """Save chat history to file"""
         try:
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(self.chat_history, f, indent=2, ensure_ascii=False)
+            with self.history_lock:
+                temp_file = self.history_file.with_suffix(".tmp")
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    json.dump(
+                        self.chat_history,
+                        f,
+                        indent=2,
+                        ensure_ascii=False,
+                        default=json_default,
+                    )
+                temp_file.replace(self.history_file)
         except Exception as e:
             print(f"Error saving history: {e}")
 
     def load_history(self):
-        """Load chat history from file"""
+        """Load chat history from file, archiving what is past the limits"""
         try:
             if self.history_file.exists():
                 with open(self.history_file, "r", encoding="utf-8") as f:
-                    self.chat_history = json.load(f)
+                    self.chat_history = load_sessions(json.load(f))
         except Exception as e:
             print(f"Error loading history: {e}")
             self.chat_history = []
+            self.history_loaded.set()
+            return
+
+        try:
+            if self.enforce_retention():
+                self.save_history()
+        except Exception as e:
+            print(f"Error archiving history: {e}")
+        finally:
+            self.history_loaded.set()
+
+    def clear_history(self):
+        """Delete the hot history and the archive"""
+        self.history_loaded.wait()
+        with self.history_lock:
+            self.chat_history = []
+            self.save_history()
+            self.archive.clear()
+            self.semantic_index.reset()
+
+    def semantic_search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Sessions closest in meaning to query, in the archive search format
+
+        Hot sessions carry their history index, archived ones their archive
+        ref. Sessions deleted since they were indexed are skipped.
+        """
+        hits = self.semantic_index.search(query, limit)
+        width = SNIPPET_CHARS * 2  # As long as an archive search snippet
+        with self.history_lock:
+            hot = {
+                session.get("timestamp"): i
+                for i, session in enumerate(self.chat_history)
+            }
+            sessions = list(self.chat_history)
+        archived = {entry["timestamp"]: entry for entry in self.archive.entries()}
+
+        results = []
+        for hit in hits:
+            if hit["key"] in hot:
+                index = hot[hit["key"]]
+                session = sessions[index]
+                messages = session["messages"]
+                text = messages[hit["message"]].content
+                snippet = text[:width].replace("\n", " ")
+                if len(text) > width:
+                    snippet += "…"
+                results.append(
+                    {
+                        "title": session["title"],
+                        "timestamp": session["timestamp"],
+                        "messages": len(messages),
+                        "snippet": snippet,
+                        "score": hit["score"],
+                        "index": index,
+                    }
+                )
+            elif hit["key"] in archived:
+                entry = archived[hit["key"]]
+                results.append(
+                    dict(entry, snippet="(archived session)", score=hit["score"])
+                )
+        return results
+
+    def load_history_async(self, on_loaded: Optional[Callable] = None):
+        """Load chat history on a background thread"""
+
+        def load():
+            self.load_history()
+            if on_loaded:
+                on_loaded()
+
+        threading.Thread(target=load, daemon=True).start()
 
     def export_session(self, filepath: str, session_index: int = -1):
         """Export a session to file"""
@@ -367,7 +810,13 @@ class ChatManager:
         try:
             with open(filepath, "w", encoding="utf-8") as f:
                 if filepath.endswith(".json"):
-                    json.dump(session, f, indent=2, ensure_ascii=False)
+                    json.dump(
+                        session,
+                        f,
+                        indent=2,
+                        ensure_ascii=False,
+                        default=json_default,
+                    )
                 else:  # Text format
                     f.write(f"# {session['title']}\n")
                     f.write(f"Date: {session['timestamp']}\n\n")
@@ -386,6 +835,11 @@ class PersonalMemoryManager:
         self.data_dir.mkdir(exist_ok=True)
         self.memory_file = self.data_dir / "personal_memory.json"
         self.memory = self.load_memory()
+        # Tokens of context notes sent per request; 0 sends every note
+        self.notes_token_budget = 512
+        # Personal info, indexed notes and instructions, rebuilt on update
+        self._compiled = None
+        self._lock = threading.Lock()
 
     def load_memory(self) -> dict:
         """Load personal memory from file"""
@@ -433,19 +887,46 @@ class PersonalMemoryManager:
 
     def update_memory(self, **kwargs):
         """Update memory fields"""
-        for key, value in kwargs.items():
-            if key in self.memory:
-                self.memory[key] = value
-            elif key in self.memory.get("personal_info", {}):
-                self.memory["personal_info"][key] = value
+        with self._lock:
+            for key, value in kwargs.items():
+                if key in self.memory:
+                    self.memory[key] = value
+                elif key in self.memory.get("personal_info", {}):
+                    self.memory["personal_info"][key] = value
+            self._compiled = None
         self.save_memory()
 
-    def get_system_context(self) -> str:
-        """Generate system context from personal memory"""
-        if not self.memory.get("enabled", True):
-            return ""
+    def get_system_context(self, query: str = "") -> str:
+        """Generate system context from personal memory
+
+        Context notes are filtered down to the items relevant to query when
+        they exceed notes_token_budget.
+        """
+        with self._lock:
+            if not self.memory.get("enabled", True):
+                return ""
+            if self._compiled is None:
+                self._compiled = self.compile_context()
+            personal, notes, instructions = self._compiled
+
+        items = notes.select(query, self.notes_token_budget)
+        if len(items) == len(notes.items):
+            notes_text = notes.notes
+        else:
+            notes_text = "\n".join(items)
 
         context_parts = []
+        if personal:
+            context_parts.append(personal)
+        if notes_text:
+            context_parts.append(f"Additional Context:\n{notes_text}")
+        if instructions:
+            context_parts.append(f"Instructions:\n{instructions}")
+        return "\n\n".join(context_parts)
+
+    def compile_context(self):
+        """Personal info block, note index and instructions from memory"""
+        context_parts = []
 
         # Add personal info
         info = self.memory.get("personal_info", {})
@@ -464,30 +945,25 @@ class PersonalMemoryManager:
             if info.get("preferences"):
                 context_parts.append(f"- My preferences: {info['preferences']}")
 
-        # Add context notes
-        if self.memory.get("context_notes"):
-            if context_parts:
-                context_parts.append("")
-            context_parts.append("Additional Context:")
-            context_parts.append(self.memory["context_notes"])
-
-        # Add custom system prompt
-        if self.memory.get("system_prompt"):
-            if context_parts:
-                context_parts.append("")
-            context_parts.append("Instructions:")
-            context_parts.append(self.memory["system_prompt"])
-
-        return "\n".join(context_parts) if context_parts else ""
+        return (
+            "\n".join(context_parts),
+            NoteIndex(self.memory.get("context_notes", "")),
+            self.memory.get("system_prompt", ""),
+        )
 
 
 class ShamaOllamaGUI:
     """Main GUI application"""
 
     def __init__(self):
+        # Settings are read from an immutable snapshot that is swapped on change
+        self.settings_store = SettingsStore()
+        settings = self.settings
+        ctk.set_appearance_mode(settings.theme)
+
         self.root = ctk.CTk()
         self.root.title("ShamaOllama - Streaming AI Interface")
-        self.root.geometry("1200x800")
+        self.root.geometry(settings.window_geometry)
         self.root.minsize(800, 600)
 
         # Set application icon - CustomTkinter specific approach
@@ -506,30 +982,215 @@ class ShamaOllamaGUI:
             # Icon loading failed, continue without icon
             pass
 
-        # Initialize components
-        self.api = OllamaAPI()
-        self.chat_manager = ChatManager()
+        # Initialize components (history is loaded once the window is up)
+        with profiler.phase("components"):
+            self.api = OllamaAPI(
+                settings.ollama_url,
+                settings.pool_size,
+                connect_timeout=settings.connect_timeout,
+                request_timeout=settings.request_timeout,
+            )
+            self.chat_manager = ChatManager(lazy_history=True)
+            self.apply_retention_settings(settings)
+            self.chat_manager.memory_manager.notes_token_budget = (
+                settings.memory_notes_tokens
+            )
+            self.chat_manager.semantic_index.on_progress = (
+                lambda indexed, remaining: self.ui_queue.put(
+                    {
+                        "type": "semantic_index",
+                        "indexed": indexed,
+                        "remaining": remaining,
+                    }
+                )
+            )
+            self.chat_manager.document_index.on_progress = (
+                lambda indexed, remaining: self.ui_queue.put(
+                    {
+                        "type": "document_index",
+                        "indexed": indexed,
+                        "remaining": remaining,
+                    }
+                )
+            )
+            self.apply_embedding_settings(settings)
+            self.apply_cache_settings(settings)
+            self.api.model_options = settings.model_options
+            self.model_metadata = ModelMetadataCache()
+            self.model_inventory = ModelInventory()
         self.current_model = None
         self.models = []
         self.is_chatting = False
+        self.documents_window = None  # Attached documents window, when open
+        self.options_window = None  # Model options window, when open
+        self.quant_window = None  # Quantization comparison window, when open
+        self.disk_usage_window = None  # Blob store usage window, when open
+        # Local blob store index, built on first scan; one scan at a time
+        self.blob_index: Optional[BlobStoreIndex] = None
+        self.blob_scan_lock = threading.Lock()
 
         # Streaming response variables
         self.current_response = ""
         self.response_start_pos = None
         self.typing_animation_active = False
         self.first_token_received = False
+        # Streamed chunks waiting for the next render tick
+        self.pending_chunks = []
+        self.render_scheduled = False
+        self.render_lock = threading.Lock()
+        # A burst of cached model details triggers a single view refresh
+        self.metadata_refresh_scheduled = False
+
+        # Settings variables (read outside the settings panel, which is lazy)
+        self.autosave_var = ctk.BooleanVar(value=settings.auto_save)
+        self.hide_thinking_var = ctk.BooleanVar(value=settings.hide_thinking)
+        self.response_cache_var = ctk.BooleanVar(value=settings.response_cache)
+        self.security_logging_var = ctk.BooleanVar(value=True)
+        self.input_validation_var = ctk.BooleanVar(value=True)
+        self.url_validation_var = ctk.BooleanVar(value=True)
+
+        # Events published by worker threads, drained on the Tk thread
+        self.ui_queue = queue.Queue()
+        self.ui_handlers = {
+            "connection": self.on_connection_event,
+            "history_loaded": self.on_history_loaded,
+            "system_info": self.on_system_info,
+            "turn_telemetry": self.on_turn_telemetry,
+            "model_metadata": self.on_model_metadata,
+            "fit_estimates": self.on_fit_estimates,
+            "settings": self.on_settings_changed,
+            "search_results": self.on_search_results,
+            "semantic_index": self.on_semantic_index,
+            "document_index": self.on_document_index,
+            "session_opened": self.on_session_opened,
+            "option_tuning": self.on_option_tuning,
+            "quant_compare": self.on_quant_compare,
+            "disk_usage": self.on_disk_usage,
+            "blob_verify": self.on_blob_verify,
+        }
+        self.settings_store.subscribe(
+            lambda new, previous: self.ui_queue.put(
+                {"type": "settings", "settings": new, "previous": previous}
+            )
+        )
+        self.connection_monitor = ConnectionMonitor(
+            self.api.test_connection, self.ui_queue.put
+        )
+        # Samples hardware only while a response is being generated
+        self.telemetry = TelemetrySampler()
 
-        # Settings variables
-        self.autosave_var = ctk.BooleanVar(value=True)
+        # Setup GUI; panels other than chat are built on first visit
+        with profiler.phase("setup_gui"):
+            self.setup_gui()
+        self.subscribe_to_models()
+        self.process_ui_queue()
 
-        # Setup GUI
-        self.setup_gui()
-        self.refresh_models()
-        self.check_connection()
+        # Network and disk work waits until the window can paint
+        self.root.after_idle(self.on_first_idle)
 
         # Bind close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def on_first_idle(self):
+        """Start background work once the first frame is up"""
+        profiler.mark("first interactive frame")
+        self.refresh_models()
+        self.check_connection()
+        self.chat_manager.load_history_async(
+            lambda: self.ui_queue.put({"type": "history_loaded"})
+        )
+        self.settings_store.start_watching()
+        # Pick up edits made to attached documents while the app was closed
+        self.chat_manager.document_index.refresh_async()
+
+        if profiler.enabled:
+            profiler.disable_import_timing()
+            print(profiler.report())
+
+    @property
+    def settings(self) -> Settings:
+        """Current settings snapshot"""
+        return self.settings_store.current
+
+    def on_settings_changed(self, event: Dict):
+        """Apply a settings snapshot loaded or saved while running"""
+        settings, previous = event["settings"], event["previous"]
+        if settings.ollama_url.rstrip("/") != self.api.base_url:
+            self.api.set_base_url(settings.ollama_url)
+            self.connection_monitor.wake()
+            self.refresh_models()
+        self.api.set_pool_size(settings.pool_size)
+        self.api.connect_timeout = settings.connect_timeout
+        self.api.request_timeout = settings.request_timeout
+        self.apply_retention_settings(settings)
+        self.chat_manager.memory_manager.notes_token_budget = (
+            settings.memory_notes_tokens
+        )
+        if (settings.embedding_model, settings.document_chunks) != (
+            previous.embedding_model,
+            previous.document_chunks,
+        ):
+            self.apply_embedding_settings(settings)
+            self.chat_manager.document_index.refresh_async()
+        retention = ("max_history", "max_history_age_days", "max_history_mb")
+        if any(getattr(settings, k) != getattr(previous, k) for k in retention):
+            threading.Thread(target=self.enforce_history_retention, daemon=True).start()
+        self.autosave_var.set(settings.auto_save)
+        self.hide_thinking_var.set(settings.hide_thinking)
+        self.response_cache_var.set(settings.response_cache)
+        self.apply_cache_settings(settings)
+        self.api.model_options = settings.model_options
+        if settings.ollama_models_dir != previous.ollama_models_dir:
+            self.refresh_disk_usage()
+        if settings.theme != previous.theme:
+            self.apply_theme(settings.theme)
+
+        if "settings" in self.panels:
+            self.fill_settings_form(settings)
+        if self.current_panel == "history":
+            self.refresh_history_display()
+        if "history" in self.panels:
+            self.update_semantic_status()
+        self.status_label.configure(text="Settings applied")
+
+    def apply_retention_settings(self, settings: Settings):
+        """Pass the history retention limits to the chat manager"""
+        self.chat_manager.set_retention(
+            settings.max_history,
+            settings.max_history_age_days,
+            int(settings.max_history_mb * 1024 * 1024),
+            settings.archive_compression,
+        )
+
+    def apply_embedding_settings(self, settings: Settings):
+        """Point semantic search and document retrieval at the embedding model"""
+        model = settings.embedding_model
+        embed = (lambda texts: self.api.embed(model, texts)) if model else None
+        self.chat_manager.semantic_index.configure(model, embed)
+        self.chat_manager.document_index.configure(
+            model, embed, settings.document_chunks
+        )
+
+    def apply_cache_settings(self, settings: Settings):
+        """Turn the response cache on or off and apply its disk budget"""
+        if not settings.response_cache:
+            self.api.response_cache = None
+            return
+        if self.api.response_cache is None:
+            self.api.response_cache = ResponseCache(
+                self.chat_manager.data_dir / "response_cache"
+            )
+        self.api.response_cache.set_max_disk_bytes(
+            int(settings.response_cache_mb * 1024 * 1024)
+        )
+
+    def enforce_history_retention(self):
+        """Archive sessions past new retention limits (worker thread)"""
+        self.chat_manager.history_loaded.wait()
+        if self.chat_manager.enforce_retention():
+            self.chat_manager.save_history()
+            self.ui_queue.put({"type": "history_loaded"})
+
     def _set_window_icon(self, icon_path):
         """Helper method to set window icon with multiple fallback approaches"""
         try:
@@ -625,7 +1286,14 @@ class ShamaOllamaGUI:
 
         # Theme toggle
         self.theme_btn = ctk.CTkButton(
-            self.sidebar, text="🌙 Dark Theme", command=self.toggle_theme, height=30
+            self.sidebar,
+            text=(
+                "☀️ Light Theme"
+                if ctk.get_appearance_mode() == "Light"
+                else "🌙 Dark Theme"
+            ),
+            command=self.toggle_theme,
+            height=30,
         )
         self.theme_btn.grid(row=5, column=0, padx=20, pady=(10, 5), sticky="ew")
 
@@ -648,17 +1316,28 @@ class ShamaOllamaGUI:
         self.main_frame.grid_columnconfigure(0, weight=1)
         self.main_frame.grid_rowconfigure(0, weight=1)
 
-        # Create different panels
-        self.create_chat_panel()
-        self.create_models_panel()
-        self.create_history_panel()
-        self.create_system_panel()
-        self.create_settings_panel()
-        self.create_about_panel()
+        # Panels are created on first visit; only chat is needed up front
+        self.panel_builders = {
+            "chat": self.create_chat_panel,
+            "models": self.create_models_panel,
+            "history": self.create_history_panel,
+            "system": self.create_system_panel,
+            "settings": self.create_settings_panel,
+            "about": self.create_about_panel,
+        }
+        self.panels = {}
 
         # Show chat panel by default
         self.current_panel = "chat"
-        self.chat_panel.grid(row=0, column=0, sticky="nsew")
+        self.get_panel("chat").grid(row=0, column=0, sticky="nsew")
+
+    def get_panel(self, panel_name: str):
+        """Return a panel frame, building it on first use"""
+        if panel_name not in self.panels:
+            with profiler.phase(f"build {panel_name} panel"):
+                self.panel_builders[panel_name]()
+            self.panels[panel_name] = getattr(self, f"{panel_name}_panel")
+        return self.panels[panel_name]
 
     def create_chat_panel(self):
         """Create the chat interface panel"""
@@ -684,7 +1363,18 @@ class ShamaOllamaGUI:
         )
         self.message_input.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
 
-        # Send button
+        # Attached documents and send buttons
+        self.attach_btn = ctk.CTkButton(
+            input_frame,
+            text="📎 Docs",
+            command=self.show_documents_window,
+            width=80,
+            height=28,
+            fg_color="transparent",
+            border_width=1,
+        )
+        self.attach_btn.grid(row=0, column=1, padx=(5, 10), pady=10, sticky="n")
+
         self.send_btn = ctk.CTkButton(
             input_frame, text="Send", command=self.send_message, width=80, height=35
         )
@@ -692,6 +1382,10 @@ class ShamaOllamaGUI:
 
         # Bind Enter key
         self.message_input.bind("<Control-Return>", lambda e: self.send_message())
+        # Ctrl+Shift+Enter asks the model even if the response is cached
+        self.message_input.bind(
+            "<Control-Shift-Return>", lambda e: self.send_message(use_cache=False)
+        )
 
         # Add welcome message
         self.add_chat_message(
@@ -808,15 +1502,35 @@ class ShamaOllamaGUI:
             font=ctk.CTkFont(size=14, weight="bold"),
         ).grid(row=0, column=1, padx=5, pady=5)
 
+        # Context size used for the memory-fit badges
+        ctk.CTkLabel(list_header_frame, text="Context:").grid(
+            row=0, column=2, padx=(5, 0), pady=5, sticky="e"
+        )
+        self.fit_ctx_var = ctk.StringVar(value=str(DEFAULT_NUM_CTX))
+        ctk.CTkOptionMenu(
+            list_header_frame,
+            values=[str(num_ctx) for num_ctx in NUM_CTX_CHOICES],
+            variable=self.fit_ctx_var,
+            command=lambda _: self.refresh_fit_estimates(),
+            width=90,
+        ).grid(row=0, column=3, padx=5, pady=5, sticky="e")
+
+        # Real disk usage of the local blob store, filled in by a scan
+        self.disk_usage_label = ctk.CTkLabel(
+            list_header_frame, text="", font=ctk.CTkFont(size=10), text_color="gray"
+        )
+        self.disk_usage_label.grid(row=1, column=0, columnspan=4, padx=5, sticky="w")
+
         # Scrollable models list
         self.models_scroll_frame = ctk.CTkScrollableFrame(list_frame, height=300)
         self.models_scroll_frame.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
         self.models_scroll_frame.grid_columnconfigure(0, weight=1)
 
-        # Initialize models tracking
+        # Initialize models tracking (kept in sync by model deltas)
         self.model_checkboxes = {}
         self.model_info_labels = {}
         self.selected_models = set()
+        self.no_models_label = None
 
         # Action buttons frame (bottom)
         actions_frame = ctk.CTkFrame(self.models_panel)
@@ -829,6 +1543,10 @@ class ShamaOllamaGUI:
             ("📋 Copy Names", self.copy_selected_model_names, "gray", "darkgray"),
             ("📊 Model Info", self.show_selected_model_info, "green", "darkgreen"),
             ("🔧 Manage Tags", self.manage_model_tags, "orange", "darkorange"),
+            ("⚙️ Options", self.show_model_options, "purple", "darkviolet"),
+            ("🧪 Compare Quants", self.show_quant_compare, "teal", "darkcyan"),
+            ("💽 Disk Usage", self.show_disk_usage, "gray", "darkgray"),
+            ("🛡️ Verify Models", self.verify_models, "green", "darkgreen"),
         ]
 
         for i, (text, command, color, hover_color) in enumerate(action_buttons):
@@ -842,6 +1560,8 @@ class ShamaOllamaGUI:
             )
             btn.grid(row=0, column=i, padx=5, pady=5, sticky="ew")
             actions_frame.grid_columnconfigure(i, weight=1)
+            if command == self.verify_models:
+                self.verify_btn = btn
 
         # Progress section
         progress_frame = ctk.CTkFrame(self.models_panel)
@@ -862,11 +1582,15 @@ class ShamaOllamaGUI:
         )
         self.progress_percentage.grid(row=1, column=1, padx=5, pady=2)
 
+        # Catch up with a model list fetched before this panel existed
+        if self.model_inventory.fingerprint:
+            self.update_models_panel(ModelDelta(self.models, self.models, [], []))
+
     def create_history_panel(self):
         """Create the chat history panel"""
         self.history_panel = ctk.CTkFrame(self.main_frame)
         self.history_panel.grid_columnconfigure(0, weight=1)
-        self.history_panel.grid_rowconfigure(1, weight=1)
+        self.history_panel.grid_rowconfigure(2, weight=1)
 
         # Header
         header = ctk.CTkLabel(
@@ -876,13 +1600,44 @@ class ShamaOllamaGUI:
         )
         header.grid(row=0, column=0, pady=10)
 
+        # Archive search: older sessions live in compressed segments.
+        # Semantic search ranks hot and archived sessions by meaning.
+        search_frame = ctk.CTkFrame(self.history_panel)
+        search_frame.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        search_frame.grid_columnconfigure(0, weight=1)
+
+        self.archive_search_entry = ctk.CTkEntry(
+            search_frame, placeholder_text="Search archived chats..."
+        )
+        self.archive_search_entry.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        self.archive_search_entry.bind("<Return>", lambda e: self.search_archive())
+
+        self.archive_search_btn = ctk.CTkButton(
+            search_frame, text="🔍 Search Archive", command=self.search_archive
+        )
+        self.archive_search_btn.grid(row=0, column=1, padx=5, pady=5)
+
+        self.semantic_search_btn = ctk.CTkButton(
+            search_frame, text="🧠 Semantic Search", command=self.search_semantic
+        )
+        self.semantic_search_btn.grid(row=0, column=2, padx=5, pady=5)
+
+        self.semantic_status_label = ctk.CTkLabel(
+            search_frame, text="", font=ctk.CTkFont(size=11), text_color="gray"
+        )
+        self.semantic_status_label.grid(
+            row=1, column=0, columnspan=3, padx=5, pady=(0, 5), sticky="w"
+        )
+        self.update_semantic_status()
+        self.search_results = []
+
         # History list
         self.history_listbox = ctk.CTkTextbox(self.history_panel, state="disabled")
-        self.history_listbox.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        self.history_listbox.grid(row=2, column=0, padx=10, pady=5, sticky="nsew")
 
         # Controls
         controls_frame = ctk.CTkFrame(self.history_panel)
-        controls_frame.grid(row=2, column=0, padx=10, pady=5, sticky="ew")
+        controls_frame.grid(row=3, column=0, padx=10, pady=5, sticky="ew")
 
         self.load_session_btn = ctk.CTkButton(
             controls_frame, text="Load Session", command=self.load_selected_session
@@ -929,7 +1684,6 @@ class ShamaOllamaGUI:
             form_frame, placeholder_text="http://localhost:11434"
         )
         self.url_entry.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
-        self.url_entry.insert(0, self.api.base_url)
 
         # Test connection button
         self.test_btn = ctk.CTkButton(
@@ -938,7 +1692,6 @@ class ShamaOllamaGUI:
         self.test_btn.grid(row=0, column=2, padx=10, pady=5)
 
         # Auto-save chats
-        self.autosave_var = ctk.BooleanVar(value=True)
         self.autosave_check = ctk.CTkCheckBox(
             form_frame, text="Auto-save chat sessions", variable=self.autosave_var
         )
@@ -947,7 +1700,6 @@ class ShamaOllamaGUI:
         )
 
         # Hide thinking/reasoning for thinking models
-        self.hide_thinking_var = ctk.BooleanVar(value=False)
         self.hide_thinking_check = ctk.CTkCheckBox(
             form_frame,
             text="Hide thinking/reasoning process (for models like DeepSeek)",
@@ -969,13 +1721,41 @@ class ShamaOllamaGUI:
         )
         self.thinking_info_btn.grid(row=2, column=2, padx=5, pady=5)
 
-        # Max history
-        ctk.CTkLabel(form_frame, text="Max history entries:").grid(
-            row=3, column=0, padx=10, pady=5, sticky="w"
+        # Replay responses to identical requests
+        self.response_cache_check = ctk.CTkCheckBox(
+            form_frame,
+            text="Reuse responses to identical requests (Ctrl+Shift+Enter skips)",
+            variable=self.response_cache_var,
+        )
+        self.response_cache_check.grid(
+            row=3, column=0, columnspan=2, padx=10, pady=5, sticky="w"
         )
-        self.max_history_entry = ctk.CTkEntry(form_frame, width=100)
-        self.max_history_entry.grid(row=3, column=1, padx=10, pady=5, sticky="w")
-        self.max_history_entry.insert(0, "100")
+
+        # Numeric and text settings, applied live when saved
+        numeric_settings = [
+            ("max_history", "Max history entries:"),
+            ("max_history_age_days", "Archive chats older than (days, 0 = never):"),
+            ("max_history_mb", "Max active history size (MB, 0 = no limit):"),
+            ("pool_size", "Connection pool size:"),
+            ("connect_timeout", "Connect timeout (s):"),
+            ("request_timeout", "Response timeout (s):"),
+            ("render_interval_ms", "Streaming render interval (ms):"),
+            ("embedding_model", "Embedding model for semantic search:"),
+            ("ollama_models_dir", "Ollama models folder (blank = default):"),
+            ("document_chunks", "Document excerpts per message (0 = off):"),
+            ("memory_notes_tokens", "Memory notes token budget (0 = all):"),
+            ("response_cache_mb", "Response cache size on disk (MB):"),
+        ]
+        self.settings_entries = {}
+        for row, (name, label) in enumerate(numeric_settings, start=4):
+            ctk.CTkLabel(form_frame, text=label).grid(
+                row=row, column=0, padx=10, pady=5, sticky="w"
+            )
+            entry = ctk.CTkEntry(form_frame, width=160)
+            entry.grid(row=row, column=1, padx=10, pady=5, sticky="w")
+            self.settings_entries[name] = entry
+        self.max_history_entry = self.settings_entries["max_history"]
+        self.fill_settings_form(self.settings)
 
         # Security section
         security_frame = ctk.CTkFrame(self.settings_panel)
@@ -990,7 +1770,6 @@ class ShamaOllamaGUI:
         security_header.grid(row=0, column=0, columnspan=3, pady=10)
 
         # Security logging
-        self.security_logging_var = ctk.BooleanVar(value=True)
         self.security_logging_check = ctk.CTkCheckBox(
             security_frame,
             text="Enable security logging",
@@ -1001,7 +1780,6 @@ class ShamaOllamaGUI:
         )
 
         # Input validation
-        self.input_validation_var = ctk.BooleanVar(value=True)
         self.input_validation_check = ctk.CTkCheckBox(
             security_frame,
             text="Enable input validation (recommended)",
@@ -1012,7 +1790,6 @@ class ShamaOllamaGUI:
         )
 
         # URL validation
-        self.url_validation_var = ctk.BooleanVar(value=True)
         self.url_validation_check = ctk.CTkCheckBox(
             security_frame,
             text="Enable URL validation (recommended)",
@@ -1166,7 +1943,9 @@ class ShamaOllamaGUI:
         self.save_settings_btn = ctk.CTkButton(
             form_frame, text="Save Settings", command=self.save_settings
         )
-        self.save_settings_btn.grid(row=3, column=0, columnspan=3, padx=10, pady=20)
+        self.save_settings_btn.grid(
+            row=4 + len(numeric_settings), column=0, columnspan=3, padx=10, pady=20
+        )
 
     def create_system_panel(self):
         """Create the system information panel"""
@@ -1198,14 +1977,11 @@ class ShamaOllamaGUI:
         self.refresh_system_btn = ctk.CTkButton(
             refresh_frame,
             text="🔄 Refresh System Info",
-            command=self.refresh_system_info,
+            command=lambda: self.refresh_system_info(force=True),
             height=35,
         )
         self.refresh_system_btn.grid(row=0, column=0, padx=10, pady=10)
 
-        # Load system info on creation
-        self.refresh_system_info()
-
     def create_about_panel(self):
         """Create the about panel with app info and donation links"""
         self.about_panel = ctk.CTkFrame(self.main_frame)
@@ -1401,23 +2177,21 @@ class ShamaOllamaGUI:
         )
         self.status_label.grid(row=0, column=0, padx=10, pady=5, sticky="w")
 
+        self.latency_label = ctk.CTkLabel(
+            self.status_frame, text="", font=ctk.CTkFont(size=12), text_color="gray"
+        )
+        self.latency_label.grid(row=0, column=1, padx=10, pady=5, sticky="e")
+
         self.connection_label = ctk.CTkLabel(
             self.status_frame, text="⚫ Disconnected", font=ctk.CTkFont(size=12)
         )
-        self.connection_label.grid(row=0, column=1, padx=10, pady=5, sticky="e")
+        self.connection_label.grid(row=0, column=2, padx=10, pady=5, sticky="e")
 
     # Navigation methods
     def show_panel(self, panel_name: str):
         """Show specific panel and update navigation"""
-        # Hide all panels
-        for panel in [
-            self.chat_panel,
-            self.models_panel,
-            self.history_panel,
-            self.system_panel,
-            self.settings_panel,
-            self.about_panel,
-        ]:
+        # Hide all panels built so far
+        for panel in self.panels.values():
             panel.grid_remove()
 
         # Reset button colors
@@ -1426,25 +2200,24 @@ class ShamaOllamaGUI:
 
         # Show selected panel
         if panel_name == "chat":
-            self.chat_panel.grid(row=0, column=0, sticky="nsew")
+            self.get_panel("chat").grid(row=0, column=0, sticky="nsew")
             self.nav_buttons["Chat"].configure(fg_color=("gray75", "gray25"))
         elif panel_name == "models":
-            self.models_panel.grid(row=0, column=0, sticky="nsew")
+            self.get_panel("models").grid(row=0, column=0, sticky="nsew")
             self.nav_buttons["Models"].configure(fg_color=("gray75", "gray25"))
-            self.refresh_models_display()
         elif panel_name == "history":
-            self.history_panel.grid(row=0, column=0, sticky="nsew")
+            self.get_panel("history").grid(row=0, column=0, sticky="nsew")
             self.nav_buttons["History"].configure(fg_color=("gray75", "gray25"))
             self.refresh_history_display()
         elif panel_name == "system":
-            self.system_panel.grid(row=0, column=0, sticky="nsew")
+            self.get_panel("system").grid(row=0, column=0, sticky="nsew")
             self.nav_buttons["System"].configure(fg_color=("gray75", "gray25"))
             self.refresh_system_info()
         elif panel_name == "settings":
-            self.settings_panel.grid(row=0, column=0, sticky="nsew")
+            self.get_panel("settings").grid(row=0, column=0, sticky="nsew")
             self.nav_buttons["Settings"].configure(fg_color=("gray75", "gray25"))
         elif panel_name == "about":
-            self.about_panel.grid(row=0, column=0, sticky="nsew")
+            self.get_panel("about").grid(row=0, column=0, sticky="nsew")
             self.nav_buttons["About"].configure(fg_color=("gray75", "gray25"))
 
         self.current_panel = panel_name
@@ -1497,51 +2270,55 @@ Note: This feature works best with models specifically designed to show thinking
 
     # Core functionality methods
     def check_connection(self):
-        """Check Ollama connection status"""
+        """Start the background connection monitor, or probe now if running"""
+        self.connection_monitor.start()
+        self.connection_monitor.wake()
 
-        def check():
-            is_connected = self.api.test_connection()
-            if is_connected:
-                self.connection_label.configure(text="🟢 Connected", text_color="green")
-                self.status_label.configure(text="Connected to Ollama")
-            else:
-                self.connection_label.configure(
-                    text="🔴 Disconnected", text_color="red"
-                )
-                self.status_label.configure(text="Cannot connect to Ollama")
+    def process_ui_queue(self):
+        """Drain events published by worker threads on the Tk thread"""
+        try:
+            while True:
+                event = self.ui_queue.get_nowait()
+                handler = self.ui_handlers.get(event.get("type"))
+                if handler:
+                    handler(event)
+        except queue.Empty:
+            pass
 
-            # Schedule next check
-            self.root.after(10000, self.check_connection)  # Check every 10 seconds
+        self.root.after(100, self.process_ui_queue)
 
-        threading.Thread(target=check, daemon=True).start()
+    def on_connection_event(self, event: Dict):
+        """Update the status bar from a connection monitor event"""
+        if event["connected"]:
+            latency_ms = event["latency_ms"]
+            sparkline = render_sparkline(event["history"])
+            self.latency_label.configure(text=f"{sparkline} {latency_ms:.0f} ms")
+        else:
+            self.latency_label.configure(text="")
+
+        if not event["changed"]:
+            return
+
+        if event["connected"]:
+            self.connection_label.configure(text="🟢 Connected", text_color="green")
+            self.status_label.configure(text="Connected to Ollama")
+            # Ollama came back: pick up models pulled while we were away
+            self.refresh_models()
+        else:
+            self.connection_label.configure(text="🔴 Disconnected", text_color="red")
+            self.status_label.configure(text="Cannot connect to Ollama")
 
     def refresh_models(self):
         """Refresh the list of available models"""
 
         def refresh():
             try:
-                self.models = self.api.get_models()
-                model_names = (
-                    [model["name"] for model in self.models]
-                    if self.models
-                    else ["No models available"]
-                )
-
-                # Update dropdown
-                self.root.after(
-                    0, lambda: self.model_dropdown.configure(values=model_names)
-                )
-
-                if self.models and not self.current_model:
-                    self.root.after(0, lambda: self.model_dropdown.set(model_names[0]))
-                    self.current_model = model_names[0]
-
-                self.root.after(
-                    0,
-                    lambda: self.status_label.configure(
-                        text=f"Found {len(self.models)} models"
-                    ),
-                )
+                models = self.api.fetch_models()
+                if models is None:
+                    # Keep the known models rather than report them all removed
+                    raise RuntimeError("Ollama did not return the model list")
+                # Subscribers only hear about it when names or digests changed
+                self.model_inventory.update(models)
             except Exception as e:
                 error_msg = str(e)
                 self.root.after(
@@ -1553,64 +2330,195 @@ Note: This feature works best with models specifically designed to show thinking
 
         threading.Thread(target=refresh, daemon=True).start()
 
-    def refresh_models_display(self):
-        """Refresh the models display with checkbox selection"""
-        # Clear existing checkboxes
-        for widget in self.models_scroll_frame.winfo_children():
-            widget.destroy()
+    def subscribe_to_models(self):
+        """Wire the dropdown, models panel and metadata cache to model deltas"""
+        self.model_inventory.subscribe(
+            lambda delta: self.model_metadata.sync_async(
+                delta.models,
+                self.api.show_model,
+                lambda name: self.ui_queue.put(
+                    {"type": "model_metadata", "name": name}
+                ),
+            )
+        )
+        self.model_inventory.subscribe(
+            lambda delta: self.root.after(0, lambda: self.on_models_changed(delta))
+        )
+
+    def on_models_changed(self, delta):
+        """Apply a model inventory delta on the Tk thread"""
+        self.models = delta.models
+        self.update_model_dropdown(delta)
+        if "models" in self.panels:
+            self.update_models_panel(delta)
+        self.status_label.configure(text=f"Found {len(self.models)} models")
+
+    def update_model_dropdown(self, delta):
+        """Update the model dropdown from a model delta"""
+        model_names = [model["name"] for model in delta.models]
+        self.model_dropdown.configure(values=model_names or ["No models available"])
+
+        if self.current_model in delta.removed:
+            self.current_model = None
+
+        if model_names and not self.current_model:
+            self.current_model = model_names[0]
+            self.model_dropdown.set(model_names[0])
+        elif not model_names:
+            self.model_dropdown.set("No models available")
+
+    def update_models_panel(self, delta):
+        """Add, remove and update model entries instead of rebuilding the list"""
+        for name in delta.removed:
+            entry = self.model_info_labels.pop(name, None)
+            if entry:
+                entry["frame"].destroy()
+            self.model_checkboxes.pop(name, None)
+            self.selected_models.discard(name)
+
+        for model in delta.updated:
+            entry = self.model_info_labels.get(model["name"])
+            if entry:
+                size_text, date_text = self.format_model_entry_labels(model)
+                entry["size"].configure(text=size_text)
+                entry["date"].configure(text=date_text)
+
+        if delta.models and self.no_models_label is not None:
+            self.no_models_label.destroy()
+            self.no_models_label = None
+
+        for model in delta.added:
+            self.create_model_entry(0, model)
+
+        # Keep rows in the order Ollama reports them
+        for index, model in enumerate(delta.models):
+            entry = self.model_info_labels.get(model["name"])
+            if entry:
+                entry["frame"].grid(row=index)
+
+        if not delta.models:
+            self.show_no_models_label()
+        else:
+            self.refresh_fit_estimates()
+        self.refresh_disk_usage()
 
-        self.model_checkboxes.clear()
-        self.model_info_labels.clear()
-        self.selected_models.clear()
+        self.models_count_label.configure(text=f"{len(delta.models)} models")
+        self.select_all_var.set(
+            bool(self.models) and len(self.selected_models) == len(self.models)
+        )
 
-        if not self.models:
-            no_models_label = ctk.CTkLabel(
+    def show_no_models_label(self):
+        """Show the placeholder shown when no models are installed"""
+        if self.no_models_label is None:
+            self.no_models_label = ctk.CTkLabel(
                 self.models_scroll_frame,
                 text="🚫 No models available\nPull a model to get started!",
                 font=ctk.CTkFont(size=14),
                 justify="center",
             )
-            no_models_label.grid(row=0, column=0, padx=20, pady=20)
-            self.models_count_label.configure(text="0 models")
-        else:
-            for i, model in enumerate(self.models):
-                self.create_model_entry(i, model)
+            self.no_models_label.grid(row=0, column=0, padx=20, pady=20)
 
-            self.models_count_label.configure(text=f"{len(self.models)} models")
+    def refresh_fit_estimates(self):
+        """Predict GPU/CPU placement of every installed model on a worker thread"""
+        models = [self.model_metadata.merged(m) for m in self.models]
+        num_ctx = int(self.fit_ctx_var.get())
 
-        # Reset select all checkbox
-        self.select_all_var.set(False)
+        def estimate():
+            try:
+                # Deferred import: GPU probing libraries are slow to load
+                from gpu_info import get_gpu_info
+                from memory_fit import hardware_budget
+
+                vram_mb, ram_gb = hardware_budget(get_gpu_info())
+                estimates = {
+                    model["name"]: estimate_fit(model, vram_mb, ram_gb, num_ctx)
+                    for model in models
+                }
+            except Exception as e:
+                logging.debug(f"Memory-fit estimation failed: {e}")
+                return
+            self.ui_queue.put({"type": "fit_estimates", "estimates": estimates})
+
+        threading.Thread(target=estimate, daemon=True).start()
+
+    def on_fit_estimates(self, event: Dict):
+        """Show memory-fit badges in the models panel"""
+        colors = {"gpu": "green", "partial": "orange", "cpu": "orange", "no_fit": "red"}
+        for name, estimate in event["estimates"].items():
+            entry = self.model_info_labels.get(name)
+            if entry:
+                entry["fit"].configure(
+                    text=fit_badge(estimate), text_color=colors[estimate["placement"]]
+                )
 
-    def refresh_system_info(self):
-        """Refresh system information display"""
-        try:
-            # Get GPU information
-            gpu_info = get_gpu_info()
+    def on_model_metadata(self, event: Dict):
+        """Re-estimate once /api/show details for a model are cached"""
+        if self.metadata_refresh_scheduled:
+            return
+        self.metadata_refresh_scheduled = True
+        self.root.after(METADATA_REFRESH_DELAY_MS, self.refresh_after_metadata)
+
+    def refresh_after_metadata(self):
+        """Refresh the views that use model details, once per burst"""
+        self.metadata_refresh_scheduled = False
+        if "models" in self.panels:
+            self.refresh_fit_estimates()
+        if "system" in self.panels:
+            self.refresh_system_info()
 
-            # Format for display
-            info_text = format_gpu_info_for_display(gpu_info)
+    def refresh_system_info(self, force: bool = False):
+        """Refresh system information display on a worker thread"""
+        # Cached metadata for installed models, read on the Tk thread
+        installed_models = [self.model_metadata.merged(m) for m in self.models]
 
-            # Update display
-            self.system_info_display.configure(state="normal")
-            self.system_info_display.delete("1.0", "end")
-            self.system_info_display.insert("1.0", info_text)
-            self.system_info_display.configure(state="disabled")
+        if not self.system_info_display.get("1.0", "end").strip():
+            self.show_system_info_text("🔍 Detecting hardware...")
 
-        except Exception as e:
-            error_text = f"❌ Error getting system information:\n{str(e)}\n\nThis may be due to missing dependencies.\nTry running: pip install -r requirements-gpu.txt"
-            self.system_info_display.configure(state="normal")
-            self.system_info_display.delete("1.0", "end")
-            self.system_info_display.insert("1.0", error_text)
-            self.system_info_display.configure(state="disabled")
+        def detect():
+            try:
+                # Deferred import: GPU probing libraries are slow to load
+                from gpu_info import get_gpu_info, format_gpu_info_for_display
 
-    def create_model_entry(self, index: int, model: Dict):
-        """Create a model entry with checkbox and info"""
-        name = model["name"]
+                # Cached; only a forced refresh re-runs full detection
+                gpu_info = get_gpu_info(refresh=force)
+                info_text = format_gpu_info_for_display(gpu_info, installed_models)
+
+            except Exception as e:
+                info_text = f"❌ Error getting system information:\n{str(e)}\n\nThis may be due to missing dependencies.\nTry running: pip install -r requirements-gpu.txt"
+
+            self.ui_queue.put({"type": "system_info", "text": info_text})
+
+        threading.Thread(target=detect, daemon=True).start()
+
+    def on_system_info(self, event: Dict):
+        """Show hardware information detected on a worker thread"""
+        self.show_system_info_text(event["text"])
+
+    def show_system_info_text(self, text: str):
+        """Replace the system info display contents"""
+        self.system_info_display.configure(state="normal")
+        self.system_info_display.delete("1.0", "end")
+        self.system_info_display.insert("1.0", text)
+        self.system_info_display.configure(state="disabled")
+
+    def format_model_entry_labels(self, model: Dict):
+        """Format the size and date label text for a model entry"""
         size = model.get("size", 0)
         size_mb = size / (1024 * 1024) if size else 0
         size_gb = size_mb / 1024 if size_mb > 1024 else 0
         modified = model.get("modified_at", "Unknown")
 
+        if size_gb > 1:
+            size_text = f"💾 {size_gb:.1f} GB"
+        else:
+            size_text = f"💾 {size_mb:.1f} MB"
+        date_text = f"📅 {modified[:10] if modified != 'Unknown' else 'Unknown'}"
+        return size_text, date_text
+
+    def create_model_entry(self, index: int, model: Dict):
+        """Create a model entry with checkbox and info"""
+        name = model["name"]
+
         # Model frame
         model_frame = ctk.CTkFrame(self.models_scroll_frame)
         model_frame.grid(row=index, column=0, padx=5, pady=2, sticky="ew")
@@ -1653,10 +2561,7 @@ Note: This feature works best with models specifically designed to show thinking
         tag_label.grid(row=1, column=0, sticky="ew")
 
         # Size and date info
-        if size_gb > 1:
-            size_text = f"💾 {size_gb:.1f} GB"
-        else:
-            size_text = f"💾 {size_mb:.1f} MB"
+        size_text, date_text = self.format_model_entry_labels(model)
 
         size_label = ctk.CTkLabel(
             info_frame, text=size_text, font=ctk.CTkFont(size=10), anchor="w"
@@ -1665,18 +2570,25 @@ Note: This feature works best with models specifically designed to show thinking
 
         date_label = ctk.CTkLabel(
             info_frame,
-            text=f"📅 {modified[:10] if modified != 'Unknown' else 'Unknown'}",
+            text=date_text,
             font=ctk.CTkFont(size=10),
             anchor="w",
         )
         date_label.grid(row=1, column=1, padx=10, sticky="e")
 
+        # Memory-fit badge, filled in by refresh_fit_estimates
+        fit_label = ctk.CTkLabel(
+            info_frame, text="", font=ctk.CTkFont(size=10), anchor="e"
+        )
+        fit_label.grid(row=2, column=0, columnspan=2, padx=10, sticky="e")
+
         self.model_info_labels[name] = {
             "frame": model_frame,
             "name": name_label,
             "tag": tag_label,
             "size": size_label,
             "date": date_label,
+            "fit": fit_label,
         }
 
     def on_model_selected(self, model_name: str, selected: bool):
@@ -1707,8 +2619,11 @@ Note: This feature works best with models specifically designed to show thinking
         """Refresh the history display"""
         self.history_listbox.configure(state="normal")
         self.history_listbox.delete("1.0", "end")
+        archived = len(self.chat_manager.archive)
 
-        if not self.chat_manager.chat_history:
+        if not self.chat_manager.history_loaded.is_set():
+            self.history_listbox.insert("1.0", "Loading chat history...")
+        elif not self.chat_manager.chat_history and not archived:
             self.history_listbox.insert("1.0", "No chat history available.")
         else:
             for i, session in enumerate(self.chat_manager.chat_history):
@@ -1719,9 +2634,220 @@ Note: This feature works best with models specifically designed to show thinking
                 self.history_listbox.insert("end", f"{i+1}. {title}\n")
                 self.history_listbox.insert("end", f"   Date: {timestamp}\n")
                 self.history_listbox.insert("end", f"   Messages: {message_count}\n\n")
+            if archived:
+                self.history_listbox.insert(
+                    "end",
+                    f"📦 {archived} older sessions are archived. "
+                    "Search the archive to find and load them.\n",
+                )
+
+        self.history_listbox.configure(state="disabled")
+
+    def search_archive(self):
+        """Search archived sessions on a worker thread"""
+        query = self.archive_search_entry.get().strip()
+        if not query:
+            self.refresh_history_display()
+            return
+        self.archive_search_btn.configure(state="disabled", text="Searching...")
+
+        def search():
+            results = self.chat_manager.archive.search(query)
+            self.ui_queue.put(
+                {"type": "search_results", "query": query, "results": results}
+            )
+
+        threading.Thread(target=search, daemon=True).start()
+
+    def search_semantic(self):
+        """Rank saved sessions by meaning on a worker thread"""
+        query = self.archive_search_entry.get().strip()
+        if not query:
+            self.refresh_history_display()
+            return
+        if not self.settings.embedding_model:
+            messagebox.showinfo(
+                "Semantic Search",
+                "Set an embedding model (e.g. nomic-embed-text) in Settings "
+                "to search chats by meaning.",
+            )
+            return
+        self.semantic_search_btn.configure(state="disabled", text="Searching...")
+
+        def search():
+            try:
+                results = self.chat_manager.semantic_search(query)
+                error = None
+            except Exception as e:
+                results, error = [], str(e)
+            self.ui_queue.put(
+                {
+                    "type": "search_results",
+                    "query": query,
+                    "results": results,
+                    "semantic": True,
+                    "error": error,
+                }
+            )
 
+        threading.Thread(target=search, daemon=True).start()
+
+    def on_search_results(self, event: Dict):
+        """List archive or semantic search results as R1, R2, ..."""
+        self.archive_search_btn.configure(state="normal", text="🔍 Search Archive")
+        self.semantic_search_btn.configure(state="normal", text="🧠 Semantic Search")
+        self.search_results = event["results"]
+        self.history_listbox.configure(state="normal")
+        self.history_listbox.delete("1.0", "end")
+        if event.get("error"):
+            self.history_listbox.insert(
+                "1.0", f"Semantic search failed: {event['error']}"
+            )
+        elif not self.search_results:
+            scope = "saved" if event.get("semantic") else "archived"
+            self.history_listbox.insert(
+                "1.0", f"No {scope} sessions match '{event['query']}'."
+            )
+        for i, result in enumerate(self.search_results):
+            timestamp = result["timestamp"][:16].replace("T", " ")
+            details = f"Date: {timestamp} | Messages: {result['messages']}"
+            if "score" in result:
+                details += f" | Similarity: {result['score']:.2f}"
+            self.history_listbox.insert("end", f"R{i+1}. {result['title']}\n")
+            self.history_listbox.insert("end", f"   {details}\n")
+            self.history_listbox.insert("end", f"   {result['snippet']}\n\n")
         self.history_listbox.configure(state="disabled")
 
+    def update_semantic_status(self, remaining: int = 0):
+        """Describe the semantic index under the search box"""
+        index = self.chat_manager.semantic_index
+        if not index.model:
+            text = "Semantic search is off (no embedding model set)"
+        elif index.error:
+            text = f"Semantic index paused: {index.error}"
+        elif remaining > 0:
+            text = f"🧠 Embedding messages... {len(index)} indexed, {remaining} to go"
+        else:
+            text = f"🧠 {len(index)} messages indexed with {index.model}"
+        self.semantic_status_label.configure(text=text)
+
+    def on_semantic_index(self, event: Dict):
+        """Show background indexing progress"""
+        if "history" in self.panels:
+            self.update_semantic_status(event["remaining"])
+
+    def show_documents_window(self):
+        """Attach folders or files to the current chat; relevant parts are sent"""
+        if self.documents_window is not None and self.documents_window.winfo_exists():
+            self.documents_window.focus()
+            return
+
+        window = ctk.CTkToplevel(self.root)
+        window.title("Attached Documents")
+        window.geometry("560x400")
+        window.transient(self.root)
+        self.documents_window = window
+
+        ctk.CTkLabel(
+            window,
+            text="📎 Attached Documents",
+            font=ctk.CTkFont(size=16, weight="bold"),
+        ).pack(padx=10, pady=(10, 5))
+        ctk.CTkLabel(
+            window,
+            text="The most relevant excerpts are added to messages in this chat.",
+            font=ctk.CTkFont(size=11),
+            text_color="gray",
+        ).pack(padx=10)
+
+        self.documents_list = ctk.CTkTextbox(window, height=200, state="disabled")
+        self.documents_list.pack(fill="both", expand=True, padx=10, pady=5)
+        self.documents_status_label = ctk.CTkLabel(
+            window, text="", font=ctk.CTkFont(size=11)
+        )
+        self.documents_status_label.pack(padx=10, pady=2)
+
+        btn_frame = ctk.CTkFrame(window)
+        btn_frame.pack(fill="x", padx=10, pady=(5, 10))
+        ctk.CTkButton(
+            btn_frame, text="📁 Add Folder", command=self.attach_document_folder
+        ).pack(side="left", padx=5, pady=5)
+        ctk.CTkButton(
+            btn_frame, text="📄 Add Files", command=self.attach_document_files
+        ).pack(side="left", padx=5, pady=5)
+        ctk.CTkButton(
+            btn_frame,
+            text="🔄 Re-index",
+            command=self.chat_manager.document_index.refresh_async,
+        ).pack(side="left", padx=5, pady=5)
+        ctk.CTkButton(
+            btn_frame, text="🗑️ Detach from Chat", command=self.detach_documents
+        ).pack(side="right", padx=5, pady=5)
+        self.refresh_documents_window()
+
+    def refresh_documents_window(self, remaining: int = 0):
+        """Show the attached sources and the indexing state"""
+        if self.documents_window is None or not self.documents_window.winfo_exists():
+            return
+        index = self.chat_manager.document_index
+        sources = self.chat_manager.document_sources
+        self.documents_list.configure(state="normal")
+        self.documents_list.delete("1.0", "end")
+        for source in sources:
+            self.documents_list.insert("end", f"{source}\n")
+        if not sources:
+            self.documents_list.insert("1.0", "No documents attached to this chat.")
+        self.documents_list.configure(state="disabled")
+
+        if not index.model:
+            text = "Set an embedding model in Settings to use documents"
+        elif index.error:
+            text = f"Indexing failed: {index.error}"
+        elif remaining > 0:
+            text = f"Embedding... {len(index.files)} files indexed, {remaining} to go"
+        else:
+            text = f"{len(index.files)} files indexed with {index.model}"
+        self.documents_status_label.configure(text=text)
+
+    def attach_document_folder(self):
+        """Attach a folder of documents"""
+        folder = filedialog.askdirectory(title="Attach Folder")
+        if folder:
+            self.attach_documents([folder])
+
+    def attach_document_files(self):
+        """Attach individual documents"""
+        files = filedialog.askopenfilenames(title="Attach Files")
+        if files:
+            self.attach_documents(list(files))
+
+    def attach_documents(self, paths: List[str]):
+        """Attach sources to the current chat and index them in the background"""
+        self.chat_manager.attach_documents(paths)
+        self.refresh_documents_window(remaining=1)
+        self.status_label.configure(text="Indexing attached documents...")
+
+    def detach_documents(self):
+        """Detach every document from the current chat"""
+        if messagebox.askyesno(
+            "Detach Documents", "Stop using the attached documents in this chat?"
+        ):
+            self.chat_manager.detach_documents()
+            self.refresh_documents_window()
+
+    def on_document_index(self, event: Dict):
+        """Show document indexing progress"""
+        self.refresh_documents_window(event["remaining"])
+        if event["remaining"] == 0:
+            self.status_label.configure(
+                text=f"Documents indexed: {event['indexed']} files"
+            )
+
+    def on_history_loaded(self, event: Dict):
+        """Show the history once the background load finishes"""
+        if self.current_panel == "history":
+            self.refresh_history_display()
+
     def on_model_dropdown_selected(self, model_name: str):
         """Handle model selection from dropdown"""
         if model_name != "No models available":
@@ -1737,6 +2863,7 @@ Note: This feature works best with models specifically designed to show thinking
             self.chat_manager.save_session()
 
         self.chat_manager.new_session()
+        self.refresh_documents_window()
         self.chat_display.configure(state="normal")
         self.chat_display.delete("1.0", "end")
         self.chat_display.configure(state="disabled")
@@ -1777,7 +2904,7 @@ Note: This feature works best with models specifically designed to show thinking
         self.chat_display.configure(state="disabled")
         self.chat_display.see("end")
 
-    def send_message(self):
+    def send_message(self, use_cache: bool = True):
         """Send a message to the AI with security validation"""
         if self.is_chatting:
             return
@@ -1811,6 +2938,8 @@ Note: This feature works best with models specifically designed to show thinking
         self.first_token_received = False
 
         def chat_thread():
+            turn = self.telemetry.begin_turn(self.current_model)
+            metrics = {}
             try:
                 # Prepare messages for API
                 messages = self.chat_manager.get_messages_for_api()
@@ -1818,11 +2947,16 @@ Note: This feature works best with models specifically designed to show thinking
                 # Initialize streaming response in UI
                 self.root.after(0, self.start_streaming_response)
 
-                # Send request with streaming
+                # Send request with streaming; chunks are rendered in batches
                 def stream_callback(chunk):
                     self.current_response += chunk
+                    with self.render_lock:
+                        self.pending_chunks.append(chunk)
+                        if self.render_scheduled:
+                            return
+                        self.render_scheduled = True
                     self.root.after(
-                        0, lambda c=chunk: self.update_streaming_response(c)
+                        self.settings.render_interval_ms, self.render_pending_chunks
                     )
 
                 full_response = self.api.chat(
@@ -1830,6 +2964,8 @@ Note: This feature works best with models specifically designed to show thinking
                     messages,
                     stream_callback,
                     self.hide_thinking_var.get(),
+                    metrics.update,
+                    use_cache=use_cache,
                 )
 
                 # If streaming didn't work (empty response), fall back to regular chat
@@ -1842,7 +2978,12 @@ Note: This feature works best with models specifically designed to show thinking
                         ),
                     )
                     full_response = self.api.chat(
-                        self.current_model, messages, None, self.hide_thinking_var.get()
+                        self.current_model,
+                        messages,
+                        None,
+                        self.hide_thinking_var.get(),
+                        metrics.update,
+                        use_cache=use_cache,
                     )
                     self.root.after(
                         0, lambda: self.add_chat_message("assistant", full_response)
@@ -1868,8 +3009,32 @@ Note: This feature works best with models specifically designed to show thinking
                 )
                 self.root.after(0, self.finish_chat_response)
 
+            finally:
+                report = self.telemetry.end_turn(turn, metrics)
+                self.ui_queue.put({"type": "turn_telemetry", "turn": report})
+
         threading.Thread(target=chat_thread, daemon=True).start()
 
+    def on_turn_telemetry(self, event: Dict):
+        """Show generation speed and any hardware bottleneck for a turn"""
+        turn = event["turn"]
+        cache = self.api.response_cache
+        if turn["metrics"].get("cached"):
+            self.status_label.configure(
+                text=f"⚡ Replayed from cache | {cache.summary() if cache else ''}"
+            )
+            return
+        tokens_per_second = turn["metrics"].get("tokens_per_second")
+        if tokens_per_second is None:
+            return
+
+        text = f"✅ {tokens_per_second:.1f} tokens/s"
+        if turn["diagnosis"]:
+            text += " | ⚠️ " + "; ".join(turn["diagnosis"])
+        if cache:
+            text += f" | {cache.summary()}"
+        self.status_label.configure(text=text)
+
     def animate_typing_indicator(self):
         """Animate the typing indicator on the send button"""
         if not self.typing_animation_active:
@@ -1907,6 +3072,15 @@ Note: This feature works best with models specifically designed to show thinking
         self.chat_display.configure(state="disabled")
         self.chat_display.see("end")
 
+    def render_pending_chunks(self):
+        """Insert the chunks streamed since the last render tick"""
+        with self.render_lock:
+            text = "".join(self.pending_chunks)
+            self.pending_chunks = []
+            self.render_scheduled = False
+        if text:
+            self.update_streaming_response(text)
+
     def update_streaming_response(self, chunk):
         """Update the streaming response with new chunk"""
         if chunk and self.response_start_pos:
@@ -1957,7 +3131,8 @@ Note: This feature works best with models specifically designed to show thinking
         # Stop typing animation
         self.typing_animation_active = False
 
-        # Complete the streaming response formatting
+        # Render chunks still waiting for a tick, then complete the formatting
+        self.render_pending_chunks()
         self.finish_streaming_response()
 
         # Re-enable interface
@@ -2092,9 +3267,14 @@ Note: This feature works best with models specifically designed to show thinking
 
         # Confirm deletion
         model_list = "\n".join([f"• {model}" for model in sorted(self.selected_models)])
+        frees = ""
+        if self.blob_index is not None and self.blob_index.models:
+            # Layers shared with models that stay are not freed
+            reclaimable = self.blob_index.reclaimable(self.selected_models)
+            frees = f"\n\nThis frees {format_bytes(reclaimable)} of disk space."
         result = messagebox.askyesno(
             "Confirm Deletion",
-            f"Are you sure you want to delete the following models?\n\n{model_list}\n\nThis action cannot be undone.",
+            f"Are you sure you want to delete the following models?\n\n{model_list}{frees}\n\nThis action cannot be undone.",
         )
 
         if not result:
@@ -2189,6 +3369,7 @@ Note: This feature works best with models specifically designed to show thinking
                 size = model_info.get("size", 0)
                 size_gb = size / (1024 * 1024 * 1024) if size else 0
                 modified = model_info.get("modified_at", "Unknown")
+                metadata = self.model_metadata.get(model_name)
 
                 info_content += f"📦 {model_name}\n"
                 info_content += f"   Size: {size_gb:.2f} GB ({size:,} bytes)\n"
@@ -2196,9 +3377,31 @@ Note: This feature works best with models specifically designed to show thinking
                 info_content += (
                     f"   Digest: {model_info.get('digest', 'N/A')[:20]}...\n"
                 )
-                info_content += f"   Parent: {model_info.get('parent_model', 'N/A')}\n"
-                info_content += f"   Format: {model_info.get('format', 'N/A')}\n"
-                info_content += f"   Family: {model_info.get('family', 'N/A')}\n\n"
+                if metadata:
+                    context_length = metadata.get("context_length") or "N/A"
+                    template = metadata.get("template", "")
+                    info_content += (
+                        f"   Parameters: {metadata.get('parameter_size') or 'N/A'}\n"
+                    )
+                    info_content += (
+                        f"   Quantization: {metadata.get('quantization') or 'N/A'}\n"
+                    )
+                    info_content += f"   Context Length: {context_length}\n"
+                    info_content += f"   Family: {metadata.get('family') or 'N/A'}\n"
+                    info_content += f"   Format: {metadata.get('format') or 'N/A'}\n"
+                    info_content += (
+                        f"   Parent: {metadata.get('parent_model') or 'N/A'}\n"
+                    )
+                    info_content += (
+                        f"   License: {license_summary(metadata.get('license'))}\n"
+                    )
+                    info_content += (
+                        f"   Template: {len(template):,} chars\n\n"
+                        if template
+                        else "   Template: N/A\n\n"
+                    )
+                else:
+                    info_content += "   Details: still loading from Ollama...\n\n"
 
         total_size = sum(
             m.get("size", 0) for m in self.models if m["name"] in self.selected_models
@@ -2211,6 +3414,515 @@ Note: This feature works best with models specifically designed to show thinking
         info_text.insert("1.0", info_content)
         info_text.configure(state="disabled")
 
+    def show_model_options(self):
+        """Edit the option preset of the selected model and auto-tune it"""
+        if len(self.selected_models) != 1:
+            messagebox.showwarning(
+                "Select One Model", "Please select one model to set its options."
+            )
+            return
+        model_name = next(iter(self.selected_models))
+        if self.options_window is not None and self.options_window.winfo_exists():
+            self.options_window.destroy()
+
+        window = ctk.CTkToplevel(self.root)
+        window.title(f"Model Options - {model_name}")
+        window.geometry("460x640")
+        window.transient(self.root)
+        self.options_window = window
+        self.options_model = model_name
+
+        ctk.CTkLabel(
+            window,
+            text=f"⚙️ {model_name}",
+            font=ctk.CTkFont(size=16, weight="bold"),
+        ).pack(padx=10, pady=(10, 5))
+        ctk.CTkLabel(
+            window,
+            text="Sent with every request to this model; blank uses Ollama's default.",
+            font=ctk.CTkFont(size=11),
+            text_color="gray",
+        ).pack(padx=10)
+
+        form = ctk.CTkScrollableFrame(window)
+        form.pack(fill="both", expand=True, padx=10, pady=5)
+        form.grid_columnconfigure(1, weight=1)
+        self.option_entries = {}
+        for row, name in enumerate(MODEL_OPTION_LIMITS):
+            ctk.CTkLabel(form, text=f"{name}:").grid(
+                row=row, column=0, padx=10, pady=3, sticky="w"
+            )
+            entry = ctk.CTkEntry(form, width=140)
+            entry.grid(row=row, column=1, padx=10, pady=3, sticky="w")
+            self.option_entries[name] = entry
+        self.fill_model_options(self.settings.model_options.get(model_name, {}))
+
+        self.options_status_label = ctk.CTkLabel(
+            window, text="", font=ctk.CTkFont(size=11)
+        )
+        self.options_status_label.pack(padx=10, pady=2)
+
+        btn_frame = ctk.CTkFrame(window)
+        btn_frame.pack(fill="x", padx=10, pady=(5, 10))
+        ctk.CTkButton(
+            btn_frame, text="💾 Save Preset", command=self.save_model_options
+        ).pack(side="left", padx=5, pady=5)
+        self.tune_btn = ctk.CTkButton(
+            btn_frame, text="⚡ Auto-tune", command=self.tune_model_options
+        )
+        self.tune_btn.pack(side="left", padx=5, pady=5)
+        ctk.CTkButton(
+            btn_frame, text="↺ Defaults", command=lambda: self.fill_model_options({})
+        ).pack(side="right", padx=5, pady=5)
+
+    def fill_model_options(self, preset: Dict):
+        """Show a preset in the model options window"""
+        for name, entry in self.option_entries.items():
+            entry.delete(0, "end")
+            if name in preset:
+                entry.insert(0, str(preset[name]))
+
+    def read_model_options(self) -> Dict:
+        """Preset typed into the model options window; raises ValueError"""
+        preset = {}
+        for name, entry in self.option_entries.items():
+            text = entry.get().strip()
+            if not text:
+                continue
+            number = float if isinstance(MODEL_OPTION_LIMITS[name][0], float) else int
+            try:
+                preset[name] = number(text)
+            except ValueError:
+                raise ValueError(f"{name}: {text!r} is not a number")
+        return preset
+
+    def store_model_options(self, model_name: str, preset: Dict):
+        """Save one model's preset; an empty preset removes it"""
+        presets = dict(self.settings.model_options)
+        if preset:
+            presets[model_name] = preset
+        else:
+            presets.pop(model_name, None)
+        self.settings_store.save(model_options=presets)
+
+    def save_model_options(self):
+        """Save the preset typed into the model options window"""
+        try:
+            self.store_model_options(self.options_model, self.read_model_options())
+        except ValueError as e:
+            messagebox.showerror("Invalid Options", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save options: {str(e)}")
+            return
+        self.options_status_label.configure(text="Preset saved")
+
+    def tune_model_options(self):
+        """Benchmark option combinations for the model on a worker thread"""
+        try:
+            base_options = self.read_model_options()
+        except ValueError as e:
+            messagebox.showerror("Invalid Options", str(e))
+            return
+        model_name = self.options_model
+        model = next((m for m in self.models if m["name"] == model_name), None)
+        if model is None:
+            return
+        model = self.model_metadata.merged(model)
+        self.tune_btn.configure(state="disabled", text="Tuning...")
+
+        def post(**event):
+            self.ui_queue.put(dict(event, type="option_tuning", model=model_name))
+
+        def tune():
+            try:
+                # Deferred import: GPU probing libraries are slow to load
+                from gpu_info import get_gpu_info
+                from memory_fit import hardware_budget
+                from option_tuner import OptionTuner
+
+                vram_mb, ram_gb = hardware_budget(get_gpu_info())
+                tuner = OptionTuner(self.api, model, vram_mb, ram_gb, base_options)
+                result = tuner.tune(lambda trial: post(trial=trial))
+            except Exception as e:
+                post(error=str(e))
+                return
+            post(result=result)
+
+        threading.Thread(target=tune, daemon=True).start()
+
+    def on_option_tuning(self, event: Dict):
+        """Show auto-tuning progress and save the fastest preset"""
+        result = event.get("result")
+        if result:
+            try:
+                self.store_model_options(event["model"], result["options"])
+                text = (
+                    f"Saved the fastest preset for {event['model']}: "
+                    f"{result['tokens_per_second']:.1f} tokens/s"
+                )
+            except Exception as e:
+                text = f"Tuned preset not saved: {e}"
+        elif "error" in event:
+            text = f"Auto-tuning failed: {event['error']}"
+        else:
+            trial = event["trial"]
+            options = ", ".join(f"{k}={v}" for k, v in trial["options"].items())
+            options = options or "defaults"
+            if trial["skipped"]:
+                text = f"Skipped, won't fit in memory: {options}"
+            elif trial["tokens_per_second"] is None:
+                text = f"Failed to run: {options}"
+            else:
+                text = f"{trial['tokens_per_second']:.1f} tokens/s with {options}"
+        self.status_label.configure(text=text)
+
+        window = self.options_window
+        if window is None or not window.winfo_exists():
+            return
+        if self.options_model != event["model"]:
+            return
+        self.options_status_label.configure(text=text)
+        if result:
+            self.fill_model_options(result["options"])
+        if result or "error" in event:
+            self.tune_btn.configure(state="normal", text="⚡ Auto-tune")
+
+    def scan_blob_store(self, models_dir: str) -> Optional[BlobStoreIndex]:
+        """Up-to-date blob store index, or None without a local store
+
+        Runs on worker threads; scans are serialized.
+        """
+        with self.blob_scan_lock:
+            path = Path(models_dir).expanduser() if models_dir else default_models_dir()
+            if self.blob_index is None or self.blob_index.models_dir != path:
+                self.blob_index = BlobStoreIndex(path)
+            if not self.blob_index.exists():
+                return None
+            self.blob_index.scan()
+            return self.blob_index
+
+    def refresh_disk_usage(self):
+        """Index the local blob store on a worker thread"""
+        models_dir = self.settings.ollama_models_dir
+
+        def scan():
+            try:
+                index = self.scan_blob_store(models_dir)
+                report = index.report() if index else None
+            except Exception as e:
+                logging.debug(f"Blob store scan failed: {e}")
+                return
+            self.ui_queue.put({"type": "disk_usage", "report": report})
+
+        threading.Thread(target=scan, daemon=True).start()
+
+    def verify_models(self):
+        """Check the selected models' files (or all) against their digests"""
+        selection = sorted(self.selected_models)
+        models_dir = self.settings.ollama_models_dir
+        # One run at a time; concurrent pools would race on the cache file
+        self.verify_btn.configure(state="disabled", text="Verifying...")
+        self.progress_label.configure(text="🔍 Verifying model files...")
+        self.progress_bar.set(0)
+
+        def post(**event):
+            self.ui_queue.put(dict(event, type="blob_verify"))
+
+        def verify():
+            try:
+                index = self.scan_blob_store(models_dir)
+                if index is None:
+                    post(
+                        error="No local Ollama model folder found (set it in Settings)"
+                    )
+                    return
+                digests = None
+                if selection:
+                    digests = {
+                        digest
+                        for name in selection
+                        for digest, _ in index.models.get(name, [])
+                    }
+                result = BlobVerifier(index.models_dir).verify(
+                    digests,
+                    lambda done, total, rate: post(done=done, total=total, rate=rate),
+                )
+            except Exception as e:
+                post(error=str(e))
+                return
+            affected = {
+                model
+                for name in result["corrupt"]
+                for model in index.layer_models.get(name.replace("-", ":", 1), ())
+            }
+            post(result=result, affected=sorted(affected))
+
+        threading.Thread(target=verify, daemon=True).start()
+
+    def on_blob_verify(self, event: Dict):
+        """Show verification progress and the outcome"""
+        if "error" in event or "result" in event:
+            self.verify_btn.configure(state="normal", text="🛡️ Verify Models")
+        if "error" in event:
+            self.progress_label.configure(text="❌ Verification failed")
+            messagebox.showerror("Verify Models", event["error"])
+            return
+        if "result" not in event:
+            fraction = event["done"] / event["total"] if event["total"] else 1.0
+            self.progress_bar.set(fraction)
+            self.progress_percentage.configure(text=f"{fraction:.0%}")
+            self.progress_label.configure(
+                text=f"🔍 Verifying {format_bytes(event['done'])} of "
+                f"{format_bytes(event['total'])} at {format_bytes(event['rate'])}/s"
+            )
+            return
+
+        result = event["result"]
+        self.progress_bar.set(0)
+        self.progress_percentage.configure(text="")
+        rate = format_bytes(result["bytes_per_second"])
+        summary = (
+            f"{result['verified']} files verified "
+            f"({result['cached']} unchanged since their last check, "
+            f"{format_bytes(result['bytes'])} hashed at {rate}/s)"
+        )
+        problems = result["corrupt"] + list(result["errors"])
+        if not problems:
+            self.progress_label.configure(text=f"✅ {summary}")
+            messagebox.showinfo(
+                "Verify Models", f"All model files are intact.\n\n{summary}"
+            )
+            return
+
+        self.progress_label.configure(text=f"❌ {len(problems)} damaged model files")
+        details = "\n".join(f"• {name}" for name in result["corrupt"])
+        details += "".join(
+            f"\n• {name}: {error}" for name, error in result["errors"].items()
+        )
+        if event["affected"]:
+            details += "\n\nPull these models again to repair them:\n" + "\n".join(
+                f"• {model}" for model in event["affected"]
+            )
+        messagebox.showerror(
+            "Verify Models",
+            f"These files do not match their sha256 digest:\n{details}\n\n{summary}",
+        )
+
+    def on_disk_usage(self, event: Dict):
+        """Show real disk usage next to the listed model sizes"""
+        report = event["report"]
+        if report is None:
+            text = "💽 Local Ollama model folder not found (set it in Settings)"
+        else:
+            text = (
+                f"💽 {format_bytes(report['real_bytes'])} on disk for "
+                f"{format_bytes(report['apparent_bytes'])} of listed models"
+            )
+        if "models" in self.panels:
+            self.disk_usage_label.configure(text=text)
+        self.refresh_disk_usage_window()
+
+    def show_disk_usage(self):
+        """Show where the local blob store's space goes"""
+        if self.disk_usage_window is not None and self.disk_usage_window.winfo_exists():
+            self.disk_usage_window.focus()
+        else:
+            window = ctk.CTkToplevel(self.root)
+            window.title("Disk Usage - ShamaOllama")
+            window.geometry("700x500")
+            window.transient(self.root)
+            self.disk_usage_window = window
+            self.disk_usage_text = ctk.CTkTextbox(
+                window,
+                wrap="none",
+                font=ctk.CTkFont(family="Courier", size=11),
+                state="disabled",
+            )
+            self.disk_usage_text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh_disk_usage_window()
+        self.refresh_disk_usage()
+
+    def refresh_disk_usage_window(self):
+        """Fill the disk usage window from the last scan"""
+        window = self.disk_usage_window
+        if window is None or not window.winfo_exists():
+            return
+        if self.blob_index is None:
+            text = "Scanning the local Ollama model folder..."
+        elif not self.blob_index.exists():
+            text = f"No Ollama models found in {self.blob_index.models_dir}"
+        else:
+            text = format_usage_report(self.blob_index, self.selected_models)
+        self.disk_usage_text.configure(state="normal")
+        self.disk_usage_text.delete("1.0", "end")
+        self.disk_usage_text.insert("1.0", text)
+        self.disk_usage_text.configure(state="disabled")
+
+    def show_quant_compare(self):
+        """Compare quantization variants of a model with the same prompts"""
+        if self.quant_window is not None and self.quant_window.winfo_exists():
+            self.quant_window.focus()
+            return
+
+        window = ctk.CTkToplevel(self.root)
+        window.title("Compare Quantizations - ShamaOllama")
+        window.geometry("760x620")
+        window.transient(self.root)
+        self.quant_window = window
+
+        ctk.CTkLabel(
+            window,
+            text="🧪 Compare Quantization Variants",
+            font=ctk.CTkFont(size=16, weight="bold"),
+        ).pack(padx=10, pady=(10, 5))
+
+        form = ctk.CTkFrame(window)
+        form.pack(fill="x", padx=10, pady=5)
+        form.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(form, text="Model:").grid(
+            row=0, column=0, padx=10, pady=5, sticky="w"
+        )
+        self.quant_model_entry = ctk.CTkEntry(
+            form, placeholder_text="e.g. llama3.1:8b-instruct"
+        )
+        self.quant_model_entry.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
+        selected = sorted(self.selected_models) or [self.current_model or ""]
+        self.quant_model_entry.insert(0, selected[0])
+
+        ctk.CTkLabel(form, text="Also pull:").grid(
+            row=1, column=0, padx=10, pady=5, sticky="w"
+        )
+        self.quant_pull_entry = ctk.CTkEntry(
+            form,
+            placeholder_text=f"e.g. {', '.join(DEFAULT_QUANTS)} (blank = installed only)",
+        )
+        self.quant_pull_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(window, text="Prompts (one per line):", anchor="w").pack(
+            fill="x", padx=10
+        )
+        self.quant_prompts_text = ctk.CTkTextbox(window, height=90)
+        self.quant_prompts_text.pack(fill="x", padx=10, pady=5)
+        self.quant_prompts_text.insert("1.0", "\n".join(DEFAULT_PROMPTS))
+
+        self.quant_results_text = ctk.CTkTextbox(
+            window, font=ctk.CTkFont(family="Courier", size=11), state="disabled"
+        )
+        self.quant_results_text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        btn_frame = ctk.CTkFrame(window)
+        btn_frame.pack(fill="x", padx=10, pady=(5, 10))
+        self.quant_run_btn = ctk.CTkButton(
+            btn_frame, text="▶ Run Comparison", command=self.run_quant_compare
+        )
+        self.quant_run_btn.pack(side="left", padx=5, pady=5)
+        self.quant_status_label = ctk.CTkLabel(
+            btn_frame, text="", font=ctk.CTkFont(size=11)
+        )
+        self.quant_status_label.pack(side="left", padx=10, pady=5)
+
+    def run_quant_compare(self):
+        """Pull missing variants and benchmark them on a worker thread"""
+        name = self.quant_model_entry.get().strip()
+        quants = [q for q in self.quant_pull_entry.get().split(",") if q.strip()]
+        prompts = [
+            line.strip()
+            for line in self.quant_prompts_text.get("1.0", "end").splitlines()
+            if line.strip()
+        ]
+        models = list(self.models)
+        if not name:
+            messagebox.showerror("Invalid Model", "Enter a model name to compare.")
+            return
+        try:
+            variants = variant_names(name, quants, models)
+        except ValueError as e:
+            messagebox.showerror("Size Tag Needed", str(e))
+            return
+        invalid = [v for v in variants if not security.validate_model_name(v)]
+        if invalid:
+            messagebox.showerror("Invalid Model", f"Invalid model name: {invalid[0]!r}")
+            return
+        if not variants:
+            messagebox.showwarning(
+                "No Variants", f"No installed variants of {name} and nothing to pull."
+            )
+            return
+
+        self.quant_run_btn.configure(state="disabled", text="Running...")
+
+        def post(**event):
+            self.ui_queue.put(dict(event, type="quant_compare"))
+
+        def compare():
+            try:
+                # Deferred import: GPU probing libraries are slow to load
+                from gpu_info import get_gpu_info
+                from memory_fit import hardware_budget
+
+                comparison = QuantComparison(self.api, variants, prompts)
+                statuses = {}
+
+                def pull_progress(variant: str, data: Dict):
+                    status = data.get("status", "")
+                    if statuses.get(variant) != status:
+                        statuses[variant] = status
+                        post(status=f"Pulling {variant}: {status}")
+
+                installed = [m["name"] for m in models]
+                missing = [v for v in variants if v not in installed]
+                failed = comparison.pull_missing(installed, pull_progress)
+                if len(failed) < len(missing):
+                    refreshed = self.api.fetch_models()
+                    if refreshed is not None:
+                        models[:] = refreshed
+                results = comparison.run(
+                    models,
+                    lambda result: post(status=f"Measured {result['name']}"),
+                )
+                budget = memory_budget_mb(*hardware_budget(get_gpu_info()))
+            except Exception as e:
+                post(error=str(e))
+                return
+            post(results=results, failed=failed, budget_mb=budget)
+
+        threading.Thread(target=compare, daemon=True).start()
+
+    def on_quant_compare(self, event: Dict):
+        """Show comparison progress and the results table"""
+        window = self.quant_window
+        window_open = window is not None and window.winfo_exists()
+        if "status" in event:
+            if window_open:
+                self.quant_status_label.configure(text=event["status"])
+            return
+
+        if "error" in event:
+            text = f"Comparison failed: {event['error']}"
+            report = text
+        else:
+            results = event["results"]
+            best = recommend(results, event["budget_mb"])
+            report = format_table(results, best)
+            if best:
+                text = f"Fastest variant that fits: {best['name']}"
+            else:
+                text = "No variant ran within the available memory"
+            report += f"\n\n{text}"
+            if event["failed"]:
+                report += f"\nCould not pull: {', '.join(event['failed'])}"
+            self.refresh_models()
+        self.status_label.configure(text=text)
+        if not window_open:
+            return
+        self.quant_status_label.configure(text=text)
+        self.quant_results_text.configure(state="normal")
+        self.quant_results_text.delete("1.0", "end")
+        self.quant_results_text.insert("1.0", report)
+        self.quant_results_text.configure(state="disabled")
+        self.quant_run_btn.configure(state="normal", text="▶ Run Comparison")
+
     def manage_model_tags(self):
         """Manage model tags and versions"""
         if not self.selected_models:
@@ -2261,9 +3973,7 @@ Note: This feature works best with models specifically designed to show thinking
             ).pack(side="left", padx=10, pady=5)
 
             # Find related models
-            related = [
-                m["name"] for m in self.models if m["name"].startswith(base_name + ":")
-            ]
+            related = related_models(self.models, base_name)
             if len(related) > 1:
                 ctk.CTkLabel(
                     model_frame,
@@ -2319,6 +4029,20 @@ Note: This feature works best with models specifically designed to show thinking
                                 f"Modified: {model_info.get('modified_at', 'Unknown')}\n"
                             )
                             f.write(f"Digest: {model_info.get('digest', 'N/A')}\n")
+                            metadata = self.model_metadata.get(model_name) or {}
+                            f.write(
+                                f"Parameters: {metadata.get('parameter_size') or 'N/A'}\n"
+                            )
+                            f.write(
+                                f"Quantization: {metadata.get('quantization') or 'N/A'}\n"
+                            )
+                            f.write(
+                                f"Context Length: {metadata.get('context_length') or 'N/A'}\n"
+                            )
+                            f.write(f"Family: {metadata.get('family') or 'N/A'}\n")
+                            f.write(
+                                f"License: {license_summary(metadata.get('license'))}\n"
+                            )
                             f.write("-" * 30 + "\n")
 
                 messagebox.showinfo(
@@ -2334,8 +4058,58 @@ Note: This feature works best with models specifically designed to show thinking
         self.delete_selected_models()
 
     def load_selected_session(self):
-        """Load a selected chat session"""
-        messagebox.showinfo("Feature", "Session loading feature coming soon!")
+        """Load a session by its number, or a search result (R1, ...)"""
+        dialog = ctk.CTkInputDialog(
+            text="Session number (e.g. 3, or R1 for a search result):",
+            title="Load Session",
+        )
+        choice = (dialog.get_input() or "").strip().upper()
+        if not choice:
+            return
+
+        result = None
+        try:
+            if choice.startswith("R"):
+                result = self.search_results[int(choice[1:]) - 1]
+                index = result.get("index", -1)
+            else:
+                index = int(choice) - 1
+                if not 0 <= index < len(self.chat_manager.chat_history):
+                    raise IndexError(choice)
+        except (ValueError, IndexError):
+            messagebox.showwarning("Load Session", f"No session {choice}.")
+            return
+
+        if result is not None and "ref" in result:
+            # Archived sessions are decompressed on demand
+            def load():
+                session = self.chat_manager.archive.load_session(result["ref"])
+                self.ui_queue.put({"type": "session_opened", "session": session})
+
+            threading.Thread(target=load, daemon=True).start()
+        else:
+            session = self.chat_manager.chat_history[index]
+            self.on_session_opened({"session": session})
+
+    def on_session_opened(self, event: Dict):
+        """Continue a saved session in the chat panel"""
+        session = event["session"]
+        if session is None:
+            messagebox.showerror("Load Session", "The archived session is unreadable.")
+            return
+        if self.chat_manager.current_session and self.autosave_var.get():
+            self.chat_manager.save_session()
+
+        self.chat_manager.open_session(session)
+        self.refresh_documents_window()
+        self.show_chat()
+        self.chat_display.configure(state="normal")
+        self.chat_display.delete("1.0", "end")
+        self.chat_display.configure(state="disabled")
+        for message in self.chat_manager.current_session:
+            if message.role in ("user", "assistant"):
+                self.add_chat_message(message.role, message.content)
+        self.status_label.configure(text=f"Loaded session: {session['title']}")
 
     def export_selected_session(self):
         """Export a selected chat session"""
@@ -2363,11 +4137,14 @@ Note: This feature works best with models specifically designed to show thinking
     def clear_history(self):
         """Clear all chat history"""
         if messagebox.askyesno(
-            "Confirm", "Are you sure you want to clear all chat history?"
+            "Confirm",
+            "Are you sure you want to clear all chat history, "
+            "including archived sessions?",
         ):
-            self.chat_manager.chat_history = []
-            self.chat_manager.save_history()
+            self.chat_manager.clear_history()
+            self.search_results = []
             self.refresh_history_display()
+            self.update_semantic_status()
             self.status_label.configure(text="Chat history cleared")
 
     def test_connection_manual(self):
@@ -2385,6 +4162,7 @@ Note: This feature works best with models specifically designed to show thinking
 
         if url:
             self.api.base_url = url
+            self.connection_monitor.wake()
 
         def test():
             is_connected = self.api.test_connection()
@@ -2453,64 +4231,208 @@ Note: This feature works best with models specifically designed to show thinking
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save memory: {str(e)}")
 
-    def save_settings(self):
-        """Save application settings"""
-        # Update API URL
-        url = self.url_entry.get().strip()
-        if url:
-            self.api.base_url = url
+    def fill_settings_form(self, settings: Settings):
+        """Show a settings snapshot in the settings panel"""
+        self.url_entry.delete(0, "end")
+        self.url_entry.insert(0, settings.ollama_url)
+        for name, entry in self.settings_entries.items():
+            entry.delete(0, "end")
+            entry.insert(0, str(getattr(settings, name)))
 
-        # Save settings to file
-        settings = {
-            "ollama_url": self.api.base_url,
+    def save_settings(self):
+        """Save application settings; they are applied once validated"""
+        changes = {
             "auto_save": self.autosave_var.get(),
-            "max_history": self.max_history_entry.get(),
+            "hide_thinking": self.hide_thinking_var.get(),
+            "response_cache": self.response_cache_var.get(),
         }
+        url = self.url_entry.get().strip()
+        if url:
+            changes["ollama_url"] = url
+        for name, entry in self.settings_entries.items():
+            changes[name] = entry.get().strip()
 
         try:
-            settings_file = self.chat_manager.data_dir / "settings.json"
-            with open(settings_file, "w") as f:
-                json.dump(settings, f, indent=2)
-
+            self.settings_store.save(**changes)
             messagebox.showinfo("Success", "Settings saved successfully!")
             self.status_label.configure(text="Settings saved")
+        except ValueError as e:
+            messagebox.showerror("Invalid Settings", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save settings: {str(e)}")
 
     def toggle_theme(self):
         """Toggle between light and dark themes"""
-        current_mode = ctk.get_appearance_mode()
-        if current_mode == "Dark":
-            ctk.set_appearance_mode("light")
+        mode = "light" if ctk.get_appearance_mode() == "Dark" else "dark"
+        self.apply_theme(mode)
+        try:
+            self.settings_store.save(theme=mode)
+        except Exception as e:
+            logging.debug(f"Theme not saved: {e}")
+
+    def apply_theme(self, mode: str):
+        """Switch the appearance mode and the theme button label"""
+        ctk.set_appearance_mode(mode)
+        if ctk.get_appearance_mode() == "Light":
             self.theme_btn.configure(text="☀️ Light Theme")
         else:
-            ctk.set_appearance_mode("dark")
             self.theme_btn.configure(text="🌙 Dark Theme")
 
     def view_security_logs(self):
-        """View security logs in a new window"""
+        """View security events, newest first, loading older pages on demand"""
         try:
+            # Events are written by a background thread; catch up first
+            security.flush_logs()
             log_file = Path.home() / ".shamollama" / "logs" / "security.log"
             if not log_file.exists():
                 messagebox.showinfo("Security Logs", "No security logs found.")
                 return
 
+            reader = security_log.SecurityLogReader(log_file)
+            # cursor: offset of the oldest event shown; newest: tail position
+            state = {"cursor": None, "newest": 0, "resets": 0, "generation": 0}
+            state["loading"] = False
+
             # Create log viewer window
             log_window = ctk.CTkToplevel(self.root)
             log_window.title("Security Logs - ShamaOllama")
-            log_window.geometry("800x600")
+            log_window.geometry("900x600")
+
+            # Filters
+            filter_frame = ctk.CTkFrame(log_window)
+            filter_frame.pack(fill="x", padx=10, pady=(10, 0))
+
+            type_var = ctk.StringVar(value="All types")
+            type_menu = ctk.CTkOptionMenu(
+                filter_frame,
+                values=["All types"],
+                variable=type_var,
+                command=lambda _: load_page(reset=True),
+            )
+            type_menu.pack(side="left", padx=5, pady=5)
+
+            range_var = ctk.StringVar(value="All time")
+            ctk.CTkOptionMenu(
+                filter_frame,
+                values=list(security_log.TIME_RANGES),
+                variable=range_var,
+                command=lambda _: load_page(reset=True),
+            ).pack(side="left", padx=5, pady=5)
+
+            count_label = ctk.CTkLabel(filter_frame, text="Loading...")
+            count_label.pack(side="right", padx=10)
 
             # Log display
             log_text = ctk.CTkTextbox(
                 log_window, wrap="word", font=ctk.CTkFont(family="Courier", size=10)
             )
             log_text.pack(fill="both", expand=True, padx=10, pady=10)
+            log_text.configure(state="disabled")
+
+            older_btn = ctk.CTkButton(
+                log_window,
+                text="⬇️ Load Older",
+                command=lambda: load_page(reset=False),
+                state="disabled",
+            )
+            older_btn.pack(pady=(0, 10))
+
+            def filters():
+                event_type = type_var.get()
+                seconds = security_log.TIME_RANGES[range_var.get()]
+                return (
+                    None if event_type == "All types" else event_type,
+                    time.time() - seconds if seconds else None,
+                )
 
-            # Read and display logs
-            with open(log_file, "r", encoding="utf-8") as f:
-                log_content = f.read()
-                log_text.insert("1.0", log_content)
+            def show(events, at_top, event_types):
+                log_text.configure(state="normal")
+                lines = "".join(security_log.format_event(e) + "\n" for e in events)
+                log_text.insert("1.0" if at_top else "end", lines)
                 log_text.configure(state="disabled")
+                shown = int(log_text.index("end-1c").split(".")[0]) - 1
+                count_label.configure(text=f"{shown} events shown")
+                type_menu.configure(values=["All types"] + event_types)
+
+            def load_page(reset):
+                if reset:
+                    state["generation"] += 1
+                    state["cursor"] = None
+                    state["loading"] = True
+                    log_text.configure(state="normal")
+                    log_text.delete("1.0", "end")
+                    log_text.configure(state="disabled")
+                elif state["cursor"] is None:
+                    return
+                generation = state["generation"]
+                before = state["cursor"]
+                event_type, since = filters()
+                older_btn.configure(state="disabled")
+
+                def read():
+                    with reader.lock:
+                        events, cursor = reader.page(before, event_type, since)
+                        position = (reader.index.indexed_to, reader.index.resets)
+                        event_types = reader.index.event_types()
+                    self.root.after(
+                        0,
+                        lambda: loaded(
+                            generation, reset, events, cursor, position, event_types
+                        ),
+                    )
+
+                threading.Thread(target=read, daemon=True).start()
+
+            def loaded(generation, reset, events, cursor, position, event_types):
+                if generation != state["generation"] or not log_window.winfo_exists():
+                    return
+                if reset:
+                    state["newest"], state["resets"] = position
+                    state["loading"] = False
+                state["cursor"] = cursor
+                show(events, at_top=False, event_types=event_types)
+                if cursor is not None:
+                    older_btn.configure(state="normal")
+
+            def tail():
+                # Poll for appended events while the window is open
+                if not log_window.winfo_exists():
+                    return
+                if state["loading"]:
+                    log_window.after(2000, tail)
+                    return
+                generation = state["generation"]
+                event_type, since = filters()
+
+                def read():
+                    with reader.lock:
+                        events, newest = reader.events_after(
+                            state["newest"], event_type, since
+                        )
+                        resets = reader.index.resets
+                        event_types = reader.index.event_types()
+                    self.root.after(
+                        0,
+                        lambda: tailed(generation, events, newest, resets, event_types),
+                    )
+
+                threading.Thread(target=read, daemon=True).start()
+
+            def tailed(generation, events, newest, resets, event_types):
+                if not log_window.winfo_exists():
+                    return
+                if generation == state["generation"]:
+                    if resets != state["resets"]:
+                        # Rotated or cleared underneath us
+                        load_page(reset=True)
+                    else:
+                        state["newest"] = newest
+                        if events:
+                            show(events, at_top=True, event_types=event_types)
+                log_window.after(2000, tail)
+
+            load_page(reset=True)
+            log_window.after(2000, tail)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to view security logs: {e}")
@@ -2551,6 +4473,9 @@ Note: This feature works best with models specifically designed to show thinking
         if self.chat_manager.current_session and self.autosave_var.get():
             self.chat_manager.save_session()
 
+        self.connection_monitor.stop()
+        self.telemetry.stop()
+        self.settings_store.stop_watching()
         self.root.quit()
         self.root.destroy()
 
@@ -2560,5 +4485,15 @@ Note: This feature works best with models specifically designed to show thinking
 
 
 if __name__ == "__main__":
+    # Frozen builds start pool workers by re-running the executable
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="ShamaOllama - Streaming AI Interface")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print an import and init timing breakdown once the window is up",
+    )
+    parser.parse_args()
+
     app = ShamaOllamaGUI()
     app.run()
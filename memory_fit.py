@@ -0,0 +1,223 @@
+"""
+Memory-fit predictor for ShamaOllama
+Estimates whether a model will run fully on the GPU, partially offloaded or
+on the CPU only, from its size, quantization and architecture (as reported
+by /api/tags and /api/show) plus the detected VRAM and system RAM. The
+KV-cache cost grows with num_ctx, so the same model can fit at 4096 tokens
+and spill at 32768.
+"""
+
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+# Ollama's default context window when a request sets no num_ctx
+DEFAULT_NUM_CTX = 4096
+
+# Context sizes offered in the UI
+NUM_CTX_CHOICES = [2048, 4096, 8192, 16384, 32768, 65536, 131072]
+
+# VRAM kept free for the CUDA/ROCm context and compute buffers
+GPU_RESERVE_MB = 512
+
+# System RAM left for the OS and other applications
+RAM_RESERVE_GB = 2.0
+
+# Approximate bits per weight of common GGUF quantizations
+QUANT_BITS = {
+    "F32": 32.0,
+    "F16": 16.0,
+    "BF16": 16.0,
+    "Q8_0": 8.5,
+    "Q6_K": 6.56,
+    "Q5_1": 6.0,
+    "Q5_K_M": 5.69,
+    "Q5_K_S": 5.54,
+    "Q5_0": 5.5,
+    "Q4_1": 5.0,
+    "Q4_K_M": 4.85,
+    "Q4_K_S": 4.58,
+    "Q4_0": 4.5,
+    "IQ4_XS": 4.25,
+    "Q3_K_L": 4.27,
+    "Q3_K_M": 3.91,
+    "Q3_K_S": 3.5,
+    "Q2_K": 3.35,
+}
+
+# Bytes per KV-cache element for each OLLAMA_KV_CACHE_TYPE
+KV_CACHE_BYTES = {"f16": 2.0, "q8_0": 1.0625, "q4_0": 0.5625}
+
+# KV bytes per token per billion parameters, used when /api/show metadata
+# is not cached yet (typical of grouped-query attention models)
+FALLBACK_KV_BYTES_PER_TOKEN_PER_B = 16384
+
+PLACEMENT_BADGES = {
+    "gpu": "🟢 Full GPU",
+    "partial": "🟡 Partial offload",
+    "cpu": "🟠 CPU only",
+    "no_fit": "🔴 Won't fit",
+}
+
+MB = 1024 * 1024
+
+
+def kv_cache_type() -> str:
+    """KV-cache element type Ollama was configured with"""
+    cache_type = os.environ.get("OLLAMA_KV_CACHE_TYPE", "f16").lower()
+    return cache_type if cache_type in KV_CACHE_BYTES else "f16"
+
+
+def parse_parameter_size(parameter_size: str) -> float:
+    """Turn "8.0B" or "350M" into billions of parameters"""
+    match = re.match(r"^\s*([\d.]+)\s*([KMBT]?)", parameter_size or "", re.I)
+    if not match:
+        return 0.0
+    try:
+        value = float(match.group(1))
+    except ValueError:
+        return 0.0
+    scale = {"K": 1e-6, "M": 1e-3, "B": 1.0, "T": 1e3, "": 1e-9}
+    return value * scale[match.group(2).upper()]
+
+
+def parameter_billions(model: Dict) -> float:
+    """Best available parameter count of a model, in billions"""
+    if model.get("parameter_count"):
+        return model["parameter_count"] / 1e9
+
+    details = model.get("details") or {}
+    parameter_size = model.get("parameter_size") or details.get("parameter_size")
+    billions = parse_parameter_size(parameter_size)
+    if billions:
+        return billions
+
+    # Work back from the file size and quantization
+    bits = QUANT_BITS.get(quantization_level(model).upper())
+    if bits and model.get("size"):
+        return model["size"] * 8 / bits / 1e9
+    return 0.0
+
+
+def quantization_level(model: Dict) -> str:
+    """Quantization from cached metadata or the /api/tags details"""
+    details = model.get("details") or {}
+    return model.get("quantization") or details.get("quantization_level") or ""
+
+
+def weights_mb(model: Dict) -> float:
+    """Memory taken by the model weights"""
+    if model.get("size"):
+        # The GGUF blob is loaded as-is, so its size is the weight footprint
+        return model["size"] / MB
+    bits = QUANT_BITS.get(quantization_level(model).upper(), 16.0)
+    return parameter_billions(model) * 1e9 * bits / 8 / MB
+
+
+def kv_cache_mb(model: Dict, num_ctx: int, cache_type: Optional[str] = None):
+    """KV-cache size for num_ctx tokens; returns (MB, exact)
+
+    exact is False when the architecture is not known and the size was
+    extrapolated from the parameter count.
+    """
+    element_bytes = KV_CACHE_BYTES[cache_type or kv_cache_type()]
+    layers = model.get("block_count")
+    embedding = model.get("embedding_length")
+    heads = model.get("head_count")
+    kv_heads = model.get("head_count_kv") or heads
+
+    if layers and embedding and heads and kv_heads:
+        head_dim = embedding / heads
+        # Keys and values for every layer, token and KV head
+        total = 2 * layers * num_ctx * kv_heads * head_dim * element_bytes
+        return total / MB, True
+
+    per_token = FALLBACK_KV_BYTES_PER_TOKEN_PER_B * parameter_billions(model)
+    return per_token * num_ctx * element_bytes / 2.0 / MB, False
+
+
+def hardware_budget(gpu_info) -> Tuple[float, float]:
+    """Total VRAM (MB) across GPUs and system RAM (GB) from a GPUInfo
+
+    Ollama splits layers across several GPUs, so their VRAM is summed.
+    """
+    vram_mb = sum(gpu.get("memory_total", 0) or 0 for gpu in gpu_info.gpu_data)
+    return vram_mb, gpu_info.system_ram or 0.0
+
+
+def estimate_fit(
+    model: Dict,
+    vram_mb: float,
+    ram_gb: float,
+    num_ctx: Optional[int] = None,
+    cache_type: Optional[str] = None,
+) -> Dict:
+    """Predict where a model will be placed and what it will cost"""
+    if num_ctx is None:
+        num_ctx = DEFAULT_NUM_CTX
+    context_length = model.get("context_length")
+    if context_length:
+        # Ollama clamps num_ctx to what the model was trained for
+        num_ctx = min(num_ctx, context_length)
+
+    weights = weights_mb(model)
+    kv_cache, exact = kv_cache_mb(model, num_ctx, cache_type)
+    total = weights + kv_cache
+    usable_vram = max(vram_mb - GPU_RESERVE_MB, 0)
+    usable_ram = max(ram_gb - RAM_RESERVE_GB, 0) * 1024
+
+    layers = model.get("block_count") or 0
+    if usable_vram and total <= usable_vram:
+        placement, gpu_fraction = "gpu", 1.0
+    else:
+        # Layers are offloaded whole; their KV cache moves with them
+        gpu_fraction = usable_vram / total if total else 0.0
+        if layers:
+            gpu_fraction = int(gpu_fraction * layers) / layers
+        spill = total * (1 - gpu_fraction)
+        if gpu_fraction > 0 and spill <= usable_ram:
+            placement = "partial"
+        elif total <= usable_ram:
+            placement, gpu_fraction = "cpu", 0.0
+        else:
+            placement = "no_fit"
+
+    return {
+        "placement": placement,
+        "gpu_fraction": gpu_fraction,
+        "gpu_layers": int(round(gpu_fraction * layers)) if layers else None,
+        "layers": layers or None,
+        "num_ctx": num_ctx,
+        "weights_mb": weights,
+        "kv_cache_mb": kv_cache,
+        "total_mb": total,
+        "exact": exact,
+    }
+
+
+def max_parameters(
+    budget_mb: float, num_ctx: int = DEFAULT_NUM_CTX, quantization: str = "Q4_K_M"
+) -> float:
+    """Largest model, in billions of parameters, that fits with its KV cache"""
+    usable = max(budget_mb, 0) * MB
+    bytes_per_b = 1e9 * QUANT_BITS[quantization] / 8
+    kv_per_b = FALLBACK_KV_BYTES_PER_TOKEN_PER_B * num_ctx
+    return usable / (bytes_per_b + kv_per_b)
+
+
+def format_size(mb: float) -> str:
+    """Format a size in MB as MB or GB"""
+    return f"{mb / 1024:.1f}GB" if mb >= 1024 else f"{mb:.0f}MB"
+
+
+def fit_badge(estimate: Dict) -> str:
+    """Short badge text, e.g. "🟡 Partial offload 62% | KV 1.0GB @ 8192" """
+    badge = PLACEMENT_BADGES[estimate["placement"]]
+    if estimate["placement"] == "partial":
+        if estimate["gpu_layers"] is not None:
+            badge += f" {estimate['gpu_layers']}/{estimate['layers']} layers"
+        else:
+            badge += f" {estimate['gpu_fraction']:.0%}"
+    approx = "" if estimate["exact"] else "~"
+    kv_cache = format_size(estimate["kv_cache_mb"])
+    return f"{badge} | KV {approx}{kv_cache} @ {estimate['num_ctx']}"
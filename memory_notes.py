@@ -0,0 +1,122 @@
+"""
+Relevance filtering for ShamaOllama personal memory notes
+The "Additional Context" notes are split into items (bullet lines or
+paragraphs) and indexed once by keyword. Each request then receives only
+the items that share keywords with the current message, best first,
+within a token budget, instead of the whole notes text. Notes that fit in
+the budget are sent whole, as before.
+"""
+
+import math
+import re
+from typing import Dict, List, Set
+
+# Rough tokens per character for budgeting; Llama-style tokenizers average
+# about four characters of English per token
+CHARS_PER_TOKEN = 4
+
+BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down
+    during each few for from further had has have having he her here hers him
+    his how i if in into is it its itself just me more most my no nor not now
+    of off on once only or other our ours out over own same she should so some
+    such than that the their theirs them then there these they this those
+    through to too under until up very was we were what when where which while
+    who whom why will with would you your yours
+    """.split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text"""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN)) if text else 0
+
+
+def split_items(notes: str) -> List[str]:
+    """Split notes into items: one per bullet line, else one per paragraph"""
+    items: List[str] = []
+    paragraph: List[str] = []
+
+    def end_paragraph():
+        if paragraph:
+            items.append("\n".join(paragraph))
+            paragraph.clear()
+
+    for line in notes.splitlines():
+        if not line.strip():
+            end_paragraph()
+        elif BULLET.match(line):
+            end_paragraph()
+            paragraph.append(line.rstrip())
+        elif paragraph and BULLET.match(paragraph[0]) and line.startswith(" "):
+            paragraph.append(line.rstrip())  # Continuation of a bullet
+        else:
+            if paragraph and BULLET.match(paragraph[0]):
+                end_paragraph()
+            paragraph.append(line.rstrip())
+    end_paragraph()
+    return items
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping so "models" matches "model" """
+    for suffix in ("ing", "ies", "es", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def keywords(text: str) -> Set[str]:
+    """Stemmed words of text, without stopwords and very short words"""
+    return {
+        stem(word)
+        for word in WORD.findall(text.lower())
+        if len(word) > 2 and word not in STOPWORDS
+    }
+
+
+class NoteIndex:
+    """Keyword index over memory note items"""
+
+    def __init__(self, notes: str):
+        self.notes = notes
+        self.items = split_items(notes)
+        self.tokens = [estimate_tokens(item) for item in self.items]
+        self.total_tokens = sum(self.tokens)
+        self.item_keywords = [keywords(item) for item in self.items]
+        # Rarer words say more about which item is meant
+        counts: Dict[str, int] = {}
+        for words in self.item_keywords:
+            for word in words:
+                counts[word] = counts.get(word, 0) + 1
+        count = len(self.items)
+        self.idf = {
+            word: math.log((count + 1) / (seen + 0.5)) for word, seen in counts.items()
+        }
+
+    def select(self, query: str, budget_tokens: int) -> List[str]:
+        """Items relevant to query that fit in budget_tokens, in note order
+
+        All items are returned when they fit in the budget; a budget of 0
+        means no limit.
+        """
+        if not budget_tokens or self.total_tokens <= budget_tokens:
+            return list(self.items)
+
+        query_words = keywords(query)
+        scored = []
+        for i, words in enumerate(self.item_keywords):
+            score = sum(self.idf[word] for word in words & query_words)
+            if score > 0:
+                scored.append((score, i))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        chosen, used = [], 0
+        for _, i in scored:
+            if used + self.tokens[i] <= budget_tokens:
+                chosen.append(i)
+                used += self.tokens[i]
+        return [self.items[i] for i in sorted(chosen)]
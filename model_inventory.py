@@ -0,0 +1,98 @@
+"""
+Model inventory for ShamaOllama
+Tracks the installed model list from /api/tags, detects changes with a
+fingerprint over names and digests, and notifies subscribers with deltas
+instead of making every view rebuild itself on each refresh.
+"""
+
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class ModelDelta:
+    """Changes between two snapshots of the installed model list"""
+
+    def __init__(
+        self,
+        models: List[Dict],
+        added: List[Dict],
+        removed: List[str],
+        updated: List[Dict],
+    ):
+        self.models = models
+        self.added = added
+        self.removed = removed
+        self.updated = updated
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.updated)
+
+    def __repr__(self) -> str:
+        return (
+            f"ModelDelta(added={[m['name'] for m in self.added]}, "
+            f"removed={self.removed}, updated={[m['name'] for m in self.updated]})"
+        )
+
+
+class ModelInventory:
+    """Change-detecting cache of the installed model list"""
+
+    def __init__(self):
+        self.models: List[Dict] = []
+        self.fingerprint = ""
+        self._by_name: Dict[str, Dict] = {}
+        self._subscribers: List[Callable[[ModelDelta], None]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def compute_fingerprint(models: List[Dict]) -> str:
+        """Hash the (name, digest) pairs of a model list"""
+        hasher = hashlib.sha1()
+        for name, digest in sorted(
+            (model.get("name", ""), model.get("digest", "")) for model in models
+        ):
+            hasher.update(f"{name}\0{digest}\n".encode("utf-8"))
+        return hasher.hexdigest()
+
+    def subscribe(self, callback: Callable[[ModelDelta], None]):
+        """Register a callback for model list deltas"""
+        self._subscribers.append(callback)
+        # Late subscribers start from the current state
+        if self.models:
+            callback(ModelDelta(list(self.models), list(self.models), [], []))
+
+    def update(self, models: List[Dict]) -> Optional[ModelDelta]:
+        """Apply a fresh model list; returns the delta, or None if unchanged"""
+        fingerprint = self.compute_fingerprint(models)
+
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return None
+
+            new_by_name = {model["name"]: model for model in models}
+            added = [
+                model
+                for name, model in new_by_name.items()
+                if name not in self._by_name
+            ]
+            removed = [name for name in self._by_name if name not in new_by_name]
+            updated = [
+                model
+                for name, model in new_by_name.items()
+                if name in self._by_name
+                and self._by_name[name].get("digest") != model.get("digest")
+            ]
+
+            self.models = list(models)
+            self._by_name = new_by_name
+            self.fingerprint = fingerprint
+            delta = ModelDelta(list(models), added, removed, updated)
+
+        for callback in list(self._subscribers):
+            callback(delta)
+        return delta
+
+    def get(self, model_name: str) -> Optional[Dict]:
+        """Get a model entry by name"""
+        return self._by_name.get(model_name)
@@ -0,0 +1,217 @@
+"""
+Model metadata cache for ShamaOllama
+Keeps the details reported by Ollama's /api/show endpoint keyed by model
+digest, so info dialogs, reports and recommendations can read them without
+a network call. Entries are only re-fetched when a model's digest changes.
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class ModelMetadataCache:
+    """Digest-keyed cache of model details fetched from /api/show"""
+
+    # Architecture keys from /api/show "model_info" we keep (prefixed by arch)
+    ARCHITECTURE_KEYS = {
+        "context_length": "context_length",
+        "block_count": "block_count",
+        "embedding_length": "embedding_length",
+        "attention.head_count": "head_count",
+        "attention.head_count_kv": "head_count_kv",
+    }
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        if cache_file is None:
+            data_dir = Path.home() / ".shamollama"
+            data_dir.mkdir(exist_ok=True)
+            cache_file = data_dir / "model_metadata.json"
+        self.cache_file = Path(cache_file)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}  # digest -> metadata
+        self._digests: Dict[str, str] = {}  # model name -> digest
+        self._sync_thread: Optional[threading.Thread] = None
+        self._pending_sync: Optional[Tuple] = None  # Arguments of the next sync
+        self.load()
+
+    def load(self):
+        """Load cached metadata from disk"""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._entries = data.get("entries", {})
+                self._digests = data.get("digests", {})
+        except Exception as e:
+            logging.debug(f"Failed to load model metadata cache: {e}")
+            self._entries = {}
+            self._digests = {}
+
+    def save(self):
+        """Persist cached metadata to disk"""
+        with self._lock:
+            data = {"entries": dict(self._entries), "digests": dict(self._digests)}
+        try:
+            temp_file = self.cache_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            temp_file.replace(self.cache_file)
+        except Exception as e:
+            logging.debug(f"Failed to save model metadata cache: {e}")
+
+    def get(self, model_name: str) -> Optional[Dict]:
+        """Get cached metadata for a model name, or None if not fetched yet"""
+        with self._lock:
+            digest = self._digests.get(model_name)
+            entry = self._entries.get(digest) if digest else None
+            return dict(entry) if entry else None
+
+    def merged(self, model: Dict) -> Dict:
+        """Merge an /api/tags entry with its cached metadata"""
+        details = dict(model)
+        metadata = self.get(model.get("name", ""))
+        if metadata:
+            details.update(metadata)
+        return details
+
+    def stale_models(self, models: List[Dict]) -> List[Dict]:
+        """Return the models whose digest has no cached metadata"""
+        with self._lock:
+            return [
+                model
+                for model in models
+                if model.get("digest") and model["digest"] not in self._entries
+            ]
+
+    def sync(
+        self,
+        models: List[Dict],
+        fetch: Callable[[str], Optional[Dict]],
+        on_update: Optional[Callable[[str], None]] = None,
+    ) -> int:
+        """Fetch metadata for new or changed digests; returns fetch count
+
+        Entries no model refers to are dropped, except when models is empty:
+        that is what a failed /api/tags request looks like too, and clearing
+        the cache then would force every entry to be fetched again.
+        """
+        with self._lock:
+            self._digests = {
+                model["name"]: model["digest"]
+                for model in models
+                if model.get("name") and model.get("digest")
+            }
+            live_digests = set(self._digests.values())
+            if live_digests:
+                for digest in list(self._entries):
+                    if digest not in live_digests:
+                        del self._entries[digest]
+
+        fetched = 0
+        for model in self.stale_models(models):
+            try:
+                data = fetch(model["name"])
+            except Exception as e:
+                logging.debug(f"Metadata fetch failed for {model['name']}: {e}")
+                continue
+            if not data:
+                continue
+
+            with self._lock:
+                self._entries[model["digest"]] = self.parse_show_response(data)
+            fetched += 1
+            if on_update:
+                on_update(model["name"])
+
+        self.save()
+        return fetched
+
+    def sync_async(
+        self,
+        models: List[Dict],
+        fetch: Callable[[str], Optional[Dict]],
+        on_update: Optional[Callable[[str], None]] = None,
+    ):
+        """Run sync on a background thread
+
+        Calls made while a sync is in flight are coalesced; the most recent
+        model list is synced again once it finishes.
+        """
+        with self._lock:
+            busy = self._sync_thread is not None
+        if not busy and not self.stale_models(models) and self._names_match(models):
+            return
+
+        with self._lock:
+            self._pending_sync = (list(models), fetch, on_update)
+            if self._sync_thread is None:
+                self._sync_thread = threading.Thread(target=self._drain, daemon=True)
+                self._sync_thread.start()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                pending, self._pending_sync = self._pending_sync, None
+                if pending is None:
+                    self._sync_thread = None
+                    return
+            try:
+                self.sync(*pending)
+            except Exception as e:
+                logging.debug(f"Model metadata sync failed: {e}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until background syncing finishes"""
+        thread = self._sync_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _names_match(self, models: List[Dict]) -> bool:
+        """Check whether the name -> digest mapping is already current"""
+        with self._lock:
+            return self._digests == {
+                model["name"]: model["digest"]
+                for model in models
+                if model.get("name") and model.get("digest")
+            }
+
+    @classmethod
+    def parse_show_response(cls, data: Dict) -> Dict:
+        """Extract the fields we care about from an /api/show response"""
+        details = data.get("details") or {}
+        model_info = data.get("model_info") or {}
+        architecture = model_info.get("general.architecture", "")
+
+        metadata = {
+            "parameter_size": details.get("parameter_size", ""),
+            "parameter_count": model_info.get("general.parameter_count", 0),
+            "quantization": details.get("quantization_level", ""),
+            "family": details.get("family", ""),
+            "families": details.get("families") or [],
+            "format": details.get("format", ""),
+            "parent_model": details.get("parent_model", ""),
+            "architecture": architecture,
+            "context_length": 0,
+            "template": data.get("template", ""),
+            "license": data.get("license", ""),
+        }
+
+        if architecture:
+            for key, field in cls.ARCHITECTURE_KEYS.items():
+                value = model_info.get(f"{architecture}.{key}")
+                if value is not None:
+                    metadata[field] = value
+
+        return metadata
+
+
+def license_summary(license_text: str) -> str:
+    """Return the first meaningful line of a license text"""
+    for line in (license_text or "").splitlines():
+        line = line.strip()
+        if line:
+            return line[:80]
+    return "N/A"
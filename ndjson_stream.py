@@ -0,0 +1,128 @@
+"""
+Streaming NDJSON reader for ShamaOllama
+Ollama streams chat and pull progress as newline-delimited JSON. This
+reader consumes large raw chunks, splits lines in place (carrying partial
+lines over in one reusable buffer) and decodes the common chat token shape
+without building a dict per token.
+"""
+
+import json
+from json.decoder import scanstring
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# Large reads mean far fewer Python-level iterations than iter_lines()
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# The shape of an in-progress chat token line, as emitted by Ollama:
+# {"model":"...","created_at":"...","message":{"role":"assistant","content":"..."},"done":false}
+_CONTENT_PREFIX = b'"message":{"role":"assistant","content":"'
+_CONTENT_SUFFIX = b'"},"done":false}'
+_PREFIX_LENGTH = len(_CONTENT_PREFIX)
+_SUFFIX_LENGTH = len(_CONTENT_SUFFIX)
+
+
+class NDJSONStreamReader:
+    """Incremental NDJSON reader over an iterable of byte chunks"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = chunks
+        self.buffer = bytearray()
+        self.lines_read = 0
+        self.fast_path_hits = 0
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Yield complete, non-empty lines from the chunk stream"""
+        buffer = self.buffer
+        for chunk in self.chunks:
+            if not chunk:
+                continue
+            if buffer:
+                # Complete the partial line carried over from the last chunk
+                buffer += chunk
+                chunk = bytes(buffer)
+                buffer.clear()
+
+            start = 0
+            find = chunk.find
+            while True:
+                newline = find(b"\n", start)
+                if newline < 0:
+                    break
+                if newline > start:
+                    self.lines_read += 1
+                    yield chunk[start:newline]
+                start = newline + 1
+
+            if start < len(chunk):
+                buffer += chunk[start:]
+
+        # A final line without a trailing newline
+        if buffer.strip():
+            self.lines_read += 1
+            yield bytes(buffer)
+        buffer.clear()
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Yield every line parsed as a JSON object"""
+        for line in self.iter_lines():
+            yield json.loads(line)
+
+    def iter_chat(self) -> Iterator[Tuple[Optional[str], Optional[Dict]]]:
+        """Yield (content, data) for each chat stream line
+
+        For plain in-progress tokens the content is decoded directly from the
+        line and data is None. Any other line (the final "done" line, tool
+        calls, errors) is fully parsed and returned as data.
+        """
+        loads = json.loads
+        for line in self.iter_lines():
+            # Inlined fast path: this loop runs once per generated token
+            if line.endswith(_CONTENT_SUFFIX):
+                prefix = line.find(_CONTENT_PREFIX)
+                if prefix >= 0:
+                    raw = line[prefix + _PREFIX_LENGTH : -_SUFFIX_LENGTH]
+                    if b"\\" not in raw:
+                        if b'"' not in raw:
+                            self.fast_path_hits += 1
+                            yield raw.decode("utf-8"), None
+                            continue
+                    else:
+                        content = _unescape(raw)
+                        if content is not None:
+                            self.fast_path_hits += 1
+                            yield content, None
+                            continue
+
+            data = loads(line)
+            message = data.get("message")
+            yield (message.get("content") if message else None), data
+
+
+def parse_chat_token(line: bytes) -> Optional[str]:
+    """Decode the content of an in-progress chat token line, or None"""
+    if not line.endswith(_CONTENT_SUFFIX):
+        return None
+
+    prefix = line.find(_CONTENT_PREFIX)
+    if prefix < 0:
+        return None
+
+    raw = line[prefix + _PREFIX_LENGTH : -_SUFFIX_LENGTH]
+    if b"\\" not in raw:
+        # A bare quote means more keys follow "content"; not our shape
+        if b'"' in raw:
+            return None
+        return raw.decode("utf-8")
+
+    return _unescape(raw)
+
+
+def _unescape(raw: bytes) -> Optional[str]:
+    """Decode a JSON string body that contains escapes, or None if invalid"""
+    text = raw.decode("utf-8")
+    try:
+        content, end = scanstring(text + '"', 0)
+    except ValueError:
+        return None
+    # Stopping early means an unescaped quote, i.e. more keys follow
+    return content if end == len(text) + 1 else None
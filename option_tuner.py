@@ -0,0 +1,167 @@
+"""
+Generation option auto-tuner for ShamaOllama
+Sweeps the Ollama options that decide how fast a model runs on this machine
+(GPU layers, CPU threads, batch size) with a short benchmark prompt, one
+option at a time, and keeps the combination with the highest tokens/s.
+Layer counts that the memory-fit estimate says will not fit in VRAM and
+RAM at the preset's context size are never tried, and a run that fails
+(Ollama reports out of memory) counts as not fitting.
+"""
+
+import logging
+import os
+import statistics
+from typing import Callable, Dict, List, Optional
+
+from gpu_info import PSUTIL_AVAILABLE, psutil
+from memory_fit import DEFAULT_NUM_CTX, GPU_RESERVE_MB, RAM_RESERVE_GB, estimate_fit
+
+# Options swept, in order; each keeps the best value found before it
+TUNED_OPTIONS = ("num_gpu", "num_thread", "num_batch")
+
+BATCH_CHOICES = [128, 256, 512, 1024]
+
+BENCH_PROMPT = "Explain in a few sentences how a bicycle gear system works."
+
+# Tokens generated per benchmark run
+BENCH_TOKENS = 64
+
+# A change must beat the best rate by this much to be kept over noise
+MIN_GAIN = 0.03
+
+
+def thread_choices(cpu_count: Optional[int] = None) -> List[int]:
+    """Thread counts worth trying: physical cores, half of them, all logical"""
+    logical = cpu_count or os.cpu_count() or 4
+    physical = logical
+    if cpu_count is None and PSUTIL_AVAILABLE:
+        physical = psutil.cpu_count(logical=False) or logical
+    return sorted({max(1, physical // 2), physical, logical})
+
+
+def gpu_layer_choices(model: Dict, vram_mb: float) -> List[int]:
+    """GPU layer counts worth trying, from all layers down to CPU only"""
+    layers = model.get("block_count") or 0
+    if not vram_mb or not layers:
+        return [0]
+    return sorted({layers, layers * 3 // 4, layers // 2, layers // 4, 0}, reverse=True)
+
+
+class OptionTuner:
+    """Finds the fastest option preset for one model on this machine
+
+    model is the /api/tags entry merged with its cached /api/show metadata.
+    """
+
+    def __init__(
+        self,
+        api,
+        model: Dict,
+        vram_mb: float,
+        ram_gb: float,
+        base_options: Optional[Dict] = None,
+        repeats: int = 2,
+        cpu_count: Optional[int] = None,
+    ):
+        self.api = api
+        self.model = model
+        self.vram_mb = vram_mb
+        self.ram_gb = ram_gb
+        self.base_options = dict(base_options or {})
+        self.repeats = repeats
+        self.cpu_count = cpu_count
+        self.trials: List[Dict] = []
+
+    def choices(self, name: str) -> List[int]:
+        """Values tried for one option"""
+        if name == "num_gpu":
+            return gpu_layer_choices(self.model, self.vram_mb)
+        if name == "num_thread":
+            return thread_choices(self.cpu_count)
+        return list(BATCH_CHOICES)
+
+    def fits(self, options: Dict) -> bool:
+        """Whether the estimated memory use of options fits this machine"""
+        num_ctx = options.get("num_ctx", DEFAULT_NUM_CTX)
+        estimate = estimate_fit(self.model, self.vram_mb, self.ram_gb, num_ctx)
+        if estimate["placement"] == "no_fit":
+            return False
+        layers = self.model.get("block_count")
+        if "num_gpu" not in options or not layers:
+            return True
+        # Layers are offloaded whole, together with their share of the KV cache
+        gpu_share = min(max(options["num_gpu"], 0), layers) / layers
+        usable_vram = max(self.vram_mb - GPU_RESERVE_MB, 0)
+        usable_ram = max(self.ram_gb - RAM_RESERVE_GB, 0) * 1024
+        return (
+            estimate["total_mb"] * gpu_share <= usable_vram
+            and estimate["total_mb"] * (1 - gpu_share) <= usable_ram
+        )
+
+    def measure(self, options: Dict) -> Optional[float]:
+        """Median tokens/s of the benchmark prompt, or None if it failed"""
+        messages = [{"role": "user", "content": BENCH_PROMPT}]
+        options = dict(options, num_predict=BENCH_TOKENS)
+        rates = []
+        for _ in range(self.repeats):
+            metrics: Dict = {}
+            try:
+                self.api.chat(
+                    self.model["name"],
+                    messages,
+                    metrics_callback=metrics.update,
+                    use_cache=False,
+                    # Exactly the options tune() returns, not the saved preset
+                    options=options,
+                    use_preset=False,
+                )
+            except Exception as e:
+                logging.debug(f"Tuning run with {options} failed: {e}")
+                return None
+            if not metrics.get("tokens_per_second"):
+                return None
+            rates.append(metrics["tokens_per_second"])
+        return statistics.median(rates)
+
+    def tune(self, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Sweep the options; returns the best preset and every trial
+
+        progress is called with each finished trial. Raises RuntimeError if
+        the model cannot run even with the base options.
+        """
+        best_options = dict(self.base_options)
+        best_rate = self.measure(best_options)
+        self._record(best_options, best_rate, progress)
+        if best_rate is None:
+            raise RuntimeError(f"{self.model['name']} did not run with its preset")
+
+        for name in TUNED_OPTIONS:
+            for value in self.choices(name):
+                if best_options.get(name) == value:
+                    continue
+                options = dict(best_options, **{name: value})
+                if not self.fits(options):
+                    self._record(options, None, progress, skipped=True)
+                    continue
+                rate = self.measure(options)
+                self._record(options, rate, progress)
+                if rate is not None and rate > best_rate * (1 + MIN_GAIN):
+                    best_options, best_rate = options, rate
+
+        return {
+            "options": best_options,
+            "tokens_per_second": best_rate,
+            "trials": self.trials,
+        }
+
+    def _record(
+        self,
+        options: Dict,
+        rate: Optional[float],
+        progress: Optional[Callable[[Dict], None]],
+        skipped: bool = False,
+    ):
+        trial = {"options": options, "tokens_per_second": rate, "skipped": skipped}
+        self.trials.append(trial)
+        if progress:
+            progress(trial)
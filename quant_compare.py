@@ -0,0 +1,255 @@
+"""
+Quantization variant comparison for ShamaOllama
+Runs the same prompt set against every quantization tag of a model
+(llama3.1:8b-instruct-q4_K_M, ...-q5_K_M, ...-q8_0, ...) and measures size on
+disk, cold load time, time to first token, generation speed and the memory
+Ollama reports for the loaded model, so the fastest variant that fits can be
+picked. Each variant is unloaded before it runs, so loads are cold and the
+memory reading is its own.
+"""
+
+import logging
+import re
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from memory_fit import GPU_RESERVE_MB, RAM_RESERVE_GB, format_size
+
+# Quantization suffix of a tag, e.g. "8b-instruct-q4_K_M" -> "q4_K_M"
+QUANT_TAG = re.compile(
+    r"(?:^|[-_.])((?:i?q\d+(?:_[a-z0-9]+)*)|fp16|f16|bf16|fp32|f32)$", re.I
+)
+
+DEFAULT_QUANTS = ["q4_K_M", "q5_K_M", "q8_0"]
+
+DEFAULT_PROMPTS = [
+    "Summarize the plot of Romeo and Juliet in three sentences.",
+    "Write a Python function that checks whether a string is a palindrome.",
+    "List five practical tips for reducing home energy use.",
+]
+
+# Tokens generated per prompt; enough for a stable rate, short enough to wait
+COMPARE_TOKENS = 128
+
+MB = 1024 * 1024
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    """Model name as (base, tag); the tag defaults to "latest" """
+    base, _, tag = name.partition(":")
+    return base, tag or "latest"
+
+
+def quantization_of(name: str) -> str:
+    """Quantization named by a model's tag, or "" """
+    match = QUANT_TAG.search(split_name(name)[1])
+    return match.group(1) if match else ""
+
+
+def size_prefix(tag: str) -> str:
+    """Tag without its quantization, e.g. "8b-instruct-q4_K_M" -> "8b-instruct" """
+    match = QUANT_TAG.search(tag)
+    return tag[: match.start(1)].rstrip("-_.") if match else tag
+
+
+def related_models(models: List[Dict], base: str) -> List[Dict]:
+    """Installed models sharing a base name, e.g. every llama3.2:* tag"""
+    base = split_name(base)[0]
+    return [m for m in models if split_name(m["name"])[0] == base]
+
+
+def variant_names(
+    name: str, quants: List[str], models: Optional[List[Dict]] = None
+) -> List[str]:
+    """Tags to compare: name with each quantization, plus installed variants
+
+    "llama3.1:8b-instruct" with ["q4_K_M", "q8_0"] gives
+    "llama3.1:8b-instruct-q4_K_M" and "llama3.1:8b-instruct-q8_0". Installed
+    quantizations with the same size prefix are added. Raises ValueError
+    without a size tag, since "llama3.1" alone would mix 8b and 70b.
+    """
+    base, tag = split_name(name)
+    if ":" not in name or tag == "latest":
+        raise ValueError(
+            f"Give a size tag such as {base}:8b-instruct, so only "
+            "quantizations of one model size are compared"
+        )
+    prefix = size_prefix(tag)
+    names = []
+    for suffix in quants:
+        suffix = suffix.strip()
+        if suffix:
+            names.append(f"{base}:{prefix}-{suffix}" if prefix else f"{base}:{suffix}")
+    for model in related_models(models or [], base):
+        model_tag = split_name(model["name"])[1]
+        if quantization_of(model["name"]) and size_prefix(model_tag) == prefix:
+            names.append(model["name"])
+    return list(dict.fromkeys(names))
+
+
+class QuantComparison:
+    """Benchmarks a set of model variants with the same prompts"""
+
+    def __init__(
+        self,
+        api,
+        variants: List[str],
+        prompts: Optional[List[str]] = None,
+        num_predict: int = COMPARE_TOKENS,
+    ):
+        self.api = api
+        self.variants = variants
+        self.prompts = prompts or list(DEFAULT_PROMPTS)
+        self.num_predict = num_predict
+
+    def pull_missing(
+        self,
+        installed: List[str],
+        progress: Optional[Callable[[str, Dict], None]] = None,
+    ) -> List[str]:
+        """Pull variants that are not installed; returns those that failed"""
+        failed = []
+        for name in self.variants:
+            if name in installed:
+                continue
+            callback = (lambda data, n=name: progress(n, data)) if progress else None
+            if not self.api.pull_model(name, callback):
+                failed.append(name)
+        return failed
+
+    def measure(self, name: str, size: int = 0) -> Dict:
+        """Run the prompt set against one variant"""
+        result = {
+            "name": name,
+            "quantization": quantization_of(name),
+            "size": size,
+            "load_seconds": None,
+            "ttft_seconds": None,
+            "tokens_per_second": None,
+            "memory": None,
+            "memory_vram": None,
+            "error": None,
+        }
+        self.api.unload_model(name)
+        ttfts, eval_count, eval_duration = [], 0, 0
+        try:
+            for i, prompt in enumerate(self.prompts):
+                metrics: Dict = {}
+                first_chunk: List[float] = []
+
+                def on_chunk(chunk, first_chunk=first_chunk):
+                    if not first_chunk:
+                        first_chunk.append(time.perf_counter())
+
+                started = time.perf_counter()
+                self.api.chat(
+                    name,
+                    [{"role": "user", "content": prompt}],
+                    on_chunk,
+                    metrics_callback=metrics.update,
+                    use_cache=False,
+                    options={"num_predict": self.num_predict},
+                )
+                if not metrics:
+                    raise RuntimeError("no response")
+                load = metrics.get("load_duration", 0) / 1e9
+                if i == 0:
+                    result["load_seconds"] = load
+                if first_chunk:
+                    # Time to first token after the model is in memory
+                    ttfts.append(max(first_chunk[0] - started - load, 0.0))
+                eval_count += metrics.get("eval_count", 0)
+                eval_duration += metrics.get("eval_duration", 0)
+                self._read_memory(name, result)
+        except Exception as e:
+            logging.debug(f"Comparison run of {name} failed: {e}")
+            result["error"] = str(e)
+        finally:
+            self.api.unload_model(name)
+
+        if ttfts:
+            result["ttft_seconds"] = statistics.median(ttfts)
+        if eval_count and eval_duration:
+            result["tokens_per_second"] = eval_count / (eval_duration / 1e9)
+        return result
+
+    def _read_memory(self, name: str, result: Dict):
+        """Keep the largest footprint /api/ps reports for the variant"""
+        for model in self.api.running_models():
+            if model.get("name") == name and (model.get("size") or 0) > (
+                result["memory"] or 0
+            ):
+                result["memory"] = model.get("size")
+                result["memory_vram"] = model.get("size_vram")
+
+    def run(
+        self,
+        models: List[Dict],
+        progress: Optional[Callable[[Dict], None]] = None,
+    ) -> List[Dict]:
+        """Measure every installed variant; progress gets each result"""
+        sizes = {m["name"]: m.get("size", 0) for m in models}
+        results = []
+        for name in self.variants:
+            if name not in sizes:
+                continue
+            result = self.measure(name, sizes[name])
+            results.append(result)
+            if progress:
+                progress(result)
+        return results
+
+
+def memory_budget_mb(vram_mb: float, ram_gb: float) -> float:
+    """Memory a variant may use: usable VRAM, or usable RAM without a GPU"""
+    if vram_mb:
+        return max(vram_mb - GPU_RESERVE_MB, 0)
+    return max(ram_gb - RAM_RESERVE_GB, 0) * 1024
+
+
+def recommend(results: List[Dict], memory_budget_mb: float = 0) -> Optional[Dict]:
+    """Fastest variant that ran and, given a budget, fits in it"""
+    candidates = [
+        r
+        for r in results
+        if r["tokens_per_second"]
+        and not r["error"]
+        and (
+            not memory_budget_mb or (r["memory"] or r["size"]) / MB <= memory_budget_mb
+        )
+    ]
+    return max(candidates, key=lambda r: r["tokens_per_second"], default=None)
+
+
+def format_table(results: List[Dict], best: Optional[Dict] = None) -> str:
+    """Plain-text comparison table, best variant marked with a star"""
+
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.2f}s" if value is not None else "-"
+
+    rows = [("", "Variant", "Size", "Load", "TTFT", "Tok/s", "Memory (VRAM)")]
+    for r in results:
+        memory = "-"
+        if r["memory"]:
+            memory = format_size(r["memory"] / MB)
+            if r["memory_vram"] is not None:
+                memory += f" ({r['memory_vram'] / r['memory']:.0%})"
+        rate = r["tokens_per_second"]
+        rows.append(
+            (
+                "*" if best is not None and r["name"] == best["name"] else "",
+                r["name"],
+                format_size(r["size"] / MB) if r["size"] else "-",
+                seconds(r["load_seconds"]),
+                seconds(r["ttft_seconds"]),
+                f"{rate:.1f}" if rate else "failed" if r["error"] else "-",
+                memory,
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = [
+        "  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip() for row in rows
+    ]
+    lines.insert(1, "-" * len(lines[0]))
+    return "\n".join(lines)
@@ -0,0 +1,188 @@
+"""
+Response cache for ShamaOllama
+Repeated requests (benchmarks, batch jobs, asking the same question again
+at temperature 0) can be answered without running the model. Responses are
+keyed on a hash of the model digest, the full messages array and the
+generation options, so a re-pulled model or any change to the conversation
+misses. A small in-memory LRU sits in front of a disk tier of one JSON file
+per response, evicted least recently used first once it outgrows its byte
+budget.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Responses kept in memory
+MEMORY_ENTRIES = 128
+
+CACHE_VERSION = 1
+
+
+def cache_key(
+    model_digest: str, messages: List[Dict], options: Optional[Dict] = None
+) -> str:
+    """Stable hash of everything that determines a response"""
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "digest": model_digest,
+            "messages": messages,
+            "options": options or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU, size-bounded disk) store of chat responses
+
+    A response is a dict with the reply "content" and the turn "metrics".
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        memory_entries: int = MEMORY_ENTRIES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._disk: Optional["OrderedDict[str, int]"] = None  # key -> bytes
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _disk_index(self) -> "OrderedDict[str, int]":
+        """Cached responses on disk, least recently used first"""
+        if self._disk is None:
+            entries = []
+            try:
+                with os.scandir(self.cache_dir) as scan:
+                    for entry in scan:
+                        if entry.name.endswith(".json"):
+                            stat = entry.stat()
+                            entries.append(
+                                (stat.st_mtime, entry.name[:-5], stat.st_size)
+                            )
+            except FileNotFoundError:
+                pass
+            entries.sort()
+            self._disk = OrderedDict((key, size) for _, key, size in entries)
+            self._disk_bytes = sum(self._disk.values())
+        return self._disk
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached response for key, or None; counts a hit or a miss"""
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return response
+
+            disk = self._disk_index()
+            if key in disk:
+                try:
+                    with open(self._path(key), "r", encoding="utf-8") as f:
+                        response = json.load(f)
+                    # The file's mtime is its place in the disk LRU
+                    os.utime(self._path(key))
+                    disk.move_to_end(key)
+                    self._remember(key, response)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return response
+                except (OSError, ValueError) as e:
+                    logging.debug(f"Dropping unreadable cached response: {e}")
+                    self._forget_disk(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """Store a response in both tiers"""
+        with self._lock:
+            self._remember(key, response)
+            if self.max_disk_bytes <= 0:
+                return
+            data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+            if len(data) > self.max_disk_bytes:
+                return
+            disk = self._disk_index()
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                temp_file = self._path(key).with_suffix(".tmp")
+                temp_file.write_bytes(data)
+                temp_file.replace(self._path(key))
+            except OSError as e:
+                logging.warning(f"Failed to cache response: {e}")
+                return
+            self._disk_bytes += len(data) - disk.pop(key, 0)
+            disk[key] = len(data)
+            while self._disk_bytes > self.max_disk_bytes and disk:
+                self._forget_disk(next(iter(disk)))
+
+    def _remember(self, key: str, response: Dict):
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _forget_disk(self, key: str):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def set_max_disk_bytes(self, max_disk_bytes: int):
+        """Change the disk budget, evicting at once if it shrank"""
+        with self._lock:
+            self.max_disk_bytes = max_disk_bytes
+            disk = self._disk_index()
+            while self._disk_bytes > max(0, max_disk_bytes) and disk:
+                self._forget_disk(next(iter(disk)))
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk_index()):
+                self._forget_disk(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counts since start, and the disk tier size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk or ()),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def summary(self) -> str:
+        """Short status bar text"""
+        stats = self.stats()
+        return (
+            f"cache {stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%})"
+        )
@@ -11,11 +11,16 @@ import re
 import os
 import urllib.parse
 from pathlib import Path
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Optional
 import hashlib
 import secrets
 import logging
 import json
+import atexit
+from functools import lru_cache
+
+from async_logging import attach_queued_file_logging
+from security_log import JSONLineFormatter
 
 
 class SecurityValidator:
@@ -30,6 +35,18 @@ class SecurityValidator:
     MAX_URL_LENGTH = 2000
     MAX_FILENAME_LENGTH = 255
 
+    # Largest JSON request body sent to Ollama; a 128K-token context is
+    # roughly 512 KB of text. Override per deployment with the environment
+    # variable below.
+    MAX_REQUEST_BYTES = 2 * 1024 * 1024
+    MAX_REQUEST_BYTES_ENV = "SHAMOLLAMA_MAX_REQUEST_BYTES"
+
+    # Security log rotation and in-memory buffering
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUP_COUNT = 3
+    LOG_ROTATE_WHEN = None  # e.g. "midnight" for daily instead of size rotation
+    LOG_QUEUE_SIZE = 1000
+
     # Dangerous patterns to detect
     DANGEROUS_PATTERNS = [
         r"<script[^>]*>.*?</script>",  # Script tags
@@ -42,40 +59,91 @@ class SecurityValidator:
         r"<object[^>]*>.*?</object>",  # Object injection
     ]
 
+    # Patterns compiled once; every dangerous pattern in a single matcher.
+    # It is applied to lowercased text: a case-sensitive alternation lets the
+    # regex engine skip ahead on the first characters, IGNORECASE does not.
+    DANGEROUS_MATCHER = re.compile(
+        "|".join(f"(?:{pattern})" for pattern in DANGEROUS_PATTERNS)
+    )
+    MODEL_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9._:-]+$")
+    DOMAIN_PATTERN = re.compile(
+        r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)*[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?$"
+    )
+
+    # Hosts always allowed: local Ollama and our project links
+    LOCAL_HOSTS = frozenset(["localhost", "127.0.0.1", "::1"])
+    GITHUB_DOMAINS = (
+        "github.com",
+        "www.github.com",
+        "github.io",
+        "githubusercontent.com",
+    )
+
+    # Results for repeated inputs are memoized; long texts are not kept
+    VALIDATION_CACHE_SIZE = 1024
+    MAX_MEMOIZED_LENGTH = 2048
+
     def __init__(self):
         """Initialize security validator"""
+        self._dangerous_memo = lru_cache(self.VALIDATION_CACHE_SIZE)(
+            self._search_dangerous
+        )
+        self._model_name_memo = lru_cache(self.VALIDATION_CACHE_SIZE)(
+            self._match_model_name
+        )
+        self._domain_memo = lru_cache(self.VALIDATION_CACHE_SIZE)(self._match_domain)
+        self.max_request_bytes = self.configured_request_limit()
+        self.log_listener = None
         self.setup_logging()
+        # Daemon listener thread: write out buffered events at exit
+        atexit.register(self.stop_logging)
         self.session_token = self.generate_session_token()
 
     def setup_logging(self):
-        """Setup security logging"""
+        """Setup security logging through a queue and background writer"""
         log_dir = Path.home() / ".shamollama" / "logs"
         log_dir.mkdir(parents=True, exist_ok=True)
 
         self.logger = logging.getLogger("ShamaOllama.Security")
 
         # Remove existing handlers to avoid duplicates
+        self.stop_logging()
+
+        # One JSON object per line, read back by security_log.SecurityLogReader
+        formatter = JSONLineFormatter()
+        self.log_listener = attach_queued_file_logging(
+            self.logger,
+            log_dir / "security.log",
+            formatter,
+            queue_size=self.LOG_QUEUE_SIZE,
+            max_bytes=self.LOG_MAX_BYTES,
+            backup_count=self.LOG_BACKUP_COUNT,
+            when=self.LOG_ROTATE_WHEN,
+        )
+        self.logger.setLevel(logging.INFO)
+
+    def flush_logs(self, timeout: float = 5.0) -> bool:
+        """Wait for queued security events to reach the log file"""
+        if self.log_listener is None:
+            return True
+        return self.log_listener.flush(timeout)
+
+    def stop_logging(self):
+        """Write out queued events and detach the log handlers"""
+        if self.log_listener is not None:
+            self.log_listener.stop()
+            self.log_listener = None
         for handler in self.logger.handlers[:]:
             handler.close()
             self.logger.removeHandler(handler)
 
-        handler = logging.FileHandler(log_dir / "security.log")
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(logging.INFO)
-
     def clear_logs(self) -> bool:
         """Clear security logs safely"""
         try:
             log_file = Path.home() / ".shamollama" / "logs" / "security.log"
 
-            # Step 1: Close all handlers for this logger
-            for handler in self.logger.handlers[:]:
-                handler.close()
-                self.logger.removeHandler(handler)
+            # Step 1: Drain the queue and close all handlers for this logger
+            self.stop_logging()
 
             # Step 2: Close all handlers for the root logger that might have this file
             root_logger = logging.getLogger()
@@ -121,6 +189,13 @@ class SecurityValidator:
                                     f.write("")
                                 # File exists but is now empty
 
+            # Rotated backups (security.log.1, security.log.2025-07-28, ...)
+            for backup in log_file.parent.glob("security.log.*"):
+                try:
+                    backup.unlink()
+                except OSError:
+                    pass
+
             # Step 5: Recreate the logging setup
             self.setup_logging()
 
@@ -180,31 +255,22 @@ class SecurityValidator:
         """Validate domain name"""
         if not domain:
             return False
+        return self._domain_memo(domain)
 
+    def _match_domain(self, domain: str) -> bool:
         # Split domain and port
         host = domain.split(":")[0] if ":" in domain else domain
 
         # Allow localhost for Ollama
-        if host in ["localhost", "127.0.0.1", "::1"]:
+        if host in self.LOCAL_HOSTS:
             return True
 
         # Allow github.com for our project links
-        github_domains = [
-            "github.com",
-            "www.github.com",
-            "github.io",
-            "githubusercontent.com",
-        ]
-
-        if any(host.endswith(allowed) for allowed in github_domains):
+        if host.endswith(self.GITHUB_DOMAINS):
             return True
 
         # Basic domain validation
-        domain_pattern = re.compile(
-            r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)*[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?$"
-        )
-
-        return bool(domain_pattern.match(host))
+        return bool(self.DOMAIN_PATTERN.match(host))
 
     def validate_message_input(self, message: str) -> bool:
         """Validate user message input - simplified for chat usage"""
@@ -232,9 +298,7 @@ class SecurityValidator:
             if not model_name or len(model_name) > self.MAX_MODEL_NAME_LENGTH:
                 return False
 
-            # Allow alphanumeric, hyphens, underscores, colons, and dots
-            pattern = re.compile(r"^[a-zA-Z0-9._:-]+$")
-            return bool(pattern.match(model_name))
+            return self._model_name_memo(model_name)
 
         except Exception as e:
             self.logger.error(f"Model name validation error: {e}")
@@ -275,15 +339,24 @@ class SecurityValidator:
             self.logger.error(f"File path validation error: {e}")
             return False
 
+    def _match_model_name(self, model_name: str) -> bool:
+        # Allow alphanumeric, hyphens, underscores, colons, and dots
+        return bool(self.MODEL_NAME_PATTERN.match(model_name))
+
     def contains_dangerous_patterns(self, text: str) -> bool:
         """Check if text contains dangerous patterns"""
-        text_lower = text.lower()
+        if len(text) > self.MAX_MEMOIZED_LENGTH:
+            return self._search_dangerous(text)
+        return self._dangerous_memo(text)
 
-        for pattern in self.DANGEROUS_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                return True
+    def _search_dangerous(self, text: str) -> bool:
+        return self.DANGEROUS_MATCHER.search(text.lower()) is not None
 
-        return False
+    def clear_validation_cache(self):
+        """Forget memoized validation results"""
+        self._dangerous_memo.cache_clear()
+        self._model_name_memo.cache_clear()
+        self._domain_memo.cache_clear()
 
     def sanitize_input(self, text: str) -> str:
         """Sanitize user input"""
@@ -299,24 +372,51 @@ class SecurityValidator:
 
         return text
 
+    def configured_request_limit(self) -> int:
+        """Request size limit, from the environment when set"""
+        value = os.environ.get(self.MAX_REQUEST_BYTES_ENV)
+        if value:
+            try:
+                limit = int(value)
+                if limit > 0:
+                    return limit
+            except ValueError:
+                pass
+            logging.warning(f"Ignoring invalid {self.MAX_REQUEST_BYTES_ENV}={value!r}")
+        return self.MAX_REQUEST_BYTES
+
+    @staticmethod
+    def encode_json(data: Any) -> bytes:
+        """Serialize a request body once; the bytes are both measured and sent"""
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def validate_json_size(self, body: bytes, limit: Optional[int] = None) -> bool:
+        """Check an encoded JSON body against the request size limit"""
+        limit = self.max_request_bytes if limit is None else limit
+        if len(body) > limit:
+            self.logger.warning(
+                f"JSON validation failed: {len(body)} bytes exceeds {limit}"
+            )
+            return False
+        return True
+
     def validate_json_data(self, data: Any) -> bool:
         """Validate JSON data structure"""
         try:
             # Ensure it's not too large when serialized
-            json_str = json.dumps(data)
-            if len(json_str) > 100000:  # 100KB limit
-                self.logger.warning("JSON validation failed: Too large")
-                return False
-
-            return True
+            return self.validate_json_size(self.encode_json(data))
 
         except Exception as e:
             self.logger.error(f"JSON validation error: {e}")
             return False
 
     def log_security_event(self, event_type: str, details: Dict[str, Any]):
-        """Log security events"""
-        self.logger.info(f"Security Event: {event_type} - {details}")
+        """Log a structured security event"""
+        self.logger.info(
+            event_type, extra={"event_type": event_type, "details": details}
+        )
 
     def create_secure_temp_file(self, suffix: str = ".tmp") -> Path:
         """Create a secure temporary file"""
@@ -0,0 +1,345 @@
+"""
+Structured security event log for ShamaOllama
+Security events are written one JSON object per line. A small sidecar index
+records, for each block of events, its byte range, time range and event type
+counts, so the log viewer can page backwards from the end of the file and
+filter by type or time without reading the whole log.
+"""
+
+import json
+import logging
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Events summarised by one index block
+INDEX_BLOCK_EVENTS = 256
+
+# Bytes of the first line kept to notice rotation or clearing
+HEAD_SIGNATURE_BYTES = 256
+
+INDEX_VERSION = 1
+
+# Time range filters offered by the log viewer, in seconds
+TIME_RANGES = {
+    "All time": None,
+    "Last hour": 3600,
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+}
+
+
+class JSONLineFormatter(logging.Formatter):
+    """Formats log records as single-line JSON events"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": round(record.created, 6),
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="seconds"
+            ),
+            "level": record.levelname,
+            "type": getattr(record, "event_type", None) or "log",
+            "message": record.getMessage(),
+        }
+        details = getattr(record, "details", None)
+        if details is not None:
+            event["details"] = details
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+def parse_event(line: bytes, offset: int) -> Dict:
+    """Decode one log line; text lines from older versions are kept raw"""
+    text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+    try:
+        event = json.loads(text)
+        if not isinstance(event, dict):
+            raise ValueError("not an object")
+    except ValueError:
+        event = {"ts": None, "level": "", "type": "legacy", "message": text}
+    event["offset"] = offset
+    return event
+
+
+# Leading fields in the order JSONLineFormatter writes them; lets indexing
+# skip a full JSON decode of every line
+INDEX_FIELDS_PATTERN = re.compile(
+    rb'^\{"ts": ([0-9.eE+-]+), "time": "[^"]*", "level": "[^"]*", '
+    rb'"type": "((?:[^"\\]|\\.)*)"'
+)
+
+
+def index_fields(
+    line: bytes, type_cache: Optional[Dict[bytes, str]] = None
+) -> Tuple[Optional[float], str]:
+    """Timestamp and type of a log line, for indexing
+
+    A handful of event types repeat across the whole log, so their decoded
+    names are memoised in type_cache.
+    """
+    if type_cache is None:
+        type_cache = {}
+    match = INDEX_FIELDS_PATTERN.match(line)
+    if match:
+        raw_type = match.group(2)
+        try:
+            if raw_type not in type_cache:
+                type_cache[raw_type] = json.loads(b'"' + raw_type + b'"')
+            return float(match.group(1)), type_cache[raw_type]
+        except ValueError:
+            pass
+    event = parse_event(line, 0)
+    ts = event.get("ts")
+    return (ts if isinstance(ts, (int, float)) else None), event["type"]
+
+
+def format_event(event: Dict) -> str:
+    """One display line for an event"""
+    if event["type"] == "legacy":
+        return event["message"]
+    time_text = event.get("time", "").replace("T", " ")
+    line = f"{time_text} | {event.get('level', ''):<7} | {event['message']}"
+    if event.get("details") is not None:
+        line += f" | {json.dumps(event['details'], ensure_ascii=False, default=str)}"
+    return line
+
+
+class SecurityLogIndex:
+    """Sidecar index of a JSONL log, extended incrementally as it grows"""
+
+    def __init__(self, log_file: Path, index_file: Optional[Path] = None):
+        self.log_file = Path(log_file)
+        self.index_file = Path(index_file or f"{self.log_file}.idx")
+        self.blocks: List[Dict] = []
+        self.head = ""
+        # Bumped whenever the log was rotated or cleared and indexing restarted
+        self.resets = 0
+        self.load()
+
+    @property
+    def indexed_to(self) -> int:
+        """Byte offset up to which the log has been indexed"""
+        return self.blocks[-1]["end"] if self.blocks else 0
+
+    def load(self):
+        """Load the index from disk"""
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.blocks = data["blocks"]
+                self.head = data["head"]
+        except (OSError, ValueError, KeyError) as e:
+            logging.debug(f"Security log index not loaded: {e}")
+            self.blocks = []
+            self.head = ""
+
+    def save(self):
+        """Persist the index to disk"""
+        data = {"version": INDEX_VERSION, "head": self.head, "blocks": self.blocks}
+        try:
+            temp_file = self.index_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            temp_file.replace(self.index_file)
+        except OSError as e:
+            logging.debug(f"Failed to save security log index: {e}")
+
+    def _read_head(self) -> str:
+        with open(self.log_file, "rb") as f:
+            return f.readline(HEAD_SIGNATURE_BYTES).decode("utf-8", "replace")
+
+    def update(self) -> bool:
+        """Index lines appended since the last update; returns True if changed"""
+        try:
+            size = self.log_file.stat().st_size
+            head = self._read_head() if size else ""
+        except OSError:
+            size, head = 0, ""
+
+        reset = size < self.indexed_to or head != self.head
+        if reset:
+            # Rotated, cleared or replaced: start over
+            self.blocks = []
+            self.head = head
+            self.resets += 1
+        if size == self.indexed_to:
+            if reset:
+                self.save()
+            return reset
+
+        # The last block may be partial; re-scan it so blocks stay full
+        if self.blocks and self.blocks[-1]["count"] < INDEX_BLOCK_EVENTS:
+            self.blocks.pop()
+        start = self.indexed_to
+
+        with open(self.log_file, "rb") as f:
+            f.seek(start)
+            block = None
+            offset = start
+            type_cache: Dict[bytes, str] = {}
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Still being written
+                if block is None:
+                    block = {"start": offset, "count": 0, "types": {}}
+                    block.update(first=None, last=None)
+                ts, event_type = index_fields(line, type_cache)
+                offset += len(line)
+                self._add_to_block(block, ts, event_type, offset)
+                if block["count"] >= INDEX_BLOCK_EVENTS:
+                    self.blocks.append(block)
+                    block = None
+            if block is not None:
+                self.blocks.append(block)
+
+        self.save()
+        return True
+
+    @staticmethod
+    def _add_to_block(block: Dict, ts: Optional[float], event_type: str, end: int):
+        block["end"] = end
+        block["count"] += 1
+        block["types"][event_type] = block["types"].get(event_type, 0) + 1
+        if ts is not None:
+            block["first"] = ts if block["first"] is None else min(block["first"], ts)
+            block["last"] = ts if block["last"] is None else max(block["last"], ts)
+
+    def event_types(self) -> List[str]:
+        """All event types seen in the log"""
+        types = set()
+        for block in self.blocks:
+            types.update(block["types"])
+        return sorted(types)
+
+    def block_matches(
+        self,
+        block: Dict,
+        event_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> bool:
+        """Whether a block can contain events matching the filters"""
+        if event_type and event_type not in block["types"]:
+            return False
+        if since is not None or until is not None:
+            if block["first"] is None:
+                return False
+            if since is not None and block["last"] < since:
+                return False
+            if until is not None and block["first"] > until:
+                return False
+        return True
+
+
+class SecurityLogReader:
+    """Reads pages of events, newest first, using the sidecar index"""
+
+    def __init__(self, log_file: Path, page_size: int = 200):
+        self.log_file = Path(log_file)
+        self.page_size = page_size
+        self.index = SecurityLogIndex(self.log_file)
+        # The viewer pages and tails from different worker threads
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def event_matches(
+        event: Dict,
+        event_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> bool:
+        """Whether an event passes the type and time filters"""
+        if event_type and event["type"] != event_type:
+            return False
+        if since is not None or until is not None:
+            ts = event.get("ts")
+            if not isinstance(ts, (int, float)):
+                return False
+            if since is not None and ts < since:
+                return False
+            if until is not None and ts > until:
+                return False
+        return True
+
+    def _read_range(self, f, start: int, end: int) -> List[Dict]:
+        f.seek(start)
+        data = f.read(end - start)
+        events = []
+        offset = start
+        for line in data.splitlines(keepends=True):
+            events.append(parse_event(line, offset))
+            offset += len(line)
+        return events
+
+    def page(
+        self,
+        before: Optional[int] = None,
+        event_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """Events starting before a byte offset, newest first
+
+        Returns the events and the cursor for the next (older) page, or None
+        when the start of the log was reached.
+        """
+        with self.lock:
+            return self._page(before, event_type, since, until)
+
+    def _page(self, before, event_type, since, until):
+        self.index.update()
+        if before is None:
+            before = self.index.indexed_to
+
+        events: List[Dict] = []
+        try:
+            with open(self.log_file, "rb") as f:
+                for block in reversed(self.index.blocks):
+                    if block["start"] >= before:
+                        continue
+                    if not self.index.block_matches(block, event_type, since, until):
+                        continue
+                    block_events = self._read_range(
+                        f, block["start"], min(block["end"], before)
+                    )
+                    for event in reversed(block_events):
+                        if self.event_matches(event, event_type, since, until):
+                            events.append(event)
+                            if len(events) == self.page_size:
+                                return events, event["offset"]
+        except OSError as e:
+            logging.debug(f"Failed to read security log: {e}")
+        return events, None
+
+    def events_after(
+        self,
+        offset: int,
+        event_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict], int]:
+        """Events appended at or after a byte offset, newest first (for tailing)
+
+        Also returns the offset to pass on the next call.
+        """
+        with self.lock:
+            self.index.update()
+            end = self.index.indexed_to
+            if offset >= end:
+                # A smaller end means the log was rotated or cleared
+                return [], end
+            try:
+                with open(self.log_file, "rb") as f:
+                    events = self._read_range(f, offset, end)
+            except OSError as e:
+                logging.debug(f"Failed to read security log: {e}")
+                return [], offset
+        matching = [
+            event
+            for event in reversed(events)
+            if self.event_matches(event, event_type, since, until)
+        ]
+        return matching, end
@@ -0,0 +1,366 @@
+"""
+Application settings for ShamaOllama
+Loads settings.json from the data directory, validates every value against
+the defaults in config_template.json and exposes the result as an immutable
+snapshot that hot paths can read without locking. A background watcher
+reloads the file when it changes and notifies subscribers so new values can
+be applied while the application is running.
+"""
+
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from security import security
+
+TEMPLATE_FILE = Path(__file__).parent / "config_template.json"
+
+# Nested sections of settings.json; their keys are flattened on the snapshot
+SECTIONS = ("connection", "chat_settings", "model_settings")
+
+# Inclusive bounds for numeric settings
+LIMITS = {
+    "max_history": (1, 100_000),
+    "max_history_age_days": (0, 36_500),
+    "max_history_mb": (0.0, 1024.0),
+    "pool_size": (1, 64),
+    "connect_timeout": (0.5, 120.0),
+    "request_timeout": (5.0, 3600.0),
+    "render_interval_ms": (0, 1000),
+    "document_chunks": (0, 20),
+    "memory_notes_tokens": (0, 32768),
+    "response_cache_mb": (0.0, 4096.0),
+    "font_size": (8, 48),
+}
+
+# Ollama generation options allowed in per-model presets, with their bounds;
+# float bounds mark options that take fractional values
+MODEL_OPTION_LIMITS = {
+    "num_ctx": (256, 1_048_576),
+    "num_gpu": (-1, 999),  # Layers offloaded to the GPU; -1 lets Ollama decide
+    "main_gpu": (0, 64),
+    "num_thread": (1, 1024),
+    "num_batch": (1, 8192),
+    "num_predict": (-2, 1_000_000),  # -1 = no limit, -2 = fill the context
+    "num_keep": (-1, 1_000_000),
+    "temperature": (0.0, 2.0),
+    "top_k": (0, 1000),
+    "top_p": (0.0, 1.0),
+    "min_p": (0.0, 1.0),
+    "repeat_penalty": (0.0, 5.0),
+    "repeat_last_n": (-1, 1_000_000),
+    "seed": (-1, 2**31 - 1),
+}
+
+CHOICES = {
+    "theme": ("dark", "light", "system"),
+    "archive_compression": ("gzip", "lzma"),
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable snapshot of the application settings"""
+
+    ollama_url: str = "http://localhost:11434"
+    auto_save: bool = True
+    hide_thinking: bool = False
+    max_history: int = 100
+    max_history_age_days: int = 0  # 0 keeps sessions regardless of age
+    max_history_mb: float = 5.0  # 0 puts no size limit on the hot history
+    archive_compression: str = "gzip"
+    theme: str = "dark"
+    window_geometry: str = "1200x800"
+    default_model: str = ""
+    embedding_model: str = "nomic-embed-text"  # "" turns semantic search off
+    document_chunks: int = 4  # Attached-document excerpts per request
+    memory_notes_tokens: int = 512  # Personal memory notes per request; 0 = all
+    response_cache: bool = False  # Replay responses to identical requests
+    response_cache_mb: float = 64.0  # Disk tier budget; 0 keeps it in memory
+    ollama_models_dir: str = ""  # Ollama's manifests/blobs folder; "" = default
+    # Ollama options sent with every request to a model, by model name
+    model_options: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # connection
+    pool_size: int = 4
+    connect_timeout: float = 5.0
+    request_timeout: float = 60.0
+    # chat_settings
+    auto_scroll: bool = True
+    show_timestamps: bool = True
+    word_wrap: bool = True
+    font_size: int = 14
+    render_interval_ms: int = 50
+    # model_settings
+    auto_refresh: bool = True
+    show_model_info: bool = True
+    confirm_delete: bool = True
+
+    def to_dict(self, layout: Optional[Dict] = None) -> Dict:
+        """Nested settings.json layout of this snapshot"""
+        values = asdict(self)
+        layout = layout or load_template()
+        data: Dict[str, Any] = {}
+        for key, default in layout.items():
+            if key in SECTIONS and isinstance(default, dict):
+                data[key] = {name: values[name] for name in default if name in values}
+            elif key in values:
+                data[key] = values[key]
+        return data
+
+
+def builtin_layout() -> Dict:
+    """Nested layout of the built-in defaults, used without a template"""
+    sections = {
+        "connection": ("pool_size", "connect_timeout", "request_timeout"),
+        "chat_settings": (
+            "auto_scroll",
+            "show_timestamps",
+            "word_wrap",
+            "font_size",
+            "render_interval_ms",
+        ),
+        "model_settings": ("auto_refresh", "show_model_info", "confirm_delete"),
+    }
+    values = asdict(Settings())
+    nested = {name for names in sections.values() for name in names}
+    layout: Dict[str, Any] = {
+        key: value for key, value in values.items() if key not in nested
+    }
+    for section, names in sections.items():
+        layout[section] = {name: values[name] for name in names}
+    return layout
+
+
+def flatten(data: Dict) -> Dict:
+    """Move the keys of nested sections to the top level"""
+    flat = {}
+    for key, value in data.items():
+        if key in SECTIONS and isinstance(value, dict):
+            flat.update(value)
+        else:
+            flat[key] = value
+    return flat
+
+
+def load_template(template_file: Path = TEMPLATE_FILE) -> Dict:
+    """Default settings from config_template.json, or the built-in defaults"""
+    try:
+        with open(template_file, "r", encoding="utf-8") as f:
+            template = json.load(f)
+        if isinstance(template, dict):
+            return template
+    except (OSError, ValueError) as e:
+        logging.debug(f"Settings template not loaded: {e}")
+    return builtin_layout()
+
+
+def check_model_options(presets: Dict) -> Optional[str]:
+    """First problem found in per-model option presets, or None"""
+    for model, options in presets.items():
+        if not security.validate_model_name(model):
+            return f"model_options: {model!r} is not a valid model name"
+        if not isinstance(options, dict):
+            return f"model_options: {model}: expected an object, got {options!r}"
+        for name, value in options.items():
+            if name not in MODEL_OPTION_LIMITS:
+                return f"model_options: {model}: unknown option {name!r}"
+            low, high = MODEL_OPTION_LIMITS[name]
+            number = (float, int) if isinstance(low, float) else (int,)
+            if isinstance(value, bool) or not isinstance(value, number):
+                return f"model_options: {model}: {name} must be a number"
+            if not low <= value <= high:
+                return f"model_options: {model}: {name} {value} outside {low}-{high}"
+    return None
+
+
+def check_value(key: str, value: Any, default: Any) -> Tuple[Any, Optional[str]]:
+    """Validated value for one setting, or the default and a problem"""
+    numeric = isinstance(default, (int, float)) and not isinstance(default, bool)
+    if isinstance(value, str) and numeric:
+        # Older versions saved numbers from entry fields as text
+        try:
+            value = type(default)(value.strip())
+        except ValueError:
+            pass
+    if isinstance(default, bool):
+        valid = isinstance(value, bool)
+    elif isinstance(default, int):
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(default, float):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        value = float(value) if valid else value
+    else:
+        valid = isinstance(value, type(default))
+    if not valid:
+        return default, f"{key}: expected {type(default).__name__}, got {value!r}"
+
+    if key in LIMITS:
+        low, high = LIMITS[key]
+        if not low <= value <= high:
+            return default, f"{key}: {value} outside {low}-{high}"
+    if key in CHOICES and value not in CHOICES[key]:
+        return default, f"{key}: {value!r} not one of {', '.join(CHOICES[key])}"
+    if key == "ollama_url" and not security.validate_url(value):
+        return default, f"ollama_url: {value!r} is not a valid URL"
+    if key == "embedding_model" and value and not security.validate_model_name(value):
+        return default, f"embedding_model: {value!r} is not a valid model name"
+    if key == "model_options":
+        problem = check_model_options(value)
+        if problem:
+            return default, problem
+    return value, None
+
+
+def validate(data: Any, template: Optional[Dict] = None) -> Tuple[Settings, List[str]]:
+    """Build a snapshot from raw settings; invalid values fall back to defaults
+
+    Returns the snapshot and a list of problems found.
+    """
+    template = template or load_template()
+    defaults = flatten(template)
+    problems = []
+    if not isinstance(data, dict):
+        problems.append("settings file does not contain an object")
+        data = {}
+    raw = flatten(data)
+
+    known = {field.name for field in fields(Settings)}
+    values = {}
+    for key, default in defaults.items():
+        if key not in known:
+            continue
+        if key in raw:
+            value, problem = check_value(key, raw[key], default)
+            if problem:
+                problems.append(problem)
+            values[key] = value
+        else:
+            values[key] = default
+    problems.extend(f"{key}: unknown setting" for key in raw if key not in known)
+    return Settings(**values), problems
+
+
+class SettingsStore:
+    """Loads, saves and watches settings.json, publishing new snapshots"""
+
+    def __init__(
+        self,
+        settings_file: Optional[Path] = None,
+        template_file: Path = TEMPLATE_FILE,
+        poll_interval: float = 1.0,
+    ):
+        if settings_file is None:
+            data_dir = Path.home() / ".shamollama"
+            data_dir.mkdir(exist_ok=True)
+            settings_file = data_dir / "settings.json"
+        self.settings_file = Path(settings_file)
+        self.template = load_template(template_file)
+        self.poll_interval = poll_interval
+        self.problems: List[str] = []
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Settings, Settings], None]] = []
+        self._signature: Optional[Tuple[int, int]] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.current, _ = validate({}, self.template)
+        self.load()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.settings_file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.settings_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to read settings: {e}")
+            return {}
+
+    def load(self) -> Settings:
+        """Read and validate the settings file, publishing changes"""
+        with self._lock:
+            self._signature = self._file_signature()
+            snapshot, self.problems = validate(self._read(), self.template)
+        for problem in self.problems:
+            logging.warning(f"Invalid setting ignored - {problem}")
+        self._publish(snapshot)
+        return snapshot
+
+    def save(self, **changes) -> Settings:
+        """Validate and apply changes, then write them to settings.json
+
+        Keys not managed by the snapshot are kept as they are in the file.
+        Raises ValueError if any change is invalid.
+        """
+        with self._lock:
+            values = {**asdict(self.current), **changes}
+            snapshot, problems = validate(values, self.template)
+            if problems:
+                raise ValueError("; ".join(problems))
+
+            data = self._read()
+            for key, value in snapshot.to_dict(self.template).items():
+                if key in SECTIONS and isinstance(data.get(key), dict):
+                    data[key].update(value)
+                else:
+                    data[key] = value
+
+            temp_file = self.settings_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            temp_file.replace(self.settings_file)
+            self._signature = self._file_signature()
+        self._publish(snapshot)
+        return snapshot
+
+    def subscribe(self, callback: Callable[[Settings, Settings], None]):
+        """Call callback(new, previous) whenever the snapshot changes"""
+        self._subscribers.append(callback)
+
+    def _publish(self, snapshot: Settings):
+        previous, self.current = self.current, snapshot
+        if snapshot == previous:
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot, previous)
+            except Exception as e:
+                logging.debug(f"Settings subscriber failed: {e}")
+
+    def check_for_changes(self) -> bool:
+        """Reload if the file changed on disk; returns True if it was reloaded"""
+        if self._file_signature() == self._signature:
+            return False
+        self.load()
+        return True
+
+    def start_watching(self):
+        """Poll the settings file for edits on a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="SettingsWatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop_watching(self):
+        """Stop the watcher thread"""
+        self._stop_event.set()
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_changes()
+            except Exception as e:
+                logging.debug(f"Settings watch failed: {e}")
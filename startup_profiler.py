@@ -0,0 +1,102 @@
+"""
+Startup profiler for ShamaOllama
+Records import and initialization timings so slow startups can be diagnosed
+with `python main.py --profile-startup`. Import timing is only switched on
+when that flag is present; phases and marks are always cheap to record.
+"""
+
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+PROFILE_FLAG = "--profile-startup"
+
+
+class StartupProfiler:
+    """Collects import times, init phases and startup milestones"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.enabled = False
+        self.imports: List[Tuple[str, float]] = []
+        self.phases: List[Tuple[str, float]] = []
+        self.marks: List[Tuple[str, float]] = []
+        self._original_import = None
+        self._local = threading.local()
+
+    def enable(self):
+        """Turn on reporting and time top-level imports from now on"""
+        self.enabled = True
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def disable_import_timing(self):
+        """Restore the original import function"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        depth = getattr(self._local, "depth", 0)
+        # Only the outermost import of a new module is recorded; nested
+        # imports are included in their parent's time
+        if depth or level or name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        self._local.depth = 1
+        started = self.clock()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            self._local.depth = 0
+            self.imports.append((name, self.clock() - started))
+
+    @contextmanager
+    def phase(self, label: str):
+        """Time a block of initialization work"""
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.phases.append((label, self.clock() - started))
+
+    def mark(self, label: str):
+        """Record a milestone relative to profiler creation"""
+        self.marks.append((label, self.clock() - self.started))
+
+    def report(self, top: int = 10) -> str:
+        """Format the timing breakdown"""
+        lines = ["⏱️ ShamaOllama Startup Profile", "=" * 40]
+
+        if self.imports:
+            lines.append("Slowest imports:")
+            slowest = sorted(self.imports, key=lambda item: item[1], reverse=True)
+            for name, seconds in slowest[:top]:
+                lines.append(f"  {name:<28} {seconds * 1000:8.1f} ms")
+            total = sum(seconds for _, seconds in self.imports)
+            lines.append(f"  {'total':<28} {total * 1000:8.1f} ms")
+
+        if self.phases:
+            lines.append("Init phases:")
+            for label, seconds in self.phases:
+                lines.append(f"  {label:<28} {seconds * 1000:8.1f} ms")
+
+        if self.marks:
+            lines.append("Milestones (since start):")
+            for label, seconds in self.marks:
+                lines.append(f"  {label:<28} {seconds * 1000:8.1f} ms")
+
+        return "\n".join(lines)
+
+
+# Shared profiler, created as early as possible by importing it first
+profiler = StartupProfiler()
+
+if PROFILE_FLAG in sys.argv:
+    profiler.enable()
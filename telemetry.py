@@ -0,0 +1,275 @@
+"""
+Hardware telemetry for ShamaOllama
+A low-overhead sampler thread that records CPU, RAM and GPU readings into a
+fixed-size ring buffer while chats or benchmarks run, and lines the samples
+up with Ollama's per-turn timing metrics. The combination shows whether a
+slow response came from VRAM spill, CPU offload, thermal throttling or a
+cold model load.
+"""
+
+import logging
+import platform
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Timing fields reported on the final line of /api/chat and /api/generate
+TURN_METRIC_KEYS = (
+    "total_duration",
+    "load_duration",
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+)
+
+# Thresholds used by diagnose()
+VRAM_SPILL_RATIO = 0.95
+CPU_OFFLOAD_PERCENT = 80.0
+LOW_GPU_LOAD = 0.3
+THERMAL_LIMIT_C = 85.0
+SLOW_LOAD_SECONDS = 5.0
+
+
+def extract_turn_metrics(data: Dict) -> Dict:
+    """Pull timing metrics from a final stream line and derive rates"""
+    metrics = {key: data[key] for key in TURN_METRIC_KEYS if key in data}
+
+    eval_count = metrics.get("eval_count", 0)
+    eval_duration = metrics.get("eval_duration", 0)
+    if eval_count and eval_duration:
+        metrics["tokens_per_second"] = eval_count / (eval_duration / 1e9)
+
+    prompt_count = metrics.get("prompt_eval_count", 0)
+    prompt_duration = metrics.get("prompt_eval_duration", 0)
+    if prompt_count and prompt_duration:
+        metrics["prompt_tokens_per_second"] = prompt_count / (prompt_duration / 1e9)
+
+    return metrics
+
+
+class SystemReader:
+    """Reads current CPU, RAM and GPU figures from the best available source"""
+
+    def __init__(self, gpu_info=None, clock: Callable[[], float] = time.monotonic):
+        # Deferred: gpu_info pulls in optional GPU libraries
+        from gpu_info import PSUTIL_AVAILABLE, VOLATILE_TTL, get_gpu_info, psutil
+
+        self.psutil = psutil if PSUTIL_AVAILABLE else None
+        self.gpu_info = gpu_info if gpu_info is not None else get_gpu_info()
+        self.clock = clock
+        # GPUtil forks nvidia-smi per call, so it is read less often than
+        # sysfs; samples in between reuse its last reading
+        self.gputil_interval = VOLATILE_TTL
+        self._gputil_read_at: Optional[float] = None
+        self.linux_probe = self.gpu_info.linux_probe
+        self.is_linux = platform.system() == "Linux"
+        self._last_cpu_times = None
+
+        if self.psutil:
+            # The first call only primes psutil's counters
+            self.psutil.cpu_percent(interval=None)
+        elif self.is_linux:
+            self._last_cpu_times = self.linux_probe.cpu_times()
+
+    def cpu_percent(self) -> Optional[float]:
+        """CPU utilisation since the previous reading"""
+        if self.psutil:
+            return self.psutil.cpu_percent(interval=None)
+        if not self.is_linux:
+            return None
+
+        times = self.linux_probe.cpu_times()
+        previous, self._last_cpu_times = self._last_cpu_times, times
+        if not times or not previous:
+            return None
+        busy = times[0] - previous[0]
+        total = times[1] - previous[1]
+        return 100.0 * busy / total if total > 0 else 0.0
+
+    def ram_used_gb(self) -> Optional[float]:
+        """System RAM currently in use"""
+        if self.psutil:
+            memory = self.psutil.virtual_memory()
+            return (memory.total - memory.available) / (1024**3)
+        if self.is_linux:
+            memory = self.linux_probe.memory_gb()
+            return memory["total"] - memory["available"]
+        return None
+
+    def __call__(self) -> Dict:
+        now = self.clock()
+        gputil = (
+            self._gputil_read_at is None
+            or now - self._gputil_read_at >= self.gputil_interval
+        )
+        if gputil:
+            self._gputil_read_at = now
+        self.gpu_info.refresh_volatile(gputil=gputil)
+        gpus = [
+            {
+                "memory_used": gpu.get("memory_used"),
+                "memory_total": gpu.get("memory_total"),
+                "load": gpu.get("load"),
+                "temperature": gpu.get("temperature"),
+            }
+            for gpu in self.gpu_info.gpu_data
+            if gpu.get("memory_total")
+        ]
+        return {
+            "cpu_percent": self.cpu_percent(),
+            "ram_used_gb": self.ram_used_gb(),
+            "ram_total_gb": self.gpu_info.system_ram,
+            "gpus": gpus,
+        }
+
+
+class TelemetrySampler:
+    """Samples hardware readings into a ring buffer on a background thread"""
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        capacity: int = 600,
+        read: Optional[Callable[[], Dict]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval
+        self.read = read
+        self.clock = clock
+        self.buffer = deque(maxlen=capacity)
+        self.turns = deque(maxlen=50)
+
+        self._active_turns = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the sampler thread if it is not already running"""
+        if self._thread and self._thread.is_alive():
+            if not self._stop_event.is_set():
+                return
+            # A stopping thread may already be past its last check
+            self._thread.join()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="TelemetrySampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampler thread"""
+        self._stop_event.set()
+
+    def _run(self):
+        """Sampler loop"""
+        if self.read is None:
+            try:
+                self.read = SystemReader()
+            except Exception as e:
+                logging.debug(f"Telemetry unavailable: {e}")
+                return
+
+        while not self._stop_event.is_set():
+            self.sample_once()
+            self._stop_event.wait(self.interval)
+
+    def sample_once(self) -> Optional[Dict]:
+        """Take one reading and append it to the ring buffer"""
+        try:
+            sample = self.read()
+        except Exception as e:
+            logging.debug(f"Telemetry sample failed: {e}")
+            return None
+        sample["time"] = self.clock()
+        self.buffer.append(sample)
+        return sample
+
+    def samples(
+        self, since: Optional[float] = None, until: Optional[float] = None
+    ) -> List[Dict]:
+        """Samples taken within a time window"""
+        return [
+            sample
+            for sample in list(self.buffer)
+            if (since is None or sample["time"] >= since)
+            and (until is None or sample["time"] <= until)
+        ]
+
+    def begin_turn(self, label: str = "") -> Dict:
+        """Mark the start of a chat turn or benchmark run; starts sampling"""
+        turn = {"label": label, "started": self.clock()}
+        with self._lock:
+            self._active_turns += 1
+        self.start()
+        return turn
+
+    def end_turn(self, turn: Dict, metrics: Optional[Dict] = None) -> Dict:
+        """Close a turn, aligning its samples with Ollama's timing metrics"""
+        turn["ended"] = self.clock()
+        turn["metrics"] = metrics or {}
+        turn["samples"] = self.samples(turn["started"], turn["ended"])
+        turn["summary"] = summarize(turn["samples"])
+        turn["diagnosis"] = diagnose(turn["summary"], turn["metrics"])
+        self.turns.append(turn)
+
+        with self._lock:
+            self._active_turns -= 1
+            idle = self._active_turns <= 0
+        if idle:
+            self.stop()
+        return turn
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    """Peak and average readings over a list of samples"""
+
+    def values(key, source=None):
+        items = source if source is not None else samples
+        return [item[key] for item in items if item.get(key) is not None]
+
+    gpus = [gpu for sample in samples for gpu in sample.get("gpus", [])]
+    cpu = values("cpu_percent")
+    loads = values("load", gpus)
+    vram_ratios = [
+        gpu["memory_used"] / gpu["memory_total"]
+        for gpu in gpus
+        if gpu.get("memory_used") is not None and gpu.get("memory_total")
+    ]
+
+    return {
+        "samples": len(samples),
+        "cpu_percent_avg": sum(cpu) / len(cpu) if cpu else None,
+        "cpu_percent_max": max(cpu) if cpu else None,
+        "ram_used_gb_max": max(values("ram_used_gb"), default=None),
+        "gpu_load_avg": sum(loads) / len(loads) if loads else None,
+        "gpu_memory_ratio_max": max(vram_ratios, default=None),
+        "gpu_temperature_max": max(values("temperature", gpus), default=None),
+    }
+
+
+def diagnose(summary: Dict, metrics: Dict) -> List[str]:
+    """Explain likely causes of a slow turn from its telemetry"""
+    findings = []
+
+    vram = summary.get("gpu_memory_ratio_max")
+    if vram is not None and vram >= VRAM_SPILL_RATIO:
+        findings.append(f"VRAM {vram:.0%} full - layers may spill to system RAM")
+
+    cpu = summary.get("cpu_percent_avg")
+    gpu_load = summary.get("gpu_load_avg")
+    if cpu is not None and cpu >= CPU_OFFLOAD_PERCENT:
+        if gpu_load is None or gpu_load < LOW_GPU_LOAD:
+            findings.append(f"CPU {cpu:.0f}% busy with an idle GPU - CPU offload")
+
+    temperature = summary.get("gpu_temperature_max")
+    if temperature is not None and temperature >= THERMAL_LIMIT_C:
+        findings.append(f"GPU reached {temperature:.0f}°C - possible throttling")
+
+    load_seconds = metrics.get("load_duration", 0) / 1e9
+    if load_seconds >= SLOW_LOAD_SECONDS:
+        findings.append(f"Model load took {load_seconds:.1f}s (cold start)")
+
+    return findings
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Offline Ollama stand-in for ShamaOllama tests and benchmarks
+Implements the parts of the Ollama REST API the app uses, with configurable
+token rate, latency, jitter, chunk splitting and failure injection, so API
+code and streaming can be exercised deterministically without a live server.
+
+Run standalone:
+    python tests/fake_ollama.py --port 11435 --token-rate 50
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+
+class FakeOllamaConfig:
+    """Behaviour knobs for the fake server"""
+
+    def __init__(
+        self,
+        token_rate: float = 0.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        chunk_split: int = 1,
+        lines_per_chunk: int = 1,
+        response_tokens: int = 20,
+        fail_rate: float = 0.0,
+        fail_paths: Optional[List[str]] = None,
+        drop_after_tokens: Optional[int] = None,
+        option_rate: Optional[Callable[[Dict], float]] = None,
+        seed: int = 1978,
+    ):
+        self.token_rate = token_rate  # tokens per second, 0 = as fast as possible
+        self.latency = latency  # seconds before the response starts
+        self.jitter = jitter  # +/- seconds applied to latency and token gaps
+        self.chunk_split = chunk_split  # HTTP chunks each NDJSON line is split into
+        self.lines_per_chunk = lines_per_chunk  # NDJSON lines coalesced per chunk
+        self.response_tokens = response_tokens
+        self.fail_rate = fail_rate  # probability of an injected HTTP 500
+        self.fail_paths = fail_paths  # restrict failures to these paths
+        self.drop_after_tokens = drop_after_tokens  # cut streams mid-response
+        # tokens/s reported for a chat's options; 0 fails it as out of memory
+        self.option_rate = option_rate
+        self.seed = seed
+
+
+DEFAULT_MODELS = {
+    "llama3.2:latest": {
+        "size": 2019393189,
+        "parameter_size": "3.2B",
+        "quantization_level": "Q4_K_M",
+        "family": "llama",
+        "context_length": 131072,
+        "block_count": 28,
+        "embedding_length": 3072,
+        "head_count": 24,
+        "head_count_kv": 8,
+    },
+    "mistral:7b": {
+        "size": 4113301824,
+        "parameter_size": "7.2B",
+        "quantization_level": "Q4_0",
+        "family": "llama",
+        "context_length": 32768,
+        "block_count": 32,
+        "embedding_length": 4096,
+        "head_count": 32,
+        "head_count_kv": 8,
+    },
+}
+
+# Length of the vectors returned by /api/embed
+EMBEDDING_DIM = 64
+
+RESPONSE_WORDS = [
+    "Shama", "lama", "ding", "dong", "is", "a", "fake", "Ollama", "reply",
+    "with", "deterministic", "tokens", "for", "testing", "streaming", "\n",
+]  # fmt: skip
+
+
+class FakeOllamaState:
+    """Installed and loaded models of the fake server"""
+
+    def __init__(self, models: Optional[Dict[str, Dict]] = None):
+        self.lock = threading.Lock()
+        self.models: Dict[str, Dict] = {}
+        self.loaded: Dict[str, float] = {}
+        self.requests: List[str] = []
+        for name, info in (models or DEFAULT_MODELS).items():
+            self.add_model(name, info)
+
+    def add_model(self, name: str, info: Optional[Dict] = None):
+        """Install a model, deriving a digest from its name"""
+        info = dict(info or {})
+        info.setdefault("size", 1024 * 1024 * 1024)
+        info.setdefault("parameter_size", "1B")
+        info.setdefault("quantization_level", "Q4_K_M")
+        info.setdefault("family", "llama")
+        info.setdefault("context_length", 4096)
+        info["digest"] = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        info["modified_at"] = "2025-07-28T12:00:00.000000000Z"
+        with self.lock:
+            self.models[name] = info
+
+    def tag_entry(self, name: str, info: Dict) -> Dict:
+        """Format a model as an /api/tags entry"""
+        return {
+            "name": name,
+            "model": name,
+            "modified_at": info["modified_at"],
+            "size": info["size"],
+            "digest": info["digest"],
+            "details": {
+                "parent_model": "",
+                "format": "gguf",
+                "family": info["family"],
+                "families": [info["family"]],
+                "parameter_size": info["parameter_size"],
+                "quantization_level": info["quantization_level"],
+            },
+        }
+
+
+def embed_text(text: str) -> List[float]:
+    """Deterministic unit vector: hashed bag of words, so shared words match"""
+    vector = [0.0] * EMBEDDING_DIM
+    for word in text.lower().split():
+        digest = hashlib.sha256(word.strip(".,!?").encode("utf-8")).digest()
+        vector[digest[0] % EMBEDDING_DIM] += 1.0 if digest[1] & 1 else -1.0
+    norm = sum(value * value for value in vector) ** 0.5 or 1.0
+    return [value / norm for value in vector]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the Ollama endpoints"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeOllama/0.1"
+
+    def log_message(self, format, *args):
+        """Keep test output quiet"""
+
+    @property
+    def config(self) -> FakeOllamaConfig:
+        return self.server.config
+
+    @property
+    def state(self) -> FakeOllamaState:
+        return self.server.state
+
+    # Request plumbing
+
+    def do_GET(self):
+        self._dispatch(
+            {
+                "/api/version": self.handle_version,
+                "/api/tags": self.handle_tags,
+                "/api/ps": self.handle_ps,
+            }
+        )
+
+    def do_POST(self):
+        self._dispatch(
+            {
+                "/api/chat": self.handle_chat,
+                "/api/pull": self.handle_pull,
+                "/api/show": self.handle_show,
+                "/api/embed": self.handle_embed,
+            }
+        )
+
+    def do_DELETE(self):
+        self._dispatch({"/api/delete": self.handle_delete})
+
+    def _dispatch(self, routes):
+        with self.state.lock:
+            self.state.requests.append(f"{self.command} {self.path}")
+
+        handler = routes.get(self.path)
+        if handler is None:
+            self.send_json({"error": "not found"}, status=404)
+            return
+
+        self._sleep(self.config.latency)
+        if self._should_fail():
+            self.send_json({"error": "injected failure"}, status=500)
+            return
+
+        try:
+            body = self._read_body()
+        except ValueError:
+            self.send_json({"error": "invalid JSON body"}, status=400)
+            return
+        handler(body)
+
+    def _read_body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _should_fail(self) -> bool:
+        paths = self.config.fail_paths
+        if paths is not None and self.path not in paths:
+            return False
+        return self.server.rng.random() < self.config.fail_rate
+
+    def _sleep(self, seconds: float):
+        if self.config.jitter:
+            seconds += self.server.rng.uniform(-self.config.jitter, self.config.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def send_json(self, data: Dict, status: int = 200):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream_ndjson(self, lines, token_gap: float = 0.0):
+        """Send NDJSON lines with chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        pending = []
+        for index, line in enumerate(lines):
+            if (
+                self.config.drop_after_tokens is not None
+                and index >= self.config.drop_after_tokens
+            ):
+                # Simulate a dropped connection: no terminating chunk
+                self.wfile.flush()
+                self.close_connection = True
+                return
+
+            pending.append(json.dumps(line, separators=(",", ":")).encode() + b"\n")
+            if len(pending) < self.config.lines_per_chunk:
+                continue
+            self._write_split(b"".join(pending))
+            pending = []
+            if token_gap:
+                self._sleep(token_gap)
+
+        if pending:
+            self._write_split(b"".join(pending))
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_split(self, data: bytes):
+        """Write data as chunk_split HTTP chunks"""
+        parts = max(1, min(self.config.chunk_split, len(data)))
+        step = -(-len(data) // parts)
+        for start in range(0, len(data), step):
+            piece = data[start : start + step]
+            self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+        self.wfile.flush()
+
+    # Endpoints
+
+    def handle_version(self, body):
+        self.send_json({"version": "0.0.0-fake"})
+
+    def handle_tags(self, body):
+        with self.state.lock:
+            models = [
+                self.state.tag_entry(name, info)
+                for name, info in self.state.models.items()
+            ]
+        self.send_json({"models": models})
+
+    def handle_ps(self, body):
+        with self.state.lock:
+            models = []
+            for name in self.state.loaded:
+                info = self.state.models.get(name)
+                if info:
+                    entry = self.state.tag_entry(name, info)
+                    entry["size_vram"] = info["size"]
+                    entry["expires_at"] = "2099-01-01T00:00:00Z"
+                    models.append(entry)
+        self.send_json({"models": models})
+
+    def handle_show(self, body):
+        name = body.get("model") or body.get("name", "")
+        with self.state.lock:
+            info = self.state.models.get(name)
+        if info is None:
+            self.send_json({"error": f"model '{name}' not found"}, status=404)
+            return
+
+        architecture = info["family"]
+        model_info = {
+            "general.architecture": architecture,
+            "general.parameter_count": int(
+                float(info["parameter_size"].rstrip("B")) * 1e9
+            ),
+        }
+        for key in ["context_length", "block_count", "embedding_length"]:
+            if key in info:
+                model_info[f"{architecture}.{key}"] = info[key]
+        for key in ["head_count", "head_count_kv"]:
+            if key in info:
+                model_info[f"{architecture}.attention.{key}"] = info[key]
+
+        self.send_json(
+            {
+                "license": "FAKE MODEL LICENSE\nFor testing only.",
+                "modelfile": f"FROM {name}",
+                "parameters": "stop <|eot_id|>",
+                "template": "{{ .System }}\n{{ .Prompt }}",
+                "details": self.state.tag_entry(name, info)["details"],
+                "model_info": model_info,
+            }
+        )
+
+    def handle_chat(self, body):
+        name = body.get("model", "")
+        if not body.get("messages") and body.get("keep_alive") == 0:
+            # Unload request
+            with self.state.lock:
+                self.state.loaded.pop(name, None)
+            self.send_json(
+                {
+                    "model": name,
+                    "message": {"role": "assistant", "content": ""},
+                    "done_reason": "unload",
+                    "done": True,
+                }
+            )
+            return
+        with self.state.lock:
+            known = name in self.state.models
+            was_loaded = name in self.state.loaded
+            if known:
+                self.state.loaded[name] = time.time()
+        if not known:
+            self.send_json({"error": f"model '{name}' not found"}, status=404)
+            return
+
+        rate = None
+        if self.config.option_rate:
+            rate = self.config.option_rate(body.get("options") or {})
+            if not rate:
+                self.send_json(
+                    {"error": "model requires more system memory"}, status=500
+                )
+                return
+
+        tokens = self.reply_tokens(body)
+        started = time.perf_counter()
+        gap = 1.0 / self.config.token_rate if self.config.token_rate else 0.0
+        eval_duration = max(1, int(len(tokens) * gap * 1e9))
+        if rate:
+            eval_duration = int(len(tokens) / rate * 1e9)
+        prompt_chars = sum(len(m.get("content", "")) for m in body.get("messages", []))
+
+        def final_line(duration_ns: int) -> Dict:
+            return {
+                "model": name,
+                "created_at": "2025-07-28T12:00:01Z",
+                "message": {"role": "assistant", "content": ""},
+                "done_reason": "stop",
+                "done": True,
+                "total_duration": duration_ns,
+                "load_duration": 0 if was_loaded else 250_000_000,
+                "prompt_eval_count": max(1, prompt_chars // 4),
+                "prompt_eval_duration": 10_000_000,
+                "eval_count": len(tokens),
+                "eval_duration": eval_duration,
+            }
+
+        if body.get("stream", True) is False:
+            for _ in tokens:
+                self._sleep(gap)
+            duration_ns = int((time.perf_counter() - started) * 1e9)
+            response = final_line(duration_ns)
+            response["message"]["content"] = "".join(tokens)
+            self.send_json(response)
+            return
+
+        def lines():
+            for token in tokens:
+                yield {
+                    "model": name,
+                    "created_at": "2025-07-28T12:00:00Z",
+                    "message": {"role": "assistant", "content": token},
+                    "done": False,
+                }
+            yield final_line(int((time.perf_counter() - started) * 1e9))
+
+        self.stream_ndjson(lines(), token_gap=gap)
+
+    def reply_tokens(self, body) -> List[str]:
+        """Deterministic reply tokens seeded by the conversation"""
+        messages = body.get("messages") or []
+        last = messages[-1].get("content", "") if messages else ""
+        count = int((body.get("options") or {}).get("num_predict") or 0)
+        count = count if count > 0 else self.config.response_tokens
+        rng = random.Random(f"{self.config.seed}:{body.get('model')}:{last}")
+        return [
+            rng.choice(RESPONSE_WORDS) + ("" if i == count - 1 else " ")
+            for i in range(count)
+        ]
+
+    def handle_embed(self, body):
+        name = body.get("model", "")
+        with self.state.lock:
+            known = name in self.state.models
+            if known:
+                self.state.loaded[name] = time.time()
+        if not known:
+            self.send_json({"error": f"model '{name}' not found"}, status=404)
+            return
+
+        texts = body.get("input", "")
+        if isinstance(texts, str):
+            texts = [texts]
+        self.send_json(
+            {
+                "model": name,
+                "embeddings": [embed_text(text) for text in texts],
+                "prompt_eval_count": sum(len(text.split()) for text in texts),
+            }
+        )
+
+    def handle_pull(self, body):
+        name = body.get("model") or body.get("name", "")
+        if ":" not in name:
+            name += ":latest"
+        total = 4 * 1024 * 1024
+
+        def lines():
+            yield {"status": "pulling manifest"}
+            for completed in range(0, total + 1, total // 4):
+                yield {
+                    "status": "downloading",
+                    "digest": "sha256:" + hashlib.sha256(name.encode()).hexdigest(),
+                    "total": total,
+                    "completed": completed,
+                }
+            yield {"status": "verifying sha256 digest"}
+            yield {"status": "writing manifest"}
+            self.state.add_model(name, {"size": total})
+            yield {"status": "success"}
+
+        self.stream_ndjson(lines())
+
+    def handle_delete(self, body):
+        name = body.get("model") or body.get("name", "")
+        with self.state.lock:
+            removed = self.state.models.pop(name, None)
+            self.state.loaded.pop(name, None)
+        if removed is None:
+            self.send_json({"error": f"model '{name}' not found"}, status=404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class FakeOllamaServer:
+    """Threaded fake Ollama server; use as a context manager"""
+
+    def __init__(
+        self,
+        config: Optional[FakeOllamaConfig] = None,
+        models: Optional[Dict[str, Dict]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.config = config or FakeOllamaConfig()
+        self.state = FakeOllamaState(models)
+        self.httpd = ThreadingHTTPServer((host, port), FakeOllamaHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = self.config
+        self.httpd.state = self.state
+        self.httpd.rng = random.Random(self.config.seed)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return (
+            f"http://localhost:{port}"
+            if host == "127.0.0.1"
+            else f"http://{host}:{port}"
+        )
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--chunk-split", type=int, default=1)
+    parser.add_argument("--response-tokens", type=int, default=20)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        token_rate=args.token_rate,
+        latency=args.latency,
+        jitter=args.jitter,
+        chunk_split=args.chunk_split,
+        response_tokens=args.response_tokens,
+        fail_rate=args.fail_rate,
+    )
+    server = FakeOllamaServer(config, host=args.host, port=args.port)
+    print(f"🦙 Fake Ollama listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,27 @@ def main():
         "test_dependencies.py",
         "test_security.py",
         "test_app.py",
+        "test_model_metadata.py",
+        "test_connection_monitor.py",
+        "test_ndjson_stream.py",
+        "test_api.py",
+        "test_startup.py",
+        "test_hardware_probe.py",
+        "test_telemetry.py",
+        "test_memory_fit.py",
+        "test_async_logging.py",
+        "test_security_log.py",
+        "test_settings.py",
+        "test_history_archive.py",
+        "test_chat_messages.py",
+        "test_history_search.py",
+        "test_document_index.py",
+        "test_memory_notes.py",
+        "test_response_cache.py",
+        "test_option_tuner.py",
+        "test_quant_compare.py",
+        "test_blob_store.py",
+        "test_blob_verify.py",
     ]
 
     # Track results
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Ollama API test script for ShamaOllama
+Exercises OllamaAPI end to end against the offline fake Ollama server
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def test_models_endpoints():
+    """Test version, tags, show, pull and delete"""
+    try:
+        from fake_ollama import FakeOllamaServer
+        from main import OllamaAPI
+
+        with FakeOllamaServer() as server:
+            api = OllamaAPI(server.base_url)
+
+            if not api.test_connection():
+                print("❌ Connection to fake server failed")
+                return False
+
+            names = sorted(model["name"] for model in api.get_models())
+            if names != ["llama3.2:latest", "mistral:7b"]:
+                print(f"❌ Unexpected models: {names}")
+                return False
+
+            info = api.show_model("mistral:7b")
+            if not info or info["model_info"]["llama.attention.head_count_kv"] != 8:
+                print("❌ /api/show details missing")
+                return False
+
+            progress = []
+            if not api.pull_model("phi3:mini", progress.append):
+                print("❌ Pull did not report success")
+                return False
+            if progress[0]["status"] != "pulling manifest" or len(progress) < 5:
+                print(f"❌ Unexpected pull progress: {progress}")
+                return False
+
+            if not api.delete_model("mistral:7b") or api.delete_model("mistral:7b"):
+                print("❌ Delete should succeed once, then 404")
+                return False
+
+            names = sorted(model["name"] for model in api.get_models())
+            if names != ["llama3.2:latest", "phi3:mini"]:
+                print(f"❌ Pull/delete not reflected in tags: {names}")
+                return False
+
+        print("✅ Model endpoints working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Model endpoints test error: {e}")
+        return False
+
+
+def test_chat_streaming():
+    """Test streamed and non-streamed chat with split HTTP chunks"""
+    try:
+        from fake_ollama import FakeOllamaConfig, FakeOllamaServer
+        from main import OllamaAPI
+
+        messages = [{"role": "user", "content": "Shama lama?"}]
+        config = FakeOllamaConfig(chunk_split=3, response_tokens=50)
+        with FakeOllamaServer(config) as server:
+            api = OllamaAPI(server.base_url)
+
+            chunks = []
+            streamed = api.chat("llama3.2:latest", messages, chunks.append)
+            if len(chunks) != 50 or "".join(chunks) != streamed:
+                print(f"❌ Expected 50 streamed tokens, got {len(chunks)}")
+                return False
+
+            # Replies are deterministic for the same conversation
+            if api.chat("llama3.2:latest", messages) != streamed:
+                print("❌ Non-streamed reply differs from streamed reply")
+                return False
+
+            loaded = api.session.get(f"{server.base_url}/api/ps").json()["models"]
+            if [model["name"] for model in loaded] != ["llama3.2:latest"]:
+                print("❌ Chatted model not listed as loaded")
+                return False
+
+        print("✅ Chat streaming working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Chat streaming test error: {e}")
+        return False
+
+
+def test_failure_injection():
+    """Test that injected failures surface as API errors"""
+    try:
+        from fake_ollama import FakeOllamaConfig, FakeOllamaServer
+        from main import OllamaAPI
+
+        config = FakeOllamaConfig(fail_rate=1.0, fail_paths=["/api/tags"])
+        with FakeOllamaServer(config) as server:
+            api = OllamaAPI(server.base_url)
+            if not api.test_connection() or api.get_models() != []:
+                print("❌ Failure injection should only hit /api/tags")
+                return False
+            if api.fetch_models() is not None:
+                print("❌ A failed model list should not look like an empty one")
+                return False
+
+        config = FakeOllamaConfig(drop_after_tokens=5, response_tokens=20)
+        with FakeOllamaServer(config) as server:
+            api = OllamaAPI(server.base_url)
+            try:
+                messages = [{"role": "user", "content": "hi"}]
+                api.chat("llama3.2:latest", messages, lambda chunk: None)
+                print("❌ Dropped stream should raise")
+                return False
+            except Exception as e:
+                if "Chat request failed" not in str(e):
+                    raise
+
+        print("✅ Failure injection working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Failure injection test error: {e}")
+        return False
+
+
+def test_request_size_limit():
+    """Test that oversized chats raise instead of silently returning nothing"""
+    try:
+        from fake_ollama import FakeOllamaServer
+        from main import OllamaAPI
+        from security import security
+
+        with FakeOllamaServer() as server:
+            api = OllamaAPI(server.base_url, max_request_bytes=2000)
+            small = [{"role": "user", "content": "héllo " * 100}]
+            if not api.chat("llama3.2:latest", small):
+                print("❌ Request under the limit should be sent")
+                return False
+
+            large = small * 10
+            try:
+                api.chat("llama3.2:latest", large)
+                print("❌ Oversized request should raise")
+                return False
+            except ValueError as e:
+                if "too large" not in str(e):
+                    raise
+
+        # The measured bytes are exactly the bytes that get sent
+        body = security.encode_json({"messages": small})
+        if json.loads(body.decode("utf-8")) != {"messages": small}:
+            print("❌ Encoded body does not round-trip")
+            return False
+
+        print("✅ Request size limit working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Request size limit test error: {e}")
+        return False
+
+
+def main():
+    """Run all Ollama API tests"""
+    print("🦙 Testing ShamaOllama API Against Fake Ollama...")
+    print("=" * 50)
+
+    tests = [
+        test_models_endpoints,
+        test_chat_streaming,
+        test_failure_injection,
+        test_request_size_limit,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"API Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All API tests passed!")
+        return 0
+    else:
+        print("❌ Some API tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Queued logging test script for ShamaOllama
+Tests the bounded queue handler, the background writer and log rotation
+"""
+
+import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class SlowHandler(logging.Handler):
+    """Handler that simulates a stalled disk"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.messages = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name):
+    """Fresh logger that does not propagate to the root logger"""
+    logger = logging.getLogger(f"ShamaOllama.Test.{name}")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def test_logging_does_not_wait_for_disk():
+    """Test that log calls return while a slow writer catches up"""
+    try:
+        from async_logging import BoundedQueueHandler, FlushingQueueListener
+
+        logger = make_logger("slow")
+        log_queue = queue.Queue(maxsize=100)
+        logger.addHandler(BoundedQueueHandler(log_queue))
+        slow = SlowHandler(0.05)
+        listener = FlushingQueueListener(log_queue, slow)
+        listener.start()
+
+        started = time.perf_counter()
+        for i in range(10):
+            logger.info(f"event {i}")
+        elapsed = time.perf_counter() - started
+        if elapsed > 0.05:
+            print(f"❌ Logging blocked for {elapsed:.3f}s")
+            return False
+
+        if not listener.flush(5):
+            print("❌ Flush timed out")
+            return False
+        listener.stop()
+        if slow.messages != [f"event {i}" for i in range(10)]:
+            print(f"❌ Records lost or reordered: {slow.messages}")
+            return False
+
+        print("✅ Background writer working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Background writer test error: {e}")
+        return False
+
+
+def test_bounded_buffer_drops_oldest():
+    """Test that a full buffer keeps the newest records"""
+    try:
+        from async_logging import BoundedQueueHandler
+
+        logger = make_logger("bounded")
+        log_queue = queue.Queue(maxsize=3)
+        handler = BoundedQueueHandler(log_queue)
+        logger.addHandler(handler)
+
+        for i in range(5):
+            logger.info(f"event {i}")
+
+        buffered = [log_queue.get_nowait().getMessage() for _ in range(3)]
+        if buffered != ["event 2", "event 3", "event 4"] or handler.dropped != 2:
+            print(f"❌ Unexpected buffer contents: {buffered}, {handler.dropped}")
+            return False
+
+        print("✅ Bounded buffer working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Bounded buffer test error: {e}")
+        return False
+
+
+def test_size_rotation():
+    """Test that the writer rotates the file at the size limit"""
+    try:
+        from async_logging import attach_queued_file_logging
+
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_file = Path(log_dir) / "security.log"
+            logger = make_logger("rotation")
+            listener = attach_queued_file_logging(
+                logger, log_file, max_bytes=200, backup_count=2
+            )
+            for i in range(50):
+                logger.info(f"rotation test event number {i}")
+            listener.stop()
+
+            files = sorted(path.name for path in Path(log_dir).iterdir())
+            if files != ["security.log", "security.log.1", "security.log.2"]:
+                print(f"❌ Unexpected log files: {files}")
+                return False
+            if "number 49" not in log_file.read_text(encoding="utf-8"):
+                print("❌ Newest event not in the current log file")
+                return False
+
+        print("✅ Log rotation working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rotation test error: {e}")
+        return False
+
+
+def test_security_events_and_clear():
+    """Test SecurityValidator logging through the queue and clearing"""
+    original_home = os.environ.get("HOME")
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from security import SecurityValidator
+
+            validator = SecurityValidator()
+            log_file = Path(home) / ".shamollama" / "logs" / "security.log"
+            validator.log_security_event("Queued Event", {"test": True})
+            validator.flush_logs()
+
+            if "Queued Event" not in log_file.read_text(encoding="utf-8"):
+                print("❌ Event not written after flush")
+                return False
+
+            (log_file.parent / "security.log.1").write_text("old\n")
+            if not validator.clear_logs():
+                print("❌ Clearing logs failed")
+                return False
+            if (log_file.parent / "security.log.1").exists():
+                print("❌ Rotated backups not cleared")
+                return False
+            if not isinstance(validator.log_listener._thread, threading.Thread):
+                print("❌ Logging not restarted after clearing")
+                return False
+            validator.stop_logging()
+
+        print("✅ Queued security logging working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Security logging test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+        # Hand the shared logger back to the global validator
+        from security import security
+
+        security.setup_logging()
+
+
+def main():
+    """Run all queued logging tests"""
+    print("📝 Testing ShamaOllama Queued Logging...")
+    print("=" * 50)
+
+    tests = [
+        test_logging_does_not_wait_for_disk,
+        test_bounded_buffer_drops_oldest,
+        test_size_rotation,
+        test_security_events_and_clear,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Queued Logging Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All queued logging tests passed!")
+        return 0
+    else:
+        print("❌ Some queued logging tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Blob store analyzer test script for ShamaOllama
+Tests manifest parsing, the layer-to-models index with real versus apparent
+usage and reclaimable bytes, and incremental rescans cached by mtime
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+LIBRARY = ("registry.ollama.ai", "library")
+
+
+def write_blob(models_dir: Path, content: bytes) -> dict:
+    """Store content as a blob and return its manifest layer entry"""
+    digest = "sha256:" + hashlib.sha256(content).hexdigest()
+    blobs = models_dir / "blobs"
+    blobs.mkdir(parents=True, exist_ok=True)
+    (blobs / digest.replace(":", "-")).write_bytes(content)
+    return {
+        "mediaType": "application/octet-stream",
+        "digest": digest,
+        "size": len(content),
+    }
+
+
+def write_manifest(models_dir: Path, parts, config: dict, layers: list) -> Path:
+    """Write a manifest below manifests/"""
+    path = models_dir.joinpath("manifests", *parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = {"schemaVersion": 2, "config": config, "layers": layers}
+    path.write_text(json.dumps(manifest), encoding="utf-8")
+    return path
+
+
+def build_store(models_dir: Path) -> dict:
+    """Two tags of one model, a second model sharing its license, and leftovers"""
+    layers = {
+        "weights": write_blob(models_dir, b"w" * 5000),
+        "license": write_blob(models_dir, b"l" * 300),
+        "config": write_blob(models_dir, b'{"model_format":"gguf"}'),
+        "mistral": write_blob(models_dir, b"m" * 4000),
+        "mistral_config": write_blob(models_dir, b'{"model_format":"gguf","x":1}'),
+    }
+    write_blob(models_dir, b"orphan" * 100)
+    llama = [layers["weights"], layers["license"]]
+    write_manifest(
+        models_dir, LIBRARY + ("llama3.2", "latest"), layers["config"], llama
+    )
+    write_manifest(models_dir, LIBRARY + ("llama3.2", "3b"), layers["config"], llama)
+    write_manifest(
+        models_dir,
+        ("registry.ollama.ai", "jmorgan", "mistral", "7b"),
+        layers["mistral_config"],
+        [layers["mistral"], layers["license"]],
+    )
+    return layers
+
+
+def test_manifest_names():
+    """Test model names derived from manifest paths"""
+    try:
+        from blob_store import blob_file_name, model_name_from_path
+
+        cases = {
+            LIBRARY + ("llama3.2", "latest"): "llama3.2:latest",
+            ("registry.ollama.ai", "jmorgan", "phi", "2b"): "jmorgan/phi:2b",
+            ("hf.co", "bartowski", "qwen", "Q4_K_M"): "hf.co/bartowski/qwen:Q4_K_M",
+        }
+        for parts, name in cases.items():
+            if model_name_from_path(parts) != name:
+                print(f"❌ {parts}: expected {name}, got {model_name_from_path(parts)}")
+                return False
+        if blob_file_name("sha256:abc") != "sha256-abc":
+            print("❌ Blob file names use a dash after the algorithm")
+            return False
+
+        print("✅ Manifest names working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Manifest name test error: {e}")
+        return False
+
+
+def test_usage_report():
+    """Test real versus apparent usage, shared layers and reclaimable bytes"""
+    try:
+        from blob_store import BlobStoreIndex, format_usage_report
+
+        with tempfile.TemporaryDirectory() as work:
+            models_dir = Path(work) / "models"
+            layers = build_store(models_dir)
+            index = BlobStoreIndex(models_dir, Path(work) / "cache.json")
+            index.scan()
+            report = index.report()
+
+            llama = 5000 + 300 + layers["config"]["size"]
+            mistral = 4000 + 300 + layers["mistral_config"]["size"]
+            if report["models"] != 3 or report["apparent_bytes"] != 2 * llama + mistral:
+                print(f"❌ Wrong apparent usage: {report}")
+                return False
+            if report["real_bytes"] != llama + mistral - 300:
+                print(f"❌ Shared layers should be counted once: {report}")
+                return False
+            if report["unreferenced_bytes"] != 600 or report["missing_blobs"]:
+                print("❌ The orphaned blob should be reported")
+                return False
+            if report["shared_layers"][0]["models"] != [
+                "llama3.2:3b",
+                "llama3.2:latest",
+            ]:
+                print(f"❌ Largest shared layer wrong: {report['shared_layers'][0]}")
+                return False
+
+            if index.reclaimable(["llama3.2:latest"]) != 0:
+                print("❌ Deleting one of two tags of a model frees nothing")
+                return False
+            if index.reclaimable(["llama3.2:latest", "llama3.2:3b"]) != llama - 300:
+                print("❌ The license shared with mistral should not be freed")
+                return False
+            everything = index.reclaimable(index.models)
+            if everything != report["real_bytes"]:
+                print("❌ Deleting every model should free every referenced layer")
+                return False
+            if index.model_usage("jmorgan/mistral:7b")["unique"] != mistral - 300:
+                print("❌ Unique bytes of a model are wrong")
+                return False
+
+            text = format_usage_report(index, ["jmorgan/mistral:7b"])
+            if "Deleting the 1 selected models frees" not in text:
+                print(f"❌ Report should show the bytes a deletion frees:\n{text}")
+                return False
+
+        print("✅ Usage report working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Usage report test error: {e}")
+        return False
+
+
+def test_incremental_scan():
+    """Test that only changed manifests are parsed again"""
+    try:
+        from blob_store import BlobStoreIndex
+
+        with tempfile.TemporaryDirectory() as work:
+            models_dir = Path(work) / "models"
+            layers = build_store(models_dir)
+            cache_file = Path(work) / "cache.json"
+            index = BlobStoreIndex(models_dir, cache_file)
+            if index.scan() != 3 or index.scan() != 0:
+                print("❌ An unchanged store should not be parsed again")
+                return False
+
+            # A fresh instance reuses the parses saved to the cache file
+            if BlobStoreIndex(models_dir, cache_file).scan() != 0:
+                print("❌ Cached parses should survive a restart")
+                return False
+
+            # A Settings value such as ~/.ollama/models
+            home = BlobStoreIndex("~/.ollama/models", cache_file)
+            if home.models_dir != Path.home() / ".ollama" / "models":
+                print(f"❌ ~ should expand to the home folder: {home.models_dir}")
+                return False
+
+            # Re-pulled tag: new content and mtime
+            path = write_manifest(
+                models_dir,
+                LIBRARY + ("llama3.2", "3b"),
+                layers["config"],
+                [layers["mistral"]],
+            )
+            os.utime(path, ns=(1, 2_000_000_000))
+            models_dir.joinpath("manifests", *LIBRARY, "llama3.2", "latest").unlink()
+            if index.scan() != 1:
+                print("❌ Only the changed manifest should be parsed")
+                return False
+            if sorted(index.models) != ["jmorgan/mistral:7b", "llama3.2:3b"]:
+                print(
+                    f"❌ Deleted manifests should leave the index: {sorted(index.models)}"
+                )
+                return False
+            if index.layer_models[layers["mistral"]["digest"]] != {
+                "jmorgan/mistral:7b",
+                "llama3.2:3b",
+            }:
+                print("❌ Layer index not rebuilt after the change")
+                return False
+
+        print("✅ Incremental scan working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Incremental scan test error: {e}")
+        return False
+
+
+def main():
+    """Run all blob store tests"""
+    print("💽 Testing ShamaOllama Blob Store Analyzer...")
+    print("=" * 50)
+
+    tests = [
+        test_manifest_names,
+        test_usage_report,
+        test_incremental_scan,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Blob Store Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All blob store tests passed!")
+        return 0
+    else:
+        print("❌ Some blob store tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
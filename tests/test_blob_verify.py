@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Blob verification test script for ShamaOllama
+Tests hashing through mmap and buffered reads, detection of corrupt blobs,
+results cached by (inode, size, mtime), and hashing across a process pool
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def write_blob(models_dir: Path, content: bytes, stored: bytes = None) -> Path:
+    """Store a blob named after content; stored replaces it to corrupt it"""
+    blobs = models_dir / "blobs"
+    blobs.mkdir(parents=True, exist_ok=True)
+    path = blobs / ("sha256-" + hashlib.sha256(content).hexdigest())
+    path.write_bytes(content if stored is None else stored)
+    return path
+
+
+def test_hash_file():
+    """Test mmap and buffered hashing against hashlib"""
+    try:
+        import blob_verify
+
+        with tempfile.TemporaryDirectory() as work:
+            for size in (0, 1, blob_verify.READ_BLOCK + 3):
+                path = Path(work) / f"blob{size}"
+                content = os.urandom(size)
+                path.write_bytes(content)
+                expected = hashlib.sha256(content).hexdigest()
+                if blob_verify.hash_file(str(path)) != expected:
+                    print(f"❌ Wrong digest for {size} bytes")
+                    return False
+
+            # Buffered reads when mmap is unavailable
+            def no_mmap(*args, **kwargs):
+                raise OSError("mmap not supported")
+
+            mmap = blob_verify.mmap.mmap
+            blob_verify.mmap.mmap = no_mmap
+            try:
+                if blob_verify.hash_file(str(path)) != expected:
+                    print("❌ Wrong digest from buffered reads")
+                    return False
+            finally:
+                blob_verify.mmap.mmap = mmap
+
+        print("✅ File hashing working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ File hashing test error: {e}")
+        return False
+
+
+def test_verify_and_cache():
+    """Test corrupt blob detection and re-verification from the cache"""
+    try:
+        from blob_verify import BlobVerifier
+
+        with tempfile.TemporaryDirectory() as work:
+            models_dir = Path(work) / "models"
+            good = write_blob(models_dir, b"weights" * 1000)
+            write_blob(models_dir, b"license")
+            bad = write_blob(models_dir, b"config", stored=b"c0nfig")
+            (models_dir / "blobs" / (good.name + "-partial")).write_bytes(b"x")
+            cache_file = Path(work) / "verified.json"
+
+            result = BlobVerifier(models_dir, cache_file).verify()
+            if result["checked"] != 3 or result["verified"] != 2:
+                print(f"❌ Partial downloads should be skipped: {result}")
+                return False
+            if result["corrupt"] != [bad.name] or result["errors"]:
+                print(f"❌ The corrupt blob should be reported: {result}")
+                return False
+
+            # A fresh instance trusts unchanged blobs, but not the corrupt one
+            verifier = BlobVerifier(models_dir, cache_file)
+            result = verifier.verify()
+            if result["cached"] != 2 or result["checked"] != 1:
+                print(f"❌ Verified blobs should come from the cache: {result}")
+                return False
+
+            # Rewritten in place: same inode and size, new mtime
+            good.write_bytes(b"W" + good.read_bytes()[1:])
+            os.utime(good, ns=(1, 2_000_000_000))
+            result = verifier.verify(["sha256:" + good.name[len("sha256-") :]])
+            if result["checked"] != 1 or result["corrupt"] != [good.name]:
+                print(f"❌ A changed blob should be hashed again: {result}")
+                return False
+
+        print("✅ Verification and cache working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Verification test error: {e}")
+        return False
+
+
+def test_process_pool():
+    """Test hashing in worker processes with progress in bytes/s"""
+    try:
+        import blob_verify
+
+        with tempfile.TemporaryDirectory() as work:
+            models_dir = Path(work) / "models"
+            blobs = [os.urandom(1024 * 1024 + i) for i in range(4)]
+            for content in blobs[:3]:
+                write_blob(models_dir, content)
+            bad = write_blob(models_dir, blobs[3], stored=blobs[3][::-1])
+
+            updates = []
+            pool_min_bytes = blob_verify.POOL_MIN_BYTES
+            blob_verify.POOL_MIN_BYTES = 0
+            try:
+                verifier = blob_verify.BlobVerifier(
+                    models_dir, Path(work) / "verified.json", workers=2
+                )
+                result = verifier.verify(
+                    progress=lambda *update: updates.append(update)
+                )
+            finally:
+                blob_verify.POOL_MIN_BYTES = pool_min_bytes
+
+            total = sum(len(content) for content in blobs)
+            if result["verified"] != 3 or result["corrupt"] != [bad.name]:
+                print(f"❌ Pool results are wrong: {result}")
+                return False
+            if result["bytes"] != total or result["bytes_per_second"] <= 0:
+                print(f"❌ Throughput not reported: {result}")
+                return False
+            if not updates or updates[-1][:2] != (total, total):
+                print(f"❌ Progress should end at the total: {updates}")
+                return False
+
+        print("✅ Process pool working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Process pool test error: {e}")
+        return False
+
+
+def main():
+    """Run all blob verification tests"""
+    print("🛡️ Testing ShamaOllama Blob Verification...")
+    print("=" * 50)
+
+    tests = [
+        test_hash_file,
+        test_verify_and_cache,
+        test_process_pool,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Blob Verify Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All blob verification tests passed!")
+        return 0
+    else:
+        print("❌ Some blob verification tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
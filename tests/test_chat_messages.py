@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Chat message test script for ShamaOllama
+Tests slotted messages, copy-on-write session logs and the JSON round trip
+through ChatManager
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def test_message_compatibility():
+    """Test dict-style access and the JSON form of a message"""
+    try:
+        from chat_messages import Message
+
+        stored = {
+            "role": "assistant",
+            "content": "Shama lama ding dong",
+            "timestamp": "2025-07-28T12:34:56.123456",
+            "model": "llama3.2:latest",
+        }
+        message = Message.from_dict(stored)
+        if message.to_dict() != stored or message["timestamp"] != stored["timestamp"]:
+            print(f"❌ Message did not round-trip: {message.to_dict()}")
+            return False
+        if message["role"] != "assistant" or message.get("missing", 1) != 1:
+            print("❌ Dict-style access broken")
+            return False
+        if hasattr(message, "__dict__"):
+            print("❌ Message should be slotted")
+            return False
+
+        other = Message.from_dict(json.loads(json.dumps(stored)))
+        if other.model is not message.model or other.role is not message.role:
+            print("❌ Role and model strings should be interned")
+            return False
+
+        # Messages from older files may lack fields or carry extra ones
+        legacy = Message.from_dict({"role": "user", "content": "hi", "rating": 5})
+        if legacy.to_dict() != {
+            "role": "user",
+            "content": "hi",
+            "model": "",
+            "rating": 5,
+        }:
+            print(f"❌ Legacy message changed: {legacy.to_dict()}")
+            return False
+
+        print("✅ Message compatibility working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Message compatibility test error: {e}")
+        return False
+
+
+def test_copy_on_write_logs():
+    """Test that snapshots share storage but not later changes"""
+    try:
+        from chat_messages import Message, MessageLog
+
+        log = MessageLog()
+        for i in range(3):
+            log.append(Message("user", f"m{i}"))
+        saved = log.snapshot()
+        if saved._items is not log._items:
+            print("❌ Snapshot should share storage")
+            return False
+
+        log.append(Message("assistant", "m3"))
+        if len(saved) != 3 or len(log) != 4 or saved._items is not log._items:
+            print("❌ Appending to the original should not copy or leak")
+            return False
+
+        saved.append(Message("user", "other"))
+        if [m.content for m in saved] != ["m0", "m1", "m2", "other"]:
+            print("❌ Snapshot append wrong")
+            return False
+        if [m.content for m in log] != ["m0", "m1", "m2", "m3"]:
+            print("❌ Snapshot append leaked into the original")
+            return False
+
+        log.clear()
+        if len(saved) != 4 or len(log) or saved[-1].content != "other":
+            print("❌ Clearing should not affect snapshots")
+            return False
+
+        print("✅ Copy-on-write session logs working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Copy-on-write test error: {e}")
+        return False
+
+
+def test_history_round_trip():
+    """Test that ChatManager keeps the chat_history.json shape"""
+    original_home = os.environ.get("HOME")
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from chat_messages import Message, MessageLog
+            from main import ChatManager
+
+            data_dir = Path(home) / ".shamollama"
+            data_dir.mkdir(exist_ok=True)
+            history_file = data_dir / "chat_history.json"
+            history = [
+                {
+                    "title": "Old chat",
+                    "timestamp": "2025-07-01T09:00:00.000001",
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": "Hi 👋",
+                            "timestamp": "2025-07-01T09:00:00.000001",
+                            "model": "",
+                        },
+                        {
+                            "role": "assistant",
+                            "content": "Hello!",
+                            "timestamp": "2025-07-01T09:00:01.500000",
+                            "model": "llama3.2:latest",
+                        },
+                    ],
+                }
+            ]
+            history_file.write_text(json.dumps(history), encoding="utf-8")
+
+            manager = ChatManager(lazy_history=True, max_history=10)
+            manager.load_history()
+            loaded = manager.chat_history[0]["messages"]
+            if not isinstance(loaded, MessageLog) or not isinstance(loaded[0], Message):
+                print("❌ Loaded messages not converted")
+                return False
+
+            manager.load_session(0)
+            manager.add_message("user", "More", "llama3.2:latest")
+            if len(manager.chat_history[0]["messages"]) != 2:
+                print("❌ Continuing a loaded session changed the saved one")
+                return False
+
+            api_messages = manager.get_messages_for_api()
+            if api_messages[-1] != {"role": "user", "content": "More"}:
+                print(f"❌ Unexpected API messages: {api_messages}")
+                return False
+
+            manager.save_session("Continued")
+            saved = json.loads(history_file.read_text(encoding="utf-8"))
+            if saved[0] != history[0]:
+                print("❌ Existing session changed on save")
+                return False
+            newest = saved[1]["messages"][-1]
+            if set(newest) != {"role", "content", "timestamp", "model"}:
+                print(f"❌ New message has the wrong shape: {newest}")
+                return False
+
+        print("✅ History round trip working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ History round trip test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+
+
+def main():
+    """Run all chat message tests"""
+    print("💬 Testing ShamaOllama Chat Messages...")
+    print("=" * 50)
+
+    tests = [
+        test_message_compatibility,
+        test_copy_on_write_logs,
+        test_history_round_trip,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Chat Message Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All chat message tests passed!")
+        return 0
+    else:
+        print("❌ Some chat message tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Connection monitor test script for ShamaOllama
+Tests backoff, fast re-probing after recovery and latency history
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeClock:
+    """Fake monotonic clock that advances 2.5 ms per reading"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.0025
+        return self.now
+
+
+def make_monitor(results):
+    """Create a monitor whose probe returns the given results in order"""
+    from connection_monitor import ConnectionMonitor
+
+    events = []
+    results = iter(results)
+    monitor = ConnectionMonitor(
+        probe=lambda: next(results),
+        publish=events.append,
+        interval=10.0,
+        fast_interval=2.0,
+        fast_period=30.0,
+        failure_interval=2.0,
+        max_backoff=60.0,
+        clock=FakeClock(),
+    )
+    return monitor, events
+
+
+def test_backoff_while_down():
+    """Test exponential backoff while Ollama is unreachable"""
+    try:
+        monitor, events = make_monitor([False] * 7)
+        delays = [monitor.step() for _ in range(7)]
+
+        if delays != [2.0, 4.0, 8.0, 16.0, 32.0, 60.0, 60.0]:
+            print(f"❌ Unexpected backoff delays: {delays}")
+            return False
+
+        changed = [event["changed"] for event in events]
+        if changed != [True] + [False] * 6:
+            print(f"❌ Only the first failure should be a state change: {changed}")
+            return False
+
+        print("✅ Exponential backoff working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Backoff test error: {e}")
+        return False
+
+
+def test_fast_probe_after_recovery():
+    """Test faster probing for a short period after recovery"""
+    try:
+        monitor, events = make_monitor([False, False, True, True])
+        monitor.step()
+        monitor.step()
+
+        if monitor.step() != 2.0:
+            print("❌ Recovery should switch to the fast interval")
+            return False
+        if not events[-1]["changed"] or not events[-1]["connected"]:
+            print("❌ Recovery not published as a state change")
+            return False
+
+        # Once the fast period is over, the normal interval applies
+        if monitor.next_delay(monitor.recovered_at + 31) != 10.0:
+            print("❌ Normal interval not restored after the fast period")
+            return False
+
+        monitor.step()
+        if events[-1]["changed"]:
+            print("❌ Steady state reported as a change")
+            return False
+
+        print("✅ Fast re-probing after recovery working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Recovery test error: {e}")
+        return False
+
+
+def test_latency_history_and_sparkline():
+    """Test latency history and sparkline rendering"""
+    try:
+        from connection_monitor import render_sparkline
+
+        monitor, events = make_monitor([True, True, False])
+        monitor.step()
+        monitor.step()
+        monitor.step()
+
+        if len(monitor.latency_history) != 2:
+            print("❌ Failed probes should not be recorded as latency")
+            return False
+        if abs(events[0]["latency_ms"] - 2.5) > 0.001:
+            print(f"❌ Unexpected latency: {events[0]['latency_ms']}")
+            return False
+        if events[-1]["latency_ms"] is not None:
+            print("❌ Failed probe should have no latency")
+            return False
+
+        if render_sparkline([1, 5, 9]) != "▁▅█":
+            print(f"❌ Unexpected sparkline: {render_sparkline([1, 5, 9])}")
+            return False
+        if render_sparkline([]) != "" or render_sparkline([3, 3]) != "▁▁":
+            print("❌ Sparkline edge cases not handled")
+            return False
+
+        print("✅ Latency history working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Latency test error: {e}")
+        return False
+
+
+def main():
+    """Run all connection monitor tests"""
+    print("🟢 Testing ShamaOllama Connection Monitor...")
+    print("=" * 50)
+
+    tests = [
+        test_backoff_while_down,
+        test_fast_probe_after_recovery,
+        test_latency_history_and_sparkline,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Connection Monitor Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All connection monitor tests passed!")
+        return 0
+    else:
+        print("❌ Some connection monitor tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
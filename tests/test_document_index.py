@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Document index test script for ShamaOllama
+Tests chunking, incremental re-indexing by mtime and content hash, stale
+row compaction and retrieval into chat requests via the fake Ollama server
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+MODEL = "llama3.2:latest"
+
+
+def write_corpus(folder: Path):
+    """A few small documents plus files the index should ignore"""
+    (folder / "notes").mkdir(parents=True)
+    (folder / "notes" / "garden.md").write_text(
+        "Plant tomato seedlings after the last frost.\n"
+        "Water tomato plants deeply twice a week.\n",
+        encoding="utf-8",
+    )
+    (folder / "gpu.txt").write_text(
+        "Large llama models need more VRAM on the GPU.\n", encoding="utf-8"
+    )
+    (folder / "image.png").write_bytes(b"\x89PNG\0\0")
+    (folder / ".git").mkdir()
+    (folder / ".git" / "config.txt").write_text("hidden tomato", encoding="utf-8")
+
+
+def test_chunking():
+    """Test streamed, line-aligned chunks with byte offsets"""
+    try:
+        from document_index import read_chunks
+
+        with tempfile.TemporaryDirectory() as work:
+            path = Path(work) / "doc.txt"
+            lines = [f"line {i} é\n" for i in range(200)]
+            path.write_text("".join(lines) + "x" * 5000, encoding="utf-8")
+            data = path.read_bytes()
+
+            chunks = list(read_chunks(path, chunk_bytes=300))
+            if sum(size for _, size, _ in chunks) != len(data):
+                print("❌ Chunks should cover the whole file")
+                return False
+            for offset, size, text in chunks:
+                if data[offset : offset + size].decode("utf-8") != text:
+                    print("❌ Offsets do not match the chunk text")
+                    return False
+            line_chunks = [size for _, size, text in chunks if "x" not in text]
+            if not line_chunks or max(line_chunks) > 300 + 20:
+                print("❌ Line-aligned chunks should stay near the target size")
+                return False
+            if max(size for _, size, _ in chunks) > 600:
+                print("❌ A long line should be split")
+                return False
+
+            blank = Path(work) / "blank.txt"
+            blank.write_text("\n\n   \n", encoding="utf-8")
+            if list(read_chunks(blank)):
+                print("❌ Whitespace-only chunks should be skipped")
+                return False
+
+        print("✅ Chunking working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Chunking test error: {e}")
+        return False
+
+
+def test_incremental_reindex():
+    """Test that unchanged, touched and edited files are handled incrementally"""
+    try:
+        from document_index import DocumentIndex
+        from fake_ollama import FakeOllamaServer
+        from main import OllamaAPI
+
+        with FakeOllamaServer() as server, tempfile.TemporaryDirectory() as work:
+            api = OllamaAPI(server.base_url)
+            embedded = []
+            batches = []
+
+            def embed(texts):
+                embedded.extend(texts)
+                batches.append(texts)
+                return api.embed(MODEL, texts)
+
+            corpus = Path(work) / "corpus"
+            write_corpus(corpus)
+            index = DocumentIndex(Path(work) / "index")
+            index.configure(MODEL, embed)
+            index.attach([str(corpus)])
+            if index.refresh() != 2 or len(index.files) != 2:
+                print(f"❌ Expected two text files, got {sorted(index.files)}")
+                return False
+
+            best = index.search("when to plant tomato seedlings", k=1)
+            if not best or not best[0]["path"].endswith("garden.md"):
+                print(f"❌ Wrong chunk retrieved: {best}")
+                return False
+
+            # Same content, new mtime: hashed, not embedded
+            garden = corpus / "notes" / "garden.md"
+            os.utime(garden, ns=(1, 1_000_000_000))
+            reopened = DocumentIndex(Path(work) / "index")
+            reopened.configure(MODEL, embed)
+            embedded.clear()
+            if reopened.refresh() != 0 or embedded:
+                print("❌ A touched but unchanged file should not be embedded")
+                return False
+
+            # Edited and deleted files: only the edit is embedded, old rows go stale
+            garden.write_text("Prune roses in early spring.\n", encoding="utf-8")
+            (corpus / "gpu.txt").unlink()
+            if reopened.refresh() != 1 or embedded != [
+                "Prune roses in early spring.\n"
+            ]:
+                print(f"❌ Only the edited file should be embedded: {embedded}")
+                return False
+            if len(reopened.rows) != 1 or reopened.store.rows != 1:
+                print("❌ Stale rows should have been compacted")
+                return False
+            if reopened.search("tomato frost"):
+                print("❌ Old content should no longer be retrieved")
+                return False
+            if not reopened.search("prune roses spring"):
+                print("❌ New content not retrieved")
+                return False
+
+            # A file without text is indexed without an embedding request
+            (corpus / "blank.txt").write_text("  \n", encoding="utf-8")
+            batches.clear()
+            reopened.refresh()
+            if batches:
+                print(f"❌ Empty files should not be embedded: {batches}")
+                return False
+
+        print("✅ Incremental re-indexing working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Incremental re-indexing test error: {e}")
+        return False
+
+
+def test_context_in_chat_messages():
+    """Test that a chat's relevant chunks follow the personal memory context"""
+    original_home = os.environ.get("HOME")
+    try:
+        from fake_ollama import FakeOllamaServer
+
+        with FakeOllamaServer() as server, tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from document_index import within
+            from main import ChatManager, OllamaAPI
+
+            (Path(home) / ".shamollama").mkdir(exist_ok=True)
+            corpus = Path(home) / "corpus"
+            write_corpus(corpus)
+            api = OllamaAPI(server.base_url)
+            manager = ChatManager()
+            manager.memory_manager.update_memory(name="Ada")
+            index = manager.document_index
+            index.configure(MODEL, lambda texts: api.embed(MODEL, texts), top_k=1)
+
+            manager.add_message("user", "When should I plant tomato seedlings?")
+            if len(manager.get_messages_for_api()) != 2:
+                print("❌ No document context expected before anything is attached")
+                return False
+
+            manager.attach_documents([str(corpus / "notes")])
+            index.wait(10)
+            messages = manager.get_messages_for_api()
+            roles = [message["role"] for message in messages]
+            if roles != ["system", "system", "user"]:
+                print(f"❌ Unexpected message layout: {roles}")
+                return False
+            if "Ada" not in messages[0]["content"]:
+                print("❌ Personal memory context should come first")
+                return False
+            if "[garden.md]" not in messages[1]["content"]:
+                print(f"❌ Relevant excerpt missing: {messages[1]['content']}")
+                return False
+
+            # Documents belong to their chat
+            manager.save_session("Garden")
+            manager.new_session()
+            manager.add_message("user", "When should I plant tomato seedlings?")
+            if len(manager.get_messages_for_api()) != 2:
+                print("❌ Another chat should not get this chat's documents")
+                return False
+            manager.attach_documents([str(corpus / "gpu.txt")])
+            index.wait(10)
+            if "[garden.md]" in str(manager.get_messages_for_api()):
+                print("❌ Excerpts should only come from the chat's own documents")
+                return False
+            manager.detach_documents()
+            if any(within(path, [str(corpus / "gpu.txt")]) for path in index.files):
+                print("❌ Documents no chat uses should leave the index")
+                return False
+
+            manager.open_session(manager.chat_history[-1])
+            if "[garden.md]" not in str(manager.get_messages_for_api()):
+                print("❌ A reopened chat should get its documents back")
+                return False
+
+            # Retrieval failures never block a chat
+            index.embed = lambda texts: api.embed("missing:latest", texts)
+            if len(manager.get_messages_for_api()) != 2:
+                print("❌ A failed retrieval should only drop the excerpts")
+                return False
+
+        print("✅ Document context in chat requests working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Document context test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+
+
+def main():
+    """Run all document index tests"""
+    print("📎 Testing ShamaOllama Document Index...")
+    print("=" * 50)
+
+    tests = [
+        test_chunking,
+        test_incremental_reindex,
+        test_context_in_chat_messages,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Document Index Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All document index tests passed!")
+        return 0
+    else:
+        print("❌ Some document index tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
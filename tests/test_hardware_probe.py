@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Hardware probing test script for ShamaOllama
+Tests cached detection, the static/volatile split, probe merging and the
+sysfs/procfs Linux probe against a fixture tree
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+PCI_IDS = """# Fixture subset of pci.ids
+1002  Advanced Micro Devices, Inc. [AMD/ATI]
+\t744c  Navi 31 [Radeon RX 7900 XT/7900 XTX/7900M]
+\t\t1002 0e3b  Radeon RX 7900 XTX
+10de  NVIDIA Corporation
+\t2684  AD102 [GeForce RTX 4090]
+8086  Intel Corporation
+\t4680  AlderLake-S GT1
+"""
+
+
+def write(root, relative, text):
+    """Write a fixture file, creating parent directories"""
+    path = Path(root) / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def add_pci_device(root, address, device_class, vendor, device, driver, **files):
+    """Create a fake /sys/bus/pci/devices entry"""
+    base = f"sys/bus/pci/devices/{address}"
+    write(root, f"{base}/class", device_class + "\n")
+    write(root, f"{base}/vendor", vendor + "\n")
+    write(root, f"{base}/device", device + "\n")
+    for name, value in files.items():
+        write(root, f"{base}/{name.replace('__', '/')}", f"{value}\n")
+    if driver:
+        target = Path(root) / "sys" / "bus" / "pci" / "drivers" / driver
+        target.mkdir(parents=True, exist_ok=True)
+        os.symlink(target, Path(root) / base / "driver")
+
+
+def make_sysfs_fixture(root):
+    """Build a fixture tree with an AMD, an NVIDIA and a non-GPU device"""
+    write(
+        root,
+        "proc/meminfo",
+        "MemTotal:       65536000 kB\nMemFree:         1000000 kB\n"
+        "MemAvailable:   32768000 kB\nBuffers:          100 kB\n",
+    )
+    cpu = "processor\t: {0}\nmodel name\t: AMD Ryzen 9 7950X\ncpu MHz\t\t: 4500.000\n\n"
+    write(root, "proc/cpuinfo", "".join(cpu.format(i) for i in range(32)))
+    write(
+        root,
+        "proc/driver/nvidia/version",
+        "NVRM version: NVIDIA UNIX x86_64 Kernel Module  550.54.14  Thu Feb 22\n",
+    )
+    write(root, "usr/share/hwdata/pci.ids", PCI_IDS)
+
+    add_pci_device(
+        root,
+        "0000:03:00.0",
+        "0x030000",
+        "0x1002",
+        "0x744c",
+        "amdgpu",
+        mem_info_vram_total=24 * 1024**3,
+        mem_info_vram_used=2 * 1024**3,
+        gpu_busy_percent=37,
+        hwmon__hwmon3__temp1_input=54000,
+    )
+    add_pci_device(root, "0000:01:00.0", "0x030000", "0x10de", "0x2684", "nvidia")
+    add_pci_device(root, "0000:00:02.0", "0x038000", "0x8086", "0x4680", None)
+    add_pci_device(root, "0000:00:1f.3", "0x040300", "0x8086", "0x51c8", None)
+
+
+def make_info(memory_used=0):
+    """Build a GPUInfo without running detection"""
+    from gpu_info import GPUInfo
+
+    info = GPUInfo(detect=False)
+    info.gpu_data = [
+        {
+            "name": "NVIDIA GeForce RTX 4090",
+            "memory_total": 24564,
+            "memory_used": memory_used,
+            "memory_free": 24564 - memory_used,
+            "driver": "550.54",
+            "uuid": "GPU-1",
+            "vendor": "NVIDIA",
+            "load": 0.5,
+        }
+    ]
+    return info
+
+
+def test_cache_ttls():
+    """Test static and volatile TTLs and forced refresh"""
+    try:
+        from gpu_info import GPUInfoCache
+
+        created = []
+        refreshed = []
+
+        def factory():
+            info = make_info()
+            info.refresh_volatile = lambda: refreshed.append(True)
+            created.append(info)
+            return info
+
+        clock = FakeClock()
+        cache = GPUInfoCache(
+            static_ttl=3600, volatile_ttl=5, factory=factory, clock=clock
+        )
+
+        first = cache.get()
+        clock.now = 2
+        if cache.get() is not first or created != [first] or refreshed:
+            print("❌ Fresh cache should be reused without any probing")
+            return False
+
+        clock.now = 6
+        cache.get()
+        if len(created) != 1 or len(refreshed) != 1:
+            print("❌ Volatile TTL should refresh volatile facts only")
+            return False
+
+        clock.now = 3700
+        cache.get()
+        if len(created) != 2:
+            print("❌ Static TTL should re-run full detection")
+            return False
+
+        cache.get(refresh=True)
+        if len(created) != 3:
+            print("❌ Forced refresh should re-run full detection")
+            return False
+
+        print("✅ Detection cache TTLs working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Cache TTL test error: {e}")
+        return False
+
+
+def test_static_volatile_split():
+    """Test that gpu_data merges separately stored static and volatile facts"""
+    try:
+        info = make_info(memory_used=1000)
+
+        if "memory_used" in info.gpu_static[0] or "name" in info.gpu_volatile[0]:
+            print("❌ Static and volatile facts not separated")
+            return False
+
+        gpu = info.gpu_data[0]
+        if gpu["name"] != "NVIDIA GeForce RTX 4090" or gpu["memory_used"] != 1000:
+            print(f"❌ Merged GPU data incorrect: {gpu}")
+            return False
+
+        info.gpu_volatile = [{"memory_used": 2000, "memory_free": 22564}]
+        gpu = info.gpu_data[0]
+        if gpu["memory_used"] != 2000 or gpu["uuid"] != "GPU-1":
+            print("❌ Volatile update not reflected in gpu_data")
+            return False
+
+        print("✅ Static/volatile split working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Static/volatile test error: {e}")
+        return False
+
+
+def test_probe_merge():
+    """Test that concurrent probe results merge in priority order"""
+    try:
+        from gpu_info import GPUInfo
+
+        info = GPUInfo(detect=False)
+        merged = info._merge_gpus(
+            [
+                [{"name": "RTX 4090", "memory_total": 24564, "load": 0.1}],
+                [{"name": "RTX 4090", "memory_total": 0}, {"name": "Intel UHD 770"}],
+            ]
+        )
+        if [gpu["name"] for gpu in merged] != ["RTX 4090", "Intel UHD 770"]:
+            print(f"❌ Unexpected merge result: {merged}")
+            return False
+        if merged[0]["memory_total"] != 24564:
+            print("❌ Higher priority probe should win on duplicate names")
+            return False
+
+        # Identical cards stay separate; later probes only fill in others
+        card = {"name": "NVIDIA GeForce RTX 3090", "vendor": "NVIDIA"}
+        merged = info._merge_gpus(
+            [
+                [dict(card, uuid="GPU-1"), dict(card, uuid="GPU-2")],
+                [
+                    dict(card, pci_bus="0000:01:00.0"),
+                    dict(card, pci_bus="0000:02:00.0"),
+                    {"name": "Intel UHD 770", "pci_bus": "0000:00:02.0"},
+                ],
+            ]
+        )
+        if [gpu.get("uuid") for gpu in merged] != ["GPU-1", "GPU-2", None]:
+            print(f"❌ Two identical GPUs should stay separate: {merged}")
+            return False
+        merged = info._merge_gpus(
+            [
+                [
+                    dict(card, pci_bus="0000:01:00.0"),
+                    dict(card, pci_bus="0000:02:00.0"),
+                ],
+                [
+                    dict(card, pci_bus="0000:02:00.0"),
+                    dict(card, pci_bus="0000:03:00.0"),
+                ],
+            ]
+        )
+        if [gpu["pci_bus"] for gpu in merged] != [
+            "0000:01:00.0",
+            "0000:02:00.0",
+            "0000:03:00.0",
+        ]:
+            print(f"❌ GPUs should be matched by PCI bus: {merged}")
+            return False
+
+        fallback = info._merge_gpus([[], []])
+        if fallback[0]["vendor"] != "Integrated":
+            print("❌ Empty probes should fall back to integrated graphics")
+            return False
+
+        print("✅ Probe merging working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Probe merge test error: {e}")
+        return False
+
+
+def test_sysfs_memory_and_cpu():
+    """Test /proc/meminfo and /proc/cpuinfo parsing"""
+    try:
+        from linux_probe import LinuxSysfsProbe
+
+        with tempfile.TemporaryDirectory() as root:
+            make_sysfs_fixture(root)
+            probe = LinuxSysfsProbe(root)
+
+            memory = probe.memory_gb()
+            if memory != {"total": 62.5, "available": 31.25}:
+                print(f"❌ Unexpected memory: {memory}")
+                return False
+
+            cpu = probe.cpu_info()
+            if cpu != "AMD Ryzen 9 7950X (32 cores @ 4.5GHz)":
+                print(f"❌ Unexpected CPU info: {cpu}")
+                return False
+
+            empty = LinuxSysfsProbe(Path(root) / "missing")
+            if empty.memory_gb()["total"] != 0 or empty.cpu_info() or empty.gpus():
+                print("❌ Missing files should yield empty results")
+                return False
+
+        print("✅ procfs memory and CPU parsing working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ procfs test error: {e}")
+        return False
+
+
+def test_sysfs_gpus():
+    """Test PCI display controller discovery and DRM memory files"""
+    try:
+        from linux_probe import LinuxSysfsProbe
+
+        with tempfile.TemporaryDirectory() as root:
+            make_sysfs_fixture(root)
+            gpus = {gpu["pci_bus"]: gpu for gpu in LinuxSysfsProbe(root).gpus()}
+
+            if sorted(gpus) != ["0000:00:02.0", "0000:01:00.0", "0000:03:00.0"]:
+                print(f"❌ Unexpected display controllers: {sorted(gpus)}")
+                return False
+
+            amd = gpus["0000:03:00.0"]
+            expected = {
+                "name": "AMD Radeon RX 7900 XT/7900 XTX/7900M",
+                "memory_total": 24576,
+                "memory_used": 2048,
+                "memory_free": 22528,
+                "driver": "amdgpu",
+                "vendor": "AMD",
+                "load": 0.37,
+                "temperature": 54.0,
+            }
+            for key, value in expected.items():
+                if amd.get(key) != value:
+                    print(f"❌ AMD {key}: expected {value!r}, got {amd.get(key)!r}")
+                    return False
+
+            nvidia = gpus["0000:01:00.0"]
+            expected = ("NVIDIA GeForce RTX 4090", "550.54.14")
+            if (nvidia["name"], nvidia["driver"]) != expected:
+                print(f"❌ Unexpected NVIDIA entry: {nvidia}")
+                return False
+
+            intel = gpus["0000:00:02.0"]
+            if intel["name"] != "Intel AlderLake-S GT1" or intel["driver"] != "Unknown":
+                print(f"❌ Unexpected Intel entry: {intel}")
+                return False
+
+        print("✅ sysfs GPU discovery working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ sysfs GPU test error: {e}")
+        return False
+
+
+def test_linux_detection_merges_nvidia_smi():
+    """Test that nvidia-smi VRAM is matched to sysfs devices by PCI bus"""
+    try:
+        from gpu_info import GPUInfo
+        from linux_probe import LinuxSysfsProbe
+
+        with tempfile.TemporaryDirectory() as root:
+            make_sysfs_fixture(root)
+            info = GPUInfo(detect=False)
+            info.linux_probe = LinuxSysfsProbe(root)
+            info._detect_nvidia_smi_gpus = lambda: [
+                {
+                    "name": "NVIDIA GeForce RTX 4090",
+                    "memory_total": 24564,
+                    "memory_free": 24564,
+                    "driver": "550.54.14",
+                    "vendor": "NVIDIA",
+                    "pci_bus": "0000:01:00.0",
+                }
+            ]
+            gpus = {gpu["pci_bus"]: gpu for gpu in info._detect_linux_gpus()}
+
+            if gpus["0000:01:00.0"]["memory_total"] != 24564:
+                print("❌ nvidia-smi VRAM not merged into the sysfs entry")
+                return False
+            if len(gpus) != 3:
+                print("❌ Merging should not duplicate devices")
+                return False
+
+        print("✅ nvidia-smi merge working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ nvidia-smi merge test error: {e}")
+        return False
+
+
+def main():
+    """Run all hardware probing tests"""
+    print("🖥️ Testing ShamaOllama Hardware Probing...")
+    print("=" * 50)
+
+    tests = [
+        test_cache_ttls,
+        test_static_volatile_split,
+        test_probe_merge,
+        test_sysfs_memory_and_cpu,
+        test_sysfs_gpus,
+        test_linux_detection_merges_nvidia_smi,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Hardware Probing Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All hardware probing tests passed!")
+        return 0
+    else:
+        print("❌ Some hardware probing tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+History archive test script for ShamaOllama
+Tests the retention policy, compressed archive segments and their use by
+ChatManager
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def make_session(i, now=None):
+    """Numbered session saved i days before now"""
+    now = now or datetime(2025, 7, 28, 12, 0)
+    return {
+        "title": f"Chat {i}",
+        "timestamp": (now - timedelta(days=i)).isoformat(),
+        "messages": [
+            {"role": "user", "content": f"question {i}"},
+            {"role": "assistant", "content": f"answer {i}"},
+        ],
+    }
+
+
+def titles(sessions):
+    """Session titles, for comparisons"""
+    return [session["title"] for session in sessions]
+
+
+def test_retention_policy():
+    """Test the session count, age and size limits"""
+    try:
+        from history_archive import session_size, split_for_retention
+
+        now = datetime(2025, 7, 28, 12, 0)
+        # Oldest first, as in chat_history.json
+        history = [make_session(i, now) for i in range(9, -1, -1)]
+
+        keep, moved = split_for_retention(history, max_sessions=4)
+        if titles(keep) != ["Chat 3", "Chat 2", "Chat 1", "Chat 0"]:
+            print(f"❌ Count limit kept {titles(keep)}")
+            return False
+        if titles(moved) != [f"Chat {i}" for i in range(9, 3, -1)]:
+            print(f"❌ Count limit archived {titles(moved)}")
+            return False
+
+        keep, moved = split_for_retention(history, max_age_days=2, now=now)
+        if titles(keep) != ["Chat 2", "Chat 1", "Chat 0"]:
+            print(f"❌ Age limit kept {titles(keep)}")
+            return False
+
+        limit = session_size(history[-1]) * 2 + 1
+        keep, _ = split_for_retention(history, max_bytes=limit)
+        if titles(keep) != ["Chat 1", "Chat 0"]:
+            print(f"❌ Size limit kept {titles(keep)}")
+            return False
+
+        # The newest session stays even when it alone is over the limits
+        keep, _ = split_for_retention(history, max_age_days=1, max_bytes=1, now=now)
+        if titles(keep) != ["Chat 0"]:
+            print(f"❌ Newest session not kept: {titles(keep)}")
+            return False
+
+        keep, moved = split_for_retention(history)
+        if len(keep) != 10 or moved:
+            print("❌ No limits should keep everything")
+            return False
+
+        print("✅ Retention policy working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Retention policy test error: {e}")
+        return False
+
+
+def test_archive_segments():
+    """Test appending, listing, searching and loading archived sessions"""
+    try:
+        from history_archive import SEGMENT_SESSIONS, HistoryArchive
+
+        for compression in ["gzip", "lzma"]:
+            with tempfile.TemporaryDirectory() as archive_dir:
+                archive = HistoryArchive(Path(archive_dir), compression)
+                total = SEGMENT_SESSIONS + 50
+                sessions = [make_session(i) for i in range(total)]
+                sessions[7]["messages"][0]["content"] = "How do I tune Ollama?"
+                archive.add(sessions[:100])
+                archive.add(sessions[100:])
+
+                if len(archive) != total or len(archive.segments) != 2:
+                    print(f"❌ {compression}: unexpected segments {archive.segments}")
+                    return False
+                suffix = {"gzip": ".jsonl.gz", "lzma": ".jsonl.xz"}[compression]
+                if not archive.segments[0]["file"].endswith(suffix):
+                    print(f"❌ {compression}: unexpected file name")
+                    return False
+
+                # Catalog alone lists the archive, newest appended first
+                reopened = HistoryArchive(Path(archive_dir), compression)
+                entries = reopened.entries()
+                if entries[0]["title"] != f"Chat {total - 1}" or len(entries) != total:
+                    print(f"❌ {compression}: catalog not persisted")
+                    return False
+
+                results = reopened.search("TUNE ollama")
+                if titles(results) != ["Chat 7"] or "tune" not in results[0]["snippet"]:
+                    print(f"❌ {compression}: unexpected search results {results}")
+                    return False
+                if len(reopened.search("answer", limit=5)) != 5:
+                    print(f"❌ {compression}: search limit ignored")
+                    return False
+
+                session = reopened.load_session(results[0]["ref"])
+                if session != sessions[7]:
+                    print(f"❌ {compression}: archived session changed")
+                    return False
+                session = reopened.load_session(entries[0]["ref"])
+                if session != sessions[-1]:
+                    print(f"❌ {compression}: last session not loaded")
+                    return False
+
+        print("✅ Archive segments working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Archive segment test error: {e}")
+        return False
+
+
+def test_interrupted_write():
+    """Test that a segment changed behind the catalog is not appended to"""
+    try:
+        from history_archive import HistoryArchive
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            archive = HistoryArchive(Path(archive_dir))
+            archive.add([make_session(0)])
+            segment = Path(archive_dir) / archive.segments[0]["file"]
+            with open(segment, "ab") as f:
+                f.write(b"\x1f\x8b partial")
+
+            archive.add([make_session(1)])
+            if len(archive.segments) != 2:
+                print("❌ Damaged segment should not be appended to")
+                return False
+            if archive.load_session(archive.entries()[0]["ref"]) != make_session(1):
+                print("❌ Session after the damaged segment not readable")
+                return False
+
+            archive.clear()
+            if len(archive) or list(Path(archive_dir).glob("segment-*")):
+                print("❌ Archive not cleared")
+                return False
+
+        print("✅ Interrupted write handling working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Interrupted write test error: {e}")
+        return False
+
+
+def test_chat_manager_retention():
+    """Test that ChatManager archives past the limits on load and save"""
+    original_home = os.environ.get("HOME")
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from main import ChatManager
+
+            data_dir = Path(home) / ".shamollama"
+            data_dir.mkdir(exist_ok=True)
+            history = [make_session(i) for i in range(30, 0, -1)]
+            (data_dir / "chat_history.json").write_text(json.dumps(history))
+
+            manager = ChatManager(lazy_history=True, max_history=10)
+            manager.load_history()
+            saved = json.loads((data_dir / "chat_history.json").read_text())
+            if titles(saved) != titles(history[-10:]) or len(manager.archive) != 20:
+                print("❌ Oversized history not archived on load")
+                return False
+
+            manager.add_message("user", "Shama lama ding dong")
+            manager.save_session("Newest")
+            if manager.chat_history[-1]["title"] != "Newest":
+                print("❌ Session not saved")
+                return False
+            if len(manager.chat_history) != 10 or len(manager.archive) != 21:
+                print("❌ Retention not applied on save")
+                return False
+
+            manager.set_retention(5, max_bytes=0)
+            if manager.enforce_retention() != 5:
+                print("❌ Lowered limit not enforced")
+                return False
+
+            manager.clear_history()
+            if manager.chat_history or len(manager.archive):
+                print("❌ History and archive not cleared")
+                return False
+
+        print("✅ ChatManager retention working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ ChatManager retention test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+
+
+def test_reopened_sessions():
+    """Test that continuing a stored session does not save copies of it"""
+    original_home = os.environ.get("HOME")
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from main import ChatManager
+
+            data_dir = Path(home) / ".shamollama"
+            data_dir.mkdir(exist_ok=True)
+            history = [make_session(i) for i in range(3, 0, -1)]
+            (data_dir / "chat_history.json").write_text(json.dumps(history))
+
+            manager = ChatManager(lazy_history=True, max_history=10)
+            manager.load_history()
+            manager.open_session(manager.chat_history[0])
+            manager.save_session()
+            manager.new_session()
+            if len(manager.chat_history) != 3:
+                print("❌ An unchanged reopened session should not be saved")
+                return False
+
+            manager.open_session(manager.chat_history[0])
+            manager.add_message("user", "follow-up")
+            manager.save_session()
+            manager.new_session()
+            saved = json.loads((data_dir / "chat_history.json").read_text())
+            if titles(saved) != titles(history) or len(saved[0]["messages"]) != 3:
+                print(f"❌ A continued session should be updated in place: {saved}")
+                return False
+            if saved[0]["timestamp"] != history[0]["timestamp"]:
+                print("❌ A continued session should keep its timestamp")
+                return False
+
+            # Archived sessions can't be updated, so additions save them anew
+            archived = make_session(40)
+            manager.open_session(archived)
+            manager.new_session()
+            manager.open_session(archived)
+            manager.add_message("user", "follow-up")
+            manager.new_session()
+            if titles(manager.chat_history) != titles(history) + ["Chat 40"]:
+                print(f"❌ Continued archive session: {titles(manager.chat_history)}")
+                return False
+
+        print("✅ Reopened sessions working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Reopened session test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+
+
+def main():
+    """Run all history archive tests"""
+    print("📦 Testing ShamaOllama History Archive...")
+    print("=" * 50)
+
+    tests = [
+        test_retention_policy,
+        test_archive_segments,
+        test_interrupted_write,
+        test_chat_manager_retention,
+        test_reopened_sessions,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"History Archive Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All history archive tests passed!")
+        return 0
+    else:
+        print("❌ Some history archive tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Semantic history search test script for ShamaOllama
+Tests the float32 vector store, incremental embedding through /api/embed on
+the fake Ollama server and semantic search wired into ChatManager
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+SESSIONS = [
+    ("Pasta", ["How long should I boil spaghetti?", "About ten minutes."]),
+    ("GPU", ["Which GPU runs llama models fastest?", "More VRAM helps most."]),
+    ("Garden", ["When do I plant tomato seedlings?", "After the last frost."]),
+]
+
+
+def make_sessions():
+    """Saved-session dicts in the chat_history.json shape"""
+    from chat_messages import MessageLog
+
+    sessions = []
+    for i, (title, texts) in enumerate(SESSIONS):
+        messages = [
+            {"role": role, "content": text, "model": "llama3.2:latest"}
+            for role, text in zip(["user", "assistant"], texts)
+        ]
+        sessions.append(
+            {
+                "title": title,
+                "timestamp": f"2025-07-28T12:0{i}:00",
+                "messages": MessageLog.from_dicts(messages),
+            }
+        )
+    return sessions
+
+
+def test_vector_store():
+    """Test appending rows and ranking them by cosine similarity"""
+    try:
+        import vector_store
+        from vector_store import VectorStore
+
+        with tempfile.TemporaryDirectory() as work:
+            store = VectorStore(Path(work) / "vectors.f32")
+            store.append([[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 1.0, 0.0]])
+            if store.rows != 3 or store.path.stat().st_size != 3 * 3 * 4:
+                print("❌ Rows should be stored as float32")
+                return False
+
+            best = store.top_k([3.0, 0.1, 0.0], k=2)
+            if [row for row, _ in best] != [0, 2] or abs(best[0][1] - 0.9994) > 1e-3:
+                print(f"❌ Wrong ranking: {best}")
+                return False
+
+            # A torn write leaves a partial row that the next append drops
+            with open(store.path, "ab") as f:
+                f.write(b"\0\0")
+            store.append([[0.0, 0.0, 5.0]])
+            if store.rows != 4 or store.top_k([0, 0, 1], k=1)[0][0] != 3:
+                print("❌ Partial row not discarded")
+                return False
+
+            if store.top_k([0, 0, 1], k=1, limit=3)[0][0] == 3:
+                print("❌ limit should hide later rows")
+                return False
+
+            try:
+                store.append([[1.0, 2.0]])
+                print("❌ Wrong dimension accepted")
+                return False
+            except ValueError:
+                pass
+
+            # Both query paths agree
+            if vector_store.NUMPY_AVAILABLE:
+                vector_store.NUMPY_AVAILABLE = False
+                try:
+                    fallback = store.top_k([3.0, 0.1, 0.0], k=2)
+                finally:
+                    vector_store.NUMPY_AVAILABLE = True
+                if [row for row, _ in fallback] != [0, 2]:
+                    print(f"❌ Pure Python scan disagrees: {fallback}")
+                    return False
+
+        print("✅ Vector store working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Vector store test error: {e}")
+        return False
+
+
+def test_incremental_embedding():
+    """Test that only new messages are embedded and the index survives reloads"""
+    try:
+        from fake_ollama import FakeOllamaServer
+        from history_search import HistorySemanticIndex
+        from main import OllamaAPI
+
+        with FakeOllamaServer() as server, tempfile.TemporaryDirectory() as work:
+            api = OllamaAPI(server.base_url)
+            model = "llama3.2:latest"
+            embed_calls = []
+
+            def embed(texts):
+                embed_calls.append(len(texts))
+                return api.embed(model, texts)
+
+            index = HistorySemanticIndex(Path(work))
+            index.configure(model, embed)
+            sessions = make_sessions()
+            if index.update(sessions[:2]) != 4 or len(index) != 4:
+                print("❌ First run should embed four messages")
+                return False
+
+            reopened = HistorySemanticIndex(Path(work))
+            reopened.configure(model, embed)
+            embed_calls.clear()
+            if reopened.update(sessions) != 2 or embed_calls != [2]:
+                print(f"❌ Only the new session should be embedded: {embed_calls}")
+                return False
+
+            results = reopened.search("planting tomato seedlings")
+            if not results or results[0]["key"] != sessions[2]["timestamp"]:
+                print(f"❌ Wrong best match: {results}")
+                return False
+            if len({result["key"] for result in results}) != len(results):
+                print("❌ Sessions should appear once")
+                return False
+
+            reopened.configure(
+                "mistral:7b", lambda texts: api.embed("mistral:7b", texts)
+            )
+            if len(reopened):
+                print("❌ Changing the model should drop old vectors")
+                return False
+
+            try:
+                api.embed("missing:latest", ["hi"])
+                print("❌ Unknown embedding model should raise")
+                return False
+            except Exception as e:
+                if "not found" not in str(e):
+                    print(f"❌ Unexpected error: {e}")
+                    return False
+
+        print("✅ Incremental embedding working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Incremental embedding test error: {e}")
+        return False
+
+
+def test_chat_manager_semantic_search():
+    """Test that saving a session indexes it in the background"""
+    original_home = os.environ.get("HOME")
+    try:
+        from fake_ollama import FakeOllamaServer
+
+        with FakeOllamaServer() as server, tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from main import ChatManager, OllamaAPI
+
+            (Path(home) / ".shamollama").mkdir(exist_ok=True)
+            api = OllamaAPI(server.base_url)
+            manager = ChatManager(max_history=2)
+            manager.semantic_index.configure(
+                "llama3.2:latest", lambda texts: api.embed("llama3.2:latest", texts)
+            )
+            for title, texts in SESSIONS:
+                manager.add_message("user", texts[0])
+                manager.add_message("assistant", texts[1], "llama3.2:latest")
+                manager.save_session(title)
+                manager.semantic_index.wait(10)
+                manager.current_session.clear()
+
+            if len(manager.semantic_index) != 6:
+                print(
+                    f"❌ Expected 6 indexed messages, got {len(manager.semantic_index)}"
+                )
+                return False
+
+            archived = manager.semantic_search("boil spaghetti pasta", limit=1)
+            if len(manager.chat_history) != 2 or len(manager.archive) != 1:
+                print("❌ Retention should have archived the first session")
+                return False
+            if (
+                not archived
+                or archived[0]["title"] != "Pasta"
+                or "ref" not in archived[0]
+            ):
+                print(f"❌ Archived session not found by meaning: {archived}")
+                return False
+
+            gpu = manager.semantic_search("fastest GPU for llama", limit=1)
+            if not gpu or gpu[0]["title"] != "GPU" or "GPU" not in gpu[0]["snippet"]:
+                print(f"❌ Hot session not found by meaning: {gpu}")
+                return False
+            if manager.chat_history[gpu[0]["index"]]["title"] != "GPU":
+                print("❌ Result index points at the wrong session")
+                return False
+
+            manager.clear_history()
+            if len(manager.semantic_index) or manager.semantic_search("GPU"):
+                print("❌ Clearing history should clear the index")
+                return False
+
+        print("✅ ChatManager semantic search working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ ChatManager semantic search test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+
+
+def main():
+    """Run all semantic history search tests"""
+    print("🧠 Testing ShamaOllama Semantic History Search...")
+    print("=" * 50)
+
+    tests = [
+        test_vector_store,
+        test_incremental_embedding,
+        test_chat_manager_semantic_search,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Semantic Search Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All semantic search tests passed!")
+        return 0
+    else:
+        print("❌ Some semantic search tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
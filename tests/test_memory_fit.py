@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Memory-fit test script for ShamaOllama
+Tests KV-cache sizing, GPU/CPU placement prediction and the hardware
+recommendations built on them
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+GB = 1024**3
+
+# llama3.2:3b as merged from /api/tags and cached /api/show metadata
+LLAMA_3B = {
+    "name": "llama3.2:latest",
+    "size": 2 * GB,
+    "parameter_size": "3.2B",
+    "quantization": "Q4_K_M",
+    "context_length": 131072,
+    "block_count": 28,
+    "embedding_length": 3072,
+    "head_count": 24,
+    "head_count_kv": 8,
+}
+
+
+def test_kv_cache_size():
+    """Test the KV-cache formula, cache types and context clamping"""
+    try:
+        from memory_fit import estimate_fit, kv_cache_mb
+
+        # 2 (K and V) x 28 layers x 4096 tokens x 8 KV heads x 128 dims x 2 bytes
+        size, exact = kv_cache_mb(LLAMA_3B, 4096, "f16")
+        if size != 448 or not exact:
+            print(f"❌ Unexpected KV cache size: {size} MB")
+            return False
+
+        quantized, _ = kv_cache_mb(LLAMA_3B, 4096, "q8_0")
+        if not 230 < quantized < 240:
+            print(f"❌ q8_0 cache should be about half the size: {quantized} MB")
+            return False
+
+        small = dict(LLAMA_3B, context_length=2048)
+        estimate = estimate_fit(small, 24576, 64, num_ctx=8192, cache_type="f16")
+        if estimate["num_ctx"] != 2048 or estimate["kv_cache_mb"] != 224:
+            print("❌ num_ctx should be clamped to the model's context length")
+            return False
+
+        print("✅ KV-cache sizing working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ KV cache test error: {e}")
+        return False
+
+
+def test_placement():
+    """Test full GPU, partial offload, CPU-only and no-fit predictions"""
+    try:
+        from memory_fit import estimate_fit
+
+        cases = [
+            (8192, 32, 4096, "gpu", 28),
+            (8192, 32, 131072, "partial", 13),
+            (0, 32, 4096, "cpu", None),
+            (2048, 3, 131072, "no_fit", None),
+        ]
+        for vram_mb, ram_gb, num_ctx, placement, gpu_layers in cases:
+            estimate = estimate_fit(LLAMA_3B, vram_mb, ram_gb, num_ctx, "f16")
+            if estimate["placement"] != placement:
+                print(
+                    f"❌ {vram_mb}MB VRAM, {ram_gb}GB RAM, ctx {num_ctx}: "
+                    f"expected {placement}, got {estimate['placement']}"
+                )
+                return False
+            if gpu_layers is not None and estimate["gpu_layers"] != gpu_layers:
+                print(f"❌ Expected {gpu_layers} GPU layers, got {estimate}")
+                return False
+
+        print("✅ Placement prediction working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Placement test error: {e}")
+        return False
+
+
+def test_fallback_without_metadata():
+    """Test estimates from /api/tags details alone"""
+    try:
+        from memory_fit import estimate_fit, fit_badge, parse_parameter_size
+
+        sizes = [parse_parameter_size(text) for text in ["8.0B", "500M", "", "x"]]
+        if sizes != [8.0, 0.5, 0.0, 0.0]:
+            print(f"❌ Unexpected parameter sizes: {sizes}")
+            return False
+
+        tags_entry = {
+            "name": "mistral:7b",
+            "size": 4 * GB,
+            "details": {"parameter_size": "7.2B", "quantization_level": "Q4_0"},
+        }
+        estimate = estimate_fit(tags_entry, 24576, 64, 4096, "f16")
+        if estimate["exact"] or estimate["placement"] != "gpu":
+            print(f"❌ Unexpected fallback estimate: {estimate}")
+            return False
+
+        badge = fit_badge(estimate)
+        if not badge.startswith("🟢 Full GPU") or "KV ~" not in badge:
+            print(f"❌ Approximate badge not marked: {badge}")
+            return False
+
+        print("✅ Metadata fallback working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Fallback test error: {e}")
+        return False
+
+
+def test_recommendations_use_installed_models():
+    """Test that recommendations come from fit estimates, not fixed names"""
+    try:
+        from gpu_info import GPUInfo
+
+        info = GPUInfo(detect=False)
+        info.gpu_data = [{"name": "RTX 4060", "memory_total": 8192}]
+        info.system_ram = 32
+
+        recommendations = info.get_ai_recommendations([LLAMA_3B])
+        text = "\n".join(recommendations["suitable_models"])
+        if "llama2" in text or "codellama" in text:
+            print("❌ Hardcoded model names still recommended")
+            return False
+        if "llama3.2:latest (installed)" not in text:
+            print(f"❌ Installed model that fits not recommended: {text}")
+            return False
+
+        installed = recommendations["installed_models"][0]
+        if "🟢 Full GPU" not in installed or "@ 4096" not in installed:
+            print(f"❌ Installed model missing its badge: {installed}")
+            return False
+
+        print("✅ Fit-based recommendations working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Recommendations test error: {e}")
+        return False
+
+
+def main():
+    """Run all memory-fit tests"""
+    print("🧮 Testing ShamaOllama Memory-Fit Predictor...")
+    print("=" * 50)
+
+    tests = [
+        test_kv_cache_size,
+        test_placement,
+        test_fallback_without_metadata,
+        test_recommendations_use_installed_models,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Memory-Fit Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All memory-fit tests passed!")
+        return 0
+    else:
+        print("❌ Some memory-fit tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
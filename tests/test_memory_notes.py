@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Personal memory notes test script for ShamaOllama
+Tests splitting notes into items, keyword relevance within a token budget
+and the cached memory context of PersonalMemoryManager
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+NOTES = """- I own a 2019 Honda Civic that needs new brakes
+- My daughter Mia plays violin and has recitals in May
+- Our home server runs Proxmox with 64GB RAM and two GPUs
+  (an RTX 3090 and an RTX 4060)
+
+I prefer Rust for systems code but write Python at work.
+Deploys go through GitLab CI."""
+
+
+def test_split_items():
+    """Test that bullets, continuations and paragraphs become items"""
+    try:
+        from memory_notes import split_items
+
+        items = split_items(NOTES)
+        if len(items) != 4:
+            print(f"❌ Expected 4 items, got {items}")
+            return False
+        if not items[2].endswith("RTX 4060)"):
+            print("❌ Indented continuation should stay with its bullet")
+            return False
+        if not items[3].startswith("I prefer Rust") or "GitLab" not in items[3]:
+            print("❌ Paragraph lines should stay together")
+            return False
+        if split_items("") or split_items("\n \n"):
+            print("❌ Blank notes should have no items")
+            return False
+
+        print("✅ Note splitting working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Note splitting test error: {e}")
+        return False
+
+
+def test_relevance_budget():
+    """Test keyword selection within the token budget"""
+    try:
+        from memory_notes import NoteIndex
+
+        index = NoteIndex(NOTES)
+        if index.select("anything", 0) != index.items:
+            print("❌ A budget of 0 should keep every item")
+            return False
+        if index.select("anything", index.total_tokens) != index.items:
+            print("❌ Notes within the budget should be sent whole")
+            return False
+
+        picked = index.select("Which GPUs are in my server?", 30)
+        if len(picked) != 1 or "Proxmox" not in picked[0]:
+            print(f"❌ Expected the server item, got {picked}")
+            return False
+        if index.select("What's the weather like?", 30):
+            print("❌ Unrelated messages should get no notes")
+            return False
+
+        # A large knowledge base still yields a small prompt
+        big = NoteIndex("\n".join(f"- fact {i} about topic{i}" for i in range(5000)))
+        picked = big.select("tell me about topic42 and topic4242", 64)
+        if picked != ["- fact 42 about topic42", "- fact 4242 about topic4242"]:
+            print(f"❌ Wrong items from a large note set: {picked}")
+            return False
+
+        print("✅ Relevance budget working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Relevance budget test error: {e}")
+        return False
+
+
+def test_memory_context_cache():
+    """Test that the compiled context is cached until update_memory"""
+    original_home = os.environ.get("HOME")
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from main import PersonalMemoryManager
+
+            (Path(home) / ".shamollama").mkdir(exist_ok=True)
+            manager = PersonalMemoryManager()
+            manager.update_memory(
+                name="Ada", context_notes=NOTES, system_prompt="Be brief."
+            )
+            full = manager.get_system_context("brakes")
+            expected = (
+                "Personal Context:\n- My name is Ada\n\n"
+                f"Additional Context:\n{NOTES}\n\nInstructions:\nBe brief."
+            )
+            if full != expected:
+                print(f"❌ Context changed for notes within budget:\n{full}")
+                return False
+
+            compiled = manager._compiled
+            manager.get_system_context("violin")
+            if manager._compiled is not compiled:
+                print("❌ Compiled context should be reused")
+                return False
+
+            manager.notes_token_budget = 20
+            filtered = manager.get_system_context("When are Mia's violin recitals?")
+            if "violin" not in filtered or "Civic" in filtered:
+                print(f"❌ Only the relevant note should be sent:\n{filtered}")
+                return False
+
+            manager.update_memory(context_notes="- Mia switched to cello")
+            if "cello" not in manager.get_system_context("Mia"):
+                print("❌ update_memory should invalidate the cache")
+                return False
+
+            manager.update_memory(enabled=False)
+            if manager.get_system_context("Mia"):
+                print("❌ Disabled memory should add no context")
+                return False
+
+        print("✅ Memory context cache working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Memory context cache test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+
+
+def main():
+    """Run all personal memory notes tests"""
+    print("📝 Testing ShamaOllama Personal Memory Notes...")
+    print("=" * 50)
+
+    tests = [
+        test_split_items,
+        test_relevance_budget,
+        test_memory_context_cache,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Memory Notes Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All memory notes tests passed!")
+        return 0
+    else:
+        print("❌ Some memory notes tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Model metadata cache test script for ShamaOllama
+Tests digest-keyed caching of /api/show details and model list change detection
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SHOW_RESPONSE = {
+    "license": "\nLLAMA 3 COMMUNITY LICENSE AGREEMENT\nMore text...",
+    "template": "{{ .System }}\n{{ .Prompt }}",
+    "details": {
+        "parent_model": "",
+        "format": "gguf",
+        "family": "llama",
+        "families": ["llama"],
+        "parameter_size": "8.0B",
+        "quantization_level": "Q4_K_M",
+    },
+    "model_info": {
+        "general.architecture": "llama",
+        "general.parameter_count": 8030261248,
+        "llama.context_length": 8192,
+        "llama.block_count": 32,
+        "llama.embedding_length": 4096,
+        "llama.attention.head_count": 32,
+        "llama.attention.head_count_kv": 8,
+    },
+}
+
+
+def make_models(digest_suffix="a"):
+    """Build a fake /api/tags model list"""
+    return [
+        {"name": "llama3:8b", "digest": "1" * 63 + digest_suffix, "size": 4661224676},
+        {"name": "mistral:7b", "digest": "2" * 64, "size": 4109865159},
+    ]
+
+
+def test_parse_show_response():
+    """Test extraction of fields from /api/show"""
+    try:
+        from model_metadata import ModelMetadataCache, license_summary
+
+        metadata = ModelMetadataCache.parse_show_response(SHOW_RESPONSE)
+        expected = {
+            "parameter_size": "8.0B",
+            "quantization": "Q4_K_M",
+            "context_length": 8192,
+            "head_count_kv": 8,
+            "family": "llama",
+        }
+        for key, value in expected.items():
+            if metadata.get(key) != value:
+                print(f"❌ {key}: expected {value}, got {metadata.get(key)}")
+                return False
+
+        if (
+            license_summary(metadata["license"])
+            != "LLAMA 3 COMMUNITY LICENSE AGREEMENT"
+        ):
+            print("❌ License summary not extracted")
+            return False
+
+        print("✅ /api/show parsing working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Parse test error: {e}")
+        return False
+
+
+def test_sync_fetches_only_new_digests():
+    """Test that sync only calls /api/show for unknown digests"""
+    try:
+        from model_metadata import ModelMetadataCache
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "model_metadata.json"
+            calls = []
+
+            def fetch(name):
+                calls.append(name)
+                return SHOW_RESPONSE
+
+            cache = ModelMetadataCache(cache_file)
+            cache.sync(make_models(), fetch)
+            if len(calls) != 2:
+                print(f"❌ Expected 2 fetches on first sync, got {len(calls)}")
+                return False
+
+            # Same digests: nothing to fetch, even from a fresh instance
+            cache = ModelMetadataCache(cache_file)
+            cache.sync(make_models(), fetch)
+            if len(calls) != 2:
+                print("❌ Unchanged digests were re-fetched")
+                return False
+
+            if cache.get("llama3:8b")["quantization"] != "Q4_K_M":
+                print("❌ Cached metadata not readable after reload")
+                return False
+
+            # Changed digest for one model: only that one is re-fetched
+            cache.sync(make_models(digest_suffix="b"), fetch)
+            if calls[2:] != ["llama3:8b"]:
+                print(f"❌ Unexpected re-fetches: {calls[2:]}")
+                return False
+
+            # An empty list (as from a failed /api/tags) keeps the entries
+            cache.sync([], fetch)
+            cache.sync(make_models(digest_suffix="b"), fetch)
+            if len(calls) != 3:
+                print("❌ An empty model list should not clear the cache")
+                return False
+
+            # Removed models are pruned
+            cache.sync(make_models(digest_suffix="b")[:1], fetch)
+            if cache.get("mistral:7b") is not None:
+                print("❌ Metadata for removed model not pruned")
+                return False
+
+        print("✅ Digest-keyed invalidation working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Sync test error: {e}")
+        return False
+
+
+def test_sync_during_sync():
+    """Test that a model list arriving during a sync is synced afterwards"""
+    try:
+        import threading
+
+        from model_metadata import ModelMetadataCache
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ModelMetadataCache(Path(temp_dir) / "model_metadata.json")
+            release = threading.Event()
+            calls = []
+
+            def fetch(name):
+                calls.append(name)
+                release.wait(5)
+                return SHOW_RESPONSE
+
+            models = make_models()
+            cache.sync_async(models[:1], fetch)
+            # Pulled while the first sync runs
+            cache.sync_async(models, fetch)
+            release.set()
+            cache.wait(5)
+
+            if sorted(calls) != sorted(m["name"] for m in models):
+                print(f"❌ Every model should be fetched once: {calls}")
+                return False
+            if any(cache.get(m["name"]) is None for m in models):
+                print("❌ Metadata missing for a model added during a sync")
+                return False
+
+        print("✅ Coalesced background syncs working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Background sync test error: {e}")
+        return False
+
+
+def test_merged_details():
+    """Test merging tag entries with cached metadata"""
+    try:
+        from model_metadata import ModelMetadataCache
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ModelMetadataCache(Path(temp_dir) / "model_metadata.json")
+            models = make_models()
+
+            merged = cache.merged(models[0])
+            if "parameter_size" in merged or merged["size"] != models[0]["size"]:
+                print("❌ Unfetched model should only have tag fields")
+                return False
+
+            cache.sync(models, lambda name: SHOW_RESPONSE)
+            merged = cache.merged(models[0])
+            if merged.get("parameter_size") != "8.0B":
+                print("❌ Merged details missing metadata")
+                return False
+
+        print("✅ Metadata merging working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Merge test error: {e}")
+        return False
+
+
+def test_inventory_deltas():
+    """Test model inventory change detection"""
+    try:
+        from model_inventory import ModelInventory
+
+        inventory = ModelInventory()
+        deltas = []
+        inventory.subscribe(deltas.append)
+
+        delta = inventory.update(make_models())
+        if [m["name"] for m in delta.added] != ["llama3:8b", "mistral:7b"]:
+            print(f"❌ Unexpected initial delta: {delta}")
+            return False
+
+        # Same names and digests (even reordered): no delta, no notification
+        if inventory.update(list(reversed(make_models()))) is not None:
+            print("❌ Unchanged model list produced a delta")
+            return False
+        if len(deltas) != 1:
+            print("❌ Subscribers notified for an unchanged list")
+            return False
+
+        # One digest changes, one model removed, one added
+        models = make_models(digest_suffix="b")[:1]
+        models.append({"name": "phi3:mini", "digest": "3" * 64, "size": 2176178913})
+        delta = inventory.update(models)
+        if (
+            [m["name"] for m in delta.added] != ["phi3:mini"]
+            or delta.removed != ["mistral:7b"]
+            or [m["name"] for m in delta.updated] != ["llama3:8b"]
+        ):
+            print(f"❌ Unexpected delta: {delta}")
+            return False
+
+        # Late subscribers get the current list as additions
+        late = []
+        inventory.subscribe(late.append)
+        if len(late) != 1 or len(late[0].added) != 2:
+            print("❌ Late subscriber did not receive current models")
+            return False
+
+        print("✅ Model inventory deltas working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Inventory test error: {e}")
+        return False
+
+
+def main():
+    """Run all model metadata tests"""
+    print("📦 Testing ShamaOllama Model Metadata Cache...")
+    print("=" * 50)
+
+    tests = [
+        test_parse_show_response,
+        test_sync_fetches_only_new_digests,
+        test_sync_during_sync,
+        test_merged_details,
+        test_inventory_deltas,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Model Metadata Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All model metadata tests passed!")
+        return 0
+    else:
+        print("❌ Some model metadata tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
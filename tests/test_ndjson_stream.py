@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+NDJSON stream reader test script for ShamaOllama
+Tests line splitting across chunk boundaries and the chat token fast path
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def chat_line(content, done=False, **extra):
+    """Build one Ollama /api/chat stream line"""
+    data = {
+        "model": "llama3.2:latest",
+        "created_at": "2025-07-28T12:00:00Z",
+        "message": {"role": "assistant", "content": content},
+        "done": done,
+    }
+    data.update(extra)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def test_chunk_boundaries():
+    """Test that lines are reassembled regardless of chunk boundaries"""
+    try:
+        from ndjson_stream import NDJSONStreamReader
+
+        stream = b"".join(chat_line(word) for word in ["Hello", " wörld", " 🎸"])
+        stream += b"\n" + chat_line("", done=True, eval_count=3).rstrip(b"\n")
+
+        for size in [1, 2, 7, 64, len(stream)]:
+            chunks = [stream[i : i + size] for i in range(0, len(stream), size)]
+            reader = NDJSONStreamReader(chunks)
+            results = list(reader.iter_chat())
+
+            contents = "".join(content or "" for content, _ in results)
+            if contents != "Hello wörld 🎸":
+                print(f"❌ Chunk size {size}: got {contents!r}")
+                return False
+            if results[-1][1] is None or results[-1][1]["eval_count"] != 3:
+                print(f"❌ Chunk size {size}: final line not fully parsed")
+                return False
+            if reader.lines_read != 4:
+                print(f"❌ Chunk size {size}: blank lines should be skipped")
+                return False
+
+        print("✅ Chunk boundary handling working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Chunk boundary test error: {e}")
+        return False
+
+
+def test_fast_path_matches_json():
+    """Test that the fast path decodes exactly what json.loads would"""
+    try:
+        from ndjson_stream import parse_chat_token
+
+        samples = [
+            "plain",
+            'say "hi"',
+            "line\nbreak\ttab",
+            "back\\slash",
+            "unicode é日 \\u escape",
+            "ends with backslash \\",
+            "",
+        ]
+        for sample in samples:
+            line = chat_line(sample).rstrip(b"\n")
+            if parse_chat_token(line) != sample:
+                print(f"❌ Fast path mismatch for {sample!r}")
+                return False
+
+        # Shapes the fast path must hand back to the full parser
+        fallbacks = [
+            chat_line("x", done=True),
+            b'{"message":{"role":"assistant","content":"a","thinking":"b"},"done":false}',
+            b'{"message":{"role":"assistant","content":"a\\\\","x":"y"},"done":false}',
+            b'{"status":"downloading","total":10,"completed":5}',
+        ]
+        for line in fallbacks:
+            if parse_chat_token(line.rstrip(b"\n")) is not None:
+                print(f"❌ Fast path accepted unexpected shape: {line!r}")
+                return False
+
+        print("✅ Chat token fast path working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Fast path test error: {e}")
+        return False
+
+
+def test_progress_objects():
+    """Test plain object iteration as used by pull_model"""
+    try:
+        from ndjson_stream import NDJSONStreamReader
+
+        stream = (
+            b'{"status":"pulling manifest"}\n'
+            b'{"status":"downloading","total":100,"completed":50}\n'
+            b'{"status":"success"}\n'
+        )
+        statuses = [
+            data["status"] for data in NDJSONStreamReader([stream[:30], stream[30:]])
+        ]
+        if statuses != ["pulling manifest", "downloading", "success"]:
+            print(f"❌ Unexpected statuses: {statuses}")
+            return False
+
+        print("✅ Progress object parsing working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Progress test error: {e}")
+        return False
+
+
+def main():
+    """Run all NDJSON stream tests"""
+    print("⚡ Testing ShamaOllama NDJSON Stream Reader...")
+    print("=" * 50)
+
+    tests = [
+        test_chunk_boundaries,
+        test_fast_path_matches_json,
+        test_progress_objects,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"NDJSON Stream Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All NDJSON stream tests passed!")
+        return 0
+    else:
+        print("❌ Some NDJSON stream tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Model option preset test script for ShamaOllama
+Tests validation and storage of per-model option presets, the options sent
+with chat requests and the auto-tuner sweep via the fake Ollama server
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+MODEL = "llama3.2:latest"
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def test_preset_settings():
+    """Test that presets are validated, saved and removed in settings.json"""
+    try:
+        from settings import SettingsStore
+
+        with tempfile.TemporaryDirectory() as work:
+            settings_file = Path(work) / "settings.json"
+            store = SettingsStore(settings_file)
+            preset = {"num_ctx": 8192, "num_gpu": 20, "temperature": 0.2}
+            store.save(model_options={MODEL: preset, "phi3:latest": {"num_batch": 256}})
+            if SettingsStore(settings_file).current.model_options[MODEL] != preset:
+                print("❌ Preset did not survive a reload")
+                return False
+
+            for bad in (
+                {MODEL: {"num_ctx": 100}},
+                {MODEL: {"num_ctx": "8192"}},
+                {MODEL: {"hide_thinking": True}},
+                {"bad name!": {"num_ctx": 8192}},
+            ):
+                try:
+                    store.save(model_options=bad)
+                    print(f"❌ Invalid preset accepted: {bad}")
+                    return False
+                except ValueError:
+                    pass
+
+            store.save(model_options={MODEL: preset})
+            saved = json.loads(settings_file.read_text(encoding="utf-8"))
+            if list(saved["model_options"]) != [MODEL]:
+                print("❌ Removed presets should be removed from the file")
+                return False
+
+        print("✅ Preset settings working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Preset settings test error: {e}")
+        return False
+
+
+def test_chat_options():
+    """Test that the model preset and per-request overrides are sent"""
+    try:
+        from fake_ollama import FakeOllamaConfig, FakeOllamaServer
+        from main import OllamaAPI
+
+        sent = []
+
+        def option_rate(options):
+            sent.append(options)
+            return 10.0
+
+        config = FakeOllamaConfig(option_rate=option_rate)
+        with FakeOllamaServer(config) as server:
+            api = OllamaAPI(server.base_url)
+            api.chat(MODEL, MESSAGES, hide_thinking=True)
+            if sent[-1] != {}:
+                print(f"❌ No options expected without a preset: {sent[-1]}")
+                return False
+
+            api.model_options = {MODEL: {"num_ctx": 8192, "num_thread": 4}}
+            api.chat(MODEL, MESSAGES, lambda chunk: None)
+            if sent[-1] != {"num_ctx": 8192, "num_thread": 4}:
+                print(f"❌ Preset not sent: {sent[-1]}")
+                return False
+            api.chat(MODEL, MESSAGES, options={"num_thread": 8, "num_predict": 5})
+            if sent[-1] != {"num_ctx": 8192, "num_thread": 8, "num_predict": 5}:
+                print(f"❌ Request options should override the preset: {sent[-1]}")
+                return False
+
+        print("✅ Chat options working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Chat options test error: {e}")
+        return False
+
+
+def test_auto_tuner():
+    """Test the sweep keeps the fastest preset that fits in memory"""
+    try:
+        from fake_ollama import DEFAULT_MODELS, FakeOllamaConfig, FakeOllamaServer
+        from main import OllamaAPI
+        from option_tuner import OptionTuner
+
+        sent = []
+
+        def option_rate(options):
+            sent.append(options)
+            if options.get("num_batch") == 1024:
+                return 0  # Out of memory
+            rate = 10.0 + options.get("num_gpu", 0)
+            return rate * 1.5 if options.get("num_thread") == 4 else rate
+
+        model = dict(DEFAULT_MODELS[MODEL], name=MODEL)
+        with FakeOllamaServer(FakeOllamaConfig(option_rate=option_rate)) as server:
+            api = OllamaAPI(server.base_url)
+            # The saved preset is replaced by the tuned one, so it isn't sent
+            api.model_options = {MODEL: {"num_ctx": 32768}}
+            # About 2.3GB at 4096 tokens, so at most 62% of 28 layers fit
+            tuner = OptionTuner(api, model, vram_mb=2000, ram_gb=16, cpu_count=8)
+            result = tuner.tune()
+
+            if result["options"] != {"num_gpu": 14, "num_thread": 4}:
+                print(f"❌ Wrong preset chosen: {result['options']}")
+                return False
+            if any("num_ctx" in options for options in sent):
+                print("❌ Trials should run with exactly the options they report")
+                return False
+            skipped = [
+                t["options"]["num_gpu"] for t in result["trials"] if t["skipped"]
+            ]
+            if skipped != [28, 21]:
+                print(f"❌ Layer counts that don't fit should be skipped: {skipped}")
+                return False
+            failed = [
+                t["options"].get("num_batch")
+                for t in result["trials"]
+                if t["tokens_per_second"] is None and not t["skipped"]
+            ]
+            if failed != [1024]:
+                print(f"❌ Out-of-memory runs should be recorded as failed: {failed}")
+                return False
+
+            tuner = OptionTuner(api, model, 2000, 16, base_options={"num_batch": 1024})
+            try:
+                tuner.tune()
+                print("❌ A preset that cannot run should raise")
+                return False
+            except RuntimeError:
+                pass
+
+        print("✅ Auto-tuner working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Auto-tuner test error: {e}")
+        return False
+
+
+def main():
+    """Run all model option preset tests"""
+    print("⚙️ Testing ShamaOllama Model Option Presets...")
+    print("=" * 50)
+
+    tests = [
+        test_preset_settings,
+        test_chat_options,
+        test_auto_tuner,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Option Tuner Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All option tuner tests passed!")
+        return 0
+    else:
+        print("❌ Some option tuner tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Quantization comparison test script for ShamaOllama
+Tests variant naming from tags, pulling and measuring variants via the fake
+Ollama server, and picking the fastest variant that fits in memory
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+BASE = "llama3.2:3b-instruct"
+MB = 1024 * 1024
+
+
+def test_variant_names():
+    """Test quantization parsing and the variant list"""
+    try:
+        from quant_compare import quantization_of, related_models, variant_names
+
+        cases = {
+            "llama3.1:8b-instruct-q4_K_M": "q4_K_M",
+            "llama3.1:8b-instruct-fp16": "fp16",
+            "qwen2.5:7b-instruct-iq4_xs": "iq4_xs",
+            "mistral:q8_0": "q8_0",
+            "llama3.2:latest": "",
+            "llama3.2:3b": "",
+        }
+        for name, quant in cases.items():
+            if quantization_of(name) != quant:
+                print(f"❌ {name}: expected {quant!r}, got {quantization_of(name)!r}")
+                return False
+
+        models = [
+            {"name": "llama3.2:3b-instruct-q4_K_M"},
+            {"name": "llama3.2:1b-instruct-q8_0"},
+            {"name": "llama3.2:latest"},
+            {"name": "llama3.20:latest"},
+        ]
+        if [m["name"] for m in related_models(models, "llama3.2")] != [
+            "llama3.2:3b-instruct-q4_K_M",
+            "llama3.2:1b-instruct-q8_0",
+            "llama3.2:latest",
+        ]:
+            print("❌ Related models should share the exact base name")
+            return False
+
+        expected = [f"{BASE}-q5_K_M", f"{BASE}-q8_0", f"{BASE}-q4_K_M"]
+        if variant_names(BASE, ["q5_K_M", " q8_0", ""], models) != expected:
+            print(
+                f"❌ Wrong variants: {variant_names(BASE, ['q5_K_M', 'q8_0'], models)}"
+            )
+            return False
+        if variant_names(f"{BASE}-q4_K_M", ["q8_0"], models) != [
+            f"{BASE}-q8_0",
+            f"{BASE}-q4_K_M",
+        ]:
+            print("❌ A variant name should compare its siblings")
+            return False
+        models.append({"name": "llama3.2:3b-instruct-v2-q8_0"})
+        if variant_names(BASE, [], models) != [f"{BASE}-q4_K_M"]:
+            print("❌ Only quantizations of the same size should be compared")
+            return False
+        for name in ("llama3.2", "llama3.2:latest"):
+            try:
+                variant_names(name, ["q8_0"], models)
+            except ValueError:
+                continue
+            print(f"❌ {name} should ask for a size tag")
+            return False
+
+        print("✅ Variant naming working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Variant naming test error: {e}")
+        return False
+
+
+def test_comparison_run():
+    """Test pulling a missing variant and measuring each with cold loads"""
+    try:
+        from fake_ollama import FakeOllamaServer
+        from main import OllamaAPI
+        from quant_compare import QuantComparison, format_table, variant_names
+
+        with FakeOllamaServer() as server:
+            server.state.add_model(f"{BASE}-q4_K_M", {"size": 2000 * MB})
+            api = OllamaAPI(server.base_url)
+            # Loaded beforehand, so a cold load needs an unload first
+            api.chat(f"{BASE}-q4_K_M", [{"role": "user", "content": "hi"}])
+
+            models = api.get_models()
+            variants = variant_names(BASE, ["q8_0"], models)
+            comparison = QuantComparison(api, variants, ["one", "two"])
+            pulled = []
+            failed = comparison.pull_missing(
+                [m["name"] for m in models], lambda name, data: pulled.append(name)
+            )
+            if failed or set(pulled) != {f"{BASE}-q8_0"}:
+                print(f"❌ Only the missing variant should be pulled: {set(pulled)}")
+                return False
+
+            results = comparison.run(api.get_models())
+            if [r["name"] for r in results] != variants:
+                print(f"❌ Every variant should be measured: {results}")
+                return False
+            for result in results:
+                if result["error"] or result["load_seconds"] != 0.25:
+                    print(f"❌ Expected a clean cold load: {result}")
+                    return False
+                if (
+                    result["memory"] != result["size"]
+                    or not result["tokens_per_second"]
+                ):
+                    print(f"❌ Memory and speed not measured: {result}")
+                    return False
+                if result["ttft_seconds"] is None:
+                    print("❌ Time to first token not measured")
+                    return False
+            if server.state.loaded:
+                print("❌ Variants should be unloaded after their run")
+                return False
+
+            table = format_table(results)
+            if "q8_0" not in table or "2.0GB" not in table:
+                print(f"❌ Table is missing results:\n{table}")
+                return False
+
+        print("✅ Comparison run working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Comparison run test error: {e}")
+        return False
+
+
+def test_recommendation():
+    """Test that the fastest variant within the memory budget is picked"""
+    try:
+        from quant_compare import format_table, memory_budget_mb, recommend
+
+        def result(name, rate, memory_mb, error=None):
+            return {
+                "name": name,
+                "quantization": name.rsplit("-", 1)[-1],
+                "size": memory_mb * MB,
+                "load_seconds": 1.0,
+                "ttft_seconds": 0.1,
+                "tokens_per_second": rate,
+                "memory": memory_mb * MB,
+                "memory_vram": memory_mb * MB,
+                "error": error,
+            }
+
+        results = [
+            result("m:q4_K_M", 40.0, 2500),
+            result("m:q5_K_M", 35.0, 3000),
+            result("m:q8_0", 60.0, 5000),
+            result("m:fp16", None, 9000, error="out of memory"),
+        ]
+        if recommend(results)["name"] != "m:q8_0":
+            print("❌ Without a budget the fastest variant should win")
+            return False
+        budget = memory_budget_mb(vram_mb=4096, ram_gb=32)
+        if recommend(results, budget)["name"] != "m:q4_K_M":
+            print("❌ Variants over the budget should be passed over")
+            return False
+        if recommend(results, 1000) is not None:
+            print("❌ Nothing should be recommended when nothing fits")
+            return False
+        if memory_budget_mb(0, 18) != 16 * 1024:
+            print("❌ Without a GPU the budget should come from RAM")
+            return False
+
+        table = format_table(results, recommend(results, budget)).splitlines()
+        if not table[2].startswith("*") or "failed" not in table[-1]:
+            print("❌ Table should mark the pick and failed variants")
+            return False
+
+        print("✅ Recommendation working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Recommendation test error: {e}")
+        return False
+
+
+def main():
+    """Run all quantization comparison tests"""
+    print("🧪 Testing ShamaOllama Quantization Comparison...")
+    print("=" * 50)
+
+    tests = [
+        test_variant_names,
+        test_comparison_run,
+        test_recommendation,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Quant Compare Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All quantization comparison tests passed!")
+        return 0
+    else:
+        print("❌ Some quantization comparison tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Response cache test script for ShamaOllama
+Tests cache keys, the memory and disk tiers with their eviction, and replay
+of cached responses through OllamaAPI.chat via the fake Ollama server
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+MODEL = "llama3.2:latest"
+MESSAGES = [{"role": "user", "content": "Why is the sky blue?"}]
+
+
+def test_cache_key():
+    """Test that keys are stable and cover digest, messages and options"""
+    try:
+        from response_cache import cache_key
+
+        key = cache_key("sha256:a", MESSAGES, {"temperature": 0, "top_k": 1})
+        if key != cache_key("sha256:a", MESSAGES, {"top_k": 1, "temperature": 0}):
+            print("❌ Option order should not change the key")
+            return False
+        variants = [
+            cache_key("sha256:b", MESSAGES, {"temperature": 0, "top_k": 1}),
+            cache_key("sha256:a", MESSAGES + MESSAGES, {"temperature": 0, "top_k": 1}),
+            cache_key("sha256:a", MESSAGES, {"temperature": 0.7, "top_k": 1}),
+        ]
+        if key in variants or len(set(variants)) != 3:
+            print("❌ Digest, messages and options should all change the key")
+            return False
+
+        print("✅ Cache keys working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Cache key test error: {e}")
+        return False
+
+
+def test_memory_and_disk_tiers():
+    """Test LRU eviction in memory, persistence and the disk byte budget"""
+    try:
+        from response_cache import ResponseCache
+
+        with tempfile.TemporaryDirectory() as work:
+            cache = ResponseCache(Path(work), memory_entries=2)
+            for key in ("a", "b", "c"):
+                cache.put(key, {"content": key * 100, "metrics": {}})
+            if list(cache._memory) != ["b", "c"]:
+                print(f"❌ Memory tier should keep the newest 2: {list(cache._memory)}")
+                return False
+            if cache.get("a")["content"] != "a" * 100 or cache.disk_hits != 1:
+                print("❌ Evicted entries should still be served from disk")
+                return False
+            if cache.get("missing") is not None or cache.misses != 1:
+                print("❌ Unknown keys should miss")
+                return False
+
+            reopened = ResponseCache(Path(work))
+            if reopened.get("c") is None or reopened.stats()["disk_entries"] != 3:
+                print("❌ Disk tier should survive a restart")
+                return False
+
+            # "c" was just used, so "a" and "b" are the least recently used
+            size = reopened.stats()["disk_bytes"] // 3
+            reopened.set_max_disk_bytes(size + 1)
+            if sorted(p.stem for p in Path(work).glob("*.json")) != ["c"]:
+                print("❌ Shrinking the budget should evict least recently used")
+                return False
+
+            reopened.clear()
+            if list(Path(work).glob("*.json")) or reopened.get("c") is not None:
+                print("❌ clear should drop every response")
+                return False
+
+        print("✅ Memory and disk tiers working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Cache tier test error: {e}")
+        return False
+
+
+def test_chat_replay():
+    """Test that repeated chats are replayed without reaching the server"""
+    try:
+        from fake_ollama import FakeOllamaServer
+        from main import OllamaAPI
+        from response_cache import ResponseCache
+
+        with FakeOllamaServer() as server, tempfile.TemporaryDirectory() as work:
+            api = OllamaAPI(server.base_url)
+            api.response_cache = ResponseCache(Path(work))
+
+            # Digests come from the model list; without one nothing is cached
+            api.chat(MODEL, MESSAGES)
+            if api.response_cache.stats()["misses"] != 0:
+                print("❌ Unknown model digests should bypass the cache")
+                return False
+            api.get_models()
+
+            def chats():
+                return sum("/api/chat" in r for r in server.state.requests)
+
+            first = api.chat(MODEL, MESSAGES, lambda chunk: None)
+            sent = chats()
+            chunks, metrics = [], []
+            second = api.chat(MODEL, MESSAGES, chunks.append, False, metrics.append)
+            if second != first or "".join(chunks) != first or chats() != sent:
+                print("❌ Repeated request should be replayed from the cache")
+                return False
+            if not metrics or not metrics[0].get("cached"):
+                print("❌ Replayed metrics should be marked as cached")
+                return False
+
+            api.chat(MODEL, MESSAGES, lambda chunk: None, use_cache=False)
+            if chats() != sent + 1:
+                print("❌ use_cache=False should always ask the server")
+                return False
+
+            api.chat(MODEL, MESSAGES, lambda chunk: None, hide_thinking=True)
+            if chats() != sent + 2:
+                print("❌ Different options should miss the cache")
+                return False
+
+        print("✅ Chat replay working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Chat replay test error: {e}")
+        return False
+
+
+def main():
+    """Run all response cache tests"""
+    print("⚡ Testing ShamaOllama Response Cache...")
+    print("=" * 50)
+
+    tests = [
+        test_cache_key,
+        test_memory_and_disk_tiers,
+        test_chat_replay,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Response Cache Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All response cache tests passed!")
+        return 0
+    else:
+        print("❌ Some response cache tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -203,6 +203,53 @@ def test_sanitization():
         return False
 
 
+def test_precompiled_validators():
+    """Test the combined dangerous-pattern matcher and the validation memo"""
+    try:
+        import re
+
+        from security import security
+
+        samples = [
+            "https://github.com/BlancuzziJ/Ollama-GUI",
+            "JavaScript:alert(1)",
+            "see <SCRIPT src=x>evil()</script> here",
+            "<iframe src=x></iframe>",
+            "DATA:text/html,hi",
+            "plain text about data science",
+            "file://etc/passwd",
+        ]
+        for text in samples:
+            expected = any(
+                re.search(pattern, text.lower(), re.IGNORECASE)
+                for pattern in security.DANGEROUS_PATTERNS
+            )
+            if security.contains_dangerous_patterns(text) != expected:
+                print(f"❌ Combined matcher disagrees on: {text}")
+                return False
+
+        security.clear_validation_cache()
+        for _ in range(3):
+            security.validate_model_name("llama3.2:latest")
+        info = security._model_name_memo.cache_info()
+        if info.hits != 2 or info.maxsize != security.VALIDATION_CACHE_SIZE:
+            print(f"❌ Model name results not memoized: {info}")
+            return False
+
+        long_text = "a" * (security.MAX_MEMOIZED_LENGTH + 1)
+        security.contains_dangerous_patterns(long_text)
+        if security._dangerous_memo.cache_info().currsize != 0:
+            print("❌ Long texts should not be kept in the memo")
+            return False
+
+        print("✅ Precompiled validators working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Precompiled validator test error: {e}")
+        return False
+
+
 def main():
     """Run all security tests"""
     print("🔒 Testing ShamaOllama Security Features...")
@@ -215,6 +262,7 @@ def main():
         test_model_validation,
         test_security_logging,
         test_sanitization,
+        test_precompiled_validators,
     ]
 
     passed = 0
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Security event log test script for ShamaOllama
+Tests JSONL event formatting, the sidecar index and paged, filtered reading
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def write_events(log_file, start, count, types=("Model pull started", "Model deleted")):
+    """Append numbered JSONL events one second apart"""
+    with open(log_file, "a", encoding="utf-8") as f:
+        for i in range(start, start + count):
+            event = {
+                "ts": 1000.0 + i,
+                "time": "2025-07-28T12:00:00",
+                "level": "INFO",
+                "type": types[i % len(types)],
+                "message": f"event {i}",
+            }
+            f.write(json.dumps(event) + "\n")
+
+
+def numbers(events):
+    """Event numbers from their messages"""
+    return [int(event["message"].split()[1]) for event in events]
+
+
+def test_jsonl_events():
+    """Test that security events are written as structured JSON lines"""
+    original_home = os.environ.get("HOME")
+    try:
+        from security_log import JSONLineFormatter, format_event, parse_event
+
+        record = logging.LogRecord("t", logging.WARNING, "", 0, "Blocked", (), None)
+        record.event_type = "Invalid URL blocked"
+        record.details = {"url": "javascript:alert(1)"}
+        event = json.loads(JSONLineFormatter().format(record))
+        if event["type"] != "Invalid URL blocked" or event["level"] != "WARNING":
+            print(f"❌ Unexpected event: {event}")
+            return False
+        if event["details"] != {"url": "javascript:alert(1)"} or "ts" not in event:
+            print(f"❌ Event missing fields: {event}")
+            return False
+
+        legacy = parse_event(b"2025-07-28 12:00:00 - old text line\n", 0)
+        if legacy["type"] != "legacy" or format_event(legacy) != legacy["message"]:
+            print("❌ Text lines from older logs should be kept as-is")
+            return False
+
+        with tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            from security import SecurityValidator
+
+            validator = SecurityValidator()
+            validator.log_security_event("Model pull started", {"model": "llama3.2"})
+            validator.flush_logs()
+            log_file = Path(home) / ".shamollama" / "logs" / "security.log"
+            line = log_file.read_text(encoding="utf-8").splitlines()[-1]
+            validator.stop_logging()
+
+            event = json.loads(line)
+            if event["type"] != "Model pull started" or event["details"] != {
+                "model": "llama3.2"
+            }:
+                print(f"❌ Security event not structured: {line}")
+                return False
+
+        print("✅ JSONL security events working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ JSONL event test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+        from security import security
+
+        security.setup_logging()
+
+
+def test_incremental_index():
+    """Test block summaries, incremental updates and rotation"""
+    try:
+        from security_log import INDEX_BLOCK_EVENTS, SecurityLogIndex
+
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_file = Path(log_dir) / "security.log"
+            write_events(log_file, 0, 600)
+
+            index = SecurityLogIndex(log_file)
+            index.update()
+            counts = [block["count"] for block in index.blocks]
+            if counts != [INDEX_BLOCK_EVENTS, INDEX_BLOCK_EVENTS, 88]:
+                print(f"❌ Unexpected block sizes: {counts}")
+                return False
+            if index.blocks[0]["first"] != 1000.0 or index.blocks[0]["last"] != 1255:
+                print("❌ Block time range not recorded")
+                return False
+
+            write_events(log_file, 600, 10)
+            reloaded = SecurityLogIndex(log_file)
+            if reloaded.indexed_to != index.indexed_to:
+                print("❌ Index not persisted")
+                return False
+            reloaded.update()
+            if reloaded.indexed_to != log_file.stat().st_size:
+                print("❌ Appended events not indexed")
+                return False
+            if [block["count"] for block in reloaded.blocks][-1] != 98:
+                print("❌ Partial block should be extended, not duplicated")
+                return False
+
+            log_file.write_text("")
+            write_events(log_file, 5000, 3)
+            reloaded.update()
+            if reloaded.resets != 1 or reloaded.blocks[0]["count"] != 3:
+                print("❌ Rotated log should be re-indexed from the start")
+                return False
+
+        print("✅ Incremental sidecar index working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Index test error: {e}")
+        return False
+
+
+def test_paged_reading():
+    """Test newest-first pages, filters and tailing"""
+    try:
+        from security_log import SecurityLogReader
+
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_file = Path(log_dir) / "security.log"
+            write_events(log_file, 0, 600)
+            reader = SecurityLogReader(log_file, page_size=250)
+
+            seen = []
+            cursor = None
+            while True:
+                events, cursor = reader.page(cursor)
+                seen.extend(numbers(events))
+                if cursor is None:
+                    break
+            if seen != list(range(599, -1, -1)):
+                print("❌ Pages should cover every event once, newest first")
+                return False
+
+            events, _ = reader.page(event_type="Model deleted", since=1590)
+            if numbers(events) != [599, 597, 595, 593, 591]:
+                print(f"❌ Unexpected filtered events: {numbers(events)}")
+                return False
+
+            # Blocks outside the time range or without the type are skipped
+            first, last = reader.index.blocks[0], reader.index.blocks[-1]
+            if reader.index.block_matches(first, since=1590) or not (
+                reader.index.block_matches(last, "Model deleted", since=1590)
+            ):
+                print("❌ Index should rule out old blocks")
+                return False
+            if reader.index.block_matches(last, event_type="Invalid URL blocked"):
+                print("❌ Index should rule out blocks without the event type")
+                return False
+
+            reader = SecurityLogReader(log_file)
+            _, end = reader.events_after(log_file.stat().st_size)
+            write_events(log_file, 600, 3)
+            events, new_end = reader.events_after(end)
+            if numbers(events) != [602, 601, 600] or new_end <= end:
+                print(f"❌ Tailing returned {numbers(events)}")
+                return False
+
+        print("✅ Paged and filtered reading working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Paged reading test error: {e}")
+        return False
+
+
+def main():
+    """Run all security event log tests"""
+    print("🔍 Testing ShamaOllama Security Event Log...")
+    print("=" * 50)
+
+    tests = [
+        test_jsonl_events,
+        test_incremental_index,
+        test_paged_reading,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Security Event Log Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All security event log tests passed!")
+        return 0
+    else:
+        print("❌ Some security event log tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
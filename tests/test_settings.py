@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Settings test script for ShamaOllama
+Tests validation against the template, saving, reloading on change and
+applying new values to the API client
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def test_template_defaults():
+    """Test that the template and the built-in defaults agree"""
+    try:
+        from settings import Settings, builtin_layout, load_template, validate
+
+        if load_template() != builtin_layout():
+            print("❌ config_template.json and Settings defaults differ")
+            return False
+
+        settings, problems = validate({})
+        if settings != Settings() or problems:
+            print(f"❌ Empty settings should give the defaults: {problems}")
+            return False
+
+        try:
+            settings.max_history = 5
+            print("❌ Settings snapshot should be immutable")
+            return False
+        except AttributeError:
+            pass
+
+        print("✅ Template defaults working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Template defaults test error: {e}")
+        return False
+
+
+def test_validation():
+    """Test that invalid values fall back to defaults with a problem"""
+    try:
+        from settings import validate
+
+        settings, problems = validate(
+            {
+                "ollama_url": "javascript:alert(1)",
+                "max_history": "250",
+                "auto_save": "yes",
+                "theme": "neon",
+                "connection": {"pool_size": 0, "request_timeout": 120},
+                "chat_settings": {"render_interval_ms": 16},
+                "mystery": 1,
+            }
+        )
+        expected = {
+            "ollama_url": "http://localhost:11434",
+            "max_history": 250,  # numbers saved as text by older versions
+            "auto_save": True,
+            "theme": "dark",
+            "pool_size": 4,
+            "request_timeout": 120.0,
+            "render_interval_ms": 16,
+        }
+        for name, value in expected.items():
+            if getattr(settings, name) != value:
+                print(f"❌ {name} = {getattr(settings, name)!r}, expected {value!r}")
+                return False
+
+        flagged = sorted(problem.split(":")[0] for problem in problems)
+        if flagged != ["auto_save", "mystery", "ollama_url", "pool_size", "theme"]:
+            print(f"❌ Unexpected problems: {problems}")
+            return False
+
+        print("✅ Settings validation working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Validation test error: {e}")
+        return False
+
+
+def test_save_and_reload():
+    """Test saving, external edits and subscriber notification"""
+    try:
+        from settings import SettingsStore
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            settings_file = Path(data_dir) / "settings.json"
+            settings_file.write_text(json.dumps({"window_state": "zoomed"}))
+
+            store = SettingsStore(settings_file)
+            changes = []
+            store.subscribe(lambda new, previous: changes.append((new, previous)))
+
+            store.save(max_history=20, request_timeout="90")
+            data = json.loads(settings_file.read_text())
+            if data["max_history"] != 20 or data["connection"]["request_timeout"] != 90:
+                print(f"❌ Settings not written: {data}")
+                return False
+            if data.get("window_state") != "zoomed":
+                print("❌ Unmanaged keys should be preserved")
+                return False
+            if len(changes) != 1 or changes[0][1].max_history != 100:
+                print("❌ Subscribers not told about the saved settings")
+                return False
+
+            try:
+                store.save(pool_size=1000)
+                print("❌ Invalid change should be rejected")
+                return False
+            except ValueError:
+                pass
+            if store.current.pool_size != 4:
+                print("❌ Rejected change should not be applied")
+                return False
+
+            if store.check_for_changes():
+                print("❌ Own save should not count as an external change")
+                return False
+
+            data["connection"]["pool_size"] = 8
+            data["ollama_url"] = "http://127.0.0.1:11435"
+            settings_file.write_text(json.dumps(data, indent=4))
+            if not store.check_for_changes():
+                print("❌ External edit not detected")
+                return False
+            current = store.current
+            if current.pool_size != 8 or current.ollama_url != data["ollama_url"]:
+                print(f"❌ External edit not loaded: {current}")
+                return False
+            if len(changes) != 2:
+                print("❌ Subscribers not told about the external edit")
+                return False
+
+        print("✅ Settings saving and reloading working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Save and reload test error: {e}")
+        return False
+
+
+def test_live_apply_to_api():
+    """Test that the API client picks up a new URL, pool and timeouts"""
+    try:
+        sys.path.insert(0, str(Path(__file__).parent))
+        from fake_ollama import FakeOllamaServer
+        from main import OllamaAPI
+
+        with FakeOllamaServer() as first, FakeOllamaServer() as second:
+            api = OllamaAPI(first.base_url, pool_size=2, connect_timeout=1.0)
+            if not api.test_connection():
+                print("❌ Could not reach the first server")
+                return False
+
+            api.set_base_url(second.base_url)
+            api.set_pool_size(6)
+            api.request_timeout = 30.0
+            adapter = api.session.get_adapter(second.base_url)
+            if adapter._pool_maxsize != 6 or api.base_url != second.base_url:
+                print("❌ New URL or pool size not applied")
+                return False
+            if not api.test_connection():
+                print("❌ Could not reach the second server")
+                return False
+
+            try:
+                api.set_base_url("javascript:alert(1)")
+                print("❌ Invalid URL should be rejected")
+                return False
+            except ValueError:
+                pass
+
+        print("✅ Live settings on the API client working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Live apply test error: {e}")
+        return False
+
+
+def main():
+    """Run all settings tests"""
+    print("⚙️ Testing ShamaOllama Settings...")
+    print("=" * 50)
+
+    tests = [
+        test_template_defaults,
+        test_validation,
+        test_save_and_reload,
+        test_live_apply_to_api,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Settings Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All settings tests passed!")
+        return 0
+    else:
+        print("❌ Some settings tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Startup test script for ShamaOllama
+Tests the startup profiler, deferred imports and background history loading
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeClock:
+    """Fake clock that advances 10 ms per reading"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.01
+        return self.now
+
+
+def test_profiler_report():
+    """Test import timing, phases and milestones"""
+    try:
+        from startup_profiler import StartupProfiler
+
+        sys.modules.pop("colorsys", None)
+        profiler = StartupProfiler(clock=FakeClock())
+        profiler.enable()
+        try:
+            __import__("colorsys")
+        finally:
+            profiler.disable_import_timing()
+
+        with profiler.phase("setup_gui"):
+            pass
+        profiler.mark("first interactive frame")
+
+        if [name for name, _ in profiler.imports] != ["colorsys"]:
+            print(f"❌ Unexpected imports recorded: {profiler.imports}")
+            return False
+        label, seconds = profiler.phases[0]
+        if label != "setup_gui" or abs(seconds - 0.01) > 1e-9:
+            print(f"❌ Unexpected phases: {profiler.phases}")
+            return False
+
+        report = profiler.report()
+        for expected in ["colorsys", "setup_gui", "first interactive frame"]:
+            if expected not in report:
+                print(f"❌ Report missing {expected}")
+                return False
+
+        print("✅ Startup profiler working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Profiler test error: {e}")
+        return False
+
+
+def test_heavy_imports_deferred():
+    """Test that importing main does not import GPU detection"""
+    try:
+        code = "import sys, main; print('gpu_info' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            print(f"❌ Importing main failed: {result.stderr.strip()}")
+            return False
+        if result.stdout.strip() != "False":
+            print("❌ gpu_info should only be imported when the System panel opens")
+            return False
+
+        print("✅ Heavy imports deferred correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Deferred import test error: {e}")
+        return False
+
+
+def test_background_history_load():
+    """Test lazy history loading and that saving waits for it"""
+    original_home = os.environ.get("HOME")
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            os.environ["HOME"] = home
+            data_dir = Path(home) / ".shamollama"
+            data_dir.mkdir()
+            session = {"title": "Old", "timestamp": "2025-07-28T12:00:00"}
+            session["messages"] = [{"role": "user", "content": "hi"}]
+            (data_dir / "chat_history.json").write_text(json.dumps([session]))
+
+            from main import ChatManager
+
+            manager = ChatManager(lazy_history=True)
+            if manager.chat_history or manager.history_loaded.is_set():
+                print("❌ History should not be loaded yet")
+                return False
+
+            loaded = threading.Event()
+            manager.load_history_async(loaded.set)
+            manager.add_message("user", "new")
+            manager.save_session("New")
+
+            titles = [s["title"] for s in manager.chat_history]
+            if titles != ["Old", "New"]:
+                print(f"❌ Saved session clobbered loaded history: {titles}")
+                return False
+
+            if not loaded.wait(5):
+                print("❌ Load callback not called")
+                return False
+
+        print("✅ Background history loading working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ History load test error: {e}")
+        return False
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+
+
+def main():
+    """Run all startup tests"""
+    print("⏱️ Testing ShamaOllama Startup...")
+    print("=" * 50)
+
+    tests = [
+        test_profiler_report,
+        test_heavy_imports_deferred,
+        test_background_history_load,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Startup Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All startup tests passed!")
+        return 0
+    else:
+        print("❌ Some startup tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Telemetry test script for ShamaOllama
+Tests the sampler ring buffer, turn alignment with Ollama timing metrics
+and bottleneck diagnosis
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to find main modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_reading(cpu=10.0, vram_used=4000, load=0.9, temperature=60):
+    """One SystemReader-shaped reading"""
+    return {
+        "cpu_percent": cpu,
+        "ram_used_gb": 12.0,
+        "ram_total_gb": 64.0,
+        "gpus": [
+            {
+                "memory_used": vram_used,
+                "memory_total": 24000,
+                "load": load,
+                "temperature": temperature,
+            }
+        ],
+    }
+
+
+def test_turn_metrics():
+    """Test metric extraction from a final stream line"""
+    try:
+        from telemetry import extract_turn_metrics
+
+        metrics = extract_turn_metrics(
+            {
+                "done": True,
+                "message": {"role": "assistant", "content": ""},
+                "load_duration": 250_000_000,
+                "prompt_eval_count": 50,
+                "prompt_eval_duration": 100_000_000,
+                "eval_count": 200,
+                "eval_duration": 4_000_000_000,
+            }
+        )
+        if "message" in metrics or metrics["eval_count"] != 200:
+            print(f"❌ Unexpected metrics: {metrics}")
+            return False
+        if metrics["tokens_per_second"] != 50.0:
+            print(f"❌ Wrong tokens/s: {metrics['tokens_per_second']}")
+            return False
+        if metrics["prompt_tokens_per_second"] != 500.0:
+            print("❌ Wrong prompt tokens/s")
+            return False
+
+        print("✅ Turn metric extraction working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Turn metrics test error: {e}")
+        return False
+
+
+def test_ring_buffer_and_turns():
+    """Test the bounded buffer and per-turn sample windows"""
+    try:
+        from telemetry import TelemetrySampler
+
+        clock = FakeClock()
+        readings = iter([fake_reading(cpu=c) for c in range(10)])
+        sampler = TelemetrySampler(capacity=4, read=lambda: next(readings), clock=clock)
+
+        for second in range(6):
+            clock.now = float(second)
+            sampler.sample_once()
+        if [s["cpu_percent"] for s in sampler.buffer] != [2, 3, 4, 5]:
+            print("❌ Ring buffer should keep only the newest samples")
+            return False
+
+        # Drive sampling by hand instead of from the background thread
+        sampler.start = lambda: None
+        clock.now = 3.5
+        turn = sampler.begin_turn("llama3.2")
+        clock.now = 6.0
+        sampler.sample_once()
+        report = sampler.end_turn(turn, {"eval_count": 10})
+
+        if [s["cpu_percent"] for s in report["samples"]] != [4, 5, 6]:
+            print("❌ Turn should include only samples taken during it")
+            return False
+        summary = report["summary"]
+        if summary["cpu_percent_max"] != 6 or summary["samples"] != 3:
+            print(f"❌ Unexpected summary: {summary}")
+            return False
+        if list(sampler.turns) != [report]:
+            print("❌ Turn not recorded")
+            return False
+
+        print("✅ Ring buffer and turn alignment working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Ring buffer test error: {e}")
+        return False
+
+
+def test_diagnosis():
+    """Test VRAM spill, CPU offload, thermal and cold load findings"""
+    try:
+        from telemetry import diagnose, summarize
+
+        healthy = summarize([fake_reading(), fake_reading()])
+        if diagnose(healthy, {"load_duration": 100_000_000}):
+            print("❌ Healthy turn should have no findings")
+            return False
+
+        spill = summarize([fake_reading(vram_used=23500)])
+        offload = summarize([fake_reading(cpu=95, load=0.05)])
+        hot = summarize([fake_reading(temperature=88)])
+        cases = [
+            (spill, {}, "VRAM"),
+            (offload, {}, "CPU offload"),
+            (hot, {}, "throttling"),
+            (healthy, {"load_duration": 7_000_000_000}, "cold start"),
+        ]
+        for summary, metrics, expected in cases:
+            findings = diagnose(summary, metrics)
+            if len(findings) != 1 or expected not in findings[0]:
+                print(f"❌ Expected a {expected} finding, got {findings}")
+                return False
+
+        if summarize([])["cpu_percent_avg"] is not None:
+            print("❌ Empty sample list should summarize to None")
+            return False
+
+        print("✅ Bottleneck diagnosis working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Diagnosis test error: {e}")
+        return False
+
+
+def test_proc_stat_cpu_times():
+    """Test CPU busy/total parsing from /proc/stat"""
+    try:
+        from linux_probe import LinuxSysfsProbe
+
+        with tempfile.TemporaryDirectory() as root:
+            stat = Path(root) / "proc" / "stat"
+            stat.parent.mkdir(parents=True)
+            stat.write_text("cpu  100 0 50 800 50 0 0 0 0 0\ncpu0 1 2 3 4\n")
+            times = LinuxSysfsProbe(root).cpu_times()
+
+        if times != (150, 1000):
+            print(f"❌ Unexpected CPU times: {times}")
+            return False
+
+        print("✅ /proc/stat parsing working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ /proc/stat test error: {e}")
+        return False
+
+
+def test_reader_throttles_gputil():
+    """Test that GPUtil is read once per TTL while sysfs is read every sample"""
+    try:
+        from gpu_info import GPUInfo
+        from telemetry import SystemReader
+
+        calls = []
+        info = GPUInfo(detect=False)
+        info.refresh_volatile = lambda gputil=True: calls.append(gputil)
+        clock = FakeClock()
+        reader = SystemReader(info, clock)
+
+        for now in (0.0, 0.5, 1.0, 5.0, 5.5, 10.5):
+            clock.now = now
+            reader()
+        if calls != [True, False, False, True, False, True]:
+            print(
+                f"❌ GPUtil should be read once per {reader.gputil_interval}s: {calls}"
+            )
+            return False
+
+        print("✅ GPUtil throttling working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ GPUtil throttling test error: {e}")
+        return False
+
+
+def test_chat_reports_metrics():
+    """Test that OllamaAPI.chat hands the final line's metrics back"""
+    try:
+        from fake_ollama import FakeOllamaConfig, FakeOllamaServer
+        from main import OllamaAPI
+
+        messages = [{"role": "user", "content": "hi"}]
+        with FakeOllamaServer(FakeOllamaConfig(response_tokens=12)) as server:
+            api = OllamaAPI(server.base_url)
+            for stream_callback in [lambda chunk: None, None]:
+                metrics = {}
+                api.chat(
+                    "llama3.2:latest", messages, stream_callback, False, metrics.update
+                )
+                if (
+                    metrics.get("eval_count") != 12
+                    or "tokens_per_second" not in metrics
+                ):
+                    print(f"❌ Metrics not reported: {metrics}")
+                    return False
+
+        print("✅ Chat metrics reporting working correctly")
+        return True
+
+    except Exception as e:
+        print(f"❌ Chat metrics test error: {e}")
+        return False
+
+
+def main():
+    """Run all telemetry tests"""
+    print("📈 Testing ShamaOllama Telemetry...")
+    print("=" * 50)
+
+    tests = [
+        test_turn_metrics,
+        test_ring_buffer_and_turns,
+        test_diagnosis,
+        test_proc_stat_cpu_times,
+        test_reader_throttles_gputil,
+        test_chat_reports_metrics,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"Telemetry Tests Results: {passed}/{total} passed")
+
+    if passed == total:
+        print("🎉 All telemetry tests passed!")
+        return 0
+    else:
+        print("❌ Some telemetry tests failed. Please review the code.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+On-disk embedding matrix for ShamaOllama
+Vectors are unit-normalised and appended as rows of raw little-endian
+float32 to a single file, so cosine similarity is a dot product and the
+file can be memory-mapped instead of loaded. With NumPy installed a top-k
+query is one matrix-vector product over the mapping; without it the rows
+are scanned in pure Python, which is fine for a few thousand vectors.
+"""
+
+import heapq
+import math
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import AbstractSet, List, Optional, Sequence, Tuple
+
+# NumPy is optional; queries fall back to a pure Python scan without it
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+
+FLOAT_BYTES = 4
+# Rows read per block by the pure Python scan
+SCAN_BLOCK_ROWS = 4096
+BIG_ENDIAN = sys.byteorder == "big"
+
+
+def normalize(vector: Sequence[float]) -> List[float]:
+    """Unit-length copy of vector (zero vectors stay zero)"""
+    norm = math.sqrt(sum(value * value for value in vector))
+    if not norm:
+        return [0.0] * len(vector)
+    return [value / norm for value in vector]
+
+
+def pack_rows(vectors: Sequence[Sequence[float]]) -> bytes:
+    """Rows of little-endian float32"""
+    values = array("f")
+    for vector in vectors:
+        values.extend(normalize(vector))
+    if BIG_ENDIAN:
+        values.byteswap()
+    return values.tobytes()
+
+
+class VectorStore:
+    """Append-only float32 matrix file with top-k cosine queries
+
+    The caller tracks what each row means; rows are numbered from 0 in the
+    order they were appended. Appends and queries may run on different
+    threads.
+    """
+
+    def __init__(self, path: Path, dim: int = 0):
+        self.path = Path(path)
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._matrix = None  # Cached NumPy view, replaced when rows are added
+        self._matrix_rows = 0
+
+    @property
+    def rows(self) -> int:
+        """Complete rows in the file"""
+        if not self.dim:
+            return 0
+        try:
+            return self.path.stat().st_size // (self.dim * FLOAT_BYTES)
+        except OSError:
+            return 0
+
+    def append(self, vectors: Sequence[Sequence[float]]) -> int:
+        """Normalise and append vectors; returns the index of the first one
+
+        The first append fixes the dimension; vectors of any other length
+        raise ValueError.
+        """
+        if not vectors:
+            return self.rows
+        dim = len(vectors[0])
+        if not self.dim:
+            self.dim = dim
+        if any(len(vector) != self.dim for vector in vectors):
+            raise ValueError(f"Expected {self.dim}-dimensional vectors")
+        with self._lock:
+            # Release the mapping first; Windows cannot resize a mapped file
+            self._matrix = None
+            first = self.rows
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                if f.tell() != first * self.dim * FLOAT_BYTES:
+                    # A torn earlier write left a partial row; drop it
+                    f.truncate(first * self.dim * FLOAT_BYTES)
+                f.write(pack_rows(vectors))
+            return first
+
+    def truncate(self, rows: int):
+        """Keep only the first rows"""
+        with self._lock:
+            self._matrix = None
+            if self.path.exists() and self.dim:
+                with open(self.path, "r+b") as f:
+                    f.truncate(rows * self.dim * FLOAT_BYTES)
+
+    def reset(self, dim: int = 0):
+        """Delete every row, optionally changing the dimension"""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.dim = dim
+            self._matrix = None
+
+    def compact(self, keep: Sequence[int]):
+        """Rewrite the file with only the rows in keep, in that order"""
+        with self._lock:
+            self._matrix = None
+            row_bytes = self.dim * FLOAT_BYTES
+            temp_file = self.path.with_suffix(".tmp")
+            with open(self.path, "rb") as source, open(temp_file, "wb") as target:
+                for row in keep:
+                    source.seek(row * row_bytes)
+                    target.write(source.read(row_bytes))
+            temp_file.replace(self.path)
+
+    def _numpy_matrix(self, rows: int):
+        """Read-only memory map of the first rows"""
+        if self._matrix is None or self._matrix_rows != rows:
+            self._matrix = np.memmap(
+                self.path, dtype="<f4", mode="r", shape=(rows, self.dim)
+            )
+            self._matrix_rows = rows
+        return self._matrix
+
+    def top_k(
+        self,
+        query: Sequence[float],
+        k: int = 10,
+        limit: Optional[int] = None,
+        exclude: AbstractSet[int] = frozenset(),
+    ) -> List[Tuple[int, float]]:
+        """(row, cosine similarity) of the k rows closest to query, best first
+
+        limit restricts the search to the first rows, e.g. those the caller
+        has metadata for; rows in exclude are never returned.
+        """
+        with self._lock:
+            rows = self.rows if limit is None else min(limit, self.rows)
+            k = min(k, rows)
+            if k <= 0 or len(query) != self.dim:
+                return []
+            unit = normalize(query)
+            if NUMPY_AVAILABLE:
+                matrix = self._numpy_matrix(rows)
+                scores = matrix @ np.asarray(unit, dtype=np.float32)
+                if exclude:
+                    scores[[row for row in exclude if row < rows]] = -np.inf
+                best = np.argpartition(-scores, k - 1)[:k]
+                best = best[np.argsort(-scores[best])]
+                return [
+                    (int(row), float(scores[row]))
+                    for row in best
+                    if scores[row] > -np.inf
+                ]
+            return self._scan(unit, rows, k, exclude)
+
+    def _scan(
+        self, unit: List[float], rows: int, k: int, exclude: AbstractSet[int]
+    ) -> List[Tuple[int, float]]:
+        """Pure Python top-k, reading the file a block of rows at a time"""
+        dim = self.dim
+        best: List[Tuple[float, int]] = []
+        with open(self.path, "rb") as f:
+            for first in range(0, rows, SCAN_BLOCK_ROWS):
+                count = min(SCAN_BLOCK_ROWS, rows - first)
+                values = array("f")
+                values.fromfile(f, count * dim)
+                if BIG_ENDIAN:
+                    values.byteswap()
+                for offset in range(count):
+                    if first + offset in exclude:
+                        continue
+                    row = values[offset * dim : (offset + 1) * dim]
+                    score = sum(a * b for a, b in zip(row, unit))
+                    item = (score, first + offset)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+        return [(row, score) for score, row in sorted(best, reverse=True)]